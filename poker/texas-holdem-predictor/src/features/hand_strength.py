@@ -1,40 +1,216 @@
-import pandas as pd
+"""
+Lookup-table poker hand evaluator.
+
+Cards are the integer ids of src.utils.cards: rank * 4 + suit, with ranks
+0-12 for 2 through Ace and suits 0-3 for Hearts, Diamonds, Clubs and Spades.
+A hand evaluates to the
+strength of its best five cards, from 1 (7-5-4-3-2 offsuit) to 7462 (royal
+flush); every one of the 7462 distinct 5-card hand values gets its own
+strength, so comparing strengths compares hands.
+
+Evaluation is two table lookups per hand, vectorized over NumPy arrays:
+
+- Ignoring suits, a hand is a multiset of ranks. Sorted ranks r0 <= ... <= rk
+  become the strictly increasing r0 + 0 < r1 + 1 < ..., whose index in the
+  combinatorial number system is a perfect hash; it indexes the best
+  non-flush strength of that multiset.
+- A suit holding five or more of the cards can make a flush. Its 13-bit rank
+  mask indexes the best flush or straight flush among those cards.
+
+The hand's strength is the larger of the two. Tables for 6 and 7 cards are
+derived from the 5-card table by taking the best hand after removing each
+card in turn, so a 7-card hand costs the same two lookups as a 5-card hand
+instead of 21 5-card evaluations.
+"""
+from itertools import combinations, combinations_with_replacement
+from math import comb
+
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report
-from poker import Poker  # hypothetical poker library for hand evaluation
 
-# Load dataset
-data = pd.read_csv('poker_data.csv')
+from src.utils.cards import N_RANKS, N_SUITS
+
+# Hand categories, numbered like the UCI poker-hand CLASS column
+HIGH_CARD, ONE_PAIR, TWO_PAIRS, THREE_OF_A_KIND, STRAIGHT, FLUSH, FULL_HOUSE, FOUR_OF_A_KIND, \
+    STRAIGHT_FLUSH, ROYAL_FLUSH = range(10)
+CATEGORY_NAMES = ['High card', 'One pair', 'Two pairs', 'Three of a kind', 'Straight', 'Flush',
+                  'Full house', 'Four of a kind', 'Straight flush', 'Royal flush']
+
+MAX_STRENGTH = 7462
+MAX_CARDS = 7
+
+_CHUNK_SIZE = 1 << 16
+
+
+def _straight_masks():
+    """Rank masks of the ten straights, lowest (the wheel) first."""
+    wheel = (1 << 12) | 0b1111
+    return [wheel] + [0b11111 << low for low in range(N_RANKS - 4)]
+
+
+def _rank_classes():
+    """
+    All 7462 hand values from weakest to strongest.
+
+    Each value is (category, ranks), where ranks is the multiset of the five
+    card ranks.
+    """
+    straights = _straight_masks()
+    straight_set = set(straights)
+    descending = list(range(N_RANKS - 1, -1, -1))
+
+    distinct = []
+    for combo in combinations(descending, 5):
+        mask = sum(1 << r for r in combo)
+        if mask not in straight_set:
+            distinct.append(combo)
+    distinct.sort()  # Combos are in descending rank order, so tuples compare like hands
+
+    def kickers(exclude, count):
+        return sorted(c for c in combinations([r for r in descending if r not in exclude], count))
+
+    classes = [(HIGH_CARD, combo) for combo in distinct]
+    classes += [(ONE_PAIR, (p, p) + k) for p in range(N_RANKS) for k in kickers({p}, 3)]
+    classes += [(TWO_PAIRS, (hi, hi, lo, lo, k)) for hi in range(N_RANKS) for lo in range(hi)
+                for k in range(N_RANKS) if k not in (hi, lo)]
+    classes += [(THREE_OF_A_KIND, (t, t, t) + k) for t in range(N_RANKS) for k in kickers({t}, 2)]
+    classes += [(STRAIGHT, tuple(r for r in range(N_RANKS) if mask >> r & 1)) for mask in straights]
+    classes += [(FLUSH, combo) for combo in distinct]
+    classes += [(FULL_HOUSE, (t, t, t, p, p)) for t in range(N_RANKS) for p in range(N_RANKS) if p != t]
+    classes += [(FOUR_OF_A_KIND, (q, q, q, q, k)) for q in range(N_RANKS) for k in range(N_RANKS) if k != q]
+    classes += [(STRAIGHT_FLUSH, tuple(r for r in range(N_RANKS) if mask >> r & 1)) for mask in straights]
+    return classes
+
+
+# _COMB_OFFSETS[i, s] = C(s, i + 1): the combinatorial number system term of
+# position i holding the value s.
+_COMB_OFFSETS = np.array([[comb(s, i + 1) for s in range(N_RANKS + MAX_CARDS)] for i in range(MAX_CARDS)],
+                         dtype=np.int32)
+
+
+def _multiset_index(sorted_ranks):
+    """Perfect hash of (n, k) rows of ascending ranks into range(C(12 + k, k))."""
+    k = sorted_ranks.shape[1]
+    index = np.zeros(len(sorted_ranks), dtype=np.int32)
+    for i in range(k):
+        index += _COMB_OFFSETS[i, sorted_ranks[:, i].astype(np.intp) + i]
+    return index
+
+
+def _build_tables():
+    flush = np.zeros(1 << N_RANKS, dtype=np.int16)
+    rank_tables = {5: np.zeros(comb(N_RANKS + 4, 5), dtype=np.int16)}
+    category_starts = np.zeros(ROYAL_FLUSH + 1, dtype=np.int16)
+    previous = None
+    for strength, (category, ranks) in enumerate(_rank_classes(), 1):
+        if category != previous:
+            category_starts[category] = strength
+            previous = category
+        if category in (FLUSH, STRAIGHT_FLUSH):
+            flush[sum(1 << r for r in ranks)] = strength
+        else:
+            rank_tables[5][_multiset_index(np.array([sorted(ranks)]))[0]] = strength
+    category_starts[ROYAL_FLUSH] = MAX_STRENGTH
+
+    # Best flush among six or seven suited cards: the best after dropping one.
+    masks = np.arange(1 << N_RANKS)
+    for n_bits in (6, 7):
+        level = masks[np.bitwise_count(masks) == n_bits]
+        for bit in range(N_RANKS):
+            has_bit = level[(level >> bit) & 1 == 1]
+            flush[has_bit] = np.maximum(flush[has_bit], flush[has_bit ^ (1 << bit)])
+
+    # Best non-flush hand of six or seven ranks: the best after dropping one.
+    for k in (6, MAX_CARDS):
+        multisets = np.array(list(combinations_with_replacement(range(N_RANKS), k)), dtype=np.uint8)
+        best = np.zeros(len(multisets), dtype=np.int16)
+        for drop in range(k):
+            rest = np.delete(multisets, drop, axis=1)
+            best = np.maximum(best, rank_tables[k - 1][_multiset_index(rest)])
+        table = np.zeros(comb(N_RANKS + k - 1, k), dtype=np.int16)
+        table[_multiset_index(multisets)] = best
+        rank_tables[k] = table
+    return flush, rank_tables, category_starts
+
+
+_FLUSH, _RANK_TABLES, _CATEGORY_STARTS = _build_tables()
+
+
+def _evaluate_chunk(cards):
+    ranks = cards >> 2
+    suits = cards & 3
+    strength = _RANK_TABLES[cards.shape[1]][_multiset_index(np.sort(ranks, axis=1))]
+    # At most one suit can hold five of seven cards, so the suit masks are
+    # only built for hands where some suit does.
+    suit_counts = np.stack([np.count_nonzero(suits == s, axis=1) for s in range(N_SUITS)], axis=1)
+    flush_suit = suit_counts.argmax(axis=1)
+    has_flush = suit_counts.max(axis=1) >= 5
+    if has_flush.any():
+        in_suit = suits[has_flush] == flush_suit[has_flush, np.newaxis]
+        bits = np.where(in_suit, np.left_shift(1, ranks[has_flush], dtype=np.int32), 0)
+        strength[has_flush] = np.maximum(strength[has_flush], _FLUSH[bits.sum(axis=1)])
+    return strength
+
+
+def evaluate(cards):
+    """
+    Evaluates poker hands.
+
+    Args:
+        cards: Card ids, an (n, k) array of n hands of k = 5, 6 or 7 cards, or
+            a single hand of k cards.
+
+    Returns:
+        int16 hand strengths (higher is better): an (n,) array, or a scalar
+        for a single hand. Hands of more than five cards score their best
+        five cards.
+    """
+    cards = np.asarray(cards)
+    if cards.ndim == 1:
+        return evaluate(cards[np.newaxis])[0]
+    n_cards = cards.shape[1]
+    if n_cards not in _RANK_TABLES:
+        raise ValueError(f"Hands must have 5, 6 or 7 cards, got {n_cards}")
+    cards = cards.astype(np.uint8, copy=False)
+    strength = np.empty(len(cards), dtype=np.int16)
+    for start in range(0, len(cards), _CHUNK_SIZE):
+        strength[start:start + _CHUNK_SIZE] = _evaluate_chunk(cards[start:start + _CHUNK_SIZE])
+    return strength
+
 
-# Feature engineering
-def encode_hand(hand):
-    # One-hot encode the hand
-    # Example: hand = ['AS', 'KH', '2D', '3C', '4H']
-    # Create a binary vector of length 52
-    # Return the one-hot encoded vector
-    pass
+def hand_category(strength):
+    """
+    Hand categories (HIGH_CARD ... ROYAL_FLUSH) of evaluate() strengths.
 
-data['encoded_hand'] = data['hand'].apply(encode_hand)
+    The categories are numbered like the UCI poker-hand CLASS labels.
+    """
+    return (np.searchsorted(_CATEGORY_STARTS, strength, side='right') - 1).astype(np.uint8)
 
-# Calculate hand strength
-data['hand_strength'] = data.apply(lambda row: Poker.evaluate_hand(row['encoded_hand']), axis=1)
 
-# Positional information
-data['position'] = data['position'].map({'early': 0, 'middle': 1, 'late': 2})
+if __name__ == '__main__':
+    import os
+    import time
 
-# Prepare features and labels
-X = data[['encoded_hand', 'hand_strength', 'position']]
-y = data['outcome']  # Assuming 'outcome' is the target variable
+    from src.utils.cards import parse_cards, uci_to_cards
+    from src.utils.data_loader import load_poker_hands, TRAINING_PATH, TESTING_PATH
 
-# Split the data
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    for hand in ('AS KS QS JS TS', 'AH AD AC AS 2D', '5D 4C 3H 2S AH', 'AS AD KH KC QS JD 2C'):
+        strength = evaluate(parse_cards(hand))
+        print(f"{hand}: strength {strength}, {CATEGORY_NAMES[hand_category(strength)]}")
 
-# Train the model
-model = RandomForestClassifier()
-model.fit(X_train, y_train)
+    for path in (TRAINING_PATH, TESTING_PATH):
+        uci_cards, _ = load_poker_hands(path)
+        if uci_cards is None:
+            continue
+        cards = uci_to_cards(uci_cards)
+        start = time.perf_counter()
+        evaluate(cards)
+        elapsed = time.perf_counter() - start
+        print(f"{os.path.basename(path)}: {len(cards)} hands in {elapsed * 1000:.1f} ms "
+              f"({len(cards) / elapsed / 1e6:.1f}M hands/s)")
 
-# Evaluate the model
-y_pred = model.predict(X_test)
-print(classification_report(y_test, y_pred))
\ No newline at end of file
+    rng = np.random.default_rng(0)
+    sevens = np.argsort(rng.random((1_000_000, 52)), axis=1)[:, :7].astype(np.uint8)
+    start = time.perf_counter()
+    evaluate(sevens)
+    elapsed = time.perf_counter() - start
+    print(f"7-card hands: {len(sevens) / elapsed / 1e6:.2f}M hands/s")
@@ -1,4 +1,100 @@
-import pandas as pd
+"""
+Card feature matrices for the poker model.
 
-   # Load your dataset
-df = pd.read_csv('poker_data.csv')
\ No newline at end of file
+Each hand becomes one uint8 row: 52 one-hot card columns in deck order
+(2H, 2D, ..., AS), optionally followed by 13 rank counts and 4 suit counts.
+The counts make pairs, trips and flushes visible to the model without it
+having to learn them from card combinations. Rows are built for all hands
+at once: the one-hot block is a single scatter (or, for a sparse matrix,
+just the sorted card ids as CSR column indices) and each histogram is one
+bincount. The million-row UCI testing set takes about 70 MB dense; as CSR,
+the one-hot block alone takes less than 30 MB.
+"""
+import numpy as np
+
+from src.utils.cards import CARD_NAMES, N_CARDS, N_RANKS, N_SUITS, RANK_CHARS, SUIT_CHARS, cards_to_one_hot
+
+FEATURE_NAMES = CARD_NAMES + [f'rank_{r}' for r in RANK_CHARS] + [f'suit_{s}' for s in SUIT_CHARS]
+
+
+def one_hot_cards(cards, sparse=False):
+    """
+    One-hot matrix of hands.
+
+    Args:
+        cards: (n, k) card ids; the cards of a hand must be distinct.
+        sparse: Return a scipy.sparse CSR matrix instead of a dense array.
+
+    Returns:
+        An (n, 52) uint8 matrix.
+    """
+    cards = np.asarray(cards, dtype=np.intp)
+    if not sparse:
+        return cards_to_one_hot(cards)
+    from scipy import sparse as sp
+
+    n, k = cards.shape
+    indices = np.sort(cards, axis=1).ravel()
+    indptr = np.arange(0, n * k + 1, k)
+    return sp.csr_matrix((np.ones(n * k, dtype=np.uint8), indices, indptr), shape=(n, N_CARDS))
+
+
+def _histogram(values, n_bins):
+    # One bincount over row-offset bins counts every row at once
+    n = len(values)
+    offsets = (np.arange(n)[:, np.newaxis] * n_bins + values).ravel()
+    return np.bincount(offsets, minlength=n * n_bins).astype(np.uint8).reshape(n, n_bins)
+
+
+def rank_counts(cards):
+    """(n, 13) uint8 count of each rank, 2 through Ace, in each hand."""
+    return _histogram(np.asarray(cards, dtype=np.intp) >> 2, N_RANKS)
+
+
+def suit_counts(cards):
+    """(n, 4) uint8 count of each suit (Hearts, Diamonds, Clubs, Spades) in each hand."""
+    return _histogram(np.asarray(cards, dtype=np.intp) & 3, N_SUITS)
+
+
+def build_features(cards, sparse=False, histograms=True):
+    """
+    Feature matrix of hands.
+
+    Args:
+        cards: (n, k) card ids.
+        sparse: Return a scipy.sparse CSR matrix instead of a dense array.
+        histograms: Append the rank and suit counts to the one-hot columns.
+
+    Returns:
+        An (n, 69) uint8 matrix with columns FEATURE_NAMES, or (n, 52)
+        without histograms.
+    """
+    one_hot = one_hot_cards(cards, sparse=sparse)
+    if not histograms:
+        return one_hot
+    counts = np.hstack([rank_counts(cards), suit_counts(cards)])
+    if not sparse:
+        return np.hstack([one_hot, counts])
+    from scipy import sparse as sp
+
+    return sp.hstack([one_hot, sp.csr_matrix(counts)], format='csr', dtype=np.uint8)
+
+
+if __name__ == '__main__':
+    import time
+
+    from src.utils.cards import uci_to_cards
+    from src.utils.data_loader import load_poker_hands, TRAINING_PATH
+
+    uci_cards, labels = load_poker_hands(TRAINING_PATH)
+    cards = uci_to_cards(uci_cards)
+    # Stand-in for the million-row testing set: the training hands repeated
+    cards = np.tile(cards, (1_000_000 // len(cards) + 1, 1))[:1_000_000]
+    for sparse in (False, True):
+        start = time.perf_counter()
+        features = build_features(cards, sparse=sparse)
+        elapsed = time.perf_counter() - start
+        size = features.nbytes if not sparse else features.data.nbytes + features.indices.nbytes + \
+            features.indptr.nbytes
+        print(f"{'sparse' if sparse else 'dense'}: {features.shape} in {elapsed * 1000:.0f} ms, {size / 1e6:.0f} MB")
+    print(dict(zip(FEATURE_NAMES[N_CARDS:], build_features(cards[:1])[0, N_CARDS:].tolist())))
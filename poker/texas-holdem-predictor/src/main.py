@@ -5,32 +5,26 @@ from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import classification_report
 from sklearn.preprocessing import OneHotEncoder
 
+from src.features.one_hot_encoding import build_features
+from src.monte_carlo.monte_carlo_simulation import equity_for_frame
+from src.utils.cards import strings_to_cards
+
 # Load dataset
 data = pd.read_csv('poker_data.csv')
 
 # Feature engineering
-def encode_hand(hand):
-    # One-hot encoding for cards
-    # Example: hand = ['AS', 'KH']
-    # Create a binary vector of size 52
-    card_vector = np.zeros(52)
-    for card in hand:
-        index = card_to_index(card)  # Implement this function
-        card_vector[index] = 1
-    return card_vector
-
-# Apply encoding to hands
-data['encoded_hand'] = data['hand'].apply(encode_hand)
+# One-hot cards plus rank and suit counts for all hands at once, e.g. hand = ['AS', 'KH']
+hand_features = build_features(strings_to_cards(data['hand'].tolist()))
 
 # Calculate hand strength and other features
 data['hand_strength'] = data.apply(calculate_hand_strength, axis=1)  # Implement this function
 data['position'] = encode_position(data['position'])  # Implement this function
 
-# Monte Carlo Simulation
-data['winning_probability'] = data.apply(run_monte_carlo_simulation, axis=1)  # Implement this function
+# Equity: preflop table lookups, exact enumeration for small spots, batched simulation otherwise
+data['winning_probability'] = equity_for_frame(data, hole_column='hand', seed=42)
 
 # Prepare features and labels
-X = np.array(data[['encoded_hand', 'hand_strength', 'position', 'winning_probability']].tolist())
+X = np.hstack([hand_features, data[['hand_strength', 'position', 'winning_probability']].to_numpy()])
 y = data['outcome']  # Assuming 'outcome' is the target variable
 
 # Split the data
@@ -1,4 +1,24 @@
-import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import classification_report
 
-   # Load your dataset
-data = pd.read_csv('poker_data.csv')
\ No newline at end of file
+from src.features.one_hot_encoding import build_features
+from src.utils.cards import uci_to_cards
+from src.utils.data_loader import load_poker_hands, TRAINING_PATH, TESTING_PATH
+
+# Load the UCI poker-hand datasets (parsed once, then memory-mapped from the .npy cache)
+uci_train, y_train = load_poker_hands(TRAINING_PATH)
+if uci_train is None:
+    raise SystemExit(f"Could not load training hands from {TRAINING_PATH}")
+uci_test, y_test = load_poker_hands(TESTING_PATH)
+
+# One-hot cards plus rank and suit counts; pass sparse=True for a CSR matrix
+X_train = build_features(uci_to_cards(uci_train))
+
+# Train the model
+model = RandomForestClassifier()
+model.fit(X_train, y_train)
+
+# Evaluate the model on the testing set when it is available
+if uci_test is not None:
+    y_pred = model.predict(build_features(uci_to_cards(uci_test)))
+    print(classification_report(y_test, y_pred))
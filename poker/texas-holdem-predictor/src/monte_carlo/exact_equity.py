@@ -0,0 +1,249 @@
+"""
+Exact equity by enumeration, and the precomputed preflop equity table.
+
+When few cards are left to come, every possible deal can be enumerated:
+heads-up on the turn there are 46 rivers times 990 opponent hands, which is
+cheaper than a 10,000 trial simulation and has no sampling error.
+
+Preflop there are far too many deals to enumerate, but only 169 distinct
+starting hands once suits are treated as interchangeable: 13 pairs, 78
+suited and 78 offsuit hands. Their equities against one to
+PREFLOP_MAX_OPPONENTS random hands are precomputed once, stored in
+preflop_equity.npy next to this module, and looked up in O(1). The table is
+not exact: each entry is a PREFLOP_TABLE_TRIALS (50,000) trial simulation,
+with a standard error of at most sqrt(0.25 / 50,000), about 0.002.
+"""
+import os
+from itertools import combinations
+from math import comb, factorial
+
+import numpy as np
+import pandas as pd
+
+from src.features.hand_strength import evaluate
+from src.utils.cards import N_RANKS, RANK_CHARS, cards_to_masks
+from src.monte_carlo.monte_carlo_simulation import (
+    to_cards, showdown_share, equity_for_frame, DECK_SIZE, BOARD_SIZE,
+)
+
+# Spots with more possible deals than this are simulated instead
+MAX_EXACT_DEALS = 100_000
+
+N_PREFLOP_CLASSES = N_RANKS * N_RANKS
+PREFLOP_MAX_OPPONENTS = 8
+PREFLOP_TABLE_TRIALS = 50_000
+PREFLOP_TABLE_PATH = os.path.join(os.path.dirname(__file__), 'preflop_equity.npy')
+
+_preflop_tables = {}
+
+
+def count_deals(n_board_cards, n_opponents):
+    """Number of distinct deals of the unseen cards for a spot with n_board_cards known."""
+    unseen = DECK_SIZE - 2 - n_board_cards
+    n_missing = BOARD_SIZE - n_board_cards
+    boards = comb(unseen, n_missing)
+    # Unordered sets of n_opponents disjoint two-card hands
+    hands = comb(unseen - n_missing, 2 * n_opponents) * factorial(2 * n_opponents) \
+        // (2 ** n_opponents * factorial(n_opponents))
+    return boards * hands
+
+
+def _opponent_hands(n_cards, n_opponents):
+    """(m, n_opponents, 2) indices of every unordered set of disjoint two-card hands."""
+    holes = np.array(list(combinations(range(n_cards), 2)), dtype=np.intp)
+    hole_masks = cards_to_masks(holes)
+    sets = np.arange(len(holes))[:, np.newaxis]
+    masks = hole_masks
+    for _ in range(n_opponents - 1):
+        # Extend each set with a later, disjoint hand so every set appears once
+        later = np.arange(len(holes))[np.newaxis, :] > sets[:, -1:]
+        disjoint = (masks[:, np.newaxis] & hole_masks[np.newaxis, :]) == 0
+        set_index, hole_index = np.nonzero(later & disjoint)
+        sets = np.concatenate([sets[set_index], hole_index[:, np.newaxis]], axis=1)
+        masks = masks[set_index] | hole_masks[hole_index]
+    return holes[sets], masks
+
+
+def exact_equity(hole_cards, board=(), n_opponents=1, max_deals=MAX_EXACT_DEALS):
+    """
+    Computes the showdown equity of a hand over every possible deal.
+
+    Args:
+        hole_cards: The player's two hole cards (see to_cards for formats).
+        board: Known community cards, zero to five of them.
+        n_opponents: Number of opponents holding unknown cards.
+        max_deals: Refuse spots with more deals than this.
+
+    Returns:
+        The equity in [0, 1].
+
+    Raises:
+        ValueError: The cards are invalid, or the spot has more than max_deals deals.
+    """
+    hole_cards, board = to_cards(hole_cards), to_cards(board)
+    if len(hole_cards) != 2 or len(board) > BOARD_SIZE:
+        raise ValueError(f"Expected 2 hole cards and at most {BOARD_SIZE} board cards")
+    known = np.concatenate([hole_cards, board])
+    if len(np.unique(known)) != len(known):
+        raise ValueError("Hole cards and board share a card")
+    n_deals = count_deals(len(board), n_opponents)
+    if n_deals > max_deals:
+        raise ValueError(f"{n_deals} deals is more than max_deals={max_deals}; use monte_carlo_equity")
+    if n_opponents == 0:
+        return 1.0
+
+    deck = np.setdiff1d(np.arange(DECK_SIZE, dtype=np.uint8), known)
+    n_missing = BOARD_SIZE - len(board)
+    completions = list(combinations(range(len(deck)), n_missing))
+    completions = np.array(completions, dtype=np.intp).reshape(len(completions), n_missing)
+    completion_masks = cards_to_masks(completions)
+    boards = np.concatenate([np.broadcast_to(board, (len(completions), len(board))), deck[completions]], axis=1)
+    hero = evaluate(np.concatenate([np.broadcast_to(hole_cards, (len(boards), 2)), boards], axis=1))
+
+    opponent_hands, opponent_masks = _opponent_hands(len(deck), n_opponents)
+    board_index, hands_index = np.nonzero((completion_masks[:, np.newaxis] & opponent_masks[np.newaxis, :]) == 0)
+    opponent_cards = np.concatenate(
+        [deck[opponent_hands[hands_index]],
+         np.broadcast_to(boards[board_index][:, np.newaxis], (len(board_index), n_opponents, BOARD_SIZE))], axis=2)
+    opponents = evaluate(opponent_cards.reshape(-1, 2 + BOARD_SIZE)).reshape(-1, n_opponents)
+    return float(showdown_share(hero[board_index], opponents).mean())
+
+
+def preflop_class(hole_cards):
+    """
+    Starting hand class (0-168) of hole cards.
+
+    Classes are cells of a 13x13 grid indexed high rank * 13 + low rank for
+    suited hands, low * 13 + high for offsuit hands and rank * 14 for pairs.
+
+    Args:
+        hole_cards: Two card ids, or an (n, 2) array of them.
+
+    Returns:
+        The class, or an (n,) array of classes.
+    """
+    hole_cards = np.asarray(hole_cards)
+    if hole_cards.ndim == 1:
+        return int(preflop_class(hole_cards[np.newaxis])[0])
+    ranks = hole_cards >> 2
+    high, low = ranks.max(axis=1).astype(np.intp), ranks.min(axis=1).astype(np.intp)
+    suited = (hole_cards[:, 0] & 3) == (hole_cards[:, 1] & 3)
+    return np.where(suited, high * N_RANKS + low, low * N_RANKS + high)
+
+
+def preflop_class_name(preflop_class_id):
+    """Conventional name of a starting hand class, like 'AKs', 'T9o' or '77'."""
+    row, col = divmod(int(preflop_class_id), N_RANKS)
+    if row == col:
+        return RANK_CHARS[row] * 2
+    if row > col:
+        return f"{RANK_CHARS[row]}{RANK_CHARS[col]}s"
+    return f"{RANK_CHARS[col]}{RANK_CHARS[row]}o"
+
+
+def _class_representative(preflop_class_id):
+    """Hole cards of one hand in a starting hand class."""
+    row, col = divmod(int(preflop_class_id), N_RANKS)
+    if row > col:  # Suited: both cards in suit 0
+        return [row * 4, col * 4]
+    return [max(row, col) * 4, min(row, col) * 4 + 1]
+
+
+def build_preflop_table(max_opponents=PREFLOP_MAX_OPPONENTS, n_trials=PREFLOP_TABLE_TRIALS, seed=0,
+                        max_workers=None):
+    """
+    Simulates the preflop equity of every starting hand class.
+
+    Returns:
+        A (max_opponents, 169) float32 array; row k - 1 holds the equities
+        against k opponents.
+    """
+    classes = np.tile(np.arange(N_PREFLOP_CLASSES), max_opponents)
+    situations = pd.DataFrame({
+        'hand': [_class_representative(c) for c in classes],
+        'n_opponents': np.repeat(np.arange(1, max_opponents + 1), N_PREFLOP_CLASSES),
+    })
+    equities = equity_for_frame(situations, n_trials=n_trials, seed=seed, max_workers=max_workers, use_tables=False)
+    return equities.to_numpy(dtype=np.float32).reshape(max_opponents, N_PREFLOP_CLASSES)
+
+
+def load_preflop_table(path=PREFLOP_TABLE_PATH, rebuild=False):
+    """
+    The preflop equity table, loaded once per process and path.
+
+    The table is read from path, or built with build_preflop_table and saved
+    there if the file is missing or unreadable.
+    """
+    if path in _preflop_tables and not rebuild:
+        return _preflop_tables[path]
+    table = None
+    if not rebuild:
+        try:
+            table = np.load(path)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable preflop equity table {path}: {e}")
+        if table is not None and table.shape != (PREFLOP_MAX_OPPONENTS, N_PREFLOP_CLASSES):
+            print(f"Ignoring preflop equity table {path} with shape {table.shape}")
+            table = None
+    if table is None:
+        print(f"Building the preflop equity table ({PREFLOP_TABLE_TRIALS} trials per starting hand)...")
+        table = build_preflop_table()
+        try:
+            np.save(path, table)
+        except OSError as e:
+            print(f"Error saving preflop equity table {path}: {e}")
+    _preflop_tables[path] = table
+    return table
+
+
+def preflop_equity(hole_cards, n_opponents=1):
+    """
+    Preflop equity of hole cards against n_opponents random hands.
+
+    The values come from the simulated preflop table, so each carries a
+    standard error of up to about 0.002 (50,000 trials per entry).
+
+    Args:
+        hole_cards: Two card ids, or an (n, 2) array of them.
+        n_opponents: 1 to PREFLOP_MAX_OPPONENTS, or an (n,) array.
+
+    Returns:
+        The equity, or an (n,) array of equities.
+
+    Raises:
+        ValueError: A hand is not two distinct cards, or n_opponents is out of range.
+    """
+    holes = np.asarray(hole_cards)
+    if holes.ndim not in (1, 2) or holes.shape[-1] != 2:
+        raise ValueError(f"Expected 2 hole cards, got {holes.shape[-1] if holes.ndim else 0}")
+    holes = holes.reshape(-1, 2)
+    if np.any((holes < 0) | (holes >= DECK_SIZE)):
+        raise ValueError(f"Card ids must be 0 to {DECK_SIZE - 1}")
+    if np.any(holes[:, 0] == holes[:, 1]):
+        raise ValueError("Hole cards and board share a card")
+    if np.any(np.asarray(n_opponents) < 1) or np.any(np.asarray(n_opponents) > PREFLOP_MAX_OPPONENTS):
+        raise ValueError(f"The preflop table covers 1 to {PREFLOP_MAX_OPPONENTS} opponents")
+    return load_preflop_table()[np.asarray(n_opponents) - 1, preflop_class(hole_cards)]
+
+
+if __name__ == '__main__':
+    import time
+
+    from src.monte_carlo.monte_carlo_simulation import monte_carlo_equity
+
+    for hole, board in (('AS AH', 'KD 7C 2H 9S'), ('JH TH', '9H 8H 2C 3D'), ('7C 2D', 'AH KD QS 3C 7H')):
+        start = time.perf_counter()
+        equity = exact_equity(hole, board)
+        elapsed = time.perf_counter() - start
+        print(f"{hole} on [{board}]: exact {equity:.4f} ({elapsed * 1000:.1f} ms), "
+              f"simulated {monte_carlo_equity(hole, board, rng=0):.4f}")
+
+    table = load_preflop_table()
+    best = np.argsort(table[0])[::-1]
+    print("Strongest heads-up:", ', '.join(f"{preflop_class_name(c)} {table[0, c]:.3f}" for c in best[:5]))
+    print("Weakest heads-up:", ', '.join(f"{preflop_class_name(c)} {table[0, c]:.3f}" for c in best[-3:]))
+    hands = np.array([[48, 49], [48, 44], [20, 1]])
+    print("AA, AKs, 72o vs 1-3 opponents:")
+    print(np.stack([preflop_equity(hands, k) for k in (1, 2, 3)], axis=1).round(3))
@@ -1,4 +1,244 @@
+"""
+Monte Carlo equity simulation.
+
+The equity of a hand is its expected share of the pot at showdown against
+opponents holding random cards: a win counts 1 and a k-way split counts 1/k.
+Every trial deals the opponents' hole cards and the rest of the board from
+the unseen cards. All trials are dealt and evaluated at once as NumPy
+arrays, so a simulation has no per-trial Python loop.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 
-   # Load your dataset
-df = pd.read_csv('poker_data.csv')
\ No newline at end of file
+from src.features.hand_strength import evaluate
+from src.utils.cards import N_CARDS as DECK_SIZE, parse_cards, strings_to_cards
+
+BOARD_SIZE = 5
+DEFAULT_TRIALS = 10_000
+# Frames with fewer situations than this are simulated in-process; process
+# start-up costs more than it saves on small batches.
+PARALLEL_MIN_ROWS = 64
+
+
+def to_cards(value):
+    """
+    Card ids of a hand given as 'AS KH', ['AS', 'KH'] or an array of ids.
+
+    Missing values (None or NaN) are an empty hand.
+    """
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return np.empty(0, dtype=np.uint8)
+    if isinstance(value, str):
+        return parse_cards(value)
+    value = list(value)
+    if value and isinstance(value[0], str):
+        return parse_cards(' '.join(value))
+    return np.asarray(value, dtype=np.uint8)
+
+
+def showdown_share(hero, opponents):
+    """
+    The player's pot share in each deal.
+
+    Args:
+        hero: (n,) strengths of the player's hand.
+        opponents: (n, k) strengths of the k opponents' hands.
+
+    Returns:
+        (n,) shares: 1 for a win, 1/m for an m-way split, 0 for a loss.
+    """
+    best = opponents.max(axis=1)
+    ties = np.count_nonzero(opponents == best[:, np.newaxis], axis=1)
+    return np.where(hero > best, 1.0, np.where(hero == best, 1.0 / (1 + ties), 0.0))
+
+
+def _column_cards(column):
+    """
+    Card ids of a column of hands.
+
+    Returns:
+        An (n, k) array when every hand is a string with the same number of
+        cards (parsed in one vectorized pass), otherwise a list of arrays.
+    """
+    values = column.tolist()
+    if values and all(isinstance(value, str) for value in values):
+        try:
+            return strings_to_cards(values)
+        except ValueError:
+            pass
+    parsed = {}
+    hands = []
+    for value in values:
+        if isinstance(value, str):
+            if value not in parsed:
+                parsed[value] = parse_cards(value)
+            hands.append(parsed[value])
+        else:
+            hands.append(to_cards(value))
+    return hands
+
+
+def _deal(rng, deck, n_trials, n_cards):
+    """(n_trials, n_cards) cards dealt without replacement from deck in each trial."""
+    order = rng.random((n_trials, len(deck))).argsort(axis=1)[:, :n_cards]
+    return deck[order]
+
+
+def monte_carlo_equity(hole_cards, board=(), n_opponents=1, n_trials=DEFAULT_TRIALS, rng=None):
+    """
+    Estimates the showdown equity of a hand by simulation.
+
+    Args:
+        hole_cards: The player's two hole cards (see to_cards for formats).
+        board: Known community cards, zero to five of them.
+        n_opponents: Number of opponents, each dealt two random hole cards.
+        n_trials: Number of simulated deals.
+        rng: A numpy Generator or seed.
+
+    Returns:
+        The equity in [0, 1].
+    """
+    hole_cards, board = to_cards(hole_cards), to_cards(board)
+    if len(hole_cards) != 2:
+        raise ValueError(f"Expected 2 hole cards, got {len(hole_cards)}")
+    if len(board) > BOARD_SIZE:
+        raise ValueError(f"A board has at most {BOARD_SIZE} cards, got {len(board)}")
+    known = np.concatenate([hole_cards, board])
+    if len(np.unique(known)) != len(known):
+        raise ValueError("Hole cards and board share a card")
+    n_missing = BOARD_SIZE - len(board)
+    n_dealt = n_missing + 2 * n_opponents
+    deck = np.setdiff1d(np.arange(DECK_SIZE, dtype=np.uint8), known)
+    if n_dealt > len(deck):
+        raise ValueError(f"Not enough cards for {n_opponents} opponents")
+
+    if n_opponents == 0:
+        return 1.0
+
+    rng = np.random.default_rng(rng)
+    dealt = _deal(rng, deck, n_trials, n_dealt)
+    boards = np.concatenate([np.broadcast_to(board, (n_trials, len(board))), dealt[:, :n_missing]], axis=1)
+    hero = evaluate(np.concatenate([np.broadcast_to(hole_cards, (n_trials, 2)), boards], axis=1))
+
+    opponent_holes = dealt[:, n_missing:].reshape(n_trials, n_opponents, 2)
+    opponent_hands = np.concatenate(
+        [opponent_holes, np.broadcast_to(boards[:, np.newaxis], (n_trials, n_opponents, BOARD_SIZE))], axis=2)
+    opponents = evaluate(opponent_hands.reshape(-1, 2 + BOARD_SIZE)).reshape(n_trials, n_opponents)
+
+    return float(showdown_share(hero, opponents).mean())
+
+
+def situation_equity(hole_cards, board=(), n_opponents=1, n_trials=DEFAULT_TRIALS, rng=None, use_tables=True):
+    """
+    Equity of one situation by the cheapest adequate method.
+
+    With use_tables=True, preflop situations are looked up in the
+    precomputed preflop table and spots with few enough possible deals are
+    enumerated exactly (see exact_equity). The preflop table is itself a
+    50,000 trial simulation per starting hand, so its values carry a standard
+    error of up to about 0.002, but the same for every call; everything else
+    is simulated with n_trials. use_tables=False simulates every situation.
+    """
+    if use_tables:
+        # Imported here because exact_equity builds on this module.
+        from src.monte_carlo import exact_equity
+
+        hole_cards, board = to_cards(hole_cards), to_cards(board)
+        if len(board) == 0 and 1 <= n_opponents <= exact_equity.PREFLOP_MAX_OPPONENTS:
+            return float(exact_equity.preflop_equity(hole_cards, n_opponents))
+        if exact_equity.count_deals(len(board), n_opponents) <= exact_equity.MAX_EXACT_DEALS:
+            return exact_equity.exact_equity(hole_cards, board, n_opponents)
+    return monte_carlo_equity(hole_cards, board, n_opponents, n_trials, rng)
+
+
+def _equity_rows(rows, n_trials, entropy, row_numbers, use_tables):
+    # Row i draws from the i-th child of the seed, like SeedSequence.spawn
+    return [situation_equity(hole, board, n_opponents, n_trials,
+                             np.random.default_rng(np.random.SeedSequence(entropy, spawn_key=(i,))), use_tables)
+            for (hole, board, n_opponents), i in zip(rows, row_numbers)]
+
+
+def equity_for_frame(frame, hole_column='hand', board_column='board', opponents_column='n_opponents',
+                     n_opponents=1, n_trials=DEFAULT_TRIALS, seed=None, max_workers=None, use_tables=True):
+    """
+    Equity for every situation (row) of a DataFrame.
+
+    Args:
+        frame: One situation per row.
+        hole_column: Column of hole cards.
+        board_column: Column of known board cards; if missing, every board is empty.
+        opponents_column: Column of opponent counts; if missing, n_opponents is used.
+        n_opponents: Opponent count for frames without opponents_column.
+        n_trials: Simulated deals per situation.
+        seed: Seed for reproducible results. Each row gets its own random
+            stream, so results do not depend on max_workers.
+        max_workers: Worker processes for frames of PARALLEL_MIN_ROWS rows or
+            more (None for one per CPU, 1 to stay in-process).
+        use_tables: Use the precomputed preflop table (simulated, standard
+            error about 0.002) and exact enumeration where they apply (see
+            situation_equity); False simulates every situation.
+
+    Returns:
+        A Series of equities aligned with the frame's index.
+    """
+    holes = _column_cards(frame[hole_column])
+    boards = _column_cards(frame[board_column]) if board_column in frame \
+        else np.empty((len(frame), 0), dtype=np.uint8)
+    opponents = frame[opponents_column].to_numpy(dtype=int) if opponents_column in frame \
+        else np.full(len(frame), n_opponents)
+    entropy = np.random.SeedSequence(seed).entropy
+    equities = np.empty(len(frame))
+    pending = np.arange(len(frame))
+
+    if use_tables:
+        from src.monte_carlo import exact_equity
+
+        # Preflop rows are one vectorized table lookup, never worth a process
+        board_sizes = np.full(len(frame), boards.shape[1]) if isinstance(boards, np.ndarray) \
+            else np.array([len(board) for board in boards], dtype=int)
+        preflop = (board_sizes == 0) & (opponents >= 1) & (opponents <= exact_equity.PREFLOP_MAX_OPPONENTS)
+        if preflop.any():
+            preflop_rows = np.flatnonzero(preflop)
+            if isinstance(holes, np.ndarray):
+                preflop_holes = holes[preflop_rows]
+            else:
+                # Hands of mixed sizes would not stack into an (n, 2) array
+                hole_sizes = np.array([len(holes[i]) for i in preflop_rows], dtype=int)
+                if np.any(hole_sizes != 2):
+                    raise ValueError(f"Expected 2 hole cards, got {hole_sizes[hole_sizes != 2][0]}")
+                preflop_holes = np.array([holes[i] for i in preflop_rows])
+            equities[preflop_rows] = exact_equity.preflop_equity(preflop_holes, opponents[preflop_rows])
+            pending = np.flatnonzero(~preflop)
+
+    pending = pending.tolist()
+    rows = [(holes[i], boards[i], int(opponents[i])) for i in pending]
+    workers = max_workers or os.cpu_count() or 1
+    if len(pending) < PARALLEL_MIN_ROWS or workers == 1:
+        equities[pending] = _equity_rows(rows, n_trials, entropy, pending, use_tables)
+    else:
+        bounds = np.linspace(0, len(pending), workers * 4 + 1).astype(int)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(_equity_rows, rows[lo:hi], n_trials, entropy, pending[lo:hi], use_tables)
+                       for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+            equities[pending] = [equity for future in futures for equity in future.result()]
+    return pd.Series(equities, index=frame.index, name='winning_probability')
+
+
+if __name__ == '__main__':
+    import time
+
+    for hole, board, n_opp in (('AS AH', '', 1), ('7C 2D', '', 1), ('AS AH', '', 4), ('JH TH', '9H 8H 2C', 1)):
+        start = time.perf_counter()
+        equity = monte_carlo_equity(hole, board, n_opp, rng=0)
+        elapsed = time.perf_counter() - start
+        print(f"{hole} on [{board}] vs {n_opp}: equity {equity:.3f} ({elapsed * 1000:.1f} ms)")
+
+    situations = pd.DataFrame({'hand': ['AS KS', 'QD QC', '9H 8H', '7C 2D'] * 64,
+                               'board': ['', '2S 7D JC', '', 'AH KD QS 3C'] * 64})
+    start = time.perf_counter()
+    equities = equity_for_frame(situations, n_trials=5_000, seed=0)
+    print(f"{len(situations)} situations in {time.perf_counter() - start:.2f} s")
+    print(equities.head(4))
@@ -0,0 +1,203 @@
+"""
+Card and hand representations shared by the poker features.
+
+A card is an integer id rank * 4 + suit, with ranks 0-12 for 2 through Ace
+and suits 0-3 for Hearts, Diamonds, Clubs and Spades, so id order matches
+the deck '2H', '2D', '2C', '2S', '3H', ..., 'AS'. A hand is either an (n, k)
+array of card ids or a uint64 bitmask with bit id set for each card; masks
+make membership tests, unions and overlap checks single integer operations.
+
+Every converter works on whole arrays of hands:
+
+- strings ('AS KH' or 'ASKH') <-> card ids: strings_to_cards, cards_to_strings
+- UCI S1,C1,...,S5,C5 columns <-> card ids: uci_to_cards, cards_to_uci
+- card ids <-> bitmasks: cards_to_masks, masks_to_cards
+- card ids or bitmasks -> (n, 52) one-hot matrices: cards_to_one_hot,
+  masks_to_one_hot, and back with one_hot_to_masks
+"""
+import numpy as np
+
+N_RANKS = 13
+N_SUITS = 4
+N_CARDS = N_RANKS * N_SUITS
+RANK_CHARS = '23456789TJQKA'
+SUIT_CHARS = 'HDCS'
+CARD_NAMES = [rank + suit for rank in RANK_CHARS for suit in SUIT_CHARS]
+
+_INVALID = 255
+_RANK_BY_BYTE = np.full(256, _INVALID, dtype=np.uint8)
+_SUIT_BY_BYTE = np.full(256, _INVALID, dtype=np.uint8)
+for _i, _char in enumerate(RANK_CHARS):
+    _RANK_BY_BYTE[ord(_char)] = _RANK_BY_BYTE[ord(_char.lower())] = _i
+for _i, _char in enumerate(SUIT_CHARS):
+    _SUIT_BY_BYTE[ord(_char)] = _SUIT_BY_BYTE[ord(_char.lower())] = _i
+_NAME_BYTES = np.array([name.encode() for name in CARD_NAMES], dtype='S2').view(np.uint8).reshape(N_CARDS, 2)
+
+# UCI suits 1-4 are Hearts, Spades, Diamonds, Clubs; ranks 1-13 are Ace to King
+_SUIT_FROM_UCI = np.array([_INVALID, 0, 3, 1, 2], dtype=np.uint8)
+_RANK_FROM_UCI = np.array([_INVALID] + [(c - 2) % N_RANKS for c in range(1, 14)], dtype=np.uint8)
+_UCI_FROM_SUIT = np.array([1, 3, 4, 2], dtype=np.uint8)
+_UCI_FROM_RANK = np.array([(r + 1) % N_RANKS + 1 for r in range(N_RANKS)], dtype=np.uint8)
+
+_BIT = np.left_shift(np.uint64(1), np.arange(64, dtype=np.uint64))
+
+
+def card_index(card):
+    """Id of one card written rank then suit, like 'AS' or 'th'."""
+    if len(card) != 2 or card[0].upper() not in RANK_CHARS or card[1].upper() not in SUIT_CHARS:
+        raise ValueError(f"Invalid card {card!r}")
+    return RANK_CHARS.index(card[0].upper()) * N_SUITS + SUIT_CHARS.index(card[1].upper())
+
+
+def parse_cards(text):
+    """Card ids of one hand written like 'AS KH 2D'."""
+    return np.array([card_index(card) for card in text.split()], dtype=np.uint8)
+
+
+def strings_to_cards(hands):
+    """
+    Parses many hands at once.
+
+    Args:
+        hands: Hands with the same number of cards, either as strings
+            ('AS KH', 'AS,KH' or 'ASKH'; one separator character between
+            cards, or none) or as an (n, k) array of card strings.
+
+    Returns:
+        An (n, k) uint8 array of card ids.
+
+    Raises:
+        ValueError: A card is invalid or the hands differ in length.
+    """
+    hands = np.asarray(hands)
+    if hands.size == 0:
+        return np.empty((len(hands), 0), dtype=np.uint8)
+    if hands.ndim == 2:
+        text = hands.astype('S2').view(np.uint8).reshape(len(hands), -1)
+        stride = 2
+    else:
+        text = hands.astype('S').view(np.uint8).reshape(len(hands), -1)
+        width = text.shape[1]
+        has_separator = width % 3 == 2 and width > 2 and _RANK_BY_BYTE[text[0, 2]] == _INVALID
+        stride = 3 if has_separator else 2
+        if (width + has_separator) % stride:
+            raise ValueError(f"Hands of {width} characters are not whole cards")
+    ranks = _RANK_BY_BYTE[text[:, 0::stride]]
+    suits = _SUIT_BY_BYTE[text[:, 1::stride]]
+    bad = (ranks == _INVALID) | (suits == _INVALID)
+    if bad.any():
+        row, col = np.argwhere(bad)[0]
+        raise ValueError(f"Invalid card {col + 1} in hand {row}: {str(hands[row])!r} "
+                         f"(hands must all have the same number of cards)")
+    return ranks * N_SUITS + suits
+
+
+def cards_to_strings(cards, sep=' '):
+    """
+    Formats (n, k) card ids as an (n,) array of hand strings like 'AS KH'.
+
+    Args:
+        cards: Card ids.
+        sep: Separator between cards; one character or ''.
+    """
+    cards = np.asarray(cards, dtype=np.intp)
+    n, k = cards.shape
+    if sep:
+        text = np.full((n, k, 3), ord(sep), dtype=np.uint8)
+        text[:, :, :2] = _NAME_BYTES[cards]
+        text = text.reshape(n, -1)[:, :max(3 * k - 1, 0)]
+    else:
+        text = _NAME_BYTES[cards].reshape(n, -1)
+    return np.ascontiguousarray(text).view(f'S{max(text.shape[1], 1)}').ravel().astype(str)
+
+
+def uci_to_cards(uci_cards):
+    """
+    Converts UCI S1,C1,...,S5,C5 columns to card ids.
+
+    Args:
+        uci_cards: An (n, 2k) array of alternating UCI suits (1-4) and ranks (1-13).
+
+    Returns:
+        An (n, k) uint8 array of card ids.
+    """
+    uci_cards = np.asarray(uci_cards)
+    return _RANK_FROM_UCI[uci_cards[:, 1::2]] * N_SUITS + _SUIT_FROM_UCI[uci_cards[:, 0::2]]
+
+
+def cards_to_uci(cards):
+    """Converts (n, k) card ids to (n, 2k) UCI suit/rank columns."""
+    cards = np.asarray(cards)
+    uci = np.empty((cards.shape[0], 2 * cards.shape[1]), dtype=np.uint8)
+    uci[:, 0::2] = _UCI_FROM_SUIT[cards & 3]
+    uci[:, 1::2] = _UCI_FROM_RANK[cards >> 2]
+    return uci
+
+
+def cards_to_masks(cards):
+    """(n,) uint64 bitmasks of (n, k) card ids; duplicate cards count once."""
+    return np.bitwise_or.reduce(_BIT[np.asarray(cards, dtype=np.intp)], axis=-1)
+
+
+def masks_to_cards(masks):
+    """
+    Card ids of bitmask hands, in ascending order.
+
+    Returns:
+        An (n, k) uint8 array; every mask must hold the same number k of cards.
+    """
+    masks = np.asarray(masks, dtype='<u8')
+    counts = np.bitwise_count(masks)
+    if len(masks) and np.any(counts != counts[0]):
+        raise ValueError("Masks hold different numbers of cards")
+    bits = np.unpackbits(masks.view(np.uint8).reshape(len(masks), 8), axis=1, bitorder='little')
+    return np.nonzero(bits)[1].astype(np.uint8).reshape(len(masks), -1)
+
+
+def masks_to_one_hot(masks):
+    """(n, 52) uint8 one-hot matrix of bitmask hands."""
+    masks = np.asarray(masks, dtype='<u8')
+    bits = np.unpackbits(masks.view(np.uint8).reshape(len(masks), 8), axis=1, bitorder='little')
+    return bits[:, :N_CARDS]
+
+
+def cards_to_one_hot(cards):
+    """(n, 52) uint8 one-hot matrix of (n, k) card ids, built with one scatter."""
+    cards = np.asarray(cards, dtype=np.intp)
+    one_hot = np.zeros((len(cards), N_CARDS), dtype=np.uint8)
+    one_hot[np.arange(len(cards))[:, np.newaxis], cards] = 1
+    return one_hot
+
+
+def one_hot_to_masks(one_hot):
+    """(n,) uint64 bitmasks of an (n, 52) one-hot matrix."""
+    one_hot = np.asarray(one_hot)
+    padded = np.zeros((len(one_hot), 64), dtype=np.uint8)
+    padded[:, :N_CARDS] = one_hot != 0
+    return np.packbits(padded, axis=1, bitorder='little').view('<u8').ravel()
+
+
+if __name__ == '__main__':
+    import time
+
+    rng = np.random.default_rng(0)
+    n_hands = 1_000_000
+    cards = np.sort(np.argsort(rng.random((n_hands, N_CARDS)), axis=1)[:, :5], axis=1).astype(np.uint8)
+    hands = cards_to_strings(cards)
+    print(hands[:3])
+
+    conversions = [
+        ('strings -> cards', lambda: strings_to_cards(hands)),
+        ('cards -> strings', lambda: cards_to_strings(cards)),
+        ('cards -> masks', lambda: cards_to_masks(cards)),
+        ('masks -> cards', lambda: masks_to_cards(cards_to_masks(cards))),
+        ('cards -> one-hot', lambda: cards_to_one_hot(cards)),
+        ('masks -> one-hot', lambda: masks_to_one_hot(cards_to_masks(cards))),
+        ('cards -> UCI -> cards', lambda: uci_to_cards(cards_to_uci(cards))),
+    ]
+    for name, convert in conversions:
+        start = time.perf_counter()
+        convert()
+        print(f"{name}: {n_hands} hands in {(time.perf_counter() - start) * 1000:.0f} ms")
+    assert np.array_equal(strings_to_cards(hands), cards)
+    assert np.array_equal(masks_to_cards(one_hot_to_masks(cards_to_one_hot(cards))), cards)
@@ -1,17 +1,139 @@
-import pandas as pd
+"""
+Loader for the UCI poker-hand dataset.
 
-# Example of one-hot encoding for cards
-def one_hot_encode_cards(hands):
-    card_columns = [f'card_{rank}_{suit}' for rank in range(13) for suit in range(4)]
-    encoded_hands = pd.DataFrame(0, index=hands.index, columns=card_columns)
+Each line of the UCI files is S1,C1,S2,C2,...,S5,C5,CLASS: the suit (1-4,
+Hearts, Spades, Diamonds, Clubs) and rank (1-13, Ace to King) of five cards,
+followed by the hand class (0-9). Every value fits in a byte, so a file is
+parsed once into an (n, 11) uint8 array and cached next to it as a .npy file.
+Later loads memory-map the cache instead of parsing the text again, which
+takes milliseconds even for the million-row testing set.
+"""
+import os
 
-    for i, hand in enumerate(hands):
-        for card in hand:
-            rank, suit = card  # Assuming card is a tuple (rank, suit)
-            encoded_hands.loc[i, f'card_{rank}_{suit}'] = 1
+import numpy as np
 
-    return encoded_hands
+DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), '..', '..', '..', 'data'))
+TRAINING_PATH = os.path.join(DATA_DIR, 'poker-hand-training-true.data')
+TESTING_PATH = os.path.join(DATA_DIR, 'poker-hand-testing.data')
 
-# Example hands
-hands = [(0, 1), (2, 3), (4, 5)]  # Example card tuples
-encoded_hands = one_hot_encode_cards(pd.Series(hands))
\ No newline at end of file
+N_CARDS = 5
+N_COLUMNS = 2 * N_CARDS + 1
+HAND_CLASSES = ['Nothing', 'One pair', 'Two pairs', 'Three of a kind', 'Straight', 'Flush',
+                'Full house', 'Four of a kind', 'Straight flush', 'Royal flush']
+
+
+def parse_poker_hands(path):
+    """
+    Parses a UCI poker-hand file.
+
+    Args:
+        path: Path to a comma separated S1,C1,...,S5,C5,CLASS file.
+
+    Returns:
+        An (n, 11) uint8 array, or None if the file is missing or malformed.
+    """
+    try:
+        table = np.loadtxt(path, delimiter=',', dtype=np.uint8, ndmin=2)
+    except OSError as e:
+        print(f"Error reading poker hands from {path}: {e}")
+        return None
+    except ValueError as e:
+        print(f"Error parsing poker hands from {path}: {e}")
+        return None
+    if table.size and table.shape[1] != N_COLUMNS:
+        print(f"Error parsing poker hands from {path}: expected {N_COLUMNS} columns, got {table.shape[1]}")
+        return None
+    return table.reshape(-1, N_COLUMNS)
+
+
+def _cache_path(path, cache_dir):
+    return os.path.join(cache_dir or os.path.dirname(path), os.path.basename(path) + '.npy')
+
+
+def _cache_is_fresh(cache_path, path):
+    try:
+        return os.path.getmtime(cache_path) >= os.path.getmtime(path)
+    except OSError:
+        return False
+
+
+def load_poker_hands(path=TRAINING_PATH, cache_dir=None, use_cache=True):
+    """
+    Loads a UCI poker-hand file as columnar uint8 arrays.
+
+    The first load parses the text and writes a .npy cache (in cache_dir,
+    default next to the data file); later loads memory-map the cache
+    read-only. The cache is rebuilt when the data file is newer.
+
+    Args:
+        path: UCI poker-hand file. Defaults to the training set.
+        cache_dir: Directory for the .npy cache.
+        use_cache: Set False to always parse the text.
+
+    Returns:
+        A (cards, labels) tuple: an (n, 10) uint8 array of S1,C1,...,S5,C5
+        and an (n,) uint8 array of hand classes; (None, None) on error.
+    """
+    cache_path = _cache_path(path, cache_dir)
+    table = None
+    if use_cache and _cache_is_fresh(cache_path, path):
+        try:
+            table = np.load(cache_path, mmap_mode='r')
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable poker hand cache {cache_path}: {e}")
+            table = None
+        if table is not None and (table.dtype != np.uint8 or table.ndim != 2 or table.shape[1] != N_COLUMNS):
+            print(f"Ignoring poker hand cache {cache_path} with shape {table.shape} and dtype {table.dtype}")
+            table = None
+
+    if table is None:
+        table = parse_poker_hands(path)
+        if table is None:
+            return None, None
+        if use_cache:
+            _write_cache(cache_path, table)
+
+    return table[:, :2 * N_CARDS], table[:, 2 * N_CARDS]
+
+
+def _write_cache(cache_path, table):
+    # Written to a temporary file first so a reader never maps a partial cache.
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            np.save(f, table)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Error writing poker hand cache {cache_path}: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def suits(cards):
+    """Suit columns S1..S5 of an (n, 10) card array."""
+    return cards[:, 0::2]
+
+
+def ranks(cards):
+    """Rank columns C1..C5 of an (n, 10) card array."""
+    return cards[:, 1::2]
+
+
+if __name__ == '__main__':
+    import time
+
+    for data_path in (TRAINING_PATH, TESTING_PATH):
+        if not os.path.exists(data_path):
+            print(f"{data_path} not found, skipping")
+            continue
+        for attempt in ('parse + cache', 'memory-mapped cache'):
+            start = time.perf_counter()
+            cards, labels = load_poker_hands(data_path)
+            elapsed = time.perf_counter() - start
+            print(f"{os.path.basename(data_path)} ({attempt}): {len(labels)} hands in {elapsed * 1000:.1f} ms")
+        counts = np.bincount(labels, minlength=len(HAND_CLASSES))
+        for name, count in zip(HAND_CLASSES, counts):
+            print(f"  {name}: {count}")
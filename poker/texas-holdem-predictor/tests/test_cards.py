@@ -0,0 +1,75 @@
+import unittest
+
+import numpy as np
+
+from src.utils.cards import (
+    CARD_NAMES, N_CARDS, card_index, parse_cards, strings_to_cards, cards_to_strings, uci_to_cards,
+    cards_to_uci, cards_to_masks, masks_to_cards, masks_to_one_hot, cards_to_one_hot, one_hot_to_masks,
+)
+
+
+def _random_hands(n, k, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.sort(np.argsort(rng.random((n, N_CARDS)), axis=1)[:, :k], axis=1).astype(np.uint8)
+
+
+class TestCards(unittest.TestCase):
+
+    def test_card_ids(self):
+        self.assertEqual(CARD_NAMES[:5], ['2H', '2D', '2C', '2S', '3H'])
+        self.assertEqual(card_index('2H'), 0)
+        self.assertEqual(card_index('as'), 51)
+        self.assertEqual([card_index(name) for name in CARD_NAMES], list(range(N_CARDS)))
+        self.assertEqual(parse_cards('AS KH 2D').tolist(), [51, 44, 1])
+        for bad in ('1S', 'AX', 'ASK'):
+            with self.assertRaises(ValueError):
+                card_index(bad)
+
+    def test_string_round_trip(self):
+        cards = _random_hands(1000, 5)
+        for sep in (' ', ',', ''):
+            strings = cards_to_strings(cards, sep=sep)
+            self.assertEqual(strings[0], sep.join(CARD_NAMES[c] for c in cards[0]))
+            np.testing.assert_array_equal(strings_to_cards(strings), cards)
+        np.testing.assert_array_equal(strings_to_cards([['AS', 'kh'], ['2d', '3C']]), [[51, 44], [1, 6]])
+        self.assertEqual(strings_to_cards([]).shape, (0, 0))
+
+    def test_strings_to_cards_rejects_bad_hands(self):
+        with self.assertRaises(ValueError):
+            strings_to_cards(['AS KH', 'AS XH'])
+        with self.assertRaises(ValueError):
+            strings_to_cards(['AS KH', 'AS'])  # Mixed lengths
+        with self.assertRaises(ValueError):
+            strings_to_cards(['ASK'])
+
+    def test_uci_round_trip(self):
+        # UCI: suits 1-4 are Hearts, Spades, Diamonds, Clubs; ranks 1-13 are Ace to King
+        np.testing.assert_array_equal(uci_to_cards([[1, 1, 2, 13, 3, 2, 4, 10]]), [[48, 47, 1, 34]])
+        cards = _random_hands(1000, 5)
+        np.testing.assert_array_equal(uci_to_cards(cards_to_uci(cards)), cards)
+        self.assertEqual(cards_to_uci(cards).shape, (1000, 10))
+
+    def test_mask_round_trip(self):
+        cards = _random_hands(1000, 7)
+        masks = cards_to_masks(cards)
+        self.assertEqual(masks.dtype, np.uint64)
+        self.assertEqual(int(cards_to_masks([[0, 51]])[0]), 1 | 1 << 51)
+        np.testing.assert_array_equal(masks_to_cards(masks), cards)
+        self.assertTrue((np.bitwise_count(masks) == 7).all())
+        with self.assertRaises(ValueError):
+            masks_to_cards(np.array([0b1, 0b11], dtype=np.uint64))
+
+    def test_one_hot_round_trip(self):
+        cards = _random_hands(1000, 5)
+        one_hot = cards_to_one_hot(cards)
+        self.assertEqual((one_hot.shape, one_hot.dtype), ((1000, N_CARDS), np.uint8))
+        np.testing.assert_array_equal(one_hot.sum(axis=1), 5)
+        np.testing.assert_array_equal(np.nonzero(one_hot)[1].reshape(1000, 5), cards)
+        masks = cards_to_masks(cards)
+        np.testing.assert_array_equal(masks_to_one_hot(masks), one_hot)
+        np.testing.assert_array_equal(one_hot_to_masks(one_hot), masks)
+        np.testing.assert_array_equal(masks_to_cards(one_hot_to_masks(one_hot)), cards)
+
+
+if __name__ == '__main__':
+    unittest.main()
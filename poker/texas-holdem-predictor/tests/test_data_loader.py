@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.utils.data_loader import load_poker_hands, parse_poker_hands, N_COLUMNS
+
+ROWS = [
+    [1, 10, 1, 11, 1, 13, 1, 12, 1, 1, 9],
+    [2, 11, 2, 13, 2, 10, 2, 12, 2, 1, 9],
+    [1, 1, 2, 1, 3, 5, 4, 7, 1, 9, 1],
+]
+
+
+class TestDataLoader(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, 'hands.data')
+        self.cache_path = self.path + '.npy'
+        self._write_rows(ROWS)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write_rows(self, rows):
+        with open(self.path, 'w') as f:
+            f.write(''.join(','.join(map(str, row)) + '\n' for row in rows))
+
+    def _make_older(self, path, seconds=10):
+        """Backdates path so that files written afterwards count as newer."""
+        mtime = os.path.getmtime(path) - seconds
+        os.utime(path, (mtime, mtime))
+
+    def test_first_load_writes_cache_and_second_maps_it(self):
+        cards, labels = load_poker_hands(self.path)
+        self.assertTrue(os.path.exists(self.cache_path))
+        np.testing.assert_array_equal(cards, np.array(ROWS, dtype=np.uint8)[:, :10])
+        np.testing.assert_array_equal(labels, [9, 9, 1])
+        self.assertEqual(cards.dtype, np.uint8)
+
+        cached_cards, cached_labels = load_poker_hands(self.path)
+        self.assertIsInstance(cached_cards.base, np.memmap)
+        self.assertFalse(cached_cards.flags.writeable)
+        np.testing.assert_array_equal(cached_cards, cards)
+        np.testing.assert_array_equal(cached_labels, labels)
+
+    def test_cache_dir(self):
+        cache_dir = os.path.join(self._tmp.name, 'cache')
+        load_poker_hands(self.path, cache_dir=cache_dir)
+        self.assertTrue(os.path.exists(os.path.join(cache_dir, 'hands.data.npy')))
+        self.assertFalse(os.path.exists(self.cache_path))
+
+    def test_use_cache_false_writes_nothing(self):
+        cards, _ = load_poker_hands(self.path, use_cache=False)
+        self.assertEqual(len(cards), len(ROWS))
+        self.assertFalse(os.path.exists(self.cache_path))
+
+    def test_newer_data_file_forces_reparse(self):
+        load_poker_hands(self.path)
+        self._make_older(self.cache_path)
+        self._write_rows(ROWS[:2])
+
+        cards, labels = load_poker_hands(self.path)
+        self.assertEqual(len(cards), 2)
+        np.testing.assert_array_equal(labels, [9, 9])
+        self.assertEqual(np.load(self.cache_path).shape, (2, N_COLUMNS))  # Cache rebuilt
+
+    def _assert_bad_cache_ignored(self):
+        self._make_older(self.path)
+        cards, labels = load_poker_hands(self.path)
+        np.testing.assert_array_equal(cards, np.array(ROWS, dtype=np.uint8)[:, :10])
+        np.testing.assert_array_equal(labels, [9, 9, 1])
+        cache = np.load(self.cache_path)
+        self.assertEqual((cache.shape, cache.dtype), ((len(ROWS), N_COLUMNS), np.uint8))
+
+    def test_cache_with_wrong_shape_is_ignored(self):
+        np.save(self.cache_path, np.zeros((3, 5), dtype=np.uint8))
+        self._assert_bad_cache_ignored()
+
+    def test_cache_with_wrong_dtype_is_ignored(self):
+        np.save(self.cache_path, np.zeros((3, N_COLUMNS), dtype=np.int64))
+        self._assert_bad_cache_ignored()
+
+    def test_corrupt_cache_is_ignored(self):
+        with open(self.cache_path, 'wb') as f:
+            f.write(b'not a numpy file')
+        self._assert_bad_cache_ignored()
+
+    def test_malformed_rows(self):
+        self._write_rows([ROWS[0], ['x'] * N_COLUMNS])
+        self.assertIsNone(parse_poker_hands(self.path))
+        self.assertEqual(load_poker_hands(self.path), (None, None))
+        self.assertFalse(os.path.exists(self.cache_path))
+
+    def test_wrong_column_count(self):
+        self._write_rows([row[:-1] for row in ROWS])
+        self.assertIsNone(parse_poker_hands(self.path))
+        self.assertEqual(load_poker_hands(self.path), (None, None))
+
+    def test_missing_file(self):
+        missing = os.path.join(self._tmp.name, 'missing.data')
+        self.assertEqual(load_poker_hands(missing), (None, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
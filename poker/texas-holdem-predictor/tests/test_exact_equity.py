@@ -0,0 +1,92 @@
+import unittest
+from itertools import combinations
+from math import comb
+
+import numpy as np
+
+from src.monte_carlo.exact_equity import (
+    count_deals, exact_equity, preflop_class, preflop_class_name, preflop_equity, load_preflop_table,
+    MAX_EXACT_DEALS, N_PREFLOP_CLASSES, PREFLOP_MAX_OPPONENTS, PREFLOP_TABLE_TRIALS,
+)
+from src.monte_carlo.monte_carlo_simulation import monte_carlo_equity
+from src.utils.cards import parse_cards
+
+
+class TestExactEquity(unittest.TestCase):
+
+    def test_count_deals(self):
+        self.assertEqual(count_deals(5, 1), comb(45, 2))
+        self.assertEqual(count_deals(4, 1), 46 * comb(45, 2))
+        self.assertEqual(count_deals(3, 1), comb(47, 2) * comb(45, 2))
+        # Two opponents: unordered pairs of disjoint hands
+        self.assertEqual(count_deals(5, 2), comb(45, 2) * comb(43, 2) // 2)
+        self.assertGreater(count_deals(0, 1), MAX_EXACT_DEALS)
+        self.assertGreater(count_deals(5, 2), MAX_EXACT_DEALS)
+
+    def test_matches_simulation(self):
+        rng = np.random.default_rng(0)
+        for hole, board, n_opponents in (('AS AH', 'KD 7C 2H 9S', 1), ('JH TH', '9H 8H 2C 3D', 1),
+                                         ('7C 2D', 'AH KD QS 3C 7H', 1), ('QC QD', 'QH 4S 4D 9C 2S', 1)):
+            exact = exact_equity(hole, board, n_opponents)
+            simulated = monte_carlo_equity(hole, board, n_opponents, n_trials=40_000, rng=rng)
+            standard_error = np.sqrt(exact * (1 - exact) / 40_000)
+            self.assertAlmostEqual(exact, simulated, delta=max(4 * standard_error, 0.002), msg=f"{hole} [{board}]")
+
+    def test_river_by_hand(self):
+        # Quad queens lose only to the one hand holding both missing cards of a straight flush
+        hole, board = parse_cards('QC QD'), parse_cards('QH QS 9S TS 2D')
+        deck = np.setdiff1d(np.arange(52), np.concatenate([hole, board]))
+        losing = {tuple(sorted(parse_cards(cards))) for cards in ('KS JS', '8S JS')}
+        expected = sum(tuple(sorted(pair)) not in losing for pair in combinations(deck, 2)) / comb(len(deck), 2)
+        self.assertAlmostEqual(exact_equity(hole, board), expected)
+
+    def test_rejects_large_and_invalid_spots(self):
+        with self.assertRaises(ValueError):
+            exact_equity('AS AH')
+        with self.assertRaises(ValueError):
+            exact_equity('AS AH', 'AS 2C 3D 4H')
+        self.assertEqual(exact_equity('AS AH', 'KD 7C 2H 9S 3C', n_opponents=0), 1.0)
+
+    def test_preflop_classes(self):
+        hands = np.array(list(combinations(range(52), 2)))
+        classes = preflop_class(hands)
+        counts = np.bincount(classes, minlength=N_PREFLOP_CLASSES).reshape(13, 13)
+        self.assertEqual(len(np.unique(classes)), N_PREFLOP_CLASSES)
+        pairs, suited, offsuit = np.diag(counts), counts[np.tril_indices(13, -1)], counts[np.triu_indices(13, 1)]
+        self.assertTrue((pairs == 6).all() and (suited == 4).all() and (offsuit == 12).all())
+        self.assertEqual(preflop_class_name(preflop_class(parse_cards('AS KS'))), 'AKs')
+        self.assertEqual(preflop_class_name(preflop_class(parse_cards('9D TH'))), 'T9o')
+        self.assertEqual(preflop_class_name(preflop_class(parse_cards('7C 7D'))), '77')
+
+    def test_preflop_table(self):
+        table = load_preflop_table()
+        self.assertEqual(table.shape, (PREFLOP_MAX_OPPONENTS, N_PREFLOP_CLASSES))
+        self.assertTrue((np.diff(table, axis=0) < 0).all())  # More opponents, less equity for every hand
+        aces = preflop_class(parse_cards('AS AH'))
+        self.assertEqual(np.argmax(table[0]), aces)
+        # The table is simulated: allow a few standard errors of its trials
+        for hole in ('AS AH', '7C 2D', 'JH TH'):
+            for n_opponents in (1, 3):
+                simulated = monte_carlo_equity(hole, n_opponents=n_opponents, n_trials=40_000, rng=1)
+                tolerance = 4 * np.sqrt(0.25 / PREFLOP_TABLE_TRIALS + 0.25 / 40_000)
+                self.assertAlmostEqual(float(preflop_equity(parse_cards(hole), n_opponents)), simulated,
+                                       delta=tolerance, msg=f"{hole} vs {n_opponents}")
+        np.testing.assert_array_equal(preflop_equity(np.array([parse_cards('AS AH')] * 2), np.array([1, 2])),
+                                      table[[0, 1], aces])
+        with self.assertRaises(ValueError):
+            preflop_equity(parse_cards('AS AH'), PREFLOP_MAX_OPPONENTS + 1)
+
+    def test_preflop_rejects_invalid_hands(self):
+        for hole, message in (('AS KH QD', 'Expected 2 hole cards'), ('AS', 'Expected 2 hole cards'),
+                              ('AS AS', 'share a card')):
+            with self.assertRaisesRegex(ValueError, message, msg=hole):
+                preflop_equity(parse_cards(hole))
+        # One bad row fails the whole batch
+        with self.assertRaisesRegex(ValueError, 'share a card'):
+            preflop_equity(np.array([parse_cards('AS KH'), parse_cards('QD QD')]))
+        with self.assertRaisesRegex(ValueError, 'Card ids'):
+            preflop_equity(np.array([[0, 52]]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import unittest
+from itertools import combinations
+
+import numpy as np
+
+from src.features.hand_strength import (
+    evaluate, hand_category, CATEGORY_NAMES, MAX_STRENGTH, FLUSH, FULL_HOUSE, HIGH_CARD, ROYAL_FLUSH,
+    STRAIGHT, STRAIGHT_FLUSH,
+)
+from src.utils.cards import parse_cards, uci_to_cards
+from src.utils.data_loader import load_poker_hands, TRAINING_PATH
+
+
+def _random_hands(rng, n, k):
+    return np.argsort(rng.random((n, 52)), axis=1)[:, :k].astype(np.uint8)
+
+
+def _best_of_five(hands):
+    """Strength of the best 5-card subset of each hand, by brute force."""
+    subsets = list(combinations(range(hands.shape[1]), 5))
+    return np.max([evaluate(hands[:, list(subset)]) for subset in subsets], axis=0)
+
+
+class TestHandStrength(unittest.TestCase):
+
+    def test_known_hands(self):
+        cases = [
+            ('AS KS QS JS TS', ROYAL_FLUSH),
+            ('5D 4D 3D 2D AD', STRAIGHT_FLUSH),
+            ('5D 4C 3H 2S AH', STRAIGHT),
+            ('KH KD KC 2S 2H', FULL_HOUSE),
+            ('AH JH 9H 4H 2H', FLUSH),
+            ('7C 5D 4H 3S 2C', HIGH_CARD),
+        ]
+        for hand, category in cases:
+            self.assertEqual(hand_category(evaluate(parse_cards(hand))), category, hand)
+        self.assertEqual(evaluate(parse_cards('7C 5D 4H 3S 2C')), 1)
+        self.assertEqual(evaluate(parse_cards('AS KS QS JS TS')), MAX_STRENGTH)
+        self.assertEqual(len(CATEGORY_NAMES), ROYAL_FLUSH + 1)
+
+    def test_wheel_is_the_lowest_straight(self):
+        wheel = evaluate(parse_cards('5D 4C 3H 2S AH'))
+        six_high = evaluate(parse_cards('6D 5C 4H 3S 2H'))
+        ace_high = evaluate(parse_cards('AD KC QH JS 9H'))
+        self.assertLess(ace_high, wheel)
+        self.assertLess(wheel, six_high)
+
+    def test_every_strength_is_reachable_once_per_value(self):
+        hands = np.array(list(combinations(range(52), 5)), dtype=np.uint8)
+        strengths = evaluate(hands)
+        self.assertEqual(len(np.unique(strengths)), MAX_STRENGTH)
+        counts = np.bincount(hand_category(strengths), minlength=ROYAL_FLUSH + 1)
+        # Standard 5-card frequencies, with royal flushes counted apart from straight flushes
+        self.assertEqual(counts.tolist(), [1302540, 1098240, 123552, 54912, 10200, 5108, 3744, 624, 36, 4])
+
+    def test_six_and_seven_cards_score_their_best_five(self):
+        rng = np.random.default_rng(0)
+        for k in (6, 7):
+            hands = _random_hands(rng, 20_000, k)
+            np.testing.assert_array_equal(evaluate(hands), _best_of_five(hands))
+
+    def test_rejects_other_hand_sizes(self):
+        with self.assertRaises(ValueError):
+            evaluate(np.zeros((3, 4), dtype=np.uint8))
+
+    @unittest.skipUnless(os.path.exists(TRAINING_PATH), "UCI poker-hand training data not available")
+    def test_categories_match_uci_labels(self):
+        uci_cards, labels = load_poker_hands(TRAINING_PATH, use_cache=False)
+        categories = hand_category(evaluate(uci_to_cards(uci_cards)))
+        self.assertEqual(int(np.count_nonzero(categories != labels)), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.monte_carlo.monte_carlo_simulation import (
+    to_cards, showdown_share, monte_carlo_equity, situation_equity, equity_for_frame, PARALLEL_MIN_ROWS,
+)
+from src.utils.cards import parse_cards
+
+
+class TestMonteCarloSimulation(unittest.TestCase):
+
+    def test_to_cards_formats(self):
+        expected = parse_cards('AS KH').tolist()
+        self.assertEqual(to_cards('AS KH').tolist(), expected)
+        self.assertEqual(to_cards(['AS', 'KH']).tolist(), expected)
+        self.assertEqual(to_cards(expected).tolist(), expected)
+        self.assertEqual(len(to_cards(None)), 0)
+        self.assertEqual(len(to_cards(float('nan'))), 0)
+
+    def test_showdown_share_splits_ties(self):
+        hero = np.array([10, 10, 10, 5])
+        opponents = np.array([[9, 8], [10, 8], [10, 10], [6, 1]])
+        np.testing.assert_allclose(showdown_share(hero, opponents), [1.0, 0.5, 1 / 3, 0.0])
+
+    def test_known_preflop_equities(self):
+        # Heads-up all-in equities against a random hand: AA 85.2%, 72o 34.6%
+        self.assertAlmostEqual(monte_carlo_equity('AS AH', n_trials=40_000, rng=0), 0.852, delta=0.01)
+        self.assertAlmostEqual(monte_carlo_equity('7C 2D', n_trials=40_000, rng=0), 0.346, delta=0.01)
+
+    def test_more_opponents_lower_equity(self):
+        equities = [monte_carlo_equity('AS AH', n_opponents=k, n_trials=5_000, rng=0) for k in (1, 3, 6)]
+        self.assertGreater(equities[0], equities[1])
+        self.assertGreater(equities[1], equities[2])
+
+    def test_decided_boards(self):
+        # A royal flush on the board splits every pot
+        self.assertEqual(monte_carlo_equity('2C 3D', 'AS KS QS JS TS', n_trials=500, rng=0), 0.5)
+        self.assertEqual(monte_carlo_equity('AS KS', 'QS JS TS 2C 3D', n_trials=500, rng=0), 1.0)
+        self.assertEqual(monte_carlo_equity('AS AH', n_opponents=0), 1.0)
+
+    def test_seeded_runs_repeat(self):
+        first = monte_carlo_equity('JH TH', '9H 8H 2C', n_trials=2_000, rng=7)
+        self.assertEqual(monte_carlo_equity('JH TH', '9H 8H 2C', n_trials=2_000, rng=7), first)
+
+    def test_invalid_situations(self):
+        with self.assertRaises(ValueError):
+            monte_carlo_equity('AS')
+        with self.assertRaises(ValueError):
+            monte_carlo_equity('AS KH', 'AS 2C 3D')
+        with self.assertRaises(ValueError):
+            monte_carlo_equity('AS KH', '2C 3D 4H 5S 6C 7D')
+        with self.assertRaises(ValueError):
+            monte_carlo_equity('AS KH', n_opponents=25)
+
+    def test_situation_equity_enumerates_small_spots(self):
+        # River heads-up is enumerated exactly, so the seed does not matter
+        self.assertEqual(situation_equity('AS AH', 'KD 7C 2H 9S 3C', rng=1),
+                         situation_equity('AS AH', 'KD 7C 2H 9S 3C', rng=2))
+        self.assertNotEqual(situation_equity('AS AH', 'KD 7C 2H', n_opponents=3, n_trials=500, rng=1, use_tables=False),
+                            situation_equity('AS AH', 'KD 7C 2H', n_opponents=3, n_trials=500, rng=2, use_tables=False))
+        # Without tables preflop spots are simulated rather than looked up
+        self.assertNotEqual(situation_equity('AS AH', n_trials=500, rng=1, use_tables=False),
+                            situation_equity('AS AH', n_trials=500, rng=2, use_tables=False))
+
+    def test_equity_for_frame_is_seeded_and_independent_of_workers(self):
+        rng = np.random.default_rng(0)
+        n = PARALLEL_MIN_ROWS + 8
+        deals = np.argsort(rng.random((n, 52)), axis=1)[:, :5]
+        frame = pd.DataFrame({
+            'hand': [[int(c) for c in deal[:2]] for deal in deals],
+            'board': [[int(c) for c in deal[2:5]] for deal in deals],
+            'n_opponents': rng.integers(1, 4, n),
+        }, index=np.arange(n) * 10)
+
+        in_process = equity_for_frame(frame, n_trials=300, seed=3, max_workers=1, use_tables=False)
+        parallel = equity_for_frame(frame, n_trials=300, seed=3, max_workers=2, use_tables=False)
+        pd.testing.assert_series_equal(in_process, parallel)
+        self.assertTrue(in_process.index.equals(frame.index))
+        self.assertTrue(((in_process >= 0) & (in_process <= 1)).all())
+        self.assertFalse(in_process.equals(equity_for_frame(frame, n_trials=300, seed=4, max_workers=1, use_tables=False)))
+
+    def test_equity_for_frame_mixes_streets_and_formats(self):
+        frame = pd.DataFrame({'hand': ['AS AH', '7C 2D', 'JH TH'], 'board': ['', None, '9H 8H 2C 3D']})
+        equities = equity_for_frame(frame, seed=0)
+        self.assertAlmostEqual(equities.iloc[0], 0.852, delta=0.01)  # Preflop table
+        self.assertAlmostEqual(equities.iloc[1], 0.346, delta=0.01)
+        self.assertEqual(equities.name, 'winning_probability')
+
+    def test_preflop_lookups_validate_hands(self):
+        for hole in ('AS KH QD', 'AS AS'):
+            with self.assertRaises(ValueError, msg=hole):
+                situation_equity(hole)
+            with self.assertRaises(ValueError, msg=hole):
+                equity_for_frame(pd.DataFrame({'hand': ['KD KC', hole]}))
+        # Hands of different sizes fall back to per-hand parsing
+        with self.assertRaisesRegex(ValueError, 'Expected 2 hole cards'):
+            equity_for_frame(pd.DataFrame({'hand': ['AS KH', 'AS KH QD'], 'board': ['', '']}))
+
+
+if __name__ == '__main__':
+    unittest.main()
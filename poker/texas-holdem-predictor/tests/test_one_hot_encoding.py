@@ -0,0 +1,44 @@
+import unittest
+
+import numpy as np
+
+from src.features.one_hot_encoding import FEATURE_NAMES, one_hot_cards, rank_counts, suit_counts, build_features
+from src.utils.cards import N_CARDS, parse_cards, cards_to_one_hot
+
+
+def _random_hands(n, k, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.argsort(rng.random((n, N_CARDS)), axis=1)[:, :k].astype(np.uint8)
+
+
+class TestOneHotEncoding(unittest.TestCase):
+
+    def test_histograms(self):
+        hand = parse_cards('AS AH KD 2C 2S')[np.newaxis]
+        ranks = rank_counts(hand)[0]
+        self.assertEqual((ranks[12], ranks[11], ranks[0], ranks.sum()), (2, 1, 2, 5))
+        self.assertEqual(suit_counts(hand)[0].tolist(), [1, 1, 1, 2])  # Hearts, Diamonds, Clubs, Spades
+
+    def test_dense_features(self):
+        cards = _random_hands(500, 5)
+        features = build_features(cards)
+        self.assertEqual((features.shape, features.dtype), ((500, len(FEATURE_NAMES)), np.uint8))
+        np.testing.assert_array_equal(features[:, :N_CARDS], cards_to_one_hot(cards))
+        np.testing.assert_array_equal(features[:, N_CARDS:N_CARDS + 13].sum(axis=1), 5)
+        np.testing.assert_array_equal(features[:, N_CARDS + 13:].sum(axis=1), 5)
+        self.assertEqual(build_features(cards, histograms=False).shape, (500, N_CARDS))
+
+    def test_sparse_matches_dense(self):
+        cards = _random_hands(500, 7)
+        for histograms in (True, False):
+            sparse = build_features(cards, sparse=True, histograms=histograms)
+            self.assertEqual(sparse.format, 'csr')
+            self.assertEqual(sparse.dtype, np.uint8)
+            np.testing.assert_array_equal(sparse.toarray(), build_features(cards, histograms=histograms))
+        csr = one_hot_cards(cards, sparse=True)
+        self.assertTrue(csr.has_sorted_indices)
+        np.testing.assert_array_equal(csr.toarray(), one_hot_cards(cards))
+
+
+if __name__ == '__main__':
+    unittest.main()
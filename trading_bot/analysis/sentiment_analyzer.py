@@ -1,7 +1,11 @@
-import google.generativeai as genai
-from google.api_core import exceptions as google_exceptions # For specific Google API errors
-import requests.exceptions # For potential network errors if genai uses requests internally, or for general handling
 from trading_bot import config
+from trading_bot.lazy_imports import lazy_import
+from trading_bot.reporting import metrics
+
+# The Gemini client takes most of the package's import time, so it is only loaded on the first analysis
+genai = lazy_import("google.generativeai")
+google_exceptions = lazy_import("google.api_core.exceptions") # For specific Google API errors
+requests = lazy_import("requests") # For potential network errors if genai uses requests internally, or for general handling
 
 # Configure Gemini API Key at the module level when it's first imported,
 # or ensure it's configured before making an API call.
@@ -23,6 +27,7 @@ def analyze_sentiment_gemini(text_content: str) -> str | None:
     """
     if not GEMINI_API_KEY or GEMINI_API_KEY == "YOUR_GEMINI_API_KEY_FALLBACK":
         print("Error: Gemini API Key not configured or is using placeholder.")
+        metrics.increment("sentiment_fallbacks_total", reason="missing_api_key")
         return None # Or 'neutral' if a default is preferred even without key
 
     if not text_content or not isinstance(text_content, str) or not text_content.strip():
@@ -53,30 +58,37 @@ def analyze_sentiment_gemini(text_content: str) -> str | None:
                     return sentiment
                 else:
                     print(f"Warning: Gemini returned unexpected sentiment: '{sentiment}'. Defaulting to neutral.")
+                    metrics.increment("sentiment_fallbacks_total", reason="unexpected_response")
                     return 'neutral'
             except ValueError as ve: # If response.text is not accessible due to blocking
                 print(f"Error accessing response text from Gemini (possibly blocked content): {ve}")
                 if response.prompt_feedback and response.prompt_feedback.block_reason:
                     print(f"Prompt feedback: Blocked due to {response.prompt_feedback.block_reason}")
+                metrics.increment("sentiment_fallbacks_total", reason="blocked")
                 return 'neutral'
 
         elif response.prompt_feedback and response.prompt_feedback.block_reason:
              print(f"Warning: Content generation blocked by Gemini. Reason: {response.prompt_feedback.block_reason}. Defaulting to neutral.")
+             metrics.increment("sentiment_fallbacks_total", reason="blocked")
              return 'neutral'
         else:
             print("Warning: Gemini returned no usable content. Defaulting to neutral.")
+            metrics.increment("sentiment_fallbacks_total", reason="empty_response")
             return 'neutral'
 
     except google_exceptions.GoogleAPIError as e:
         # This can include various API errors like InvalidArgument, PermissionDenied (bad API key), etc.
         print(f"Error: Gemini API error: {e}")
+        metrics.increment("sentiment_fallbacks_total", reason="api_error")
         return 'neutral'
     except requests.exceptions.RequestException as e: # If genai uses requests and has a network issue
         print(f"Error: Network error during Gemini API call: {e}")
+        metrics.increment("sentiment_fallbacks_total", reason="network_error")
         return 'neutral'
     except Exception as e:
         # Catch-all for other unexpected errors (e.g., issues with genai library itself)
         print(f"An unexpected error occurred during sentiment analysis: {e}")
+        metrics.increment("sentiment_fallbacks_total", reason="unexpected_error")
         return 'neutral'
 
 if __name__ == '__main__':
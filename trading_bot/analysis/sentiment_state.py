@@ -0,0 +1,208 @@
+"""
+Rolling, time-decayed news sentiment per coin.
+
+Each analyzed article adds its label (+1 positive, 0 neutral, -1 negative),
+weighted by its source, to a per-coin running sum. Both the weighted sum and
+the total weight decay exponentially with article age (config.SENTIMENT_HALF_LIFE_HOURS),
+so breaking news outweighs yesterday's. Reading a score is O(1):
+    score = decayed_sum / (decayed_weight + prior_weight)
+The prior pulls coins with little or stale coverage toward neutral.
+"""
+import json
+import math
+import os
+import time
+from collections import deque
+from typing import Dict, Any, Deque
+
+from trading_bot import config
+from trading_bot.processing.timestamps import parse_published_at
+
+LABEL_VALUES = {"positive": 1.0, "neutral": 0.0, "negative": -1.0}
+STATE_VERSION = 1
+
+
+class _CoinSentiment:
+    __slots__ = ("weighted_sum", "weight", "updated_at", "articles", "seen", "seen_order")
+
+    def __init__(self, max_seen: int):
+        self.weighted_sum = 0.0
+        self.weight = 0.0
+        self.updated_at = 0.0  # Epoch seconds the sums are decayed to
+        self.articles = 0
+        self.seen: set = set()
+        self.seen_order: Deque[str] = deque(maxlen=max_seen)
+
+
+class SentimentState:
+    """
+    Per-coin exponentially decayed, source-weighted sentiment.
+
+    Args:
+        half_life_hours: Age at which an article's weight halves.
+        source_weights: Weight per lower-case source name; "default" covers the rest.
+        prior_weight: Pseudo-weight of neutral evidence added when reading scores.
+        max_seen: Article keys remembered per coin so re-listed articles are
+                  not analyzed or counted twice.
+    """
+
+    def __init__(self, half_life_hours: float | None = None, source_weights: Dict[str, float] | None = None,
+                 prior_weight: float | None = None, max_seen: int = 500):
+        half_life_hours = config.SENTIMENT_HALF_LIFE_HOURS if half_life_hours is None else half_life_hours
+        self.half_life_hours = half_life_hours
+        self.decay_rate = math.log(2) / (half_life_hours * 3600.0)
+        self.source_weights = {k.lower(): v for k, v in
+                               (config.SENTIMENT_SOURCE_WEIGHTS if source_weights is None else source_weights).items()}
+        self.prior_weight = config.SENTIMENT_PRIOR_WEIGHT if prior_weight is None else prior_weight
+        self.max_seen = max_seen
+        self._coins: Dict[str, _CoinSentiment] = {}
+
+    def _coin(self, coin_id: str) -> _CoinSentiment:
+        state = self._coins.get(coin_id)
+        if state is None:
+            state = _CoinSentiment(self.max_seen)
+            self._coins[coin_id] = state
+        return state
+
+    def source_weight(self, source: str | None) -> float:
+        return self.source_weights.get((source or "").lower(), self.source_weights.get("default", 1.0))
+
+    def has_seen(self, coin_id: str, article_key: str) -> bool:
+        state = self._coins.get(coin_id)
+        return bool(article_key) and state is not None and article_key in state.seen
+
+    def add(self, coin_id: str, label: str, published_at: Any = None, source: str | None = None,
+            article_key: str | None = None, now: float | None = None) -> bool:
+        """
+        Folds one analyzed article into a coin's state.
+
+        Args:
+            coin_id: Coin the article is about.
+            label: 'positive', 'neutral' or 'negative'.
+            published_at: ISO-8601 string or epoch seconds; defaults to now.
+            source: Source name used to look up the article's weight.
+            article_key: Unique key (e.g. URL); articles already added are ignored.
+            now: Current epoch seconds (for testing).
+
+        Returns:
+            True if the article was counted.
+        """
+        value = LABEL_VALUES.get(label)
+        if value is None:
+            return False
+        state = self._coin(coin_id)
+        if article_key:
+            if article_key in state.seen:
+                return False
+            if len(state.seen_order) == state.seen_order.maxlen:
+                state.seen.discard(state.seen_order[0])
+            state.seen_order.append(article_key)
+            state.seen.add(article_key)
+
+        now = time.time() if now is None else now
+        if isinstance(published_at, (int, float)):
+            timestamp = float(published_at)
+        else:
+            parsed = parse_published_at(published_at)
+            timestamp = parsed.timestamp() if parsed else now
+        timestamp = min(timestamp, now)
+
+        weight = self.source_weight(source)
+        if timestamp >= state.updated_at:
+            factor = math.exp(-self.decay_rate * (timestamp - state.updated_at))
+            state.weighted_sum = state.weighted_sum * factor + weight * value
+            state.weight = state.weight * factor + weight
+            state.updated_at = timestamp
+        else:  # Late arrival: decay the article itself to the state's reference time
+            factor = math.exp(-self.decay_rate * (state.updated_at - timestamp))
+            state.weighted_sum += weight * value * factor
+            state.weight += weight * factor
+        state.articles += 1
+        return True
+
+    def _decayed(self, coin_id: str, now: float | None) -> tuple[float, float]:
+        state = self._coins.get(coin_id)
+        if state is None or state.weight == 0.0:
+            return 0.0, 0.0
+        now = time.time() if now is None else now
+        factor = math.exp(-self.decay_rate * max(now - state.updated_at, 0.0))
+        return state.weighted_sum * factor, state.weight * factor
+
+    def score(self, coin_id: str, now: float | None = None) -> float:
+        """Continuous sentiment in [-1, 1]; 0 for coins with no (or fully decayed) coverage."""
+        weighted_sum, weight = self._decayed(coin_id, now)
+        denominator = weight + self.prior_weight
+        return weighted_sum / denominator if denominator > 0 else 0.0
+
+    def weight(self, coin_id: str, now: float | None = None) -> float:
+        """Decayed evidence weight behind the score (roughly, effective fresh articles)."""
+        return self._decayed(coin_id, now)[1]
+
+    def label(self, coin_id: str, now: float | None = None, threshold: float | None = None) -> str:
+        """'positive', 'negative' or 'neutral' from the score and config.SENTIMENT_SCORE_THRESHOLD."""
+        threshold = config.SENTIMENT_SCORE_THRESHOLD if threshold is None else threshold
+        score = self.score(coin_id, now)
+        if score >= threshold:
+            return "positive"
+        if score <= -threshold:
+            return "negative"
+        return "neutral"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": STATE_VERSION,
+            "coins": {
+                coin_id: {"weighted_sum": s.weighted_sum, "weight": s.weight, "updated_at": s.updated_at,
+                          "articles": s.articles, "seen": list(s.seen_order)}
+                for coin_id, s in self._coins.items()
+            },
+        }
+
+    def load_dict(self, data: Dict[str, Any]) -> None:
+        self._coins = {}
+        for coin_id, saved in data.get("coins", {}).items():
+            state = self._coin(coin_id)
+            state.weighted_sum = float(saved.get("weighted_sum", 0.0))
+            state.weight = float(saved.get("weight", 0.0))
+            state.updated_at = float(saved.get("updated_at", 0.0))
+            state.articles = int(saved.get("articles", 0))
+            state.seen_order.extend(saved.get("seen", []))
+            state.seen = set(state.seen_order)
+
+    def save(self, path: str | None = None) -> str:
+        """Writes the state as JSON (atomically) and returns the path."""
+        path = path or config.SENTIMENT_STATE_PATH
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path: str | None = None, **kwargs) -> "SentimentState":
+        """
+        Loads state saved by save(); returns an empty state if the file is
+        missing or unreadable.
+        """
+        path = path or config.SENTIMENT_STATE_PATH
+        state = cls(**kwargs)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state.load_dict(json.load(f))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            print(f"Error loading sentiment state from {path}: {e}. Starting fresh.")
+            state = cls(**kwargs)
+        return state
+
+
+if __name__ == '__main__':
+    now = time.time()
+    sentiment = SentimentState(half_life_hours=6)
+    sentiment.add("bitcoin", "negative", now - 24 * 3600, source="Crypto Insights", article_key="old", now=now)
+    sentiment.add("bitcoin", "positive", now - 600, source="Financial Times", article_key="fresh", now=now)
+    sentiment.add("bitcoin", "positive", now - 600, source="Financial Times", article_key="fresh", now=now)  # Ignored
+    print(f"Bitcoin score {sentiment.score('bitcoin', now):.3f} ({sentiment.label('bitcoin', now)}), "
+          f"weight {sentiment.weight('bitcoin', now):.2f}")
+    print(f"Twelve hours later: {sentiment.score('bitcoin', now + 12 * 3600):.3f}")
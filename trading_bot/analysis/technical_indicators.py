@@ -1,7 +1,9 @@
-import pandas as pd
-from ta.trend import SMAIndicator, MACD
-from ta.momentum import RSIIndicator
-from ta.volatility import BollingerBands
+from __future__ import annotations
+
+from trading_bot.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+# The ta indicator classes are imported inside each function: ta imports pandas eagerly.
 
 def calculate_sma(ohlc_df: pd.DataFrame, window: int = 20) -> pd.Series:
     """
@@ -27,6 +29,7 @@ def calculate_sma(ohlc_df: pd.DataFrame, window: int = 20) -> pd.Series:
         pass
 
     try:
+        from ta.trend import SMAIndicator
         indicator_sma = SMAIndicator(close=ohlc_df['close'], window=window, fillna=False)
         sma_series = indicator_sma.sma_indicator()
         return sma_series if sma_series is not None else pd.Series(dtype=float)
@@ -58,6 +61,7 @@ def calculate_rsi(ohlc_df: pd.DataFrame, window: int = 14) -> pd.Series:
         pass
 
     try:
+        from ta.momentum import RSIIndicator
         indicator_rsi = RSIIndicator(close=ohlc_df['close'], window=window, fillna=False)
         rsi_series = indicator_rsi.rsi()
         return rsi_series if rsi_series is not None else pd.Series(dtype=float)
@@ -90,6 +94,7 @@ def calculate_bollinger_bands(ohlc_df: pd.DataFrame, window: int = 20, window_de
         pass
 
     try:
+        from ta.volatility import BollingerBands
         indicator_bb = BollingerBands(close=ohlc_df['close'], window=window, window_dev=window_dev, fillna=False)
         bb_df = pd.DataFrame()
         bb_df['bb_upper'] = indicator_bb.bollinger_hband()
@@ -126,6 +131,7 @@ def calculate_macd(ohlc_df: pd.DataFrame, window_slow: int = 26, window_fast: in
         pass
 
     try:
+        from ta.trend import MACD
         indicator_macd = MACD(close=ohlc_df['close'],
                               window_slow=window_slow,
                               window_fast=window_fast,
@@ -1,8 +1,38 @@
 import requests
 from .. import config  # Use relative import to access config
+from ..reporting import metrics
+from . import resilience
 
 COINGECKO_API_URL = config.COINGECKO_API_URL
 
+# Coingecko picks the OHLC candle size from the days requested: 30-minute
+# candles up to 2 days, 4-hour candles up to 30 days and 4-day candles beyond.
+OHLC_GRANULARITY_MS = ((2, 30 * 60_000), (30, 4 * 3_600_000), (None, 4 * 86_400_000))
+
+
+def ohlc_interval_ms(days) -> int:
+    """Duration of the candles get_historical_ohlc returns for `days` ("max" or a number)."""
+    if str(days) != "max":
+        for max_days, interval_ms in OHLC_GRANULARITY_MS:
+            if max_days is None or float(days) <= max_days:
+                return interval_ms
+    return OHLC_GRANULARITY_MS[-1][1]
+
+
+def max_ohlc_days(max_interval_ms: int, limit: int = 90) -> int:
+    """
+    Most days of OHLC (up to limit) whose candles are no longer than max_interval_ms.
+
+    Returns:
+        The number of days, or 0 if even the finest granularity is too coarse.
+    """
+    days = 0
+    for max_days, interval_ms in OHLC_GRANULARITY_MS:
+        if interval_ms <= max_interval_ms:
+            days = limit if max_days is None else min(max_days, limit)
+    return days
+
+
 def get_top_coins(limit: int = 5) -> list[dict]:
     """
     Fetches the top N cryptocurrencies by market cap from the Coingecko API.
@@ -30,7 +60,8 @@ def get_top_coins(limit: int = 5) -> list[dict]:
     }
 
     try:
-        response = requests.get(f"{COINGECKO_API_URL}{endpoint}", params=params, timeout=10)
+        response = resilience.resilient_get("coingecko.markets", f"{COINGECKO_API_URL}{endpoint}",
+                                            params=params, timeout=10)
         response.raise_for_status()  # Raises an HTTPError for bad responses (4XX or 5XX)
 
         coins_data = response.json()
@@ -47,11 +78,17 @@ def get_top_coins(limit: int = 5) -> list[dict]:
             })
         return top_coins
 
+    except resilience.CircuitOpenError as e:
+        print(f"Skipping top coins request: {e}")
+        metrics.increment("api_errors_total", api="coingecko", endpoint="coins/markets", kind="circuit_open")
+        return []
     except requests.exceptions.RequestException as e:
         print(f"Error fetching top coins from Coingecko API: {e}")
+        metrics.increment("api_errors_total", api="coingecko", endpoint="coins/markets", kind="request")
         return []
     except ValueError as e: # Includes JSONDecodeError
         print(f"Error decoding JSON response for top coins from Coingecko API: {e}")
+        metrics.increment("api_errors_total", api="coingecko", endpoint="coins/markets", kind="decode")
         return []
 
 def get_historical_ohlc(coin_id: str, vs_currency: str = 'usd', days: str = 'max') -> list[list]:
@@ -81,7 +118,9 @@ def get_historical_ohlc(coin_id: str, vs_currency: str = 'usd', days: str = 'max
     }
 
     try:
-        response = requests.get(f"{COINGECKO_API_URL}{endpoint}", params=params, timeout=15) # Longer timeout for potentially larger data
+        response = resilience.resilient_get("coingecko.ohlc", f"{COINGECKO_API_URL}{endpoint}",
+                                            hedge=config.HEDGE_OHLC_REQUESTS,
+                                            params=params, timeout=15) # Longer timeout for potentially larger data
         response.raise_for_status()  # Raises HTTPError for bad responses (4XX or 5XX)
 
         ohlc_data = response.json()
@@ -90,6 +129,7 @@ def get_historical_ohlc(coin_id: str, vs_currency: str = 'usd', days: str = 'max
         if not isinstance(ohlc_data, list) or not all(isinstance(item, list) and len(item) == 5 for item in ohlc_data):
             print(f"Error: Unexpected data format received for OHLC data for {coin_id}.")
             # print(f"Received data: {ohlc_data[:2]}...") # Uncomment for debugging if needed
+            metrics.increment("api_errors_total", api="coingecko", endpoint="ohlc", kind="format")
             return []
 
         return ohlc_data
@@ -100,12 +140,19 @@ def get_historical_ohlc(coin_id: str, vs_currency: str = 'usd', days: str = 'max
             print(f"Error: Coin '{coin_id}' not found or no OHLC data available for the specified parameters on Coingecko.")
         else:
             print(f"HTTP error fetching OHLC data for {coin_id} from Coingecko: {e}")
+        metrics.increment("api_errors_total", api="coingecko", endpoint="ohlc", kind="http")
+        return []
+    except resilience.CircuitOpenError as e:
+        print(f"Skipping OHLC request for {coin_id}: {e}")
+        metrics.increment("api_errors_total", api="coingecko", endpoint="ohlc", kind="circuit_open")
         return []
     except requests.exceptions.RequestException as e:
         print(f"Request error fetching OHLC data for {coin_id} from Coingecko: {e}")
+        metrics.increment("api_errors_total", api="coingecko", endpoint="ohlc", kind="request")
         return []
     except ValueError as e:  # Includes JSONDecodeError
         print(f"Error decoding JSON response for OHLC data for {coin_id} from Coingecko: {e}")
+        metrics.increment("api_errors_total", api="coingecko", endpoint="ohlc", kind="decode")
         return []
 
 if __name__ == '__main__':
@@ -1,8 +1,10 @@
-import requests
 import json # Not strictly needed for placeholders but good for future
 import time
-import pandas as pd # For volatility calculation
-import numpy as np  # For volatility calculation
+from ..lazy_imports import lazy_import
+
+requests = lazy_import("requests")
+pd = lazy_import("pandas") # For volatility calculation
+np = lazy_import("numpy")  # For volatility calculation
 
 # Import necessary config from trading_bot.config
 # from trading_bot import config # This line might cause issues if run directly.
@@ -12,6 +14,10 @@ import numpy as np  # For volatility calculation
 
 # For placeholders, we don't need actual API key usage yet.
 
+_PERIOD_MS = {"5m": 300_000, "15m": 900_000, "30m": 1_800_000, "1h": 3_600_000,
+              "4h": 14_400_000, "1d": 86_400_000}
+_FUNDING_INTERVAL_MS = 8 * 3_600_000  # Perpetual funding settles every 8 hours
+
 def get_order_book(symbol: str, limit: int = 100) -> dict:
     """
     Fetches the order book for a given symbol.
@@ -139,13 +145,56 @@ def get_open_interest(symbol: str) -> dict:
         "time": int(time.time() * 1000)
     }
 
-def get_funding_rates(symbol: str) -> list:
+def get_open_interest_history(symbol: str, period: str = "1h", start_time: int | None = None,
+                              limit: int = 500) -> list:
+    """
+    Fetches historical open interest for a symbol (typically for futures).
+    PLACEHOLDER IMPLEMENTATION.
+
+    Args:
+        symbol: Trading symbol (e.g., "BTCUSDT").
+        period: Sampling period ("5m", "15m", "30m", "1h", "4h", "1d").
+        start_time: Only return points at or after this epoch-ms time. Defaults
+                    to the most recent `limit` periods.
+        limit: Maximum number of points to return.
+
+    Returns:
+        A list of dictionaries ({"symbol", "sumOpenInterest", "timestamp"}),
+        oldest first, or an error structure.
+    """
+    print(f"Mock API Call: Fetching open interest history for {symbol} from {start_time}")
+    if not symbol:
+        return [{"error": "Symbol is required"}]
+    period_ms = _PERIOD_MS.get(period)
+    if period_ms is None:
+        return [{"error": f"Unsupported period {period}"}]
+
+    # --- Real API call would look something like this (Binance futures) ---
+    # endpoint = f"{EXCHANGE_API_URL}/futures/data/openInterestHist"
+    # params = {"symbol": symbol, "period": period, "limit": limit, "startTime": start_time}
+
+    now_ms = int(time.time() * 1000)
+    last = now_ms - now_ms % period_ms
+    first = last - (limit - 1) * period_ms if start_time is None else start_time + (-start_time) % period_ms
+    seed = sum(symbol.encode())
+    return [
+        {"symbol": symbol,
+         "sumOpenInterest": f"{12000 + 500 * np.sin(ts / period_ms / 24 + seed):.2f}",
+         "timestamp": ts}
+        for ts in range(first, last + 1, period_ms)
+    ][:limit]
+
+def get_funding_rates(symbol: str, start_time: int | None = None, limit: int = 100) -> list:
     """
     Fetches funding rates for a given symbol (typically for perpetual futures).
     PLACEHOLDER IMPLEMENTATION.
 
     Args:
         symbol: Trading symbol (e.g., "BTCUSDT").
+        start_time: If given, return the funding history from this epoch-ms
+                    time (oldest first, at most `limit` entries) instead of
+                    only the latest rate.
+        limit: Maximum number of entries for history requests.
 
     Returns:
         A list of dictionaries containing funding rate data or an error structure.
@@ -154,6 +203,21 @@ def get_funding_rates(symbol: str) -> list:
     if not symbol:
         return [{"error": "Symbol is required"}]
 
+    if start_time is not None:
+        # --- Real API call would look something like this (Binance futures) ---
+        # endpoint = f"{EXCHANGE_API_URL}/fapi/v1/fundingRate"
+        # params = {"symbol": symbol, "startTime": start_time, "limit": limit}
+        interval = _FUNDING_INTERVAL_MS
+        now_ms = int(time.time() * 1000)
+        first = start_time + (-start_time) % interval
+        seed = sum(symbol.encode())
+        return [
+            {"symbol": symbol, "fundingTime": ts,
+             "fundingRate": f"{0.0001 + 0.00005 * np.sin(ts / interval + seed):.8f}",
+             "markPrice": "60005.00"}
+            for ts in range(first, now_ms + 1, interval)
+        ][:limit]
+
     return [{
         "symbol": symbol,
         "fundingTime": int(time.time() * 1000) - 3600000, # Simulate last funding time
@@ -161,6 +225,51 @@ def get_funding_rates(symbol: str) -> list:
         "markPrice": "60005.00"
     }]
 
+def get_exchange_info(market: str = "spot") -> dict:
+    """
+    Fetches exchange metadata: tradable symbols with their tick and lot sizes.
+    PLACEHOLDER IMPLEMENTATION.
+
+    Args:
+        market: "spot" or "futures" (USD-margined perpetuals).
+
+    Returns:
+        A dictionary in Binance exchangeInfo format ({"symbols": [...]}, each
+        with symbol, status, baseAsset, quoteAsset and PRICE_FILTER / LOT_SIZE
+        filters) or an error structure.
+    """
+    print(f"Mock API Call: Fetching {market} exchange info")
+    if market not in ("spot", "futures"):
+        return {"error": f"Unsupported market {market}"}
+
+    # --- Real API call would look something like this (Binance) ---
+    # endpoint = "/api/v3/exchangeInfo" if market == "spot" else "/fapi/v1/exchangeInfo"
+    # response = requests.get(f"{EXCHANGE_API_URL}{endpoint}", timeout=10)
+
+    # base asset: (tick size, lot size)
+    assets = {
+        "BTC": ("0.01", "0.00001"), "ETH": ("0.01", "0.0001"), "BNB": ("0.01", "0.001"),
+        "SOL": ("0.01", "0.001"), "XRP": ("0.0001", "0.1"), "ADA": ("0.0001", "0.1"),
+        "DOGE": ("0.00001", "1"), "AVAX": ("0.01", "0.01"), "DOT": ("0.001", "0.01"),
+        "LINK": ("0.001", "0.01"), "TRX": ("0.00001", "0.1"), "LTC": ("0.01", "0.001"),
+    }
+    perpetual_assets = {"BTC", "ETH", "BNB", "SOL", "XRP", "DOGE", "LINK", "AVAX"}
+    symbols = []
+    for base, (tick_size, lot_size) in assets.items():
+        if market == "futures" and base not in perpetual_assets:
+            continue
+        entry = {
+            "symbol": f"{base}USDT", "status": "TRADING", "baseAsset": base, "quoteAsset": "USDT",
+            "filters": [
+                {"filterType": "PRICE_FILTER", "tickSize": tick_size},
+                {"filterType": "LOT_SIZE", "stepSize": lot_size, "minQty": lot_size},
+            ],
+        }
+        if market == "futures":
+            entry["contractType"] = "PERPETUAL"
+        symbols.append(entry)
+    return {"timezone": "UTC", "serverTime": int(time.time() * 1000), "symbols": symbols}
+
 if __name__ == '__main__':
     print("--- Order Book Example ---")
     btc_order_book = get_order_book("BTCUSDT")
@@ -0,0 +1,327 @@
+"""
+Venue adapters with one normalized book / trade schema, and a cross-venue
+best bid/offer.
+
+Every adapter turns its venue's REST payloads into:
+    book  = {"venue", "base", "quote", "bids": [(price, qty), ...] best first,
+             "asks": [(price, qty), ...] best first, "timestamp" (epoch ms)}
+    trade = {"venue", "price", "qty", "time" (epoch ms), "side" ("buy"/"sell")}
+Trades keep the "price", "qty" and "time" keys of exchange.get_recent_trades,
+so calculate_volatility and CandleAggregator.add_trades accept them as is.
+
+BestPriceConsolidator.refresh fetches every (venue, pair) concurrently and
+keeps the latest books and trades in memory. The strategy then reads the
+consolidated best bid/offer per pair without any further network call.
+Requests go through resilience.resilient_get, so an unhealthy venue trips its
+own breaker and is simply missing from the consolidated view.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Any, Iterable, Tuple
+
+import requests
+
+from .. import config
+from ..reporting import metrics
+from . import resilience
+
+
+def _levels(raw_levels, depth: int | None = None) -> List[Tuple[float, float]]:
+    """[[price, qty, ...], ...] -> [(price, qty), ...], skipping malformed levels."""
+    levels = []
+    for level in raw_levels or []:
+        try:
+            levels.append((float(level[0]), float(level[1])))
+        except (IndexError, ValueError, TypeError):
+            continue
+        if depth is not None and len(levels) >= depth:
+            break
+    return levels
+
+
+class ExchangeAdapter:
+    """
+    Base class for one venue's public market-data API.
+
+    Subclasses set `name`, build request URLs and parse payloads; fetching,
+    error handling and metrics live here.
+
+    Args:
+        base_url: API root. Defaults to the venue's URL in config.
+        timeout: Request timeout in seconds. Defaults to config.EXCHANGE_REQUEST_TIMEOUT.
+    """
+    name = "venue"
+    url_setting = "EXCHANGE_API_URL"  # config attribute holding the default API root
+
+    def __init__(self, base_url: str | None = None, timeout: float | None = None):
+        self.base_url = (base_url or getattr(config, self.url_setting)).rstrip("/")
+        self.timeout = timeout or config.EXCHANGE_REQUEST_TIMEOUT
+
+    def pair(self, base: str, quote: str) -> str:
+        """The venue's symbol for base/quote."""
+        return f"{base}{quote}"
+
+    def book_request(self, base: str, quote: str, depth: int) -> Tuple[str, Dict[str, Any]]:
+        raise NotImplementedError
+
+    def trades_request(self, base: str, quote: str, limit: int) -> Tuple[str, Dict[str, Any]]:
+        raise NotImplementedError
+
+    def parse_book(self, payload: Any, depth: int) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def parse_trades(self, payload: Any) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def _get(self, kind: str, path: str, params: Dict[str, Any]) -> Any:
+        response = resilience.resilient_get(f"{self.name}.{kind}", f"{self.base_url}{path}",
+                                            params=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def fetch_order_book(self, base: str, quote: str, depth: int | None = None) -> Dict[str, Any] | None:
+        """
+        Fetches and normalizes the order book for base/quote.
+
+        Returns:
+            A normalized book, or None on any request or payload error.
+        """
+        depth = depth or config.EXCHANGE_BOOK_DEPTH
+        try:
+            path, params = self.book_request(base, quote, depth)
+            book = self.parse_book(self._get("book", path, params), depth)
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching {self.name} order book for {base}/{quote}: {e}")
+            metrics.increment("api_errors_total", api="exchange", endpoint=f"{self.name}.book", kind="request")
+            return None
+        except (ValueError, KeyError, TypeError, AttributeError, IndexError) as e:
+            print(f"Error decoding {self.name} order book for {base}/{quote}: {e}")
+            metrics.increment("api_errors_total", api="exchange", endpoint=f"{self.name}.book", kind="decode")
+            return None
+        book.update(venue=self.name, base=base, quote=quote)
+        book.setdefault("timestamp", int(time.time() * 1000))
+        return book
+
+    def fetch_trades(self, base: str, quote: str, limit: int | None = None) -> List[Dict[str, Any]] | None:
+        """
+        Fetches and normalizes recent trades for base/quote, oldest first.
+
+        Returns:
+            Normalized trades, or None on any request or payload error.
+        """
+        limit = limit or config.EXCHANGE_TRADES_LIMIT
+        try:
+            path, params = self.trades_request(base, quote, limit)
+            trades = self.parse_trades(self._get("trades", path, params))
+        except requests.exceptions.RequestException as e:
+            print(f"Error fetching {self.name} trades for {base}/{quote}: {e}")
+            metrics.increment("api_errors_total", api="exchange", endpoint=f"{self.name}.trades", kind="request")
+            return None
+        except (ValueError, KeyError, TypeError, AttributeError, IndexError) as e:
+            print(f"Error decoding {self.name} trades for {base}/{quote}: {e}")
+            metrics.increment("api_errors_total", api="exchange", endpoint=f"{self.name}.trades", kind="decode")
+            return None
+        for trade in trades:
+            trade["venue"] = self.name
+        trades.sort(key=lambda trade: trade["time"])
+        return trades
+
+
+class BinanceAdapter(ExchangeAdapter):
+    """Binance spot (GET /depth, GET /trades)."""
+    name = "binance"
+
+    def book_request(self, base, quote, depth):
+        # Binance only accepts a fixed set of depth limits
+        limit = next((n for n in (5, 10, 20, 50, 100, 500, 1000, 5000) if n >= depth), 5000)
+        return "/depth", {"symbol": self.pair(base, quote), "limit": limit}
+
+    def trades_request(self, base, quote, limit):
+        return "/trades", {"symbol": self.pair(base, quote), "limit": min(limit, 1000)}
+
+    def parse_book(self, payload, depth):
+        return {"bids": _levels(payload["bids"], depth), "asks": _levels(payload["asks"], depth)}
+
+    def parse_trades(self, payload):
+        return [{"price": float(t["price"]), "qty": float(t["qty"]), "time": int(t["time"]),
+                 "side": "sell" if t.get("isBuyerMaker") else "buy"} for t in payload]
+
+
+class KrakenAdapter(ExchangeAdapter):
+    """Kraken (GET /0/public/Depth, GET /0/public/Trades). Kraken calls bitcoin XBT."""
+    name = "kraken"
+    url_setting = "KRAKEN_API_URL"
+    asset_aliases = {"BTC": "XBT"}
+
+    def pair(self, base, quote):
+        return f"{self.asset_aliases.get(base, base)}{self.asset_aliases.get(quote, quote)}"
+
+    def book_request(self, base, quote, depth):
+        return "/0/public/Depth", {"pair": self.pair(base, quote), "count": depth}
+
+    def trades_request(self, base, quote, limit):
+        return "/0/public/Trades", {"pair": self.pair(base, quote), "count": limit}
+
+    @staticmethod
+    def _result(payload):
+        if payload.get("error"):
+            raise ValueError("; ".join(payload["error"]))
+        # The result is keyed by Kraken's own pair name (e.g. XXBTZUSD), next to a "last" cursor
+        result = next((value for key, value in payload["result"].items() if key != "last"), None)
+        if result is None:
+            raise ValueError("empty result")
+        return result
+
+    def parse_book(self, payload, depth):
+        book = self._result(payload)
+        return {"bids": _levels(book["bids"], depth), "asks": _levels(book["asks"], depth)}
+
+    def parse_trades(self, payload):
+        # [price, volume, time (epoch seconds), "b"/"s", order type, misc, trade id]
+        return [{"price": float(t[0]), "qty": float(t[1]), "time": int(float(t[2]) * 1000),
+                 "side": "buy" if t[3] == "b" else "sell"} for t in self._result(payload)]
+
+
+class CoinbaseAdapter(ExchangeAdapter):
+    """Coinbase Exchange (GET /products/{id}/book, GET /products/{id}/trades)."""
+    name = "coinbase"
+    url_setting = "COINBASE_API_URL"
+
+    def pair(self, base, quote):
+        return f"{base}-{quote}"
+
+    def book_request(self, base, quote, depth):
+        return f"/products/{self.pair(base, quote)}/book", {"level": 2}
+
+    def trades_request(self, base, quote, limit):
+        return f"/products/{self.pair(base, quote)}/trades", {"limit": min(limit, 1000)}
+
+    def parse_book(self, payload, depth):
+        return {"bids": _levels(payload["bids"], depth), "asks": _levels(payload["asks"], depth)}
+
+    def parse_trades(self, payload):
+        # Coinbase reports the maker's side; the taker (aggressor) is the opposite
+        return [{"price": float(t["price"]), "qty": float(t["size"]),
+                 "time": int(datetime.fromisoformat(t["time"].replace("Z", "+00:00")).timestamp() * 1000),
+                 "side": "buy" if t["side"] == "sell" else "sell"} for t in payload]
+
+
+ADAPTERS = {adapter.name: adapter for adapter in (BinanceAdapter, KrakenAdapter, CoinbaseAdapter)}
+
+
+def default_adapters() -> List[ExchangeAdapter]:
+    """One adapter per venue in config.EXCHANGE_VENUES (unknown names are skipped)."""
+    adapters = []
+    for name in config.EXCHANGE_VENUES:
+        adapter_class = ADAPTERS.get(name.strip().lower())
+        if adapter_class is None:
+            print(f"Unknown exchange venue '{name}'. Skipping.")
+            continue
+        adapters.append(adapter_class())
+    return adapters
+
+
+class BestPriceConsolidator:
+    """
+    Latest books and trades per venue, and the best bid/offer across venues.
+
+    Args:
+        adapters: Venues to consolidate. Defaults to default_adapters().
+        max_age_seconds: Books older than this are left out of the best
+                         bid/offer. Defaults to config.CONSOLIDATED_BOOK_MAX_AGE_SECONDS.
+        max_workers: Concurrent fetches. Defaults to config.EXCHANGE_FETCH_WORKERS.
+    """
+
+    def __init__(self, adapters: Iterable[ExchangeAdapter] | None = None, max_age_seconds: float | None = None,
+                 max_workers: int | None = None):
+        self.adapters = list(default_adapters() if adapters is None else adapters)
+        self.max_age_seconds = max_age_seconds or config.CONSOLIDATED_BOOK_MAX_AGE_SECONDS
+        self.max_workers = max_workers or config.EXCHANGE_FETCH_WORKERS
+        self.books: Dict[Tuple[str, str], Dict[str, Dict[str, Any]]] = {}  # (base, quote) -> venue -> book
+        self._trades: Dict[Tuple[str, str], Dict[str, List[Dict[str, Any]]]] = {}
+
+    def update_book(self, book: Dict[str, Any]) -> None:
+        """Stores a normalized book as its venue's latest for the pair."""
+        self.books.setdefault((book["base"], book["quote"]), {})[book["venue"]] = book
+
+    def update_trades(self, venue: str, base: str, quote: str, trades: List[Dict[str, Any]]) -> None:
+        """Replaces a venue's recent trades for the pair."""
+        self._trades.setdefault((base, quote), {})[venue] = trades
+
+    def refresh(self, pairs: Iterable[Tuple[str, str]], include_trades: bool = True) -> int:
+        """
+        Fetches books (and trades) for every pair from every venue concurrently.
+
+        Returns:
+            The number of books received.
+        """
+        pairs = list(dict.fromkeys(pairs))
+        jobs = [(adapter, base, quote) for base, quote in pairs for adapter in self.adapters]
+        if not jobs:
+            return 0
+        received = 0
+        with metrics.span("exchange.consolidated_refresh"):
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs)),
+                                    thread_name_prefix="venue") as pool:
+                books = [pool.submit(adapter.fetch_order_book, base, quote) for adapter, base, quote in jobs]
+                trades = [pool.submit(adapter.fetch_trades, base, quote) for adapter, base, quote in jobs] \
+                    if include_trades else []
+                for future in books:
+                    book = future.result()
+                    if book is not None:
+                        self.update_book(book)
+                        received += 1
+                for (adapter, base, quote), future in zip(jobs, trades):
+                    venue_trades = future.result()
+                    if venue_trades is not None:
+                        self.update_trades(adapter.name, base, quote, venue_trades)
+        metrics.increment("exchange_books_received_total", received)
+        return received
+
+    def best_bid_offer(self, base: str, quote: str, now: float | None = None) -> Dict[str, Any] | None:
+        """
+        Best bid and best ask across the venues with a fresh book.
+
+        Returns:
+            {"best_bid", "best_bid_venue", "best_ask", "best_ask_venue",
+            "spread", "crossed", "venues"}, or None if no venue has a fresh
+            two-sided book. A crossed market (best bid above best ask on
+            another venue) gives a negative spread.
+        """
+        now_ms = (time.time() if now is None else now) * 1000
+        best_bid = best_ask = None
+        venues = []
+        for venue, book in self.books.get((base, quote), {}).items():
+            if now_ms - book["timestamp"] > self.max_age_seconds * 1000 or not book["bids"] or not book["asks"]:
+                continue
+            venues.append(venue)
+            bid, ask = book["bids"][0][0], book["asks"][0][0]
+            if best_bid is None or bid > best_bid[0]:
+                best_bid = (bid, venue)
+            if best_ask is None or ask < best_ask[0]:
+                best_ask = (ask, venue)
+        if not venues:
+            return None
+        return {
+            "best_bid": best_bid[0], "best_bid_venue": best_bid[1],
+            "best_ask": best_ask[0], "best_ask_venue": best_ask[1],
+            "spread": best_ask[0] - best_bid[0], "crossed": best_bid[0] > best_ask[0],
+            "venues": sorted(venues),
+        }
+
+    def trades(self, base: str, quote: str) -> List[Dict[str, Any]]:
+        """Recent trades from all venues for the pair, merged oldest first."""
+        merged = [trade for venue_trades in self._trades.get((base, quote), {}).values() for trade in venue_trades]
+        merged.sort(key=lambda trade: trade["time"])
+        return merged
+
+
+if __name__ == '__main__':
+    consolidator = BestPriceConsolidator(adapters=[])
+    now_ms = int(time.time() * 1000)
+    for venue, bid, ask in (("binance", 60000.0, 60001.0), ("kraken", 60000.5, 60002.0),
+                            ("coinbase", 59999.0, 60000.8)):
+        consolidator.update_book({"venue": venue, "base": "BTC", "quote": "USDT", "timestamp": now_ms,
+                                  "bids": [(bid, 1.0)], "asks": [(ask, 1.0)]})
+    print(consolidator.best_bid_offer("BTC", "USDT"))
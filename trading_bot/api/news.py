@@ -1,6 +1,8 @@
-import requests
 from typing import List, Dict, Any
 from .. import config # Relative import for config
+from ..lazy_imports import lazy_import
+
+requests = lazy_import("requests")
 
 # In a real scenario, you'd use these from config
 # NEWS_API_KEY = config.NEWS_API_KEY
@@ -0,0 +1,354 @@
+"""
+Incremental news ingestion.
+
+Instead of one news query per coin per cycle, a NewsIngestor polls a few broad
+sources. Each poll sends the source's since-cursor and ETag, so unchanged feeds
+cost a 304 and changed feeds only return new articles. Articles are
+de-duplicated by normalized URL and by a near-duplicate SimHash text
+fingerprint. They are then routed to coins by a CoinTagger and kept in an
+in-memory NewsIndex that the strategy reads without any network call.
+"""
+import hashlib
+import re
+from collections import deque
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Any, Iterable, Set, Deque, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+
+from .. import config
+from ..analysis.coin_tagger import CoinTagger
+from ..processing.timestamps import parse_published_at
+from ..reporting import metrics
+from . import resilience
+
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src", "cmpid", "ncid"}
+SIMHASH_BITS = 64
+_SIMHASH_BANDS = 4  # Pigeonhole: two hashes within 3 bits share at least one 16-bit band
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of an article URL for exact de-duplication.
+
+    Lowercases scheme and host, drops "www.", fragments, trailing slashes and
+    tracking parameters (utm_* and friends), and sorts the remaining query.
+    """
+    if not url:
+        return ""
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(((parts.scheme or "https").lower(), host, path, urlencode(query), ""))
+
+
+def simhash(text: str, bits: int = SIMHASH_BITS) -> int:
+    """
+    SimHash fingerprint of a text over word bigrams.
+
+    Texts that differ only slightly (syndicated copies, edited headlines)
+    get fingerprints a few bits apart.
+    """
+    words = _WORD_RE.findall((text or "").lower())
+    features = [" ".join(words[i:i + 2]) for i in range(max(len(words) - 1, 1))] if words else []
+    if not features:
+        return 0
+    weights = [0] * bits
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=bits // 8).digest(), "big")
+        for i in range(bits):
+            weights[i] += 1 if (h >> i) & 1 else -1
+    fingerprint = 0
+    for i, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << i
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def _article_text(article: Dict[str, Any]) -> str:
+    return f"{article.get('title') or ''} {article.get('content_snippet') or ''}".strip()
+
+
+class NewsDeduplicator:
+    """
+    Remembers seen articles by normalized URL and SimHash fingerprint.
+
+    Args:
+        max_distance: Maximum Hamming distance for two fingerprints to count
+                      as near-duplicates (at most 3 with the banded lookup).
+        capacity: Number of recent articles remembered.
+    """
+
+    def __init__(self, max_distance: int | None = None, capacity: int = 20000):
+        self.max_distance = config.NEWS_DEDUP_MAX_DISTANCE if max_distance is None else max_distance
+        if self.max_distance >= _SIMHASH_BANDS:
+            raise ValueError(f"max_distance must be below {_SIMHASH_BANDS}.")
+        self.capacity = capacity
+        self._urls: Set[str] = set()
+        self._order: Deque[Tuple[str, int]] = deque()
+        self._bands: List[Dict[int, Set[int]]] = [{} for _ in range(_SIMHASH_BANDS)]
+        self._band_bits = SIMHASH_BITS // _SIMHASH_BANDS
+
+    def _band_keys(self, fingerprint: int) -> List[int]:
+        mask = (1 << self._band_bits) - 1
+        return [(fingerprint >> (i * self._band_bits)) & mask for i in range(_SIMHASH_BANDS)]
+
+    def is_duplicate(self, article: Dict[str, Any]) -> bool:
+        """True if the article's URL or a near-identical text was already seen."""
+        url = normalize_url(article.get("url", ""))
+        if url and url in self._urls:
+            return True
+        fingerprint = simhash(_article_text(article))
+        if not fingerprint:
+            return False
+        for band, key in zip(self._bands, self._band_keys(fingerprint)):
+            for candidate in band.get(key, ()):
+                if hamming_distance(candidate, fingerprint) <= self.max_distance:
+                    return True
+        return False
+
+    def add(self, article: Dict[str, Any]) -> None:
+        url = normalize_url(article.get("url", ""))
+        fingerprint = simhash(_article_text(article))
+        self._urls.add(url)
+        for band, key in zip(self._bands, self._band_keys(fingerprint)):
+            band.setdefault(key, set()).add(fingerprint)
+        self._order.append((url, fingerprint))
+        if len(self._order) > self.capacity:
+            self._forget(*self._order.popleft())
+
+    def _forget(self, url: str, fingerprint: int) -> None:
+        self._urls.discard(url)
+        for band, key in zip(self._bands, self._band_keys(fingerprint)):
+            bucket = band.get(key)
+            if bucket is not None:
+                bucket.discard(fingerprint)
+                if not bucket:
+                    del band[key]
+
+    def check_and_add(self, article: Dict[str, Any]) -> bool:
+        """Records the article; returns True if it was new."""
+        if self.is_duplicate(article):
+            return False
+        self.add(article)
+        return True
+
+
+class NewsIndex:
+    """
+    In-memory per-coin index of recent, de-duplicated articles.
+
+    Args:
+        matcher: Object with update_universe(coins) and tag(text) -> set of coin ids.
+                 Defaults to a CoinTagger.
+        per_coin: Articles kept per coin (newest first).
+        max_age_hours: Articles older than this are not returned.
+    """
+
+    def __init__(self, matcher=None, per_coin: int | None = None, max_age_hours: float | None = None):
+        self.matcher = matcher or CoinTagger()
+        self.per_coin = per_coin or config.NEWS_INDEX_PER_COIN
+        self.max_age_hours = config.NEWS_MAX_AGE_HOURS if max_age_hours is None else max_age_hours
+        self._by_coin: Dict[str, Deque[Dict[str, Any]]] = {}
+
+    def update_universe(self, coins: Iterable[Dict[str, Any]]) -> None:
+        self.matcher.update_universe(list(coins))
+
+    def add(self, article: Dict[str, Any]) -> Set[str]:
+        """
+        Tags an article and files it under every coin it mentions.
+
+        Returns:
+            The coin ids the article was filed under.
+        """
+        coin_ids = self.matcher.tag(_article_text(article))
+        if coin_ids:
+            article = dict(article, coins=sorted(coin_ids))
+        for coin_id in coin_ids:
+            articles = self._by_coin.setdefault(coin_id, deque(maxlen=self.per_coin))
+            articles.appendleft(article)
+        return coin_ids
+
+    def get_articles(self, coin_id: str, limit: int = 5, now: datetime | None = None) -> List[Dict[str, Any]]:
+        """
+        Returns up to `limit` of the coin's freshest articles, newest first.
+        """
+        articles = self._by_coin.get(coin_id)
+        if not articles:
+            return []
+        cutoff = None
+        if self.max_age_hours:
+            cutoff = (now or datetime.now(timezone.utc)) - timedelta(hours=self.max_age_hours)
+        fresh = [
+            a for a in articles
+            if cutoff is None or (parse_published_at(a.get("published_at")) or cutoff) >= cutoff
+        ]
+        fresh.sort(key=lambda a: a.get("published_at") or "", reverse=True)
+        return fresh[:limit]
+
+    def coins(self) -> List[str]:
+        return list(self._by_coin)
+
+
+class NewsSource:
+    """
+    One polled news endpoint (NewsAPI-style JSON with an "articles" list).
+
+    Tracks the ETag and newest published_at seen, and sends them back as
+    If-None-Match and the `since_param` query parameter on the next poll.
+
+    Args:
+        name: Label used in metrics and logs.
+        url: Endpoint URL.
+        params: Static query parameters (e.g. q, language, apiKey).
+        since_param: Query parameter carrying the since-cursor.
+        timeout: Request timeout in seconds.
+    """
+
+    def __init__(self, name: str, url: str, params: Dict[str, Any] | None = None,
+                 since_param: str = "from", timeout: int = 10):
+        self.name = name
+        self.url = url
+        self.params = dict(params or {})
+        self.since_param = since_param
+        self.timeout = timeout
+        self.etag: str | None = None
+        self.cursor: str | None = None  # ISO published_at of the newest article seen
+
+    @staticmethod
+    def _normalize(raw: Dict[str, Any]) -> Dict[str, Any]:
+        source = raw.get("source")
+        return {
+            "title": raw.get("title"),
+            "url": raw.get("url"),
+            "source": source.get("name") if isinstance(source, dict) else source,
+            "published_at": raw.get("publishedAt") or raw.get("published_at"),
+            "content_snippet": raw.get("description") or raw.get("content_snippet") or (raw.get("content") or "")[:200],
+        }
+
+    def fetch(self) -> List[Dict[str, Any]]:
+        """
+        Polls the source once.
+
+        Returns:
+            Normalized articles newer than the cursor; empty if the feed is
+            unchanged (304) or an error occurs.
+        """
+        params = dict(self.params)
+        if self.cursor:
+            params[self.since_param] = self.cursor
+        headers = {"If-None-Match": self.etag} if self.etag else {}
+
+        try:
+            response = resilience.resilient_get(f"news.{self.name}", self.url, params=params,
+                                                headers=headers, timeout=self.timeout)
+            if response.status_code == 304:
+                metrics.increment("news_polls_total", source=self.name, result="not_modified")
+                return []
+            response.raise_for_status()
+            raw_articles = response.json().get("articles", [])
+        except requests.exceptions.RequestException as e:
+            print(f"Error polling news source {self.name}: {e}")
+            metrics.increment("api_errors_total", api="news", endpoint=self.name, kind="request")
+            return []
+        except (ValueError, AttributeError) as e:
+            print(f"Error decoding news from {self.name}: {e}")
+            metrics.increment("api_errors_total", api="news", endpoint=self.name, kind="decode")
+            return []
+
+        self.etag = response.headers.get("ETag") or self.etag
+        cursor_dt = parse_published_at(self.cursor)
+        articles = []
+        for raw in raw_articles:
+            if not isinstance(raw, dict):
+                continue
+            article = self._normalize(raw)
+            published = parse_published_at(article["published_at"])
+            if cursor_dt is not None and published is not None and published < cursor_dt:
+                continue
+            if published is not None and (cursor_dt is None or published > cursor_dt):
+                cursor_dt = published
+            articles.append(article)
+        if cursor_dt is not None:
+            self.cursor = cursor_dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+        metrics.increment("news_polls_total", source=self.name, result="ok")
+        return articles
+
+
+class NewsIngestor:
+    """
+    Polls sources, de-duplicates and indexes the articles.
+
+    Args:
+        sources: NewsSource instances to poll.
+        index: NewsIndex receiving new articles.
+        deduplicator: NewsDeduplicator; a default one is created if omitted.
+    """
+
+    def __init__(self, sources: Iterable[NewsSource], index: NewsIndex | None = None,
+                 deduplicator: NewsDeduplicator | None = None):
+        self.sources = list(sources)
+        self.index = index or NewsIndex()
+        self.deduplicator = deduplicator or NewsDeduplicator()
+
+    def ingest(self, articles: Iterable[Dict[str, Any]]) -> int:
+        """Indexes articles that were not seen before; returns how many were new."""
+        new = 0
+        for article in articles:
+            if not self.deduplicator.check_and_add(article):
+                metrics.increment("news_duplicates_total")
+                continue
+            self.index.add(article)
+            new += 1
+        return new
+
+    def poll(self) -> int:
+        """Polls every source once; returns the number of new articles indexed."""
+        new = 0
+        for source in self.sources:
+            with metrics.span("news.poll", source=source.name):
+                new += self.ingest(source.fetch())
+        metrics.increment("news_articles_ingested_total", new)
+        return new
+
+
+def default_sources() -> List[NewsSource]:
+    """The broad crypto query against config.NEWS_API_URL."""
+    return [NewsSource(
+        name="newsapi",
+        url=f"{config.NEWS_API_URL}/everything",
+        params={"q": config.NEWS_FEED_QUERY, "language": "en", "sortBy": "publishedAt",
+                "pageSize": 100, "apiKey": config.NEWS_API_KEY},
+    )]
+
+
+if __name__ == '__main__':
+    index = NewsIndex(max_age_hours=0)
+    index.update_universe([
+        {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"},
+        {"id": "ethereum", "symbol": "eth", "name": "Ethereum"},
+    ])
+    ingestor = NewsIngestor(sources=[], index=index)
+    sample = [
+        {"title": "Bitcoin ETF inflows hit record", "url": "https://www.example.com/a?utm_source=x",
+         "published_at": "2023-10-28T11:00:00Z", "content_snippet": "BTC and ETH rally as flows surge."},
+        {"title": "Bitcoin ETF inflows hit record", "url": "https://example.com/a/",
+         "published_at": "2023-10-28T11:05:00Z", "content_snippet": "Syndicated copy."},
+        {"title": "Ethereum upgrade scheduled", "url": "https://example.com/b",
+         "published_at": "2023-10-28T12:00:00Z", "content_snippet": "Developers confirm the date."},
+    ]
+    print(f"New articles: {ingestor.ingest(sample)} of {len(sample)}")
+    for coin_id in ("bitcoin", "ethereum"):
+        print(coin_id, [a["title"] for a in index.get_articles(coin_id)])
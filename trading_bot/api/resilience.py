@@ -0,0 +1,264 @@
+"""
+Fail-fast and tail-latency protection for upstream HTTP APIs.
+
+Each endpoint gets a CircuitBreaker. After config.BREAKER_FAILURE_THRESHOLD
+consecutive upstream failures (network errors, 5xx, 429) it opens and rejects
+calls immediately. Once config.BREAKER_RECOVERY_SECONDS have passed it lets a
+single trial request through: success closes the breaker, failure reopens it.
+Client errors such as 404 say nothing about upstream health and are not counted.
+
+resilient_get can also hedge a request. If the first attempt has not answered
+within the endpoint's recent p95 latency, a second identical request is sent
+and whichever succeeds first is used.
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Dict, Callable
+
+import requests  # Needed at import time: CircuitOpenError subclasses its RequestException
+
+from .. import config
+from ..lazy_imports import lazy_import
+from ..reporting import metrics
+
+np = lazy_import("numpy")
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of sending a request while an endpoint's breaker is open."""
+
+
+def is_upstream_failure(error: Exception | None = None, status_code: int | None = None) -> bool:
+    """True for failures that indicate an unhealthy upstream (not a bad request)."""
+    if isinstance(error, CircuitOpenError):
+        return False
+    if isinstance(error, requests.exceptions.HTTPError):
+        response = getattr(error, "response", None)
+        status_code = getattr(response, "status_code", None)
+        if not isinstance(status_code, int):
+            return True
+    elif error is not None:
+        return isinstance(error, requests.exceptions.RequestException)
+    return isinstance(status_code, int) and (status_code >= 500 or status_code == 429)
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one endpoint.
+
+    Args:
+        name: Endpoint label used in metrics.
+        failure_threshold: Consecutive failures that open the breaker.
+        recovery_seconds: Time the breaker stays open before a trial request.
+        clock: Monotonic time source (for testing).
+    """
+
+    def __init__(self, name: str, failure_threshold: int | None = None, recovery_seconds: float | None = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold or config.BREAKER_FAILURE_THRESHOLD
+        self.recovery_seconds = config.BREAKER_RECOVERY_SECONDS if recovery_seconds is None else recovery_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+
+    def _set_state(self, state: str) -> None:
+        if state != self.state:
+            self.state = state
+            metrics.increment("breaker_state_changes_total", endpoint=self.name, state=state)
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now (claims the trial slot when half-open)."""
+        with self._lock:
+            if self.state == OPEN and self._clock() - self.opened_at >= self.recovery_seconds:
+                self._set_state(HALF_OPEN)
+                self._trial_in_flight = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+        metrics.increment("breaker_rejections_total", endpoint=self.name)
+        return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._trial_in_flight = False
+            self._set_state(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = self._clock()
+                self._set_state(OPEN)
+
+    def record_neutral(self) -> None:
+        """A completed request that says nothing about health (e.g. a 404) frees the trial slot."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Frees the half-open trial slot however the request ended (a no-op once an outcome was recorded)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+
+class LatencyTracker:
+    """Sliding window of successful request latencies for one endpoint."""
+
+    def __init__(self, window: int | None = None):
+        self._samples = deque(maxlen=window or config.LATENCY_WINDOW)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, q: float) -> float | None:
+        with self._lock:
+            if not self._samples:
+                return None
+            return float(np.percentile(np.fromiter(self._samples, dtype=float), q))
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_latencies: Dict[str, LatencyTracker] = {}
+_registry_lock = threading.Lock()
+_hedge_pool: ThreadPoolExecutor | None = None
+
+
+def get_breaker(endpoint: str) -> CircuitBreaker:
+    with _registry_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = _breakers[endpoint] = CircuitBreaker(endpoint)
+        return breaker
+
+
+def get_latency_tracker(endpoint: str) -> LatencyTracker:
+    with _registry_lock:
+        tracker = _latencies.get(endpoint)
+        if tracker is None:
+            tracker = _latencies[endpoint] = LatencyTracker()
+        return tracker
+
+
+def reset() -> None:
+    """Forgets all breakers and latency history."""
+    with _registry_lock:
+        _breakers.clear()
+        _latencies.clear()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _hedge_pool
+    with _registry_lock:
+        if _hedge_pool is None:
+            _hedge_pool = ThreadPoolExecutor(max_workers=config.HEDGE_MAX_WORKERS, thread_name_prefix="hedge")
+        return _hedge_pool
+
+
+def hedge_delay(endpoint: str) -> float | None:
+    """Seconds to wait before hedging, or None until enough latency samples exist."""
+    tracker = get_latency_tracker(endpoint)
+    if len(tracker) < config.HEDGE_MIN_SAMPLES:
+        return None
+    return max(tracker.percentile(config.HEDGE_PERCENTILE), config.HEDGE_MIN_DELAY_SECONDS)
+
+
+def _timed_get(url: str, kwargs: dict):
+    start = time.perf_counter()
+    response = requests.get(url, **kwargs)
+    return response, time.perf_counter() - start
+
+
+def _hedged_get(endpoint: str, url: str, kwargs: dict):
+    delay = hedge_delay(endpoint)
+    if delay is None:
+        return _timed_get(url, kwargs)
+
+    pool = _pool()
+    primary = pool.submit(_timed_get, url, kwargs)
+    done, pending = wait({primary}, timeout=delay)
+    if not done:
+        metrics.increment("hedged_requests_total", endpoint=endpoint)
+        pending = {primary, pool.submit(_timed_get, url, kwargs)}
+
+    failed_response, first_error = None, None
+    while True:
+        for future in done:
+            try:
+                response, elapsed = future.result()
+            except requests.exceptions.RequestException as e:
+                first_error = first_error or e
+                continue
+            if is_upstream_failure(status_code=getattr(response, "status_code", None)) and pending:
+                failed_response = failed_response or (response, elapsed)  # Give the other attempt a chance
+                continue
+            if future is not primary:
+                metrics.increment("hedge_wins_total", endpoint=endpoint)
+            return response, elapsed
+        if not pending:
+            break
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+    if failed_response is not None:
+        return failed_response
+    raise first_error
+
+
+def resilient_get(endpoint: str, url: str, hedge: bool = False, **kwargs) -> requests.Response:
+    """
+    requests.get behind the endpoint's circuit breaker, optionally hedged.
+
+    Args:
+        endpoint: Breaker / metrics label, e.g. "coingecko.ohlc".
+        url: Request URL.
+        hedge: Send a second request if the first exceeds the endpoint's p95 latency.
+        **kwargs: Passed to requests.get (params, headers, timeout, ...).
+
+    Returns:
+        The response. Callers still call raise_for_status() as usual.
+
+    Raises:
+        CircuitOpenError: If the breaker is open (a RequestException, so existing
+                          error handling treats it like any other request failure).
+        requests.exceptions.RequestException: Network errors from the request.
+    """
+    breaker = get_breaker(endpoint)
+    if not breaker.allow():
+        raise CircuitOpenError(f"Circuit open for {endpoint}; skipping request.")
+
+    try:
+        if hedge:
+            response, elapsed = _hedged_get(endpoint, url, kwargs)
+        else:
+            response, elapsed = _timed_get(url, kwargs)
+    except requests.exceptions.RequestException as e:
+        breaker.record_failure() if is_upstream_failure(e) else breaker.record_neutral()
+        raise
+    else:
+        status = getattr(response, "status_code", None)
+        if is_upstream_failure(status_code=status):
+            breaker.record_failure()
+        elif isinstance(status, int) and 400 <= status < 500:
+            breaker.record_neutral()
+        else:
+            breaker.record_success()
+            get_latency_tracker(endpoint).record(elapsed)
+        return response
+    finally:
+        # Other exceptions (a ValueError, KeyboardInterrupt) must not leave the trial slot claimed forever
+        breaker.release_trial()
@@ -36,3 +36,147 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "YOUR_GEMINI_API_KEY_FALLBACK") # L
 EXCHANGE_API_KEY = os.getenv("EXCHANGE_API_KEY", "YOUR_EXCHANGE_API_KEY_FALLBACK")
 EXCHANGE_API_SECRET = os.getenv("EXCHANGE_API_SECRET", "YOUR_EXCHANGE_API_SECRET_FALLBACK")
 EXCHANGE_API_URL = "https://api.binance.com/api/v3" # Example for Binance
+
+# Metrics / Tracing
+# Instrumentation is a no-op unless enabled (e.g. METRICS_ENABLED=true in the environment).
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() in ("1", "true", "yes")
+METRICS_EXPORT_PATH = "metrics.json"  # JSON snapshot written at the end of a run
+METRICS_HTTP_PORT = int(os.getenv("METRICS_HTTP_PORT", "0"))  # 0 disables the local /metrics endpoint
+METRICS_RECENT_SPANS = 500  # Number of recent spans kept for the JSON export
+
+# Telegram Reporting
+TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "YOUR_TELEGRAM_BOT_TOKEN_FALLBACK")
+TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")
+TELEGRAM_API_URL = "https://api.telegram.org"
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096  # Telegram's per-message text limit
+TELEGRAM_MAX_MESSAGES_PER_SECOND = 25  # Global send rate (Telegram allows ~30/s per bot)
+TELEGRAM_PER_CHAT_INTERVAL = 1.0  # Seconds between messages to the same chat
+TELEGRAM_MAX_RETRIES = 3
+
+# Delta Reporting (only coins whose signal or key indicators changed are re-sent)
+DELTA_REPORTING_ENABLED = os.getenv("DELTA_REPORTING_ENABLED", "false").lower() in ("1", "true", "yes")
+DELTA_PRICE_CHANGE_PCT = 2.0  # Re-send when price moved at least this many percent since last sent
+DELTA_RSI_CHANGE = 5.0  # Re-send when RSI (14) moved at least this many points
+DELTA_FULL_SUMMARY_EVERY = 24  # Send a compact summary of every coin every N cycles
+
+# Candle Aggregation
+CANDLE_TIMEFRAMES = ("1m", "5m", "1h", "4h", "1d")  # Timeframes maintained per symbol
+CANDLE_BUFFER_CAPACITY = 1000  # Candles kept per symbol and timeframe
+MIN_CANDLES_FOR_INDICATORS = 35  # Enough for MACD (26 + 9) on the aggregated timeframe
+
+# Shared Price Store (memory-mapped OHLC file written by one ingest process)
+PRICE_STORE_PATH = os.getenv("PRICE_STORE_PATH", "")  # Empty: /dev/shm/trading_bot_prices.bin (or the temp dir)
+PRICE_STORE_SLOTS = 256  # Maximum number of symbols
+PRICE_STORE_CAPACITY = 2048  # Candles kept per symbol
+
+# News Ingestion (broad incremental polling instead of one query per coin)
+NEWS_FEED_QUERY = "crypto OR cryptocurrency OR bitcoin OR ethereum"
+NEWS_DEDUP_MAX_DISTANCE = 3  # SimHash bits two articles may differ by and still be duplicates
+NEWS_INDEX_PER_COIN = 50  # Recent articles kept per coin
+NEWS_MAX_AGE_HOURS = 24  # Older articles are not handed to the strategy
+
+# Coin Mention Tagging
+COIN_ALIASES = {  # Extra names matched in news text, keyed by Coingecko id
+    "bitcoin": ["xbt"],
+    "ethereum": ["ether"],
+    "ripple": ["ripple labs"],
+    "binancecoin": ["bnb chain", "binance coin"],
+    "avalanche-2": ["avalanche"],
+    "matic-network": ["polygon"],
+    "the-open-network": ["toncoin"],
+}
+COIN_AMBIGUOUS_SYMBOLS = {  # Symbols, ids or names that are common words; matched only as "ONE" or "$one"
+    "one", "link", "near", "dot", "op", "ton", "gas", "sand", "ape", "ar", "ren", "key", "id", "pepe",
+    "sun", "bone", "flow", "mask", "rose", "ankr", "arb", "ai", "cat", "dog", "hot", "go", "sui",
+}
+
+# Sentiment State (time-decayed, source-weighted news sentiment per coin)
+SENTIMENT_HALF_LIFE_HOURS = 6.0  # An article's weight halves every this many hours
+SENTIMENT_PRIOR_WEIGHT = 1.0  # Neutral pseudo-evidence; thin or stale coverage scores near 0
+SENTIMENT_SCORE_THRESHOLD = 0.15  # |score| needed for a positive/negative label
+SENTIMENT_SOURCE_WEIGHTS = {  # Keyed by lower-case source name
+    "default": 1.0,
+    "financial times": 1.5,
+    "reuters": 1.5,
+    "bloomberg": 1.5,
+    "social media today": 0.5,
+}
+SENTIMENT_STATE_PATH = "sentiment_state.json"  # For SentimentState.save/load; the bot keeps it in the snapshot
+
+# Derivatives Data (open interest and funding history)
+DERIVATIVES_ENABLED = os.getenv("DERIVATIVES_ENABLED", "false").lower() in ("1", "true", "yes")
+DERIVATIVES_OI_PERIOD = "1h"  # Open interest sampling period
+DERIVATIVES_LOOKBACK_HOURS = 7 * 24  # History fetched for a symbol seen for the first time
+DERIVATIVES_MAX_POINTS = 2000  # Points kept per series
+OI_CHANGE_PERIODS = 24  # Open interest change measured over this many samples
+FUNDING_ZSCORE_WINDOW = 30  # Funding rates in the z-score baseline (10 days at 8h funding)
+FUNDING_ZSCORE_ALERT = 2.0  # |z| beyond this is reported as a decision factor
+
+# Symbol Registry (exchange markets per coin, cached on disk)
+QUOTE_ASSET = "USDT"
+SYMBOL_REGISTRY_CACHE_PATH = "exchange_info_cache.json"
+SYMBOL_REGISTRY_REFRESH_HOURS = 24
+SYMBOL_OVERRIDES = {  # Coingecko id -> exchange base asset where the symbols differ
+    "matic-network": "POL",
+}
+
+# Upstream Resilience (circuit breakers and hedged requests)
+BREAKER_FAILURE_THRESHOLD = 5  # Consecutive upstream failures that open an endpoint's breaker
+BREAKER_RECOVERY_SECONDS = 30.0  # Open time before a single trial request is let through
+HEDGE_OHLC_REQUESTS = os.getenv("HEDGE_OHLC_REQUESTS", "false").lower() in ("1", "true", "yes")
+HEDGE_PERCENTILE = 95  # Hedge once a request exceeds this latency percentile
+HEDGE_MIN_SAMPLES = 20  # Latency samples needed before hedging starts
+HEDGE_MIN_DELAY_SECONDS = 0.05
+HEDGE_MAX_WORKERS = 8
+LATENCY_WINDOW = 200  # Recent successful latencies kept per endpoint
+
+# Risk and Position Sizing
+ACCOUNT_EQUITY = 10000.0  # Quote-currency equity positions are sized against
+RISK_PER_TRADE = 0.01  # Fraction of equity lost if a stop is hit
+RISK_ATR_WINDOW = 14
+RISK_ATR_STOP_MULTIPLIER = 2.0  # Stop distance in ATRs
+RISK_VOLATILITY_STOP_MULTIPLIER = 3.0  # Stop distance in short-term trade-price standard deviations
+RISK_REWARD_RATIO = 2.0  # Take-profit distance as a multiple of the stop distance
+RISK_CONSIDER_SCALE = 0.5  # Size multiplier for CONSIDER_BUY / CONSIDER_SELL signals
+MAX_POSITION_PCT = 0.2  # Largest single position as a fraction of equity
+MAX_GROSS_EXPOSURE = 1.0  # Sum of all position notionals as a fraction of equity
+MAX_NET_EXPOSURE = 0.6  # |long - short| notional as a fraction of equity
+
+# Warm-start Snapshots
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", "bot_state.snapshot")
+SNAPSHOT_INTERVAL_SECONDS = 300  # Minimum time between periodic snapshots
+SNAPSHOT_MAX_AGE_HOURS = 24  # Older snapshots are ignored and the bot starts cold
+SNAPSHOT_COMPRESSION_LEVEL = 1  # zlib level; fast compression keeps checkpoints cheap
+
+# Extended Indicator Pack (computed by analysis.indicator_engine in one fused pass)
+INDICATOR_PACK = (
+    "ema_8", "ema_13", "ema_21", "ema_34", "ema_55",  # EMA ribbon
+    "atr_14", "stoch_14_3", "adx_14",
+    "obv", "vwap_20",  # Only computed when the candles carry volume
+)
+
+# Cross-asset Correlation and Market Regime
+REGIME_HALF_LIFE_BARS = 48  # Strategy cycles after which a return's weight halves
+REGIME_MIN_PERIODS = 20  # Returns needed before a coin counts towards correlations and the regime
+REGIME_TREND_THRESHOLD = 1.5  # |market trend t-statistic| for risk_on / risk_off
+REGIME_HIGH_CORRELATION = 0.7  # Average pairwise correlation that marks a falling market as risk_off
+
+# Multi-venue Market Data (api.exchange_adapters)
+MULTI_VENUE_MARKET_DATA = os.getenv("MULTI_VENUE_MARKET_DATA", "false").lower() in ("1", "true", "yes")
+EXCHANGE_VENUES = [v for v in os.getenv("EXCHANGE_VENUES", "binance,kraken,coinbase").split(",") if v.strip()]
+KRAKEN_API_URL = "https://api.kraken.com"
+COINBASE_API_URL = "https://api.exchange.coinbase.com"
+EXCHANGE_REQUEST_TIMEOUT = 10  # Seconds per venue request
+EXCHANGE_BOOK_DEPTH = 20  # Levels kept per side of each venue's book
+EXCHANGE_TRADES_LIMIT = 200  # Recent trades fetched per venue (enough for the 5-min volatility window)
+EXCHANGE_FETCH_WORKERS = 16  # Concurrent venue requests per refresh
+CONSOLIDATED_BOOK_MAX_AGE_SECONDS = 30  # Older venue books are left out of the best bid/offer
+
+# Decision Journal and Signal Evaluation
+DECISION_JOURNAL_PATH = os.getenv("DECISION_JOURNAL_PATH", "decision_journal.jsonl")
+SIGNAL_EVAL_HORIZONS = ("1h", "4h", "1d")  # Forward-return horizons evaluated for each journaled decision
+
+# Read-only HTTP API (reporting.http_api)
+API_HTTP_PORT = int(os.getenv("API_HTTP_PORT", "0"))  # 0 disables the API server; otherwise main serves until Ctrl+C
+API_HISTORY_PAGE_SIZE = 100  # Default decisions per /api/history page
+API_HISTORY_MAX_PAGE_SIZE = 1000
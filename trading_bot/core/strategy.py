@@ -7,33 +7,105 @@ from trading_bot.api import exchange as exchange_api # New import
 from trading_bot.processing import data_processor
 
 # Analysis Modules
-from trading_bot.analysis import technical_indicators as ti
+from trading_bot.analysis import indicator_engine
+from trading_bot.analysis import market_regime
 from trading_bot.analysis import sentiment_analyzer
 
+# Trading Modules
+from trading_bot.trading import risk
+
+# Reporting Modules
+from trading_bot.reporting import metrics
+
 # Utilities
-import pandas as pd
+import time
+from trading_bot.lazy_imports import lazy_import
 
-# Configuration - though API keys are handled within their respective modules
-# from trading_bot import config
+pd = lazy_import("pandas")
 
-def run_trading_strategy(top_n_coins: int = 3):
+# Configuration - though API keys are handled within their respective modules
+from trading_bot import config
+
+# Indicators behind the top-level decision fields, computed in the same engine pass as config.INDICATOR_PACK
+CORE_INDICATORS = ("sma_20", "rsi_14", "bb_20", "macd_12_26_9")
+
+def _derivatives_pair(coin):
+    """Perpetual pair for OI/funding calls: the registry's, else the spot pair; None if no perp exists."""
+    if "trading_pair_perp" in coin:
+        return coin["trading_pair_perp"]
+    return coin.get("trading_pair_spot", f"{coin.get('symbol', 'N/A').upper()}USDT")
+
+def _spot_base(coin):
+    """Base asset of the coin's spot pair (e.g. POL for POLUSDT), for the multi-venue adapters."""
+    pair = coin.get("trading_pair_spot")
+    if pair and pair.endswith(config.QUOTE_ASSET) and len(pair) > len(config.QUOTE_ASSET):
+        return pair[:-len(config.QUOTE_ASSET)]
+    return str(coin.get("symbol", "")).upper()
+
+def _apply_market_regime(coin_decision_data, regime_info):
+    """Downgrades signals that fight the market regime (longs in risk-off, shorts in risk-on)."""
+    regime = regime_info.get("regime")
+    signal = coin_decision_data["signal"]
+    if regime == market_regime.RISK_OFF and signal in ("BUY", "CONSIDER_BUY"):
+        coin_decision_data["signal"] = "CONSIDER_BUY" if signal == "BUY" else "HOLD"
+        coin_decision_data["decision_factors"].append("Market regime risk-off: long signal downgraded")
+    elif regime == market_regime.RISK_ON and signal in ("SELL", "CONSIDER_SELL"):
+        coin_decision_data["signal"] = "CONSIDER_SELL" if signal == "SELL" else "HOLD"
+        coin_decision_data["decision_factors"].append("Market regime risk-on: short signal downgraded")
+
+def run_trading_strategy(top_n_coins: int = 3, candles=None, news_index=None, sentiment_state=None,
+                         derivatives=None, symbol_registry=None, correlation_tracker=None,
+                         price_consolidator=None):
     """
     Runs the core trading strategy logic.
 
     Args:
         top_n_coins: The number of top coins to process.
+        candles: Optional trading_bot.data.candles.CandleAggregator. When it already
+                 holds enough config.DATA_INTERVAL candles for a coin, indicators are
+                 computed from them and the OHLC download is skipped; otherwise the
+                 downloaded OHLC and recent trades are folded into it.
+        news_index: Optional trading_bot.api.news_feed.NewsIndex filled by a NewsIngestor.
+                    When given, each coin's articles come from the index instead of a
+                    per-coin news query, and the index's coin universe is refreshed.
+        sentiment_state: Optional trading_bot.analysis.sentiment_state.SentimentState.
+                         When given, only articles it has not seen are analyzed and the
+                         aggregated sentiment comes from its time-decayed score instead
+                         of a label count over this cycle's articles.
+        derivatives: Optional trading_bot.data.derivatives_store.DerivativesStore. When
+                     given, open interest and funding history are backfilled for all
+                     coins at once and their change / z-score features are added to
+                     each coin in place of the single-point exchange calls.
+        symbol_registry: Optional trading_bot.data.symbol_registry.SymbolRegistry (loaded).
+                         When given, coins without an exchange market are skipped before
+                         any per-coin call, and exchange calls use the registry's spot and
+                         perpetual pairs (OI/funding are skipped for coins with no perp).
+        correlation_tracker: Optional trading_bot.analysis.market_regime.CorrelationTracker.
+                             When given, it is updated with this cycle's prices for the whole
+                             fetched universe, each coin gets the resulting market_regime, and
+                             signals against the regime are downgraded one step.
+        price_consolidator: Optional trading_bot.api.exchange_adapters.BestPriceConsolidator.
+                            When given, books and trades for all coins are fetched from every
+                            venue concurrently before the per-coin loop, and the order book
+                            summary and volatility come from the consolidated view instead of
+                            the single-exchange calls.
 
     Returns:
         A list of dictionaries, where each dictionary contains the coin info,
         latest indicators, aggregated sentiment, latest price, and a placeholder signal.
     """
     print(f"Running trading strategy for top {top_n_coins} coins...")
+    cycle_start = time.perf_counter()
     strategy_results = []
+    price_tails = {} # coin_id -> recent (high, low, close) rows, for ATR stops
+    lot_sizes = {}
 
     # 1. Fetch Top Coins
-    top_coins_raw = cg_api.get_top_coins(limit=top_n_coins)
+    with metrics.span("coingecko.get_top_coins"):
+        top_coins_raw = cg_api.get_top_coins(limit=top_n_coins)
     if not top_coins_raw:
         print("No top coins data received. Exiting strategy.")
+        metrics.increment("strategy_errors_total", stage="top_coins")
         return strategy_results
 
     processed_coins = data_processor.process_coin_data(top_coins_raw)
@@ -41,6 +113,30 @@ def run_trading_strategy(top_n_coins: int = 3):
         print("No coins left after initial processing. Exiting strategy.")
         return strategy_results
 
+    if symbol_registry is not None:
+        processed_coins = symbol_registry.annotate(processed_coins)
+        if not processed_coins:
+            print("No coins with an exchange market. Exiting strategy.")
+            return strategy_results
+
+    if news_index is not None:
+        news_index.update_universe(processed_coins)
+
+    regime_info = None
+    if correlation_tracker is not None:
+        correlation_tracker.update_prices({coin["id"]: coin.get("current_price") for coin in top_coins_raw
+                                           if isinstance(coin, dict) and coin.get("id")})
+        regime_info = correlation_tracker.regime()
+
+    if price_consolidator is not None:
+        price_consolidator.refresh([(_spot_base(coin), config.QUOTE_ASSET) for coin in processed_coins])
+
+    derivatives_features = None
+    if derivatives is not None:
+        perp_pairs = [pair for pair in (_derivatives_pair(coin) for coin in processed_coins) if pair]
+        derivatives.backfill(perp_pairs)
+        derivatives_features = derivatives.features(perp_pairs)
+
     # 2. Iterate Through Coins
     for coin in processed_coins:
         coin_id = coin.get("id")
@@ -58,6 +154,7 @@ def run_trading_strategy(top_n_coins: int = 3):
             "rsi_14": None,
             "bollinger_bands": None, # Could be {'upper': val, 'middle': val, 'lower': val}
             "macd": None, # Could be {'line': val, 'signal': val, 'hist': val}
+            "indicators": {}, # Latest config.INDICATOR_PACK values (EMA ribbon, ATR, Stochastic, ADX, ...)
             "aggregated_sentiment": "neutral", # Default
             "sentiment_score": 0, # Example: -1 for negative, 0 for neutral, 1 for positive
             "news_articles_analyzed": 0,
@@ -65,19 +162,35 @@ def run_trading_strategy(top_n_coins: int = 3):
             "volatility": None,
             "open_interest": None,
             "funding_rate": None,
+            "market_regime": regime_info["regime"] if regime_info else None,
             "decision_factors": [], # List of strings explaining decision
             "signal": "HOLD" # Default signal
         }
 
         # 3. Gather Data
-        # Fetch historical OHLC
-        ohlc_data_list = cg_api.get_historical_ohlc(coin_id=coin_id, days="90") # Fetch enough data for indicators
-        if not ohlc_data_list:
-            print(f"Could not fetch OHLC data for {coin_name}. Skipping further analysis for this coin.")
-            strategy_results.append(coin_decision_data) # Append with default/None values
-            continue
-
-        ohlc_df = data_processor.ohlc_list_to_dataframe(ohlc_data_list, coin_id=coin_id)
+        if candles is not None and candles.candle_count(coin_id, config.DATA_INTERVAL) >= config.MIN_CANDLES_FOR_INDICATORS:
+            # Enough aggregated candles on the configured timeframe: no OHLC download needed
+            ohlc_df = candles.get_candles(coin_id, config.DATA_INTERVAL)
+        else:
+            # Fetch historical OHLC. With a candle cache, ask for the longest history whose
+            # Coingecko granularity can still build config.DATA_INTERVAL candles.
+            days = "90"  # Enough data for indicators
+            if candles is not None:
+                from trading_bot.data.candles import timeframe_to_ms  # Already loaded with the aggregator
+                days = str(cg_api.max_ohlc_days(timeframe_to_ms(config.DATA_INTERVAL)) or days)
+            with metrics.span("coingecko.get_historical_ohlc"):
+                ohlc_data_list = cg_api.get_historical_ohlc(coin_id=coin_id, days=days)
+            if not ohlc_data_list:
+                print(f"Could not fetch OHLC data for {coin_name}. Skipping further analysis for this coin.")
+                metrics.increment("strategy_errors_total", stage="ohlc")
+                strategy_results.append(coin_decision_data) # Append with default/None values
+                continue
+
+            ohlc_df = data_processor.ohlc_list_to_dataframe(ohlc_data_list, coin_id=coin_id)
+            if candles is not None:
+                candles.add_ohlc_list(coin_id, ohlc_data_list, base_interval_ms=cg_api.ohlc_interval_ms(days))
+                if candles.candle_count(coin_id, config.DATA_INTERVAL) >= config.MIN_CANDLES_FOR_INDICATORS:
+                    ohlc_df = candles.get_candles(coin_id, config.DATA_INTERVAL)
         if ohlc_df.empty:
             print(f"OHLC data for {coin_name} is empty after DataFrame conversion. Skipping.")
             strategy_results.append(coin_decision_data)
@@ -90,14 +203,29 @@ def run_trading_strategy(top_n_coins: int = 3):
             # Potentially skip coin if latest price is crucial and missing
             # For now, we'll allow it to proceed and have None for indicators
 
+        if {'high', 'low', 'close'}.issubset(ohlc_df.columns):
+            price_tails[coin_id] = ohlc_df[['high', 'low', 'close']].to_numpy()[-(config.RISK_ATR_WINDOW + 1):]
+        lot_sizes[coin_id] = coin.get("lot_size")
+
         # Fetch news articles
-        # Using coin_name as keyword, could also use symbol or combine
-        news_articles = news_api.get_crypto_news(keywords=coin_name, limit=5)
+        if news_index is not None:
+            news_articles = news_index.get_articles(coin_id, limit=5)
+        else:
+            # Using coin_name as keyword, could also use symbol or combine
+            with metrics.span("news.get_crypto_news"):
+                news_articles = news_api.get_crypto_news(keywords=coin_name, limit=5)
 
         # Fetch Exchange-Specific Data (using trading_pair_spot from processed_coins)
         trading_pair = coin.get("trading_pair_spot", f"{coin_symbol}USDT") # Default if not processed
 
-        order_book_data = exchange_api.get_order_book(symbol=trading_pair)
+        if price_consolidator is not None:
+            best_bid_offer = price_consolidator.best_bid_offer(_spot_base(coin), config.QUOTE_ASSET)
+            if best_bid_offer is not None:
+                coin_decision_data["order_book_summary"] = best_bid_offer
+            order_book_data = None
+        else:
+            with metrics.span("exchange.get_order_book"):
+                order_book_data = exchange_api.get_order_book(symbol=trading_pair)
         if order_book_data and "error" not in order_book_data:
             # Simple summary: e.g. mid-price, or just a note that it's available
             if order_book_data.get("bids") and order_book_data.get("asks"):
@@ -111,52 +239,64 @@ def run_trading_strategy(top_n_coins: int = 3):
                     }
                 except (ValueError, IndexError, TypeError):
                     coin_decision_data["order_book_summary"] = "Error processing order book"
+                    metrics.increment("strategy_errors_total", stage="order_book")
 
 
-        recent_trades_list = exchange_api.get_recent_trades(symbol=trading_pair, limit=200) # Need enough for volatility window
+        if price_consolidator is not None:
+            recent_trades_list = price_consolidator.trades(_spot_base(coin), config.QUOTE_ASSET)
+        else:
+            with metrics.span("exchange.get_recent_trades"):
+                recent_trades_list = exchange_api.get_recent_trades(symbol=trading_pair, limit=200) # Need enough for volatility window
         if recent_trades_list and isinstance(recent_trades_list, list) and (not recent_trades_list[0] or "error" not in recent_trades_list[0]):
             coin_decision_data["volatility"] = exchange_api.calculate_volatility(recent_trades_list, window_seconds=300) # 5-min volatility
+            if candles is not None:
+                candles.add_trades(coin_id, recent_trades_list)
+
+        # Open Interest and Funding Rates (relevant for futures)
+        # With a symbol registry these use the coin's perpetual pair; without one
+        # we fall back to the spot trading_pair.
+        perp_pair = _derivatives_pair(coin)
+        if perp_pair is None:
+            pass # No perpetual market: nothing to fetch
+        elif derivatives_features is not None and perp_pair in derivatives_features.index:
+            features = derivatives_features.loc[perp_pair]
+            for key in ("open_interest", "oi_change_pct", "funding_rate", "funding_zscore"):
+                coin_decision_data[key] = None if pd.isna(features[key]) else float(features[key])
+        else:
+            with metrics.span("exchange.get_open_interest"):
+                oi_data = exchange_api.get_open_interest(symbol=perp_pair)
+            if oi_data and "error" not in oi_data:
+                coin_decision_data["open_interest"] = oi_data.get("openInterest")
 
-        # Open Interest and Funding Rates (relevant for futures, using base symbol for now)
-        # These might use a different symbol format (e.g. BTCUSD_PERP vs BTCUSDT spot)
-        # For placeholder stage, we'll use the spot trading_pair or coin_symbol.
-        # In a real system, this would need careful handling of symbol mapping.
-        oi_data = exchange_api.get_open_interest(symbol=trading_pair)
-        if oi_data and "error" not in oi_data:
-            coin_decision_data["open_interest"] = oi_data.get("openInterest")
-
-        funding_data_list = exchange_api.get_funding_rates(symbol=trading_pair)
-        if funding_data_list and isinstance(funding_data_list, list) and (not funding_data_list[0] or "error" not in funding_data_list[0]):
-             # Assuming the first entry is the most relevant/latest
-            coin_decision_data["funding_rate"] = funding_data_list[0].get("fundingRate")
+            with metrics.span("exchange.get_funding_rates"):
+                funding_data_list = exchange_api.get_funding_rates(symbol=perp_pair)
+            if funding_data_list and isinstance(funding_data_list, list) and (not funding_data_list[0] or "error" not in funding_data_list[0]):
+                 # Assuming the first entry is the most relevant/latest
+                coin_decision_data["funding_rate"] = funding_data_list[0].get("fundingRate")
 
 
         # 4. Analyze Data
         # Calculate Technical Indicators
         if not ohlc_df.empty and 'close' in ohlc_df.columns:
-            sma_20 = ti.calculate_sma(ohlc_df, window=20)
-            if sma_20 is not None and not sma_20.empty:
-                coin_decision_data["sma_20"] = sma_20.iloc[-1] if not pd.isna(sma_20.iloc[-1]) else None
-
-            rsi_14 = ti.calculate_rsi(ohlc_df, window=14)
-            if rsi_14 is not None and not rsi_14.empty:
-                coin_decision_data["rsi_14"] = rsi_14.iloc[-1] if not pd.isna(rsi_14.iloc[-1]) else None
-
-            bbands = ti.calculate_bollinger_bands(ohlc_df, window=20)
-            if bbands is not None and not bbands.empty:
+            with metrics.span("indicator.pack"):
+                latest = indicator_engine.latest_values(ohlc_df, CORE_INDICATORS + tuple(config.INDICATOR_PACK))
+            coin_decision_data["sma_20"] = latest.get("sma_20")
+            coin_decision_data["rsi_14"] = latest.get("rsi_14")
+            if latest.get("bb_20_middle") is not None:
                 coin_decision_data["bollinger_bands"] = {
-                    "upper": bbands['bb_upper'].iloc[-1] if not pd.isna(bbands['bb_upper'].iloc[-1]) else None,
-                    "middle": bbands['bb_middle'].iloc[-1] if not pd.isna(bbands['bb_middle'].iloc[-1]) else None,
-                    "lower": bbands['bb_lower'].iloc[-1] if not pd.isna(bbands['bb_lower'].iloc[-1]) else None,
+                    "upper": latest.get("bb_20_upper"),
+                    "middle": latest.get("bb_20_middle"),
+                    "lower": latest.get("bb_20_lower"),
                 }
-
-            macd = ti.calculate_macd(ohlc_df) # Using default windows
-            if macd is not None and not macd.empty:
-                 coin_decision_data["macd"] = {
-                    "line": macd['macd_line'].iloc[-1] if not pd.isna(macd['macd_line'].iloc[-1]) else None,
-                    "signal": macd['signal_line'].iloc[-1] if not pd.isna(macd['signal_line'].iloc[-1]) else None,
-                    "histogram": macd['macd_histogram'].iloc[-1] if not pd.isna(macd['macd_histogram'].iloc[-1]) else None,
+            if latest.get("macd_12_26_9_line") is not None:
+                coin_decision_data["macd"] = {
+                    "line": latest.get("macd_12_26_9_line"),
+                    "signal": latest.get("macd_12_26_9_signal"),
+                    "histogram": latest.get("macd_12_26_9_histogram"),
                 }
+            core_columns = {column for spec in CORE_INDICATORS for column in indicator_engine.output_columns(spec)}
+            coin_decision_data["indicators"] = {column: value for column, value in latest.items()
+                                                if column not in core_columns}
         else:
             print(f"Skipping technical indicator calculation for {coin_name} due to lack of OHLC data.")
 
@@ -165,14 +305,24 @@ def run_trading_strategy(top_n_coins: int = 3):
         if news_articles:
             coin_decision_data["news_articles_analyzed"] = len(news_articles)
             for article in news_articles:
+                article_key = article.get("url") or article.get("title")
+                if sentiment_state is not None and sentiment_state.has_seen(coin_id, article_key):
+                    continue # Already folded into the rolling state
                 # Use a snippet or title for sentiment analysis to save tokens/time
-                text_to_analyze = article.get("title", "") + " " + article.get("content_snippet", "")
+                text_to_analyze = (article.get("title") or "") + " " + (article.get("content_snippet") or "")
                 if text_to_analyze.strip():
-                    sentiment = sentiment_analyzer.analyze_sentiment_gemini(text_to_analyze.strip())
+                    with metrics.span("sentiment.analyze"):
+                        sentiment = sentiment_analyzer.analyze_sentiment_gemini(text_to_analyze.strip())
                     if sentiment: # analyze_sentiment_gemini can return None
                         sentiments.append(sentiment)
-
-        if sentiments:
+                        if sentiment_state is not None:
+                            sentiment_state.add(coin_id, sentiment, article.get("published_at"),
+                                                source=article.get("source"), article_key=article_key)
+
+        if sentiment_state is not None:
+            coin_decision_data["aggregated_sentiment"] = sentiment_state.label(coin_id)
+            coin_decision_data["sentiment_score"] = round(sentiment_state.score(coin_id), 4)
+        elif sentiments:
             # Aggregate sentiment (simple example: mode or count-based)
             positive_count = sentiments.count('positive')
             negative_count = sentiments.count('negative')
@@ -224,12 +374,28 @@ def run_trading_strategy(top_n_coins: int = 3):
                 coin_decision_data["decision_factors"].append("MACD line crossed below signal line")
                 if coin_decision_data["signal"] == "HOLD": coin_decision_data["signal"] = "CONSIDER_SELL" # Upgrade HOLD
 
+        funding_zscore = coin_decision_data.get("funding_zscore")
+        if funding_zscore is not None and abs(funding_zscore) >= config.FUNDING_ZSCORE_ALERT:
+            crowded_side = "longs" if funding_zscore > 0 else "shorts"
+            coin_decision_data["decision_factors"].append(
+                f"Funding rate z-score {funding_zscore:.2f} (crowded {crowded_side})")
+
+        if regime_info is not None:
+            _apply_market_regime(coin_decision_data, regime_info)
+
         if not coin_decision_data["decision_factors"]:
             coin_decision_data["decision_factors"].append("No strong technical or sentiment signals.")
 
         strategy_results.append(coin_decision_data)
+        metrics.increment("signals_total", signal=coin_decision_data["signal"])
         print(f"Finished processing for {coin_name}. Signal: {coin_decision_data['signal']}")
 
+    # 5. Stops, targets and position sizes for the whole batch at once
+    risk.apply_risk(strategy_results,
+                    [price_tails.get(data["coin_id"]) for data in strategy_results],
+                    lot_sizes=[lot_sizes.get(data["coin_id"]) for data in strategy_results])
+
+    metrics.observe("strategy_cycle_seconds", time.perf_counter() - cycle_start)
     return strategy_results
 
 if __name__ == '__main__':
@@ -262,6 +428,8 @@ if __name__ == '__main__':
         print(f"  Funding Rate: {_format_value(result.get('funding_rate'), precision=4)}")
         print(f"  Decision Factors: {', '.join(result.get('decision_factors', ['N/A']))}")
         print(f"  Signal: {result.get('signal', 'N/A')}")
+        print(f"  Stop Loss / Take Profit: {_format_value(result.get('stop_loss'))} / {_format_value(result.get('take_profit'))}")
+        print(f"  Position Size: {_format_value(result.get('position_size'), precision=6)}")
 
 def _format_value(value, precision: int = 2, default_na: str = "N/A"):
     """Helper to format numeric values or return N/A for main print."""
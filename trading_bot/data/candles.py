@@ -0,0 +1,338 @@
+"""
+Multi-timeframe candle aggregation.
+
+Candles for several timeframes (1m, 5m, 1h, 4h, 1d by default) are built
+incrementally from a base stream - individual trades or the smallest OHLC
+granularity available - and kept per symbol in fixed-size NumPy ring buffers.
+Indicators can then be computed on any timeframe without extra API calls.
+"""
+from typing import Dict, Iterable, List, Any, Tuple
+
+import numpy as np
+import pandas as pd
+
+from trading_bot import config
+
+TIMEFRAME_MS = {
+    "1m": 60_000,
+    "5m": 5 * 60_000,
+    "15m": 15 * 60_000,
+    "30m": 30 * 60_000,
+    "1h": 60 * 60_000,
+    "4h": 4 * 60 * 60_000,
+    "1d": 24 * 60 * 60_000,
+}
+
+OPEN, HIGH, LOW, CLOSE, VOLUME = range(5)
+COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def timeframe_to_ms(timeframe: str) -> int:
+    """
+    Converts a timeframe string such as "5m", "1h" or "1d" to milliseconds.
+
+    Raises:
+        ValueError: If the timeframe is not understood.
+    """
+    if timeframe in TIMEFRAME_MS:
+        return TIMEFRAME_MS[timeframe]
+    units = {"m": 60_000, "h": 3_600_000, "d": 86_400_000}
+    try:
+        value, unit = int(timeframe[:-1]), timeframe[-1]
+        return value * units[unit]
+    except (ValueError, KeyError, IndexError):
+        raise ValueError(f"Unsupported timeframe: {timeframe!r}")
+
+
+class CandleRingBuffer:
+    """
+    Fixed-capacity ring of OHLCV candles for one symbol and timeframe.
+
+    The newest candle can be updated in place while it is still forming; once
+    the buffer is full the oldest candle is overwritten.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("Capacity must be positive.")
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.int64)
+        self.values = np.zeros((capacity, 5), dtype=np.float64)
+        self.start = 0  # Index of the oldest candle
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def last_index(self) -> int:
+        return (self.start + self.size - 1) % self.capacity
+
+    @property
+    def last_timestamp(self) -> int | None:
+        return int(self.timestamps[self.last_index]) if self.size else None
+
+    def append(self, timestamp_ms: int, open_: float, high: float, low: float, close: float, volume: float) -> None:
+        if self.size < self.capacity:
+            idx = (self.start + self.size) % self.capacity
+            self.size += 1
+        else:
+            idx = self.start
+            self.start = (self.start + 1) % self.capacity
+        self.timestamps[idx] = timestamp_ms
+        row = self.values[idx]
+        row[OPEN] = open_
+        row[HIGH] = high
+        row[LOW] = low
+        row[CLOSE] = close
+        row[VOLUME] = volume
+
+    def merge_last(self, high: float, low: float, close: float, volume: float) -> None:
+        """Folds newer data into the still-forming last candle."""
+        row = self.values[self.last_index]
+        if high > row[HIGH]:
+            row[HIGH] = high
+        if low < row[LOW]:
+            row[LOW] = low
+        row[CLOSE] = close
+        row[VOLUME] += volume
+
+    def to_arrays(self, limit: int | None = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (timestamps, values) in chronological order.
+
+        Args:
+            limit: Only return the newest `limit` candles.
+        """
+        n = self.size if limit is None else min(limit, self.size)
+        first = (self.start + self.size - n) % self.capacity
+        if first + n <= self.capacity:
+            return self.timestamps[first:first + n].copy(), self.values[first:first + n].copy()
+        head = self.capacity - first
+        timestamps = np.concatenate((self.timestamps[first:], self.timestamps[:n - head]))
+        values = np.concatenate((self.values[first:], self.values[:n - head]))
+        return timestamps, values
+
+
+class CandleAggregator:
+    """
+    Builds candles for several timeframes per symbol from trades or base OHLC.
+
+    Args:
+        timeframes: Timeframes to maintain. Defaults to config.CANDLE_TIMEFRAMES.
+        capacity: Candles kept per symbol and timeframe. Defaults to
+                  config.CANDLE_BUFFER_CAPACITY.
+    """
+
+    def __init__(self, timeframes: Iterable[str] | None = None, capacity: int | None = None):
+        self.timeframes = list(timeframes or config.CANDLE_TIMEFRAMES)
+        self._durations = {tf: timeframe_to_ms(tf) for tf in self.timeframes}
+        self.capacity = capacity or config.CANDLE_BUFFER_CAPACITY
+        self._buffers: Dict[str, Dict[str, CandleRingBuffer]] = {}
+        self._last_base_ts: Dict[str, int] = {}
+
+    def symbols(self) -> List[str]:
+        return list(self._buffers)
+
+    def _symbol_buffers(self, symbol: str) -> Dict[str, CandleRingBuffer]:
+        buffers = self._buffers.get(symbol)
+        if buffers is None:
+            buffers = {tf: CandleRingBuffer(self.capacity) for tf in self.timeframes}
+            self._buffers[symbol] = buffers
+        return buffers
+
+    def _fold(self, buffer: CandleRingBuffer, bucket: int, open_: float, high: float,
+              low: float, close: float, volume: float) -> None:
+        last = buffer.last_timestamp
+        if last is None or bucket > last:
+            buffer.append(bucket, open_, high, low, close, volume)
+        elif bucket == last:
+            buffer.merge_last(high, low, close, volume)
+        # Older buckets are already closed; late data is ignored.
+
+    def add_trade(self, symbol: str, timestamp_ms: int, price: float, qty: float = 0.0) -> None:
+        """
+        Folds a single trade into every timeframe.
+
+        Args:
+            symbol: Symbol the trade belongs to (e.g. "BTCUSDT" or "bitcoin").
+            timestamp_ms: Trade time in epoch milliseconds.
+            price: Trade price.
+            qty: Traded quantity, accumulated as volume.
+        """
+        for tf, buffer in self._symbol_buffers(symbol).items():
+            duration = self._durations[tf]
+            self._fold(buffer, timestamp_ms - timestamp_ms % duration, price, price, price, price, qty)
+
+    def add_trades(self, symbol: str, trades_list: List[Dict[str, Any]]) -> int:
+        """
+        Folds trades in the format returned by exchange.get_recent_trades.
+
+        Returns:
+            The number of trades ingested (malformed entries are skipped).
+        """
+        ingested = 0
+        rows = []
+        for trade in trades_list or []:
+            if not isinstance(trade, dict):
+                continue
+            try:
+                rows.append((int(trade['time']), float(trade['price']), float(trade.get('qty', 0.0))))
+            except (KeyError, ValueError, TypeError):
+                continue
+        rows.sort(key=lambda row: row[0])  # Stable: same-millisecond trades keep their order
+        for timestamp_ms, price, qty in rows:
+            self.add_trade(symbol, timestamp_ms, price, qty)
+            ingested += 1
+        return ingested
+
+    def add_candle(self, symbol: str, timestamp_ms: int, open_: float, high: float, low: float,
+                   close: float, volume: float = 0.0, base_interval_ms: int = 0) -> bool:
+        """
+        Folds a base candle into every timeframe at least as long as its interval.
+
+        Base candles are expected in chronological order; a candle that is not
+        newer than the last one ingested for the symbol is ignored, so
+        overlapping re-fetches do not double count.
+
+        Args:
+            symbol: Symbol the candle belongs to.
+            timestamp_ms: Candle open time in epoch milliseconds.
+            open_, high, low, close, volume: Candle values.
+            base_interval_ms: Duration of the base candle. Finer timeframes
+                              cannot be built from it and are skipped.
+
+        Returns:
+            True if the candle was ingested; False if it is not newer than the
+            last one or coarser than every timeframe.
+        """
+        last_base = self._last_base_ts.get(symbol)
+        if last_base is not None and timestamp_ms <= last_base:
+            return False
+        if base_interval_ms > max(self._durations.values()):
+            return False
+        self._last_base_ts[symbol] = timestamp_ms
+        for tf, buffer in self._symbol_buffers(symbol).items():
+            duration = self._durations[tf]
+            if duration < base_interval_ms:
+                continue
+            self._fold(buffer, timestamp_ms - timestamp_ms % duration, open_, high, low, close, volume)
+        return True
+
+    def add_ohlc_list(self, symbol: str, ohlc_data: List[List[Any]], base_interval_ms: int | None = None,
+                      close_time: bool = True) -> int:
+        """
+        Folds OHLC rows in Coingecko's [timestamp, open, high, low, close] format.
+
+        Args:
+            symbol: Symbol the rows belong to.
+            ohlc_data: Rows as returned by coingecko.get_historical_ohlc.
+            base_interval_ms: Candle duration; inferred from the timestamps if omitted.
+            close_time: Coingecko stamps candles with their close time; set to
+                        False if timestamps are open times.
+
+        Returns:
+            The number of candles stored; 0 if they are coarser than every timeframe.
+        """
+        if not ohlc_data:
+            return 0
+        try:
+            data = np.asarray(ohlc_data, dtype=np.float64)
+        except (ValueError, TypeError):
+            print(f"Error: Invalid OHLC data format for {symbol}; cannot aggregate candles.")
+            return 0
+        if data.ndim != 2 or data.shape[1] != 5:
+            print(f"Error: Invalid OHLC data format for {symbol}; cannot aggregate candles.")
+            return 0
+
+        data = data[np.argsort(data[:, 0], kind="stable")]
+        timestamps = data[:, 0].astype(np.int64)
+        if base_interval_ms is None:
+            base_interval_ms = int(np.median(np.diff(timestamps))) if len(timestamps) > 1 else 0
+        if base_interval_ms > max(self._durations.values()):
+            print(f"Warning: {base_interval_ms // 60_000}-minute OHLC candles for {symbol} are coarser than "
+                  f"every timeframe ({', '.join(self.timeframes)}); none were stored.")
+            return 0
+        if close_time:
+            timestamps = timestamps - base_interval_ms
+
+        valid = ~np.isnan(data[:, 1:]).any(axis=1)
+        ingested = 0
+        for ts, row in zip(timestamps[valid].tolist(), data[valid, 1:].tolist()):
+            if self.add_candle(symbol, ts, row[0], row[1], row[2], row[3], 0.0, base_interval_ms):
+                ingested += 1
+        return ingested
+
+    def candle_count(self, symbol: str, timeframe: str) -> int:
+        buffers = self._buffers.get(symbol)
+        return len(buffers[timeframe]) if buffers and timeframe in buffers else 0
+
+    def get_arrays(self, symbol: str, timeframe: str, limit: int | None = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (timestamps_ms, values) for a symbol and timeframe.
+
+        values has shape (n, 5) with columns open, high, low, close, volume.
+        Both arrays are empty if the symbol or timeframe is unknown.
+        """
+        buffers = self._buffers.get(symbol)
+        if not buffers or timeframe not in buffers:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, 5), dtype=np.float64)
+        return buffers[timeframe].to_arrays(limit)
+
+    def get_candles(self, symbol: str, timeframe: str, limit: int | None = None) -> pd.DataFrame:
+        """
+        Returns candles as a DataFrame compatible with technical_indicators.
+
+        Returns:
+            A DataFrame with columns ['open', 'high', 'low', 'close', 'volume']
+            indexed by candle open time. Empty if no candles are available.
+        """
+        timestamps, values = self.get_arrays(symbol, timeframe, limit)
+        if not len(timestamps):
+            return pd.DataFrame()
+        df = pd.DataFrame(values, columns=COLUMNS, index=pd.to_datetime(timestamps, unit='ms'))
+        df.index.name = 'timestamp'
+        return df
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable state: chronological (timestamps, values) arrays per symbol and timeframe."""
+        return {
+            "timeframes": list(self.timeframes),
+            "buffers": {symbol: {tf: buffer.to_arrays() for tf, buffer in buffers.items()}
+                        for symbol, buffers in self._buffers.items()},
+            "last_base_ts": dict(self._last_base_ts),
+        }
+
+    def load_dict(self, state: Dict[str, Any]) -> None:
+        """
+        Restores state produced by to_dict.
+
+        Timeframes no longer configured are dropped; if the capacity shrank,
+        only the newest candles are kept.
+        """
+        self._buffers = {}
+        for symbol, saved in state.get("buffers", {}).items():
+            buffers = self._symbol_buffers(symbol)
+            for tf, (timestamps, values) in saved.items():
+                if tf not in buffers:
+                    continue
+                buffer = buffers[tf]
+                n = min(len(timestamps), buffer.capacity)
+                buffer.timestamps[:n] = timestamps[len(timestamps) - n:]
+                buffer.values[:n] = values[len(values) - n:]
+                buffer.start, buffer.size = 0, n
+        self._last_base_ts = {symbol: int(ts) for symbol, ts in state.get("last_base_ts", {}).items()}
+
+
+if __name__ == '__main__':
+    import time
+
+    aggregator = CandleAggregator()
+    now_ms = int(time.time() * 1000)
+    for i in range(600):  # 10 minutes of one trade per second
+        aggregator.add_trade("BTCUSDT", now_ms + i * 1000, 60000 + (i % 50) - 25, 0.01)
+
+    print("--- 1m candles ---")
+    print(aggregator.get_candles("BTCUSDT", "1m").tail())
+    print("\n--- 5m candles ---")
+    print(aggregator.get_candles("BTCUSDT", "5m"))
@@ -0,0 +1,243 @@
+"""
+Open interest and funding rate history per symbol.
+
+Series are kept as compact NumPy arrays (int64 epoch-ms timestamps, float64
+values) and backfilled incrementally: each refresh only requests points newer
+than the last one stored. Derived features (OI change, funding z-score) are
+computed for all symbols at once on right-aligned, NaN-padded matrices.
+"""
+import time
+from typing import Dict, List, Iterable, Any, Tuple
+
+import numpy as np
+import pandas as pd
+
+from trading_bot import config
+from trading_bot.api import exchange as exchange_api
+from trading_bot.reporting import metrics
+
+
+class TimeSeriesBuffer:
+    """
+    Append-only (timestamp, value) arrays with amortized growth and a size cap.
+
+    Args:
+        max_points: Oldest points are dropped beyond this many.
+    """
+
+    def __init__(self, max_points: int, initial_capacity: int = 64):
+        self.max_points = max_points
+        self._timestamps = np.zeros(initial_capacity, dtype=np.int64)
+        self._values = np.zeros(initial_capacity, dtype=np.float64)
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def last_timestamp(self) -> int | None:
+        return int(self._timestamps[self.size - 1]) if self.size else None
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._timestamps[:self.size]
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._values[:self.size]
+
+    def extend(self, timestamps: np.ndarray, values: np.ndarray) -> int:
+        """
+        Appends points newer than the last stored one.
+
+        Returns:
+            The number of points appended.
+        """
+        order = np.argsort(timestamps, kind="stable")
+        timestamps, values = timestamps[order], values[order]
+        keep = ~np.isnan(values)
+        if self.size:
+            keep &= timestamps > self._timestamps[self.size - 1]
+        if len(timestamps) > 1:  # Drop duplicate timestamps within the batch
+            keep[1:] &= timestamps[1:] != timestamps[:-1]
+        timestamps, values = timestamps[keep], values[keep]
+        n = len(timestamps)
+        if not n:
+            return 0
+
+        needed = self.size + n
+        if needed > len(self._timestamps):
+            capacity = max(needed, 2 * len(self._timestamps))
+            self._timestamps = np.resize(self._timestamps, capacity)
+            self._values = np.resize(self._values, capacity)
+        self._timestamps[self.size:needed] = timestamps
+        self._values[self.size:needed] = values
+        self.size = needed
+
+        overflow = self.size - self.max_points
+        if overflow > 0:
+            self._timestamps[:self.max_points] = self._timestamps[overflow:self.size]
+            self._values[:self.max_points] = self._values[overflow:self.size]
+            self.size = self.max_points
+        return n
+
+    def tail_matrix_row(self, window: int) -> np.ndarray:
+        """The last `window` values, left-padded with NaN."""
+        row = np.full(window, np.nan)
+        n = min(window, self.size)
+        if n:
+            row[window - n:] = self._values[self.size - n:self.size]
+        return row
+
+
+def _right_aligned(buffers: List[TimeSeriesBuffer | None], window: int) -> np.ndarray:
+    """Stacks the last `window` values of each buffer into an (n_symbols, window) matrix."""
+    matrix = np.full((len(buffers), window), np.nan)
+    for i, buffer in enumerate(buffers):
+        if buffer is not None and len(buffer):
+            matrix[i] = buffer.tail_matrix_row(window)
+    return matrix
+
+
+class DerivativesStore:
+    """
+    Open interest and funding rate history for a set of futures symbols.
+
+    Args:
+        oi_period: Open interest sampling period. Defaults to config.DERIVATIVES_OI_PERIOD.
+        lookback_hours: History requested for symbols seen for the first time.
+        max_points: Points kept per series.
+    """
+
+    def __init__(self, oi_period: str | None = None, lookback_hours: float | None = None,
+                 max_points: int | None = None):
+        self.oi_period = oi_period or config.DERIVATIVES_OI_PERIOD
+        self.lookback_hours = lookback_hours or config.DERIVATIVES_LOOKBACK_HOURS
+        self.max_points = max_points or config.DERIVATIVES_MAX_POINTS
+        self.open_interest: Dict[str, TimeSeriesBuffer] = {}
+        self.funding: Dict[str, TimeSeriesBuffer] = {}
+
+    def symbols(self) -> List[str]:
+        return sorted(set(self.open_interest) | set(self.funding))
+
+    def _buffer(self, table: Dict[str, TimeSeriesBuffer], symbol: str) -> TimeSeriesBuffer:
+        buffer = table.get(symbol)
+        if buffer is None:
+            buffer = TimeSeriesBuffer(self.max_points)
+            table[symbol] = buffer
+        return buffer
+
+    @staticmethod
+    def _parse(rows: List[Dict[str, Any]], time_key: str, value_key: str) -> Tuple[np.ndarray, np.ndarray]:
+        if not isinstance(rows, list):
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        timestamps, values = [], []
+        for row in rows:
+            if not isinstance(row, dict) or "error" in row:
+                continue
+            try:
+                timestamps.append(int(row[time_key]))
+                values.append(float(row[value_key]))
+            except (KeyError, ValueError, TypeError):
+                continue
+        return np.asarray(timestamps, dtype=np.int64), np.asarray(values, dtype=np.float64)
+
+    def _start_time(self, buffer: TimeSeriesBuffer | None, now_ms: int) -> int:
+        if buffer is not None and buffer.last_timestamp is not None:
+            return buffer.last_timestamp + 1
+        return now_ms - int(self.lookback_hours * 3_600_000)
+
+    def add_open_interest(self, symbol: str, rows: List[Dict[str, Any]]) -> int:
+        """Stores rows in exchange.get_open_interest_history format; returns points added."""
+        timestamps, values = self._parse(rows, "timestamp", "sumOpenInterest")
+        return self._buffer(self.open_interest, symbol).extend(timestamps, values) if len(timestamps) else 0
+
+    def add_funding(self, symbol: str, rows: List[Dict[str, Any]]) -> int:
+        """Stores rows in exchange.get_funding_rates format; returns points added."""
+        timestamps, values = self._parse(rows, "fundingTime", "fundingRate")
+        return self._buffer(self.funding, symbol).extend(timestamps, values) if len(timestamps) else 0
+
+    def backfill(self, symbols: Iterable[str], now_ms: int | None = None) -> Dict[str, int]:
+        """
+        Fetches only the points each symbol is missing since its last stored one.
+
+        Returns:
+            Points added per symbol (open interest + funding).
+        """
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        added = {}
+        for symbol in symbols:
+            with metrics.span("exchange.get_open_interest_history"):
+                oi_rows = exchange_api.get_open_interest_history(
+                    symbol, period=self.oi_period,
+                    start_time=self._start_time(self.open_interest.get(symbol), now_ms),
+                    limit=self.max_points)
+            with metrics.span("exchange.get_funding_rates"):
+                funding_rows = exchange_api.get_funding_rates(
+                    symbol, start_time=self._start_time(self.funding.get(symbol), now_ms),
+                    limit=self.max_points)
+            added[symbol] = self.add_open_interest(symbol, oi_rows) + self.add_funding(symbol, funding_rows)
+        return added
+
+    def oi_changes(self, symbols: List[str], periods: int | None = None) -> pd.DataFrame:
+        """
+        Latest open interest and its change over `periods` samples, for every symbol.
+
+        Returns:
+            DataFrame indexed by symbol with columns open_interest, oi_change and
+            oi_change_pct (NaN where history is too short).
+        """
+        periods = periods or config.OI_CHANGE_PERIODS
+        matrix = _right_aligned([self.open_interest.get(s) for s in symbols], periods + 1)
+        latest, base = matrix[:, -1], matrix[:, 0]
+        change = latest - base
+        with np.errstate(divide="ignore", invalid="ignore"):
+            change_pct = np.where(base != 0, change / base * 100, np.nan)
+        return pd.DataFrame({"open_interest": latest, "oi_change": change, "oi_change_pct": change_pct},
+                            index=pd.Index(symbols, name="symbol"))
+
+    def funding_zscores(self, symbols: List[str], window: int | None = None) -> pd.DataFrame:
+        """
+        Latest funding rate and its z-score against the trailing `window` rates.
+
+        Returns:
+            DataFrame indexed by symbol with columns funding_rate and
+            funding_zscore (NaN with fewer than 3 points or zero dispersion).
+        """
+        window = window or config.FUNDING_ZSCORE_WINDOW
+        matrix = _right_aligned([self.funding.get(s) for s in symbols], window)
+        counts = np.sum(~np.isnan(matrix), axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.nansum(matrix, axis=1) / counts
+            std = np.sqrt(np.nansum((matrix - mean[:, None]) ** 2, axis=1) / (counts - 1))
+            latest = matrix[:, -1]
+            zscore = np.where((counts >= 3) & (std > 0), (latest - mean) / std, np.nan)
+        return pd.DataFrame({"funding_rate": latest, "funding_zscore": zscore},
+                            index=pd.Index(symbols, name="symbol"))
+
+    def features(self, symbols: List[str]) -> pd.DataFrame:
+        """OI change and funding z-score features side by side, one row per symbol."""
+        return self.oi_changes(symbols).join(self.funding_zscores(symbols))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable state: (timestamps, values) arrays per symbol for both series."""
+        return {
+            "open_interest": {s: (b.timestamps.copy(), b.values.copy()) for s, b in self.open_interest.items()},
+            "funding": {s: (b.timestamps.copy(), b.values.copy()) for s, b in self.funding.items()},
+        }
+
+    def load_dict(self, state: Dict[str, Any]) -> None:
+        """Restores state produced by to_dict."""
+        self.open_interest, self.funding = {}, {}
+        for table, key in ((self.open_interest, "open_interest"), (self.funding, "funding")):
+            for symbol, (timestamps, values) in state.get(key, {}).items():
+                self._buffer(table, symbol).extend(np.asarray(timestamps, dtype=np.int64),
+                                                   np.asarray(values, dtype=np.float64))
+
+
+if __name__ == '__main__':
+    store = DerivativesStore(lookback_hours=72)
+    pairs = ["BTCUSDT", "ETHUSDT"]
+    print(f"Backfilled: {store.backfill(pairs)}")
+    print(f"Second refresh: {store.backfill(pairs)}")  # Only new points are requested
+    print(store.features(pairs))
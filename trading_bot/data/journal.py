@@ -0,0 +1,128 @@
+"""
+Append-only journal of the strategy's decisions.
+
+Each cycle's outputs are appended to a JSON Lines file, one decision per line:
+    {"ts": epoch ms, "coin_id", "symbol", "signal", "price", "factors": [...]}
+The journal is the input for analysis.signal_evaluation, which joins the
+decisions with forward returns. Appending never rewrites earlier lines, so a
+crash loses at most the line being written; a truncated last line is skipped
+on load.
+"""
+from __future__ import annotations
+
+import json
+import math
+import time
+from typing import Dict, List, Any, Iterable
+
+from trading_bot import config
+from trading_bot.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
+JOURNAL_COLUMNS = ["ts", "coin_id", "symbol", "signal", "price", "factors"]
+
+
+def _price(value) -> float | None:
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+def decision_records(strategy_outputs: Iterable[Dict[str, Any]], timestamp_ms: int) -> List[Dict[str, Any]]:
+    """Journal records for one cycle of run_trading_strategy outputs."""
+    records = []
+    for output in strategy_outputs:
+        if not isinstance(output, dict) or not output.get("coin_id"):
+            continue
+        records.append({
+            "ts": timestamp_ms,
+            "coin_id": output["coin_id"],
+            "symbol": output.get("symbol"),
+            "signal": output.get("signal", "HOLD"),
+            "price": _price(output.get("latest_price")),
+            "factors": list(output.get("decision_factors") or []),
+        })
+    return records
+
+
+class DecisionJournal:
+    """
+    JSON Lines decision journal.
+
+    Args:
+        path: Journal file. Defaults to config.DECISION_JOURNAL_PATH.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or config.DECISION_JOURNAL_PATH
+
+    def record(self, strategy_outputs: Iterable[Dict[str, Any]], timestamp_ms: int | None = None) -> int:
+        """
+        Appends one cycle of strategy outputs.
+
+        Returns:
+            The number of decisions written (0 if the file cannot be written).
+        """
+        timestamp_ms = int(time.time() * 1000) if timestamp_ms is None else int(timestamp_ms)
+        records = decision_records(strategy_outputs, timestamp_ms)
+        if not records:
+            return 0
+        lines = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+        try:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(lines)
+        except OSError as e:
+            print(f"Error writing decision journal {self.path}: {e}")
+            return 0
+        return len(records)
+
+    def read_records(self) -> List[Dict[str, Any]]:
+        """Journal records in file order; empty if the journal is missing."""
+        records = []
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line_number, line in enumerate(f, 1):
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        print(f"Skipping malformed line {line_number} of decision journal {self.path}.")
+        except FileNotFoundError:
+            return []
+        except OSError as e:
+            print(f"Error reading decision journal {self.path}: {e}")
+            return []
+        return records
+
+    def load(self) -> pd.DataFrame:
+        """
+        Reads the whole journal.
+
+        Returns:
+            A DataFrame with JOURNAL_COLUMNS (ts as int64 epoch ms, factors as
+            lists), sorted by ts; empty if the journal is missing.
+        """
+        records = self.read_records()
+        if not records:
+            return pd.DataFrame(columns=JOURNAL_COLUMNS)
+        frame = pd.DataFrame.from_records(records, columns=JOURNAL_COLUMNS)
+        frame["ts"] = frame["ts"].astype("int64")
+        frame["price"] = frame["price"].astype("float64")
+        return frame.sort_values("ts", kind="stable", ignore_index=True)
+
+
+if __name__ == '__main__':
+    import os
+    import tempfile
+
+    journal = DecisionJournal(os.path.join(tempfile.gettempdir(), "trading_bot_journal_example.jsonl"))
+    outputs = [
+        {"coin_id": "bitcoin", "symbol": "BTC", "signal": "CONSIDER_BUY", "latest_price": 60000.0,
+         "decision_factors": ["MACD line crossed above signal line"]},
+        {"coin_id": "ethereum", "symbol": "ETH", "signal": "HOLD", "latest_price": 3000.0,
+         "decision_factors": ["No strong technical or sentiment signals."]},
+    ]
+    print(f"Recorded {journal.record(outputs)} decisions")
+    print(journal.load().tail())
@@ -0,0 +1,326 @@
+"""
+Memory-mapped OHLC price store shared between processes.
+
+A single ingest process writes OHLC series (from the coingecko module) into a
+fixed-layout file; strategy, backtest and dashboard processes map the same
+file read-only and see the data as NumPy arrays without copying or re-parsing.
+Placing the file under /dev/shm keeps it entirely in shared memory.
+
+Consistency uses a seqlock: the writer makes the header sequence number odd
+before modifying data and even again afterwards. Readers retry a copy until
+they observe the same even sequence number before and after it; this covers
+the symbol directory as well as the candles.
+
+The store is standalone infrastructure: the bot's main loop keeps its
+candles in a CandleAggregator and does not use it. Deployments that split
+ingest from analysis run ingest_from_coingecko in one process and open the
+store read-only from the others.
+"""
+import os
+import tempfile
+import time
+from typing import Dict, List, Any, Tuple, Callable
+
+import numpy as np
+
+from trading_bot import config
+
+MAGIC = b"TBPS"
+FORMAT_VERSION = 1
+SYMBOL_BYTES = 32
+
+
+def default_store_path() -> str:
+    """Returns config.PRICE_STORE_PATH, or a file in /dev/shm (or the temp dir)."""
+    if getattr(config, "PRICE_STORE_PATH", None):
+        return config.PRICE_STORE_PATH
+    base = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return os.path.join(base, "trading_bot_prices.bin")
+
+
+def _header_dtype() -> np.dtype:
+    return np.dtype([
+        ("magic", "S4"), ("version", "<u4"), ("seq", "<u8"),
+        ("n_slots", "<u4"), ("capacity", "<u4"), ("n_used", "<u4"), ("pad", "V36"),
+    ])
+
+
+def _layout(n_slots: int, capacity: int) -> np.dtype:
+    return np.dtype([
+        ("magic", "S4"), ("version", "<u4"), ("seq", "<u8"),
+        ("n_slots", "<u4"), ("capacity", "<u4"), ("n_used", "<u4"), ("pad", "V36"),
+        ("symbols", f"S{SYMBOL_BYTES}", (n_slots,)),
+        ("counts", "<i8", (n_slots,)),
+        ("updated_ms", "<i8", (n_slots,)),
+        ("timestamps", "<i8", (n_slots, capacity)),
+        ("ohlc", "<f8", (n_slots, capacity, 4)),
+    ])
+
+
+class PriceStore:
+    """
+    Fixed-size OHLC store backed by a memory-mapped file.
+
+    Use PriceStore.create in the (single) writer process and PriceStore.open
+    in readers. Each symbol occupies a slot holding up to `capacity` of its
+    most recent candles as timestamps (ms) plus open/high/low/close columns.
+    """
+
+    def __init__(self, path: str, mm: np.memmap, writable: bool):
+        self.path = path
+        self._mm = mm
+        self.writable = writable
+        self.n_slots = int(mm["n_slots"])
+        self.capacity = int(mm["capacity"])
+        # Zero-copy views into the mapping
+        self._seq = mm["seq"]
+        self.symbols_array = mm["symbols"]
+        self.counts = mm["counts"]
+        self.updated_ms = mm["updated_ms"]
+        self.timestamps = mm["timestamps"]
+        self.ohlc = mm["ohlc"]
+        self._slots: Dict[str, int] = {}
+        self._refresh_slots()
+
+    @classmethod
+    def create(cls, path: str | None = None, n_slots: int | None = None,
+               capacity: int | None = None) -> "PriceStore":
+        """
+        Creates (or truncates) a store file and maps it for writing.
+
+        Args:
+            path: File path. Defaults to default_store_path().
+            n_slots: Maximum number of symbols. Defaults to config.PRICE_STORE_SLOTS.
+            capacity: Candles kept per symbol. Defaults to config.PRICE_STORE_CAPACITY.
+        """
+        path = path or default_store_path()
+        n_slots = n_slots or config.PRICE_STORE_SLOTS
+        capacity = capacity or config.PRICE_STORE_CAPACITY
+        mm = np.memmap(path, dtype=_layout(n_slots, capacity), mode="w+", shape=())
+        mm["magic"] = MAGIC
+        mm["version"] = FORMAT_VERSION
+        mm["seq"] = 0
+        mm["n_slots"] = n_slots
+        mm["capacity"] = capacity
+        mm["n_used"] = 0
+        mm.flush()
+        return cls(path, mm, writable=True)
+
+    @classmethod
+    def open(cls, path: str | None = None) -> "PriceStore":
+        """
+        Maps an existing store read-only.
+
+        Raises:
+            ValueError: If the file is not a price store of a supported version.
+        """
+        path = path or default_store_path()
+        header = np.fromfile(path, dtype=_header_dtype(), count=1)
+        if not len(header) or header["magic"][0] != MAGIC:
+            raise ValueError(f"{path} is not a trading_bot price store.")
+        if int(header["version"][0]) != FORMAT_VERSION:
+            raise ValueError(f"Unsupported price store version {int(header['version'][0])} in {path}.")
+        layout = _layout(int(header["n_slots"][0]), int(header["capacity"][0]))
+        mm = np.memmap(path, dtype=layout, mode="r", shape=())
+        return cls(path, mm, writable=False)
+
+    def close(self) -> None:
+        """Flushes pending writes; the mapping is released once all views are gone."""
+        if self.writable:
+            self._mm.flush()
+
+    # --- Seqlock ---
+
+    @property
+    def version(self) -> int:
+        """Current sequence number; odd while a write is in progress."""
+        return int(self._seq)
+
+    def _begin_write(self) -> None:
+        self._mm["seq"] = int(self._seq) + 1
+
+    def _end_write(self) -> None:
+        self._mm["seq"] = int(self._seq) + 1
+
+    def read_consistent(self, reader: Callable[["PriceStore"], Any], max_retries: int = 1000,
+                        spin_sleep: float = 0.0001) -> Any:
+        """
+        Runs `reader(store)` until it completes without a concurrent write.
+
+        `reader` must copy what it needs out of the mapping (views would keep
+        changing underneath it).
+
+        Raises:
+            TimeoutError: If no consistent read succeeded within max_retries.
+        """
+        for _ in range(max_retries):
+            before = int(self._seq)
+            if before % 2 == 0:
+                result = reader(self)
+                if int(self._seq) == before:
+                    return result
+            time.sleep(spin_sleep)
+        raise TimeoutError(f"Could not get a consistent snapshot from {self.path}.")
+
+    # --- Symbol slots ---
+
+    def _refresh_slots(self) -> None:
+        def _read_directory(store):
+            n_used = int(store._mm["n_used"])
+            return [store.symbols_array[i].decode("utf-8") for i in range(n_used)]
+
+        # Readers copy the directory under the seqlock; the writer is the only one changing it
+        symbols = _read_directory(self) if self.writable else self.read_consistent(_read_directory)
+        self._slots = {symbol: i for i, symbol in enumerate(symbols)}
+
+    def slot(self, symbol: str) -> int | None:
+        """Returns the slot index of a symbol, or None if it is not stored."""
+        idx = self._slots.get(symbol)
+        if idx is None and not self.writable:
+            self._refresh_slots()  # The writer may have added symbols since we mapped
+            idx = self._slots.get(symbol)
+        return idx
+
+    def symbols(self) -> List[str]:
+        if not self.writable:
+            self._refresh_slots()
+        return list(self._slots)
+
+    def _assign_slot(self, symbol: str) -> int:
+        idx = self._slots.get(symbol)
+        if idx is not None:
+            return idx
+        encoded = symbol.encode("utf-8")
+        if len(encoded) > SYMBOL_BYTES:
+            raise ValueError(f"Symbol {symbol!r} is longer than {SYMBOL_BYTES} bytes.")
+        n_used = int(self._mm["n_used"])
+        if n_used >= self.n_slots:
+            raise ValueError(f"Price store is full ({self.n_slots} symbols).")
+        self.symbols_array[n_used] = encoded
+        self._mm["n_used"] = n_used + 1
+        self._slots[symbol] = n_used
+        return n_used
+
+    # --- Writing ---
+
+    def _write_slot(self, symbol: str, ohlc_data: List[List[Any]]) -> bool:
+        try:
+            data = np.asarray(ohlc_data, dtype=np.float64)
+        except (ValueError, TypeError):
+            print(f"Error: Invalid OHLC data format for {symbol}; not stored.")
+            return False
+        if data.ndim != 2 or data.shape[1] != 5:
+            print(f"Error: Invalid OHLC data format for {symbol}; not stored.")
+            return False
+        data = data[~np.isnan(data).any(axis=1)]
+        data = data[np.argsort(data[:, 0], kind="stable")][-self.capacity:]
+
+        idx = self._assign_slot(symbol)
+        n = len(data)
+        self.timestamps[idx, :n] = data[:, 0].astype(np.int64)
+        self.ohlc[idx, :n] = data[:, 1:]
+        self.counts[idx] = n
+        self.updated_ms[idx] = int(time.time() * 1000)
+        return True
+
+    def write_ohlc(self, symbol: str, ohlc_data: List[List[Any]]) -> bool:
+        """
+        Replaces a symbol's series with Coingecko-style [ts, open, high, low, close] rows.
+
+        Only the newest `capacity` rows are kept.
+
+        Returns:
+            True if the series was stored.
+        """
+        return bool(self.write_many({symbol: ohlc_data}))
+
+    def write_many(self, series: Dict[str, List[List[Any]]]) -> int:
+        """
+        Replaces several symbols' series under a single seqlock write.
+
+        Returns:
+            The number of series stored.
+        """
+        if not self.writable:
+            raise PermissionError("Price store was opened read-only.")
+        self._begin_write()
+        try:
+            written = sum(1 for symbol, rows in series.items() if self._write_slot(symbol, rows))
+        finally:
+            self._end_write()
+        return written
+
+    # --- Reading ---
+
+    def view(self, symbol: str) -> Tuple[np.ndarray, np.ndarray] | None:
+        """
+        Zero-copy (timestamps, ohlc) views of a symbol's series.
+
+        The views alias the shared mapping, so they can change under a
+        concurrent write; use snapshot() when consistency matters.
+        """
+        idx = self.slot(symbol)
+        if idx is None:
+            return None
+        n = int(self.counts[idx])
+        return self.timestamps[idx, :n], self.ohlc[idx, :n]
+
+    def snapshot(self, symbol: str) -> Tuple[np.ndarray, np.ndarray] | None:
+        """
+        Consistent copies of a symbol's (timestamps, ohlc) arrays.
+
+        Returns:
+            A tuple of arrays, or None if the symbol is not stored.
+        """
+        idx = self.slot(symbol)
+        if idx is None:
+            return None
+
+        def _copy(store):
+            n = int(store.counts[idx])
+            return store.timestamps[idx, :n].copy(), store.ohlc[idx, :n].copy()
+
+        return self.read_consistent(_copy)
+
+    def snapshot_ohlc_list(self, symbol: str) -> List[List[float]]:
+        """Consistent copy in Coingecko's list-of-lists format (empty if missing)."""
+        result = self.snapshot(symbol)
+        if result is None:
+            return []
+        timestamps, ohlc = result
+        return [[int(ts)] + row for ts, row in zip(timestamps.tolist(), ohlc.tolist())]
+
+
+def ingest_from_coingecko(store: PriceStore, coin_ids: List[str], days: str = "90") -> int:
+    """
+    Fetches OHLC for each coin from Coingecko and writes it to the store.
+
+    Meant to run in the single ingest process of a split deployment (the
+    bot's main loop does not call it); readers pick the data up from the
+    shared mapping.
+
+    Returns:
+        The number of coins stored.
+    """
+    from trading_bot.api import coingecko as cg_api
+
+    series = {}
+    for coin_id in coin_ids:
+        ohlc = cg_api.get_historical_ohlc(coin_id=coin_id, days=days)
+        if ohlc:
+            series[coin_id] = ohlc
+    return store.write_many(series) if series else 0
+
+
+if __name__ == '__main__':
+    example_path = os.path.join(tempfile.gettempdir(), "trading_bot_prices_example.bin")
+    writer = PriceStore.create(example_path, n_slots=4, capacity=16)
+    writer.write_ohlc("bitcoin", [[1678886400000 + i * 3600000, 100 + i, 101 + i, 99 + i, 100.5 + i] for i in range(20)])
+
+    reader = PriceStore.open(example_path)
+    timestamps, ohlc = reader.snapshot("bitcoin")
+    print(f"Store version {reader.version}, symbols {reader.symbols()}")
+    print(f"{len(timestamps)} candles, last close {ohlc[-1, 3]}")
+    reader.close()
+    writer.close()
+    os.remove(example_path)
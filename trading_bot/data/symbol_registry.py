@@ -0,0 +1,191 @@
+"""
+Coingecko coin to exchange market mapping.
+
+Exchange metadata (spot and perpetual symbols with tick and lot sizes) is
+loaded once, cached on disk and refreshed after config.SYMBOL_REGISTRY_REFRESH_HOURS.
+Coins then resolve to their tradable pairs with a dictionary lookup, so coins
+without a market can be dropped before any per-coin network call.
+"""
+import json
+import os
+import time
+from typing import Dict, List, Any
+
+from trading_bot import config
+from trading_bot.api import exchange as exchange_api
+from trading_bot.reporting import metrics
+
+CACHE_VERSION = 1
+
+
+def _filter_value(filters: List[Dict[str, Any]], filter_type: str, key: str) -> float | None:
+    for f in filters or []:
+        if isinstance(f, dict) and f.get("filterType") == filter_type:
+            try:
+                return float(f[key])
+            except (KeyError, TypeError, ValueError):
+                return None
+    return None
+
+
+def _index_markets(exchange_info: Dict[str, Any], quote_asset: str, perpetual_only: bool) -> Dict[str, Dict[str, Any]]:
+    """Base asset -> market metadata for trading symbols quoted in quote_asset."""
+    markets = {}
+    for entry in exchange_info.get("symbols", []) if isinstance(exchange_info, dict) else []:
+        if not isinstance(entry, dict) or entry.get("status") != "TRADING":
+            continue
+        if entry.get("quoteAsset") != quote_asset or not entry.get("baseAsset") or not entry.get("symbol"):
+            continue
+        if perpetual_only and entry.get("contractType") != "PERPETUAL":
+            continue
+        filters = entry.get("filters", [])
+        markets[entry["baseAsset"].upper()] = {
+            "symbol": entry["symbol"],
+            "tick_size": _filter_value(filters, "PRICE_FILTER", "tickSize"),
+            "lot_size": _filter_value(filters, "LOT_SIZE", "stepSize"),
+            "min_qty": _filter_value(filters, "LOT_SIZE", "minQty"),
+        }
+    return markets
+
+
+class SymbolRegistry:
+    """
+    Resolves Coingecko coins to exchange spot and perpetual markets.
+
+    Args:
+        cache_path: JSON file holding the last fetched metadata.
+        refresh_hours: Age after which the metadata is fetched again.
+        quote_asset: Quote currency of the pairs to map to.
+        overrides: Coingecko id -> exchange base asset, for coins whose
+                   Coingecko symbol differs from the exchange's.
+    """
+
+    def __init__(self, cache_path: str | None = None, refresh_hours: float | None = None,
+                 quote_asset: str | None = None, overrides: Dict[str, str] | None = None):
+        self.cache_path = cache_path or config.SYMBOL_REGISTRY_CACHE_PATH
+        self.refresh_hours = config.SYMBOL_REGISTRY_REFRESH_HOURS if refresh_hours is None else refresh_hours
+        self.quote_asset = quote_asset or config.QUOTE_ASSET
+        self.overrides = config.SYMBOL_OVERRIDES if overrides is None else overrides
+        self.spot: Dict[str, Dict[str, Any]] = {}
+        self.perp: Dict[str, Dict[str, Any]] = {}
+        self.fetched_at: float | None = None
+
+    def is_stale(self, now: float | None = None) -> bool:
+        if self.fetched_at is None:
+            return True
+        now = time.time() if now is None else now
+        return now - self.fetched_at >= self.refresh_hours * 3600
+
+    def _load_cache(self) -> bool:
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            print(f"Error reading symbol registry cache {self.cache_path}: {e}")
+            return False
+        if not isinstance(cached, dict) or cached.get("version") != CACHE_VERSION \
+                or cached.get("quote_asset") != self.quote_asset:
+            return False
+        self.spot = cached.get("spot", {})
+        self.perp = cached.get("perp", {})
+        self.fetched_at = float(cached.get("fetched_at", 0))
+        return True
+
+    def _save_cache(self) -> None:
+        data = {"version": CACHE_VERSION, "quote_asset": self.quote_asset, "fetched_at": self.fetched_at,
+                "spot": self.spot, "perp": self.perp}
+        tmp_path = f"{self.cache_path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Error writing symbol registry cache {self.cache_path}: {e}")
+
+    def refresh(self) -> bool:
+        """
+        Fetches spot and perpetual metadata from the exchange and caches it.
+
+        Returns:
+            True on success; on failure the current (possibly stale) data is kept.
+        """
+        with metrics.span("exchange.get_exchange_info"):
+            spot_info = exchange_api.get_exchange_info("spot")
+            futures_info = exchange_api.get_exchange_info("futures")
+        if not spot_info or "error" in spot_info:
+            print(f"Error fetching exchange info: {(spot_info or {}).get('error', 'empty response')}")
+            metrics.increment("api_errors_total", api="exchange", endpoint="exchangeInfo", kind="request")
+            return False
+        self.spot = _index_markets(spot_info, self.quote_asset, perpetual_only=False)
+        self.perp = ({} if not futures_info or "error" in futures_info
+                     else _index_markets(futures_info, self.quote_asset, perpetual_only=True))
+        self.fetched_at = time.time()
+        self._save_cache()
+        return True
+
+    def load(self) -> "SymbolRegistry":
+        """Loads the disk cache and refreshes it from the exchange if missing or stale."""
+        if self.fetched_at is None:
+            self._load_cache()
+        if self.is_stale():
+            if not self.refresh() and self.fetched_at is not None:
+                print("Using stale symbol registry cache.")
+        return self
+
+    def base_asset(self, coin: Dict[str, Any]) -> str:
+        return (self.overrides.get(coin.get("id")) or str(coin.get("symbol", ""))).upper()
+
+    def resolve(self, coin: Dict[str, Any]) -> Dict[str, Any] | None:
+        """
+        Finds the markets for a coin.
+
+        Args:
+            coin: A dictionary with at least "id" and "symbol".
+
+        Returns:
+            {"spot": market, "perp": market or None}, or None if the coin has
+            no spot market. Markets carry symbol, tick_size, lot_size, min_qty.
+        """
+        base = self.base_asset(coin)
+        spot = self.spot.get(base)
+        if spot is None:
+            return None
+        return {"spot": spot, "perp": self.perp.get(base)}
+
+    def annotate(self, coins: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Adds market details to processed coins and drops those without a market.
+
+        Each returned coin gets trading_pair_spot, trading_pair_perp (None if
+        there is no perpetual), tick_size and lot_size.
+        """
+        mapped = []
+        for coin in coins:
+            markets = self.resolve(coin)
+            if markets is None:
+                print(f"No {self.quote_asset} market for {coin.get('name', coin.get('id'))}. Skipping.")
+                metrics.increment("coins_skipped_total", reason="no_market")
+                continue
+            mapped.append(dict(
+                coin,
+                trading_pair_spot=markets["spot"]["symbol"],
+                trading_pair_perp=markets["perp"]["symbol"] if markets["perp"] else None,
+                tick_size=markets["spot"]["tick_size"],
+                lot_size=markets["spot"]["lot_size"],
+            ))
+        return mapped
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    registry = SymbolRegistry(cache_path=os.path.join(tempfile.gettempdir(), "exchange_info_example.json")).load()
+    coins = [
+        {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"},
+        {"id": "tether", "symbol": "usdt", "name": "Tether"},
+        {"id": "cardano", "symbol": "ada", "name": "Cardano"},
+    ]
+    for coin in registry.annotate(coins):
+        print(coin)
@@ -0,0 +1,63 @@
+"""
+Deferred imports for heavy third-party dependencies.
+
+pandas, numpy, requests and the Gemini client together take over a second
+to import, and most entry points (the reporter, a --help, a worker process)
+need only some of them, or none. lazy_import returns a module that is
+registered in sys.modules right away but executed only when an attribute
+is first accessed:
+
+    pd = lazy_import("pandas")   # Nothing is loaded yet
+    pd.DataFrame(...)            # pandas is imported here
+
+Because the placeholder is the real module object (importlib.util.LazyLoader),
+other code importing the same module and unittest.mock patches on it see
+the same module. Modules that annotate signatures with lazily imported types
+use `from __future__ import annotations` so the annotations do not trigger
+the import.
+"""
+import importlib.util
+import sys
+import threading
+from types import ModuleType
+
+_lock = threading.Lock()
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Returns the named module, deferring its execution until first use.
+
+    Args:
+        name: Absolute module name, e.g. "pandas" or "google.api_core.exceptions".
+              Parent packages of a dotted name are imported normally.
+
+    Returns:
+        The module (already loaded if it had been imported before).
+
+    Raises:
+        ModuleNotFoundError: If the module is not installed.
+    """
+    with _lock:
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+        spec = importlib.util.find_spec(name)
+        if spec is None:
+            raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+        loader = importlib.util.LazyLoader(spec.loader)
+        spec.loader = loader
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        loader.exec_module(module)
+
+        parent, _, child = name.rpartition(".")
+        if parent:
+            setattr(sys.modules[parent], child, module)
+        return module
+
+
+def is_loaded(name: str) -> bool:
+    """True if the module has been imported and executed (not just lazily registered)."""
+    module = sys.modules.get(name)
+    return module is not None and type(module) is not importlib.util._LazyModule
@@ -2,6 +2,7 @@
 
 # Import necessary modules from the project
 from . import config  # Example: import configuration
+from .reporting import metrics
 # from .api import client  # Example: import API client
 # from .processing import data_processor # Example: import data processor
 # from .analysis import strategy # Example: import trading strategy
@@ -19,6 +20,19 @@ def main():
     print(f"Trading Symbol: {config.TRADE_SYMBOL}")
     print(f"Trading Amount: {config.TRADE_AMOUNT}")
 
+    metrics_server = None
+    if metrics.is_enabled() and config.METRICS_HTTP_PORT:
+        metrics_server = metrics.start_http_server(config.METRICS_HTTP_PORT)
+        print(f"Serving metrics on http://127.0.0.1:{config.METRICS_HTTP_PORT}/metrics")
+
+    api_store, api_server = None, None
+    if config.API_HTTP_PORT:
+        from .data.journal import DecisionJournal
+        from .reporting import http_api
+        api_store = http_api.StateStore(DecisionJournal())
+        api_server = http_api.start_api_server(api_store, config.API_HTTP_PORT)
+        print(f"Serving the strategy API on http://127.0.0.1:{api_server.port}/api/coins")
+
     # Initialize components (examples)
     # api_client = client.APIClient(config.API_KEY, config.API_SECRET)
     # data_fetcher = data_processor.DataFetcher(api_client)
@@ -28,24 +42,89 @@ def main():
 
     try:
         # Main bot loop (simplified example)
-    # ... (previous example loop code commented out or removed for clarity) ...
-
-    # Run the trading strategy
-    from .core import strategy # Import the strategy module
-    from .reporting import telegram_reporter # Import the reporter
-
-    strategy_outputs = strategy.run_trading_strategy(top_n_coins=3) # Example: top 3 coins
-
-    if strategy_outputs:
-        print("\n--- Raw Strategy Output (for debugging) ---")
-        # for output in strategy_outputs: # Optionally print raw if needed
-        #     print(output)
-
-        print("\n--- Formatted Telegram Report ---")
-        telegram_report_message = telegram_reporter.format_telegram_report(strategy_outputs)
-        print(telegram_report_message)
-    else:
-        print("Strategy did not produce any output to report.")
+        # ... (previous example loop code commented out or removed for clarity) ...
+
+        # Run the trading strategy
+        from .core import strategy # Import the strategy module
+        from .reporting import telegram_reporter # Import the reporter
+
+        # Warm start: restore the last checkpoint and fetch only what was missed since
+        from .data import snapshot
+        from .data.candles import CandleAggregator
+        from .analysis.sentiment_state import SentimentState
+        from .analysis.market_regime import CorrelationTracker
+        candles = CandleAggregator()
+        correlation_tracker = CorrelationTracker()
+        sentiment_state = SentimentState()  # Persisted in the snapshot
+        derivatives = None
+        if config.DERIVATIVES_ENABLED:
+            from .data.derivatives_store import DerivativesStore
+            derivatives = DerivativesStore()
+        delta_reporter = None
+        if config.DELTA_REPORTING_ENABLED:
+            from .reporting.delta_reporter import DeltaReporter
+            delta_reporter = DeltaReporter()
+        saved_state = snapshot.load_snapshot()
+        restored = snapshot.restore(saved_state, candles=candles, sentiment_state=sentiment_state,
+                                    correlation_tracker=correlation_tracker, derivatives=derivatives,
+                                    delta_reporter=delta_reporter)
+        universe = saved_state.get("universe", []) if saved_state else []
+        if restored:
+            print(f"Restored {', '.join(restored)} from snapshot.")
+            gap = snapshot.fetch_candle_gap(candles, [coin["id"] for coin in universe])
+            print(f"Fetched {sum(gap.values())} candles missed since the snapshot.")
+
+        news_index = None
+        if config.NEWS_API_KEY and config.NEWS_API_KEY != "YOUR_NEWS_API_KEY":
+            from .api import news_feed
+            news_ingestor = news_feed.NewsIngestor(news_feed.default_sources())
+            news_index = news_ingestor.index
+            # The first poll needs the coin universe to route articles: use the snapshot's, else the top coins
+            if not universe:
+                from .api import coingecko
+                universe = coingecko.get_top_coins(limit=3)
+            news_index.update_universe(universe)
+            print(f"Ingested {news_ingestor.poll()} new news articles.")
+
+        from .data.symbol_registry import SymbolRegistry
+        symbol_registry = SymbolRegistry().load()
+
+        price_consolidator = None
+        if config.MULTI_VENUE_MARKET_DATA:
+            from .api.exchange_adapters import BestPriceConsolidator
+            price_consolidator = BestPriceConsolidator()
+
+        strategy_outputs = strategy.run_trading_strategy(top_n_coins=3, candles=candles, news_index=news_index,
+                                                         sentiment_state=sentiment_state,
+                                                         derivatives=derivatives,
+                                                         symbol_registry=symbol_registry,
+                                                         correlation_tracker=correlation_tracker,
+                                                         price_consolidator=price_consolidator) # Example: top 3 coins
+        from .data.journal import DecisionJournal
+        DecisionJournal().record(strategy_outputs)
+        if api_store is not None:
+            api_store.publish(strategy_outputs)
+
+        if strategy_outputs:
+            print("\n--- Raw Strategy Output (for debugging) ---")
+            # for output in strategy_outputs: # Optionally print raw if needed
+            #     print(output)
+
+            print("\n--- Formatted Telegram Report ---")
+            telegram_report_message = telegram_reporter.format_telegram_report(strategy_outputs)
+            print(telegram_report_message)
+
+            if config.TELEGRAM_CHAT_ID:
+                from .reporting import telegram_client
+                telegram_client.send_telegram_report(strategy_outputs, delta_reporter=delta_reporter)
+        else:
+            print("Strategy did not produce any output to report.")
+
+        # Checkpoint after reporting so the delta reporter's last-sent state is current
+        snapshot.Checkpointer().maybe_save(
+            force=True, candles=candles, sentiment_state=sentiment_state, correlation_tracker=correlation_tracker,
+            derivatives=derivatives, delta_reporter=delta_reporter,
+            universe=[{"id": o["coin_id"], "symbol": o["symbol"], "name": o["name"]} for o in strategy_outputs])
 
 
         # 1. Fetch data
@@ -73,7 +152,13 @@ def main():
         # time.sleep(3600) # Example: wait for 1 hour
 
         print("Trading Bot main loop would run here.")
-        pass
+
+        if api_server is not None:
+            # Keep serving the published decisions; the API (and metrics) threads are daemons
+            import time
+            print("Serving the strategy API until interrupted (Ctrl+C).")
+            while True:
+                time.sleep(1)
 
     except KeyboardInterrupt:
         print("Trading Bot stopped by user.")
@@ -83,6 +168,12 @@ def main():
     finally:
         print("Trading Bot shutting down.")
         # results_reporter.generate_summary_report()
+        if metrics.is_enabled():
+            print(f"Metrics written to {metrics.write_json(config.METRICS_EXPORT_PATH)}")
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        if api_server is not None:
+            api_server.stop()
 
 if __name__ == "__main__":
     main()
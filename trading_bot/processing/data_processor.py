@@ -1,5 +1,11 @@
+from __future__ import annotations
+
 from typing import List, Dict, Any
 
+from trading_bot.lazy_imports import lazy_import
+
+pd = lazy_import("pandas")
+
 def process_coin_data(coin_data_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """
     Processes a list of coin data dictionaries to extract and standardize relevant information.
@@ -59,8 +65,6 @@ def process_coin_data(coin_data_list: List[Dict[str, Any]]) -> List[Dict[str, An
     return processed_coins
 
 
-import pandas as pd
-
 def ohlc_list_to_dataframe(ohlc_data: List[List[Any]], coin_id: str = "coin") -> pd.DataFrame:
     """
     Converts a list of lists OHLC data (from Coingecko) into a pandas DataFrame.
@@ -0,0 +1,18 @@
+"""
+Timestamp parsing shared by the news ingestion and sentiment modules.
+"""
+from datetime import datetime, timezone
+from typing import Any
+
+
+def parse_published_at(value: Any) -> datetime | None:
+    """Parses an ISO-8601 timestamp (e.g. "2023-10-27T10:00:00Z") to an aware UTC datetime."""
+    if not value or not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
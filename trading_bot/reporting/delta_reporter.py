@@ -0,0 +1,210 @@
+from typing import List, Dict, Any, Optional
+import math
+
+from trading_bot import config
+from trading_bot.reporting.telegram_reporter import (
+    format_coin_section, pack_sections, _format_value, TELEGRAM_MAX_MESSAGE_LENGTH
+)
+
+UPDATE_HEADER = "<b>Trading Update</b>\n"
+UPDATE_CONTINUATION_HEADER = "<b>Trading Update (cont.)</b>\n"
+SUMMARY_HEADER = "<b>Trading Summary</b>\n"
+SUMMARY_CONTINUATION_HEADER = "<b>Trading Summary (cont.)</b>\n"
+NO_CHANGES = None  # Returned instead of messages when nothing needs sending
+
+
+def _number(value) -> Optional[float]:
+    """Returns value as a float, or None if missing/NaN/non-numeric."""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+def _macd_histogram(data: Dict[str, Any]) -> Optional[float]:
+    macd = data.get("macd")
+    if isinstance(macd, dict):
+        return _number(macd.get("histogram"))
+    return None
+
+
+def _sign(value: Optional[float]) -> int:
+    if value is None or value == 0:
+        return 0
+    return 1 if value > 0 else -1
+
+
+class DeltaReporter:
+    """
+    Differential Telegram reporting.
+
+    Remembers what was last sent for each coin of the current universe and,
+    every cycle, only reports coins whose signal, sentiment or key indicators moved beyond the configured
+    thresholds. Every `full_summary_every` cycles (and on the first cycle) a
+    compact one-line-per-coin summary of the whole universe is sent instead.
+
+    Args:
+        price_change_pct: Minimum absolute price change, in percent.
+        rsi_change: Minimum absolute RSI (14) change, in points.
+        full_summary_every: Cycles between full summaries; 0 disables them
+                            (the first cycle then reports every coin as new).
+        max_length: Maximum characters per message.
+    """
+
+    def __init__(self, price_change_pct: float | None = None, rsi_change: float | None = None,
+                 full_summary_every: int | None = None,
+                 max_length: int = TELEGRAM_MAX_MESSAGE_LENGTH):
+        self.price_change_pct = config.DELTA_PRICE_CHANGE_PCT if price_change_pct is None else price_change_pct
+        self.rsi_change = config.DELTA_RSI_CHANGE if rsi_change is None else rsi_change
+        self.full_summary_every = (config.DELTA_FULL_SUMMARY_EVERY
+                                   if full_summary_every is None else full_summary_every)
+        self.max_length = max_length
+        self.cycle = 0
+        self.last_sent: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _coin_key(data: Dict[str, Any]) -> str:
+        return str(data.get("coin_id") or data.get("symbol") or data.get("name"))
+
+    @staticmethod
+    def _state(data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "signal": data.get("signal"),
+            "aggregated_sentiment": data.get("aggregated_sentiment"),
+            "latest_price": _number(data.get("latest_price")),
+            "rsi_14": _number(data.get("rsi_14")),
+            "macd_histogram": _macd_histogram(data),
+        }
+
+    def changes(self, data: Dict[str, Any]) -> List[str]:
+        """
+        Describes how a coin changed since it was last sent.
+
+        Args:
+            data: A coin_decision_data dictionary.
+
+        Returns:
+            A list of human-readable change descriptions; empty if nothing
+            crossed a threshold.
+        """
+        previous = self.last_sent.get(self._coin_key(data))
+        current = self._state(data)
+        if previous is None:
+            return ["new"]
+
+        changed = []
+        if current["signal"] != previous["signal"]:
+            changed.append(f"signal {previous['signal']} -> {current['signal']}")
+        if current["aggregated_sentiment"] != previous["aggregated_sentiment"]:
+            changed.append(f"sentiment {previous['aggregated_sentiment']} -> {current['aggregated_sentiment']}")
+
+        old_price, new_price = previous["latest_price"], current["latest_price"]
+        if old_price and new_price is not None:
+            pct = (new_price - old_price) / old_price * 100
+            if abs(pct) >= self.price_change_pct:
+                changed.append(f"price {pct:+.2f}%")
+        elif (old_price is None) != (new_price is None):
+            changed.append("price availability")
+
+        old_rsi, new_rsi = previous["rsi_14"], current["rsi_14"]
+        if old_rsi is not None and new_rsi is not None:
+            if abs(new_rsi - old_rsi) >= self.rsi_change:
+                changed.append(f"RSI {_format_value(old_rsi)} -> {_format_value(new_rsi)}")
+        elif (old_rsi is None) != (new_rsi is None):
+            changed.append("RSI availability")
+
+        if _sign(current["macd_histogram"]) != _sign(previous["macd_histogram"]):
+            changed.append("MACD histogram crossed zero")
+        return changed
+
+    def _is_full_summary_cycle(self) -> bool:
+        if self.full_summary_every <= 0:
+            return False
+        return self.cycle % self.full_summary_every == 0
+
+    def build_messages(self, decision_data_list: List[Dict[str, Any]]) -> Optional[List[str]]:
+        """
+        Builds this cycle's messages without changing any state.
+
+        Call commit() with the same list once the messages were delivered, so
+        that a failed send is reported again next cycle.
+
+        Args:
+            decision_data_list: A list of coin_decision_data dictionaries.
+
+        Returns:
+            A list of message strings, or None if nothing changed this cycle.
+        """
+        if self._is_full_summary_cycle():
+            return self.format_summary(decision_data_list)
+
+        sections = []
+        for data in decision_data_list:
+            changed = self.changes(data)
+            if not changed:
+                continue
+            section = format_coin_section(len(sections) + 1, data, include_placeholders=False)
+            sections.append(section + f"      Changes: {', '.join(changed)}\n")
+
+        if not sections:
+            return NO_CHANGES
+        return pack_sections(sections, UPDATE_HEADER, UPDATE_CONTINUATION_HEADER, self.max_length)
+
+    def commit(self, decision_data_list: List[Dict[str, Any]]) -> None:
+        """
+        Records this cycle's messages as sent and advances to the next cycle.
+
+        Args:
+            decision_data_list: The list passed to build_messages.
+        """
+        full_summary = self._is_full_summary_cycle()
+        reported = [data for data in decision_data_list if full_summary or self.changes(data)]
+        # Coins that left the universe are forgotten; if they return they are reported as new
+        current_keys = {self._coin_key(data) for data in decision_data_list}
+        self.last_sent = {key: state for key, state in self.last_sent.items() if key in current_keys}
+        for data in reported:
+            self.last_sent[self._coin_key(data)] = self._state(data)
+        self.cycle += 1
+
+    def format_summary(self, decision_data_list: List[Dict[str, Any]]) -> List[str]:
+        """Formats a compact one-line-per-coin summary of the whole universe."""
+        lines = []
+        for data in decision_data_list:
+            symbol = str(data.get("symbol", "N/A")).upper()
+            lines.append(
+                f"{symbol}: {_format_value(data.get('signal', 'N/A'))}"
+                f" @ {_format_value(data.get('latest_price'))}"
+                f" | RSI {_format_value(data.get('rsi_14'))}"
+                f" | {_format_value(data.get('aggregated_sentiment', 'N/A'))}"
+            )
+        if not lines:
+            lines.append("No data to report.")
+        return pack_sections(lines, SUMMARY_HEADER, SUMMARY_CONTINUATION_HEADER, self.max_length)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable state (cycle counter and last-sent values per coin)."""
+        return {"cycle": self.cycle, "last_sent": {k: dict(v) for k, v in self.last_sent.items()}}
+
+    def load_dict(self, state: Dict[str, Any]) -> None:
+        """Restores state produced by to_dict."""
+        self.cycle = int(state.get("cycle", 0))
+        self.last_sent = {k: dict(v) for k, v in state.get("last_sent", {}).items()}
+
+
+if __name__ == '__main__':
+    reporter = DeltaReporter(full_summary_every=3)
+    cycle_1 = [
+        {"coin_id": "bitcoin", "symbol": "BTC", "name": "Bitcoin", "latest_price": 45000.0, "rsi_14": 55.0,
+         "aggregated_sentiment": "positive", "signal": "HOLD", "decision_factors": ["No strong technical or sentiment signals."]},
+        {"coin_id": "ethereum", "symbol": "ETH", "name": "Ethereum", "latest_price": 3000.0, "rsi_14": 28.0,
+         "aggregated_sentiment": "neutral", "signal": "CONSIDER_BUY", "decision_factors": ["RSI < 30 (Oversold)"]},
+    ]
+    cycle_2 = [dict(cycle_1[0], latest_price=45100.0), dict(cycle_1[1], signal="BUY", aggregated_sentiment="positive")]
+
+    for i, cycle in enumerate([cycle_1, cycle_2, cycle_2], start=1):
+        print(f"--- Cycle {i} ---")
+        print(reporter.build_messages(cycle))
+        reporter.commit(cycle)
@@ -0,0 +1,344 @@
+"""
+Read-only HTTP API over the bot's latest decisions.
+
+Endpoints (GET or HEAD, JSON):
+    /healthz                          liveness and the last publish time
+    /api/coins                        one summary per coin (signal, price, regime)
+    /api/signals                      {coin_id: signal}
+    /api/coins/{coin_id}              the coin's full decision data
+    /api/coins/{coin_id}/indicators   the coin's indicator snapshot
+    /api/history?coin_id=&start=&end=&limit=&cursor=
+                                      journaled decisions, oldest first, paginated
+
+Everything is served from memory. StateStore.publish is called once per
+strategy cycle and pre-encodes every snapshot resource together with its
+ETag, so a request is a dictionary lookup and a socket write. No request ever
+reaches an upstream API. History pages are built from the in-memory journal
+and cached until new decisions are published. Clients that send
+If-None-Match with the current ETag get a 304 without a body.
+
+The server runs an asyncio event loop in a daemon thread, so the synchronous
+bot only calls start_api_server() and ApiServer.stop(). HTTP/1.1 keep-alive
+is supported so dashboards can poll over one connection.
+"""
+import asyncio
+import bisect
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Any, Iterable, Tuple
+from urllib.parse import urlsplit, parse_qs, unquote
+
+from .. import config
+from ..data.journal import DecisionJournal, decision_records
+from . import metrics
+
+# Decision fields returned by /api/coins/{coin_id}/indicators
+INDICATOR_FIELDS = ("latest_price", "sma_20", "rsi_14", "bollinger_bands", "macd", "indicators", "volatility",
+                    "open_interest", "funding_rate", "order_book_summary", "market_regime")
+SUMMARY_FIELDS = ("coin_id", "symbol", "name", "signal", "latest_price", "market_regime")
+_HISTORY_CACHE_SIZE = 256
+_REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+
+
+def json_safe(value: Any) -> Any:
+    """Converts decision data to plain JSON types (NaN/inf become null, NumPy scalars become numbers)."""
+    if value is None or isinstance(value, (str, bool, int)):
+        return value
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {str(k): json_safe(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(v) for v in value]
+    if hasattr(value, "item"):  # NumPy scalar
+        return json_safe(value.item())
+    return str(value)
+
+
+def _encode(payload: Any) -> Tuple[bytes, str]:
+    body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return body, f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+class StateStore:
+    """
+    Latest strategy outputs and the decision history, ready to serve.
+
+    Args:
+        journal: DecisionJournal whose existing records seed the history.
+                 Pass None to start with an empty history.
+    """
+
+    def __init__(self, journal: DecisionJournal | None = None):
+        self._lock = threading.Lock()
+        self._resources: Dict[str, Tuple[bytes, str]] = {}
+        self.published_at: float | None = None
+        self._history: List[Dict[str, Any]] = []  # Sorted by ts
+        self._history_ts: List[int] = []
+        self._coin_history: Dict[str, Tuple[List[Dict[str, Any]], List[int]]] = {}
+        self._history_cache: "OrderedDict[tuple, Tuple[bytes, str]]" = OrderedDict()
+        if journal is not None:
+            records = journal.read_records()
+            records.sort(key=lambda record: record.get("ts", 0))
+            self._append_history(records)
+        self._publish_resources([])
+
+    def _append_history(self, records: Iterable[Dict[str, Any]]) -> None:
+        for record in records:
+            if not isinstance(record.get("ts"), int) or not record.get("coin_id"):
+                continue
+            if self._history_ts and record["ts"] < self._history_ts[-1]:
+                continue  # History is append-only in time; late records would break the cursors
+            self._history.append(record)
+            self._history_ts.append(record["ts"])
+            coin_records, coin_ts = self._coin_history.setdefault(record["coin_id"], ([], []))
+            coin_records.append(record)
+            coin_ts.append(record["ts"])
+
+    def _publish_resources(self, outputs: List[Dict[str, Any]]) -> None:
+        resources = {
+            "/api/coins": _encode([{field: output.get(field) for field in SUMMARY_FIELDS} for output in outputs]),
+            "/api/signals": _encode({output["coin_id"]: output.get("signal") for output in outputs}),
+        }
+        for output in outputs:
+            coin_path = f"/api/coins/{output['coin_id']}"
+            resources[coin_path] = _encode(output)
+            resources[f"{coin_path}/indicators"] = _encode(
+                {"coin_id": output["coin_id"], **{field: output.get(field) for field in INDICATOR_FIELDS}})
+        self._resources = resources  # Swapped in one assignment; readers never see a partial cycle
+
+    def publish(self, strategy_outputs: Iterable[Dict[str, Any]], timestamp_ms: int | None = None) -> None:
+        """
+        Replaces the served snapshot with a new cycle's outputs and appends them to the history.
+
+        Args:
+            strategy_outputs: run_trading_strategy results.
+            timestamp_ms: Cycle time in epoch ms. Defaults to now.
+        """
+        timestamp_ms = int(time.time() * 1000) if timestamp_ms is None else int(timestamp_ms)
+        outputs = [json_safe(output) for output in strategy_outputs
+                   if isinstance(output, dict) and output.get("coin_id")]
+        with self._lock:
+            self._publish_resources(outputs)
+            self._append_history(decision_records(outputs, timestamp_ms))
+            self._history_cache.clear()
+            self.published_at = timestamp_ms / 1000
+
+    def resource(self, path: str) -> Tuple[bytes, str] | None:
+        """Pre-encoded (body, ETag) for a snapshot path, or None if unknown."""
+        return self._resources.get(path)
+
+    def history_page(self, coin_id: str | None = None, start: int | None = None, end: int | None = None,
+                     limit: int | None = None, cursor: int | None = None) -> Tuple[bytes, str]:
+        """
+        One page of journaled decisions, oldest first.
+
+        Args:
+            coin_id: Only this coin's decisions (all coins if None).
+            start: Earliest ts (epoch ms, inclusive).
+            end: Latest ts (epoch ms, exclusive).
+            limit: Page size, capped at config.API_HISTORY_MAX_PAGE_SIZE.
+            cursor: next_cursor from the previous page.
+
+        Returns:
+            (body, ETag) for {"items": [...], "next_cursor": int or null}.
+        """
+        limit = min(max(int(limit or config.API_HISTORY_PAGE_SIZE), 1), config.API_HISTORY_MAX_PAGE_SIZE)
+        with self._lock:
+            key = (coin_id, start, end, limit, cursor)
+            cached = self._history_cache.get(key)
+            if cached is not None:
+                self._history_cache.move_to_end(key)
+                return cached
+            if coin_id is None:
+                records, timestamps = self._history, self._history_ts
+            else:
+                records, timestamps = self._coin_history.get(coin_id, ([], []))
+            lo = 0 if start is None else bisect.bisect_left(timestamps, start)
+            hi = len(timestamps) if end is None else bisect.bisect_left(timestamps, end)
+            # The cursor is a position in the append-only list, so pages stay stable while history grows
+            first = max(lo, cursor or 0)
+            last = min(first + limit, hi)
+            page = _encode({"items": records[first:last] if first < last else [],
+                            "next_cursor": last if last < hi else None})
+            self._history_cache[key] = page
+            if len(self._history_cache) > _HISTORY_CACHE_SIZE:
+                self._history_cache.popitem(last=False)
+            return page
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+
+def _int_param(params: Dict[str, List[str]], name: str) -> int | None:
+    values = params.get(name)
+    if not values or values[0] == "":
+        return None
+    return int(values[0])  # ValueError becomes a 400
+
+
+class ApiServer:
+    """
+    asyncio HTTP server for a StateStore, running in a daemon thread.
+
+    Args:
+        store: StateStore to serve.
+        host: Interface to bind. Defaults to localhost only.
+        port: Port to bind; 0 picks a free port (see .port after start()).
+    """
+
+    def __init__(self, store: StateStore, host: str = "127.0.0.1", port: int = 0):
+        self.store = store
+        self.host = host
+        self.port = port
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._server: asyncio.AbstractServer | None = None
+        self._thread: threading.Thread | None = None
+
+    def route(self, target: str) -> Tuple[int, bytes, str | None]:
+        """Resolves a request target to (status, body, ETag)."""
+        url = urlsplit(target)
+        path = unquote(url.path).rstrip("/") or "/"
+        if path == "/healthz":
+            return (200, *_encode({"status": "ok", "published_at": self.store.published_at}))
+        if path == "/api/history":
+            params = parse_qs(url.query)
+            try:
+                body, etag = self.store.history_page(
+                    coin_id=(params.get("coin_id") or [None])[0], start=_int_param(params, "start"),
+                    end=_int_param(params, "end"), limit=_int_param(params, "limit"),
+                    cursor=_int_param(params, "cursor"))
+            except ValueError:
+                return 400, b'{"error":"start, end, limit and cursor must be integers"}', None
+            return 200, body, etag
+        resource = self.store.resource(path)
+        if resource is None:
+            return 404, b'{"error":"not found"}', None
+        return (200, *resource)
+
+    @staticmethod
+    def _response(status: int, body: bytes, etag: str | None, keep_alive: bool, head: bool) -> bytes:
+        headers = [f"HTTP/1.1 {status} {_REASONS[status]}", "Content-Type: application/json",
+                   f"Content-Length: {0 if status == 304 else len(body)}", "Cache-Control: no-cache"]
+        if etag:
+            headers.append(f"ETag: {etag}")
+        headers.append("Connection: keep-alive" if keep_alive else "Connection: close")
+        head_bytes = ("\r\n".join(headers) + "\r\n\r\n").encode("latin-1")
+        return head_bytes if head or status == 304 else head_bytes + body
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                lines = request.decode("latin-1").split("\r\n")
+                parts = lines[0].split(" ")
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                if len(parts) != 3:
+                    writer.write(self._response(400, b'{"error":"bad request"}', None, False, False))
+                    break
+                method, target, version = parts
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+                if method not in ("GET", "HEAD"):
+                    status, body, etag = 405, b'{"error":"method not allowed"}', None
+                else:
+                    status, body, etag = self.route(target)
+                    if status == 200 and etag and _etag_matches(headers.get("if-none-match"), etag):
+                        status = 304
+                metrics.increment("api_requests_total", status=str(status))
+                writer.write(self._response(status, body, etag, keep_alive, method == "HEAD"))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    def start(self) -> "ApiServer":
+        """Binds the port and starts serving in a daemon thread; returns self."""
+        started = threading.Event()
+        errors = []
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            try:
+                self._server = self._loop.run_until_complete(
+                    asyncio.start_server(self._handle, self.host, self.port, backlog=1024))
+            except OSError as e:
+                errors.append(e)
+                started.set()
+                return
+            self.port = self._server.sockets[0].getsockname()[1]
+            started.set()
+            self._loop.run_forever()
+            self._server.close()
+            self._loop.run_until_complete(self._server.wait_closed())
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="api-http", daemon=True)
+        self._thread.start()
+        started.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    def stop(self) -> None:
+        """Stops the server and its thread."""
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+def start_api_server(store: StateStore, port: int | None = None, host: str = "127.0.0.1") -> ApiServer:
+    """
+    Serves a StateStore over HTTP from a daemon thread.
+
+    Args:
+        store: StateStore the bot publishes each cycle's outputs to.
+        port: Port to bind. Defaults to config.API_HTTP_PORT; 0 picks a free port.
+        host: Interface to bind. Defaults to localhost only.
+
+    Returns:
+        The running ApiServer; call .stop() to stop it.
+    """
+    return ApiServer(store, host, config.API_HTTP_PORT if port is None else port).start()
+
+
+if __name__ == '__main__':
+    import urllib.request
+
+    store = StateStore(journal=None)
+    store.publish([{"coin_id": "bitcoin", "symbol": "BTC", "name": "Bitcoin", "signal": "CONSIDER_BUY",
+                    "latest_price": 60000.0, "rsi_14": 41.2, "indicators": {"atr_14": 850.0, "adx_14": float("nan")},
+                    "decision_factors": ["MACD line crossed above signal line"]}])
+    server = start_api_server(store, port=0)
+    base = f"http://127.0.0.1:{server.port}"
+    for path in ("/api/coins", "/api/coins/bitcoin/indicators", "/api/history?coin_id=bitcoin&limit=10"):
+        with urllib.request.urlopen(base + path) as response:
+            print(path, response.headers["ETag"], response.read().decode("utf-8"))
+
+    n_requests = 2000
+    start = time.perf_counter()
+    for _ in range(n_requests):
+        with urllib.request.urlopen(base + "/api/signals") as response:
+            response.read()
+    print(f"{n_requests / (time.perf_counter() - start):.0f} requests/s (one connection per request)")
+    server.stop()
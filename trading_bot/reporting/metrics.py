@@ -0,0 +1,298 @@
+"""
+Lightweight tracing and metrics for the trading bot.
+
+Spans time a block of work (an API call, an indicator, a sentiment call) and
+record its latency in a histogram; counters track errors and fallbacks.
+Everything is kept in process memory and can be exported as Prometheus text
+(optionally served over a local HTTP endpoint) or as a JSON file.
+
+When metrics are disabled (the default, see config.METRICS_ENABLED) every
+call returns immediately, so the instrumentation can stay in hot paths.
+"""
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Tuple
+
+from trading_bot import config
+
+METRIC_PREFIX = "trading_bot_"
+SPAN_METRIC = "span_duration_seconds"
+SPAN_ERROR_METRIC = "span_errors_total"
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implicit.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_enabled = bool(getattr(config, "METRICS_ENABLED", False))
+_lock = threading.Lock()
+_counters: Dict[Tuple[str, Tuple], float] = {}
+_histograms: Dict[Tuple[str, Tuple], list] = {}  # key -> [bucket_counts, sum, count]
+_recent_spans: deque = deque(maxlen=getattr(config, "METRICS_RECENT_SPANS", 500))
+
+
+def enable(flag: bool = True) -> None:
+    """Turns metric collection on or off at runtime."""
+    global _enabled
+    _enabled = bool(flag)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def reset() -> None:
+    """Clears all recorded counters, histograms and spans."""
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+        _recent_spans.clear()
+
+
+def _label_key(labels: Dict[str, Any]) -> Tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items())) if labels else ()
+
+
+def increment(name: str, value: float = 1, **labels) -> None:
+    """
+    Increments a counter.
+
+    Args:
+        name: Counter name without prefix (e.g. "api_errors_total").
+        value: Amount to add. Defaults to 1.
+        **labels: Label values, e.g. endpoint="coins/markets".
+    """
+    if not _enabled:
+        return
+    key = (name, _label_key(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name: str, value: float, **labels) -> None:
+    """
+    Records a value (typically a latency in seconds) in a histogram.
+
+    Args:
+        name: Histogram name without prefix.
+        value: Observed value.
+        **labels: Label values.
+    """
+    if not _enabled:
+        return
+    _observe(name, value, _label_key(labels))
+
+
+def _observe(name: str, value: float, label_key: Tuple) -> None:
+    key = (name, label_key)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = [[0] * len(LATENCY_BUCKETS), 0.0, 0]
+            _histograms[key] = hist
+        buckets = hist[0]
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if value <= bound:
+                buckets[i] += 1
+                break
+        hist[1] += value
+        hist[2] += 1
+
+
+class _Span:
+    """Times a block and records it in the span histogram on exit."""
+
+    __slots__ = ("name", "labels", "start")
+
+    def __init__(self, name: str, labels: Dict[str, Any]):
+        self.name = name
+        self.labels = labels
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration = time.perf_counter() - self.start
+        label_key = _label_key(dict(self.labels, span=self.name))
+        _observe(SPAN_METRIC, duration, label_key)
+        if exc_type is not None:
+            with _lock:
+                key = (SPAN_ERROR_METRIC, label_key)
+                _counters[key] = _counters.get(key, 0) + 1
+        _recent_spans.append({
+            "name": self.name,
+            "labels": dict(self.labels),
+            "start": time.time() - duration,
+            "duration": duration,
+            "error": exc_type.__name__ if exc_type is not None else None,
+        })
+        return False  # Never swallow exceptions
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name: str, **labels):
+    """
+    Context manager timing a stage of the pipeline.
+
+    Usage:
+        with metrics.span("coingecko.get_historical_ohlc", coin="bitcoin"):
+            ...
+
+    Returns a shared no-op object when metrics are disabled.
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, labels)
+
+
+def snapshot() -> Dict[str, Any]:
+    """
+    Returns a JSON-serializable copy of all recorded metrics.
+
+    Returns:
+        A dictionary with 'counters', 'histograms' and 'recent_spans' lists.
+    """
+    with _lock:
+        counters = [
+            {"name": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in _counters.items()
+        ]
+        histograms = [
+            {
+                "name": name,
+                "labels": dict(labels),
+                "buckets": dict(zip([str(b) for b in LATENCY_BUCKETS], hist[0])),
+                "sum": hist[1],
+                "count": hist[2],
+            }
+            for (name, labels), hist in _histograms.items()
+        ]
+        spans = list(_recent_spans)
+    return {"timestamp": time.time(), "counters": counters, "histograms": histograms, "recent_spans": spans}
+
+
+def write_json(path: str | None = None) -> str:
+    """
+    Writes the current metrics snapshot to a JSON file.
+
+    Args:
+        path: Output file path. Defaults to config.METRICS_EXPORT_PATH.
+
+    Returns:
+        The path that was written.
+    """
+    path = path or getattr(config, "METRICS_EXPORT_PATH", "metrics.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(snapshot(), f, indent=2)
+    return path
+
+
+def _format_labels(labels: Tuple, extra: Tuple = ()) -> str:
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    escaped = []
+    for k, v in items:
+        v = v.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        escaped.append(f'{k}="{v}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+def render_prometheus() -> str:
+    """
+    Renders all metrics in the Prometheus text exposition format.
+
+    Returns:
+        The exposition text, ending with a newline.
+    """
+    lines = []
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = sorted((k, [list(v[0]), v[1], v[2]]) for k, v in _histograms.items())
+
+    seen_types = set()
+    for (name, labels), value in counters:
+        metric = METRIC_PREFIX + name
+        if metric not in seen_types:
+            lines.append(f"# TYPE {metric} counter")
+            seen_types.add(metric)
+        lines.append(f"{metric}{_format_labels(labels)} {value}")
+
+    for (name, labels), (buckets, total, count) in histograms:
+        metric = METRIC_PREFIX + name
+        if metric not in seen_types:
+            lines.append(f"# TYPE {metric} histogram")
+            seen_types.add(metric)
+        cumulative = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS, buckets):
+            cumulative += bucket_count
+            lines.append(f"{metric}_bucket{_format_labels(labels, (('le', str(bound)),))} {cumulative}")
+        lines.append(f"{metric}_bucket{_format_labels(labels, (('le', '+Inf'),))} {count}")
+        lines.append(f"{metric}_sum{_format_labels(labels)} {total}")
+        lines.append(f"{metric}_count{_format_labels(labels)} {count}")
+
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/metrics.json"):
+            body = json.dumps(snapshot()).encode("utf-8")
+            content_type = "application/json"
+        elif self.path.startswith("/metrics"):
+            body = render_prometheus().encode("utf-8")
+            content_type = "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # Keep the bot's stdout clean
+        pass
+
+
+def start_http_server(port: int | None = None, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serves /metrics (Prometheus text) and /metrics.json from a daemon thread.
+
+    Args:
+        port: Port to bind. Defaults to config.METRICS_HTTP_PORT; 0 picks a free port.
+        host: Interface to bind. Defaults to localhost only.
+
+    Returns:
+        The running server; call .shutdown() to stop it.
+    """
+    if port is None:
+        port = getattr(config, "METRICS_HTTP_PORT", 9108)
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True)
+    thread.start()
+    return server
+
+
+if __name__ == '__main__':
+    enable()
+    with span("example.stage", coin="bitcoin"):
+        time.sleep(0.01)
+    increment("api_errors_total", endpoint="coins/markets")
+    increment("sentiment_fallbacks_total", reason="api_error")
+    print(render_prometheus())
@@ -0,0 +1,232 @@
+"""
+Async delivery of Telegram reports.
+
+Messages are sent over a pooled HTTP session (requests.Session with a sized
+connection pool) from worker threads, so many chats can be served concurrently
+from one asyncio event loop. Sends are rate limited globally and per chat, and
+transient failures (network errors, 5xx, 429 with retry_after) are retried with
+exponential backoff.
+"""
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from trading_bot import config
+from trading_bot.reporting import metrics
+from trading_bot.reporting.telegram_reporter import split_telegram_report
+
+
+class _RateLimiter:
+    """Spaces out acquisitions so that at most one happens every `interval` seconds."""
+
+    def __init__(self, interval: float):
+        self.interval = max(0.0, interval)
+        self._next_allowed = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.interval <= 0:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_allowed - now
+            if wait > 0:
+                await asyncio.sleep(wait)
+                now = time.monotonic()
+            self._next_allowed = now + self.interval
+
+
+class TelegramClient:
+    """
+    Sends messages through the Telegram Bot API.
+
+    Args:
+        bot_token: The bot token. Defaults to config.TELEGRAM_BOT_TOKEN.
+        api_url: Base URL of the Bot API. Tests point this at a local stub.
+        max_concurrency: Maximum in-flight HTTP requests (also the pool size).
+        messages_per_second: Global send rate; 0 disables the global limit.
+        per_chat_interval: Minimum seconds between messages to one chat.
+        max_retries: Retries for transient failures before giving up.
+        backoff: Base delay in seconds for exponential backoff.
+        timeout: Per-request timeout in seconds.
+    """
+
+    def __init__(self, bot_token: str | None = None, api_url: str | None = None,
+                 max_concurrency: int = 4,
+                 messages_per_second: float | None = None,
+                 per_chat_interval: float | None = None,
+                 max_retries: int | None = None,
+                 backoff: float = 0.5, timeout: float = 10):
+        self.bot_token = bot_token or config.TELEGRAM_BOT_TOKEN
+        self.api_url = (api_url or config.TELEGRAM_API_URL).rstrip("/")
+        self.max_retries = config.TELEGRAM_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = backoff
+        self.timeout = timeout
+
+        if messages_per_second is None:
+            messages_per_second = config.TELEGRAM_MAX_MESSAGES_PER_SECOND
+        self._per_chat_interval = (config.TELEGRAM_PER_CHAT_INTERVAL
+                                   if per_chat_interval is None else per_chat_interval)
+        self._global_limiter = _RateLimiter(1.0 / messages_per_second if messages_per_second else 0)
+        self._chat_limiters: Dict[str, _RateLimiter] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+
+    def close(self) -> None:
+        """Closes the pooled HTTP session."""
+        self._session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _chat_limiter(self, chat_id: str) -> _RateLimiter:
+        limiter = self._chat_limiters.get(chat_id)
+        if limiter is None:
+            limiter = _RateLimiter(self._per_chat_interval)
+            self._chat_limiters[chat_id] = limiter
+        return limiter
+
+    def _post(self, method: str, payload: Dict[str, Any]) -> requests.Response:
+        url = f"{self.api_url}/bot{self.bot_token}/{method}"
+        return self._session.post(url, json=payload, timeout=self.timeout)
+
+    async def send_message(self, chat_id: str, text: str, parse_mode: str = "HTML") -> Optional[Dict[str, Any]]:
+        """
+        Sends one message, retrying transient failures.
+
+        Args:
+            chat_id: Target chat.
+            text: Message text (must already fit the size limit).
+            parse_mode: Telegram parse mode. Defaults to "HTML".
+
+        Returns:
+            The Bot API 'result' dictionary, or None if the message could not be sent.
+        """
+        chat_id = str(chat_id)
+        payload = {"chat_id": chat_id, "text": text, "parse_mode": parse_mode,
+                   "disable_web_page_preview": True}
+
+        for attempt in range(self.max_retries + 1):
+            await self._chat_limiter(chat_id).acquire()
+            await self._global_limiter.acquire()
+
+            retry_delay = self.backoff * (2 ** attempt)
+            try:
+                async with self._semaphore:
+                    with metrics.span("telegram.send_message"):
+                        response = await asyncio.to_thread(self._post, "sendMessage", payload)
+            except requests.exceptions.RequestException as e:
+                print(f"Error sending Telegram message to {chat_id}: {e}")
+                metrics.increment("telegram_send_errors_total", kind="request")
+            else:
+                try:
+                    body = response.json()
+                except ValueError:
+                    body = {}
+
+                if response.status_code == 200 and body.get("ok"):
+                    metrics.increment("telegram_messages_sent_total")
+                    return body.get("result")
+
+                description = body.get("description", response.text[:200] if response.text else "")
+                if response.status_code == 429:
+                    retry_after = (body.get("parameters") or {}).get("retry_after")
+                    if retry_after is not None:
+                        retry_delay = float(retry_after)
+                    print(f"Telegram rate limit hit for chat {chat_id}, retrying in {retry_delay}s.")
+                    metrics.increment("telegram_send_errors_total", kind="rate_limited")
+                elif response.status_code >= 500:
+                    print(f"Telegram server error {response.status_code} for chat {chat_id}: {description}")
+                    metrics.increment("telegram_send_errors_total", kind="server")
+                else:
+                    # Client errors (bad token, chat not found, malformed HTML) will not succeed on retry
+                    print(f"Error: Telegram rejected message to {chat_id} ({response.status_code}): {description}")
+                    metrics.increment("telegram_send_errors_total", kind="client")
+                    return None
+
+            if attempt < self.max_retries:
+                await asyncio.sleep(retry_delay)
+
+        print(f"Error: Giving up on Telegram message to {chat_id} after {self.max_retries + 1} attempts.")
+        return None
+
+    async def send_messages(self, chat_id: str, messages: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """Sends messages to one chat in order (Telegram does not reorder for us)."""
+        results = []
+        for text in messages:
+            results.append(await self.send_message(chat_id, text))
+        return results
+
+    async def broadcast(self, chat_ids: List[str], messages: List[str]) -> Dict[str, List[Optional[Dict[str, Any]]]]:
+        """
+        Sends the same ordered messages to several chats concurrently.
+
+        Returns:
+            A dictionary mapping each chat id to its list of send results.
+        """
+        results = await asyncio.gather(*(self.send_messages(chat_id, messages) for chat_id in chat_ids))
+        return dict(zip([str(c) for c in chat_ids], results))
+
+
+async def send_telegram_report_async(decision_data_list: List[Dict[str, Any]],
+                                     chat_ids: List[str] | None = None,
+                                     client: TelegramClient | None = None,
+                                     delta_reporter=None) -> Dict[str, List[Optional[Dict[str, Any]]]]:
+    """
+    Formats the strategy output, splits it within the size limit and sends it.
+
+    Args:
+        decision_data_list: A list of coin_decision_data dictionaries.
+        chat_ids: Target chats. Defaults to [config.TELEGRAM_CHAT_ID].
+        client: An existing TelegramClient; a temporary one is created otherwise.
+        delta_reporter: A DeltaReporter; if given, only its update (or periodic
+                        summary) messages are sent instead of the full report,
+                        and they are committed as sent only if every message
+                        reached every chat.
+
+    Returns:
+        A dictionary mapping each chat id to its list of send results; empty
+        if the delta reporter found nothing to send.
+    """
+    chat_ids = chat_ids or [config.TELEGRAM_CHAT_ID]
+    if delta_reporter is not None:
+        messages = delta_reporter.build_messages(decision_data_list)
+        if not messages:
+            delta_reporter.commit(decision_data_list)
+            return {}
+    else:
+        messages = split_telegram_report(decision_data_list)
+
+    if client is not None:
+        results = await client.broadcast(chat_ids, messages)
+    else:
+        async with TelegramClient() as owned_client:
+            results = await owned_client.broadcast(chat_ids, messages)
+    if delta_reporter is not None:
+        if all(result is not None for chat_results in results.values() for result in chat_results):
+            delta_reporter.commit(decision_data_list)
+        else:
+            print("Some Telegram updates were not delivered; they will be reported again next cycle.")
+    return results
+
+
+def send_telegram_report(decision_data_list: List[Dict[str, Any]], chat_ids: List[str] | None = None,
+                         delta_reporter=None) -> Dict[str, List[Optional[Dict[str, Any]]]]:
+    """Synchronous wrapper around send_telegram_report_async for scripts."""
+    if not config.TELEGRAM_BOT_TOKEN or config.TELEGRAM_BOT_TOKEN == "YOUR_TELEGRAM_BOT_TOKEN_FALLBACK":
+        print("Error: Telegram bot token not configured or is using placeholder.")
+        return {}
+    if not (chat_ids or config.TELEGRAM_CHAT_ID):
+        print("Error: No Telegram chat id configured.")
+        return {}
+    return asyncio.run(send_telegram_report_async(decision_data_list, chat_ids, delta_reporter=delta_reporter))
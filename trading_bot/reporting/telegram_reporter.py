@@ -1,5 +1,11 @@
+import re
 from typing import List, Dict, Any
-import pandas as pd # For pd.isna checks, though data should be primitive by now
+from trading_bot import config
+from trading_bot.lazy_imports import lazy_import
+
+pd = lazy_import("pandas") # For pd.isna checks, though data should be primitive by now
+
+TELEGRAM_MAX_MESSAGE_LENGTH = config.TELEGRAM_MAX_MESSAGE_LENGTH
 
 def _format_value(value, precision: int = 2, default_na: str = "N/A"):
     """Helper to format numeric values or return N/A."""
@@ -9,6 +15,124 @@ def _format_value(value, precision: int = 2, default_na: str = "N/A"):
         return f"{value:.{precision}f}"
     return str(value)
 
+REPORT_HEADER = "<b>Trading Report</b>\n"
+CONTINUATION_HEADER = "<b>Trading Report (cont.)</b>\n"
+EMPTY_REPORT = "<b>Trading Report</b>\n\nNo data to report."
+
+# Static placeholder sections, built once instead of per coin.
+_LONG_TERM_SPOT_PLACEHOLDER = (
+    "  <b>Long-term:</b>\n"
+    "    Action: N/A\n"
+    "    Entry Price: N/A\n"
+    "    Stop Loss: N/A\n"
+    "    Take Profit: N/A\n"
+    "    Rationale: N/A\n"
+)
+_LEVERAGED_PLACEHOLDER = (
+    "<b>Leveraged Recommendations:</b>\n"
+    "  <b>Short-term:</b>\n"
+    "    Position: N/A\n"
+    "    Leverage: N/A\n"
+    "    Entry Price: N/A\n"
+    "    Stop Loss: N/A\n"
+    "    Take Profit: N/A\n"
+    "    Rationale: N/A\n"
+    "  <b>Long-term:</b>\n"
+    "    Position: N/A\n"
+    "    Leverage: N/A\n"
+    "    Entry Price: N/A\n"
+    "    Stop Loss: N/A\n"
+    "    Take Profit: N/A\n"
+    "    Rationale: N/A\n"
+)
+
+
+def format_coin_section(position: int, data: Dict[str, Any], include_placeholders: bool = True) -> str:
+    """
+    Formats the report section for a single coin.
+
+    Args:
+        position: 1-based position of the coin in the report.
+        data: A coin_decision_data dictionary.
+        include_placeholders: Whether to append the long-term and leveraged
+                              recommendation blocks (all N/A for now).
+
+    Returns:
+        The section text, starting with a blank line and ending with a newline.
+    """
+    coin_name = data.get('name', 'Unknown Coin')
+    coin_symbol = data.get('symbol', 'N/A').upper()
+
+    lines = [
+        f"\n<b>{position}. {coin_name} ({coin_symbol})</b>",
+        # --- Spot Recommendations ---
+        "<b>Spot Recommendations:</b>",
+        # Short-term Spot
+        "  <b>Short-term:</b>",
+        f"    Action: {_format_value(data.get('signal', 'N/A'))}",
+        f"    Entry Price: {_format_value(data.get('latest_price'))}",
+        f"    Stop Loss: {_format_value(data.get('stop_loss'))}",
+        f"    Take Profit: {_format_value(data.get('take_profit'))}",
+    ]
+    if data.get('position_size') is not None:
+        lines.append(f"    Position Size: {_format_value(data.get('position_size'), precision=6)} "
+                     f"(~{_format_value(data.get('position_notional'))} {config.QUOTE_ASSET})")
+    lines.append("    Rationale:")
+
+    # Rationale - Primary Price Action Signals
+    primary_signals = []
+    rsi_14 = data.get('rsi_14')
+    if rsi_14 is not None and not pd.isna(rsi_14):
+        primary_signals.append(f"RSI (14) at {_format_value(rsi_14)}")
+
+    bbands = data.get('bollinger_bands')
+    if bbands and isinstance(bbands, dict):
+        bb_middle = bbands.get('middle')
+        # Could add more BB related signals here if logic existed
+        if bb_middle is not None and not pd.isna(bb_middle):
+             primary_signals.append(f"BB Middle (SMA 20) at {_format_value(bb_middle)}")
+
+    if not primary_signals:
+        primary_signals.append("N/A")
+    lines.append(f"      Primary Price Action Signals: {', '.join(primary_signals)}")
+
+    # Rationale - Lagging Indicator Confirmation
+    lagging_signals = []
+    macd = data.get('macd')
+    if macd and isinstance(macd, dict):
+        macd_line = macd.get('line')
+        signal_line = macd.get('signal')
+        hist = macd.get('histogram')
+        macd_parts = []
+        if macd_line is not None and not pd.isna(macd_line): macd_parts.append(f"MACD Line: {_format_value(macd_line)}")
+        if signal_line is not None and not pd.isna(signal_line): macd_parts.append(f"Signal: {_format_value(signal_line)}")
+        if hist is not None and not pd.isna(hist): macd_parts.append(f"Hist: {_format_value(hist)}")
+        if macd_parts: lagging_signals.append(', '.join(macd_parts))
+
+    # SMA (20) is already reported as the BB middle band above.
+
+    if not lagging_signals:
+        lagging_signals.append("N/A")
+    lines.append(f"      Lagging Indicator Confirmation: {', '.join(lagging_signals)}")
+
+    # Rationale - Sentiment & Macro Analysis
+    agg_sentiment = _format_value(data.get('aggregated_sentiment', 'N/A'))
+    sentiment_score = _format_value(data.get('sentiment_score', 'N/A'), precision=2)
+    articles_analyzed = _format_value(data.get('news_articles_analyzed', 0), precision=0)
+    lines.append(f"      Sentiment & Macro Analysis: Aggregated news sentiment: {agg_sentiment} (Score: {sentiment_score}, Articles: {articles_analyzed})")
+
+    # Decision Factors from strategy
+    decision_factors = data.get('decision_factors', [])
+    if decision_factors:
+        lines.append(f"      Key Decision Factors: {', '.join(decision_factors)}")
+
+    lines.append("")  # Trailing newline for the short-term block
+    if not include_placeholders:
+        return "\n".join(lines)
+    # Long-term Spot and Leveraged Recommendations (Placeholders)
+    return "\n".join(lines) + _LONG_TERM_SPOT_PLACEHOLDER + _LEVERAGED_PLACEHOLDER
+
+
 def format_telegram_report(decision_data_list: List[Dict[str, Any]]) -> str:
     """
     Formats the decision data for multiple coins into a single Telegram report string.
@@ -20,104 +144,154 @@ def format_telegram_report(decision_data_list: List[Dict[str, Any]]) -> str:
         A single string formatted for Telegram with HTML-like tags.
     """
     if not decision_data_list:
-        return "<b>Trading Report</b>\n\nNo data to report."
+        return EMPTY_REPORT
 
-    full_report_parts = ["<b>Trading Report</b>\n"]
+    full_report_parts = [REPORT_HEADER]
+    full_report_parts.extend(format_coin_section(i + 1, data) for i, data in enumerate(decision_data_list))
+    return "\n".join(full_report_parts)
 
-    for i, data in enumerate(decision_data_list):
-        coin_name = data.get('name', 'Unknown Coin')
-        coin_symbol = data.get('symbol', 'N/A').upper()
 
-        report_part = f"\n<b>{i+1}. {coin_name} ({coin_symbol})</b>\n"
+def split_telegram_report(decision_data_list: List[Dict[str, Any]],
+                          max_length: int = TELEGRAM_MAX_MESSAGE_LENGTH) -> List[str]:
+    """
+    Formats the report as one or more messages that each fit Telegram's size limit.
 
-        # --- Spot Recommendations ---
-        report_part += "<b>Spot Recommendations:</b>\n"
-        # Short-term Spot
-        report_part += "  <b>Short-term:</b>\n"
-        report_part += f"    Action: {_format_value(data.get('signal', 'N/A'))}\n"
-        report_part += f"    Entry Price: {_format_value(data.get('latest_price'))}\n"
-        report_part += f"    Stop Loss: N/A\n"  # Placeholder
-        report_part += f"    Take Profit: N/A\n" # Placeholder
-        report_part += "    Rationale:\n"
-
-        # Rationale - Primary Price Action Signals
-        primary_signals = []
-        rsi_14 = data.get('rsi_14')
-        if rsi_14 is not None and not pd.isna(rsi_14):
-            primary_signals.append(f"RSI (14) at {_format_value(rsi_14)}")
-
-        bbands = data.get('bollinger_bands')
-        if bbands and isinstance(bbands, dict):
-            bb_middle = bbands.get('middle')
-            # Could add more BB related signals here if logic existed
-            if bb_middle is not None and not pd.isna(bb_middle):
-                 primary_signals.append(f"BB Middle (SMA 20) at {_format_value(bb_middle)}")
-
-        if not primary_signals:
-            primary_signals.append("N/A")
-        report_part += f"      Primary Price Action Signals: {', '.join(primary_signals)}\n"
-
-        # Rationale - Lagging Indicator Confirmation
-        lagging_signals = []
-        macd = data.get('macd')
-        if macd and isinstance(macd, dict):
-            macd_line = macd.get('line')
-            signal_line = macd.get('signal')
-            hist = macd.get('histogram')
-            macd_parts = []
-            if macd_line is not None and not pd.isna(macd_line): macd_parts.append(f"MACD Line: {_format_value(macd_line)}")
-            if signal_line is not None and not pd.isna(signal_line): macd_parts.append(f"Signal: {_format_value(signal_line)}")
-            if hist is not None and not pd.isna(hist): macd_parts.append(f"Hist: {_format_value(hist)}")
-            if macd_parts: lagging_signals.append(', '.join(macd_parts))
-
-        sma_20 = data.get('sma_20') # This was also BB Middle
-        # if sma_20 is not None and not pd.isna(sma_20) and not any("SMA 20" in s for s in primary_signals): # Avoid duplicate if BB middle used
-        #     lagging_signals.append(f"SMA (20) at {_format_value(sma_20)}")
-
-        if not lagging_signals:
-            lagging_signals.append("N/A")
-        report_part += f"      Lagging Indicator Confirmation: {', '.join(lagging_signals)}\n"
-
-        # Rationale - Sentiment & Macro Analysis
-        agg_sentiment = _format_value(data.get('aggregated_sentiment', 'N/A'))
-        sentiment_score = _format_value(data.get('sentiment_score', 'N/A'), precision=0)
-        articles_analyzed = _format_value(data.get('news_articles_analyzed', 0), precision=0)
-        report_part += f"      Sentiment & Macro Analysis: Aggregated news sentiment: {agg_sentiment} (Score: {sentiment_score}, Articles: {articles_analyzed})\n"
-
-        # Decision Factors from strategy
-        decision_factors = data.get('decision_factors', [])
-        if decision_factors:
-             report_part += f"      Key Decision Factors: {', '.join(decision_factors)}\n"
-
-
-        # Long-term Spot (Placeholder)
-        report_part += "  <b>Long-term:</b>\n"
-        report_part += "    Action: N/A\n"
-        report_part += "    Entry Price: N/A\n"
-        report_part += "    Stop Loss: N/A\n"
-        report_part += "    Take Profit: N/A\n"
-        report_part += "    Rationale: N/A\n"
-
-        # --- Leveraged Recommendations (Placeholders) ---
-        report_part += "<b>Leveraged Recommendations:</b>\n"
-        report_part += "  <b>Short-term:</b>\n"
-        report_part += "    Position: N/A\n"
-        report_part += "    Leverage: N/A\n"
-        report_part += "    Entry Price: N/A\n"
-        report_part += "    Stop Loss: N/A\n"
-        report_part += "    Take Profit: N/A\n"
-        report_part += "    Rationale: N/A\n"
-        report_part += "  <b>Long-term:</b>\n"
-        report_part += "    Position: N/A\n"
-        report_part += "    Leverage: N/A\n"
-        report_part += "    Entry Price: N/A\n"
-        report_part += "    Stop Loss: N/A\n"
-        report_part += "    Take Profit: N/A\n"
-        report_part += "    Rationale: N/A\n"
-
-        full_report_parts.append(report_part)
+    Messages are split on coin boundaries so HTML tags are never cut in half;
+    a single coin section that is too long on its own is split on line boundaries.
 
-    return "\n".join(full_report_parts)
+    Args:
+        decision_data_list: A list of coin_decision_data dictionaries.
+        max_length: Maximum characters per message.
+
+    Returns:
+        A list of message strings, in report order. When everything fits in one
+        message it is identical to the output of format_telegram_report.
+    """
+    if not decision_data_list:
+        return [EMPTY_REPORT]
+    sections = [format_coin_section(i + 1, data) for i, data in enumerate(decision_data_list)]
+    return pack_sections(sections, REPORT_HEADER, CONTINUATION_HEADER, max_length)
+
+
+def pack_sections(sections: List[str], header: str, continuation_header: str,
+                  max_length: int = TELEGRAM_MAX_MESSAGE_LENGTH) -> List[str]:
+    """
+    Packs pre-formatted sections into as few messages as fit within max_length.
+
+    Args:
+        sections: Section texts, in order. Each is kept whole where possible.
+        header: Header of the first message.
+        continuation_header: Header of every following message.
+        max_length: Maximum characters per message.
+
+    Returns:
+        A list of message strings (header and sections joined with newlines).
+    """
+    messages = []
+    current = [header]
+    current_length = len(header)
+
+    def flush():
+        nonlocal current, current_length
+        messages.append("\n".join(current))
+        current = [continuation_header]
+        current_length = len(continuation_header)
+
+    for section in sections:
+        added_length = len(section) + 1  # +1 for the joining newline
+        if current_length + added_length > max_length and len(current) > 1:
+            flush()
+        if current_length + added_length > max_length:
+            # The section does not fit even in an empty message. Chunks are
+            # sized for the longer of the two headers, since every chunk
+            # after the first goes out under the continuation header.
+            chunk_length = max_length - max(current_length, len(continuation_header)) - 1
+            for i, chunk in enumerate(_split_on_lines(section, chunk_length)):
+                if i > 0:
+                    flush()
+                current.append(chunk)
+                current_length += len(chunk) + 1
+            continue
+        current.append(section)
+        current_length += added_length
+
+    if len(current) > 1:
+        messages.append("\n".join(current))
+    return messages
+
+
+_TAG_RE = re.compile(r"<(/?)([a-zA-Z]+)[^>]*>")
+
+
+def _open_tags(text: str) -> List[str]:
+    """Opening tags in text that are not closed within it, outermost first."""
+    stack = []
+    for match in _TAG_RE.finditer(text):
+        if not match.group(1):
+            stack.append(match)
+        elif stack and stack[-1].group(2) == match.group(2):
+            stack.pop()
+    return [(m.group(0), m.group(2)) for m in stack]
+
+
+def _tag_safe_cut(line: str, max_length: int) -> int:
+    """
+    Cut position <= max_length that is not inside a tag, moved back to a
+    space when one falls in the second half of the allowed length.
+    """
+    cut = max_length
+    open_at = line.rfind("<", 0, cut)
+    if open_at > line.rfind(">", 0, cut) and open_at > 0:
+        cut = open_at
+    space_at = line.rfind(" ", 0, cut)
+    if space_at >= max_length // 2:
+        cut = space_at + 1
+    return cut
+
+
+def _hard_split(line: str, max_length: int) -> List[str]:
+    """
+    Splits one overlong line into pieces of at most max_length characters.
+
+    Cuts never fall inside a tag, and elements open at a cut are closed at
+    the end of the piece and reopened at the start of the next, so every
+    piece is valid Telegram HTML on its own.
+    """
+    pieces = []
+    while len(line) > max_length:
+        cut = _tag_safe_cut(line, max_length)
+        open_tags = _open_tags(line[:cut])
+        closing = "".join(f"</{name}>" for _, name in reversed(open_tags))
+        if closing:
+            cut = _tag_safe_cut(line, max_length - len(closing))
+            open_tags = _open_tags(line[:cut])
+            closing = "".join(f"</{name}>" for _, name in reversed(open_tags))
+        pieces.append(line[:cut] + closing)
+        line = "".join(tag for tag, _ in open_tags) + line[cut:]
+    pieces.append(line)
+    return pieces
+
+
+def _split_on_lines(text: str, max_length: int) -> List[str]:
+    """Splits text into chunks of at most max_length characters, preferring line breaks."""
+    chunks = []
+    current = []
+    current_length = 0
+    for line in text.splitlines(keepends=True):
+        if len(line) > max_length:  # A single overlong line: split it on its own
+            if current:
+                chunks.append("".join(current))
+                current, current_length = [], 0
+            *pieces, line = _hard_split(line, max_length)
+            chunks.extend(pieces)
+        if current_length + len(line) > max_length:
+            chunks.append("".join(current))
+            current, current_length = [], 0
+        current.append(line)
+        current_length += len(line)
+    if current:
+        chunks.append("".join(current))
+    return chunks
 
 
 if __name__ == '__main__':
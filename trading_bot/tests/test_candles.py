@@ -0,0 +1,122 @@
+import unittest
+import numpy as np
+import pandas as pd
+from trading_bot.data.candles import CandleAggregator, CandleRingBuffer, timeframe_to_ms
+from trading_bot.analysis import technical_indicators as ti
+
+BASE_TS = 1_700_000_000_000 - (1_700_000_000_000 % 86_400_000)  # Midnight UTC
+
+
+class TestCandleRingBuffer(unittest.TestCase):
+
+    def test_wraps_and_keeps_chronological_order(self):
+        buffer = CandleRingBuffer(capacity=3)
+        for i in range(5):
+            buffer.append(i, i, i + 1, i - 1, i + 0.5, 1.0)
+        timestamps, values = buffer.to_arrays()
+        self.assertEqual(len(buffer), 3)
+        self.assertEqual(timestamps.tolist(), [2, 3, 4])
+        self.assertEqual(values[:, 0].tolist(), [2.0, 3.0, 4.0])
+        timestamps, _ = buffer.to_arrays(limit=2)
+        self.assertEqual(timestamps.tolist(), [3, 4])
+
+    def test_merge_last(self):
+        buffer = CandleRingBuffer(capacity=2)
+        buffer.append(0, 10, 10, 10, 10, 1)
+        buffer.merge_last(12, 9, 11, 2)
+        _, values = buffer.to_arrays()
+        self.assertEqual(values[0].tolist(), [10, 12, 9, 11, 3])
+
+
+class TestCandleAggregator(unittest.TestCase):
+
+    def test_timeframe_to_ms(self):
+        self.assertEqual(timeframe_to_ms("5m"), 300_000)
+        self.assertEqual(timeframe_to_ms("4h"), 14_400_000)
+        self.assertEqual(timeframe_to_ms("2d"), 172_800_000)
+        with self.assertRaises(ValueError):
+            timeframe_to_ms("weekly")
+
+    def test_trades_build_every_timeframe(self):
+        agg = CandleAggregator(timeframes=("1m", "5m", "1h"), capacity=100)
+        # One trade every 10 seconds for 10 minutes, price rising by 1 each trade
+        for i in range(60):
+            agg.add_trade("BTCUSDT", BASE_TS + i * 10_000, 100.0 + i, 0.5)
+
+        one_min = agg.get_candles("BTCUSDT", "1m")
+        self.assertEqual(len(one_min), 10)
+        first = one_min.iloc[0]
+        self.assertEqual((first['open'], first['high'], first['low'], first['close'], first['volume']),
+                         (100.0, 105.0, 100.0, 105.0, 3.0))
+
+        five_min = agg.get_candles("BTCUSDT", "5m")
+        self.assertEqual(len(five_min), 2)
+        self.assertEqual(five_min.iloc[1]['open'], 130.0)
+        self.assertEqual(five_min.iloc[1]['close'], 159.0)
+        self.assertEqual(agg.candle_count("BTCUSDT", "1h"), 1)
+
+    def test_trades_from_exchange_format(self):
+        agg = CandleAggregator(timeframes=("1m",), capacity=10)
+        trades = [
+            {"price": "101", "qty": "1", "time": BASE_TS + 30_000},
+            {"price": "100", "qty": "2", "time": BASE_TS},  # Out of order input is sorted
+            {"price": "bad", "qty": "1", "time": BASE_TS + 1},
+            {"bad_data": True},
+        ]
+        self.assertEqual(agg.add_trades("BTCUSDT", trades), 2)
+        candle = agg.get_candles("BTCUSDT", "1m").iloc[0]
+        self.assertEqual((candle['open'], candle['close'], candle['volume']), (100.0, 101.0, 3.0))
+
+    def test_ohlc_base_stream_resamples_to_coarser_timeframes(self):
+        agg = CandleAggregator(timeframes=("5m", "1h", "4h"), capacity=100)
+        half_hour = 30 * 60_000
+        # 16 half-hour candles (8 hours), Coingecko-style close-time stamps
+        ohlc = [[BASE_TS + (i + 1) * half_hour, 100 + i, 110 + i, 90 + i, 105 + i] for i in range(16)]
+        self.assertEqual(agg.add_ohlc_list("bitcoin", ohlc), 16)
+
+        self.assertEqual(agg.candle_count("bitcoin", "5m"), 0)  # Cannot be built from 30m candles
+        hourly = agg.get_candles("bitcoin", "1h")
+        self.assertEqual(len(hourly), 8)
+        self.assertEqual(hourly.index[0], pd.to_datetime(BASE_TS, unit='ms'))
+        self.assertEqual(hourly.iloc[0].tolist()[:4], [100.0, 111.0, 90.0, 106.0])
+        four_hourly = agg.get_candles("bitcoin", "4h")
+        self.assertEqual(len(four_hourly), 2)
+        self.assertEqual(four_hourly.iloc[1]['high'], 125.0)
+
+    def test_ohlc_coarser_than_every_timeframe_is_not_counted(self):
+        agg = CandleAggregator(timeframes=("1h", "4h", "1d"), capacity=100)
+        four_days = 4 * 24 * 60 * 60_000
+        # days="90" returns 4-day candles: 23 rows that no timeframe can hold
+        ohlc = [[BASE_TS + (i + 1) * four_days, 100 + i, 110 + i, 90 + i, 105 + i] for i in range(23)]
+        self.assertEqual(agg.add_ohlc_list("bitcoin", ohlc), 0)
+        self.assertEqual(agg.candle_count("bitcoin", "1d"), 0)
+        # Finer candles fetched afterwards are still ingested
+        half_hour = 30 * 60_000
+        ohlc = [[BASE_TS + (i + 1) * half_hour, 100, 110, 90, 105] for i in range(4)]
+        self.assertEqual(agg.add_ohlc_list("bitcoin", ohlc), 4)
+
+    def test_overlapping_refetch_is_not_double_counted(self):
+        agg = CandleAggregator(timeframes=("1h",), capacity=100)
+        half_hour = 30 * 60_000
+        ohlc = [[BASE_TS + (i + 1) * half_hour, 100, 110, 90, 105] for i in range(4)]
+        agg.add_ohlc_list("bitcoin", ohlc)
+        self.assertEqual(agg.add_ohlc_list("bitcoin", ohlc[2:] + [[BASE_TS + 5 * half_hour, 1, 2, 0.5, 1.5]]), 1)
+        self.assertEqual(agg.candle_count("bitcoin", "1h"), 3)
+
+    def test_candles_feed_indicators(self):
+        agg = CandleAggregator(timeframes=("1h",), capacity=500)
+        for i in range(60 * 40):  # 40 hours of one trade per minute
+            agg.add_trade("bitcoin", BASE_TS + i * 60_000, 100.0 + np.sin(i / 50.0), 1.0)
+        df = agg.get_candles("bitcoin", "1h")
+        self.assertEqual(len(df), 40)
+        sma = ti.calculate_sma(df, window=20)
+        self.assertAlmostEqual(sma.iloc[-1], df['close'].tail(20).mean())
+
+    def test_unknown_symbol(self):
+        agg = CandleAggregator()
+        self.assertTrue(agg.get_candles("nope", "1h").empty)
+        self.assertEqual(agg.candle_count("nope", "1h"), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+from trading_bot.analysis.coin_tagger import CoinTagger
+
+UNIVERSE = [
+    {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"},
+    {"id": "ethereum", "symbol": "eth", "name": "Ethereum"},
+    {"id": "chainlink", "symbol": "link", "name": "Chainlink"},
+    {"id": "bitcoin-cash", "symbol": "bch", "name": "Bitcoin Cash"},
+]
+
+
+class TestCoinTagger(unittest.TestCase):
+
+    def setUp(self):
+        self.tagger = CoinTagger(UNIVERSE, aliases={"bitcoin": ["xbt"], "ethereum": ["ether"]},
+                                 ambiguous_symbols={"link"})
+
+    def test_names_symbols_and_aliases(self):
+        self.assertEqual(self.tagger.tag("BTC slips while Ether gains"), {"bitcoin", "ethereum"})
+        self.assertEqual(self.tagger.tag("XBT perpetuals see record volume"), {"bitcoin"})
+        self.assertEqual(self.tagger.tag("Nothing to see here"), set())
+        self.assertEqual(self.tagger.tag(""), set())
+
+    def test_word_boundaries(self):
+        self.assertEqual(self.tagger.tag("Etherscan and bitcoiners"), set())
+        self.assertEqual(self.tagger.tag("Bitcoin's dominance (BTC.D) rises"), {"bitcoin"})
+
+    def test_overlapping_patterns(self):
+        mentions = self.tagger.mentions("Bitcoin Cash forks again")
+        self.assertIn(("bitcoin", 0, 7), mentions)
+        self.assertIn(("bitcoin-cash", 0, 12), mentions)
+
+    def test_ambiguous_symbols_need_upper_case_or_cashtag(self):
+        self.assertEqual(self.tagger.tag("a link to the article"), set())
+        self.assertEqual(self.tagger.tag("LINK oracle usage rises"), {"chainlink"})
+        self.assertEqual(self.tagger.tag("traders pile into $link"), {"chainlink"})
+        self.assertEqual(self.tagger.tag("Chainlink staking opens"), {"chainlink"})
+
+    def test_ambiguous_ids_and_names_need_upper_case_or_cashtag(self):
+        tagger = CoinTagger(UNIVERSE + [
+            {"id": "near", "symbol": "near", "name": "NEAR Protocol"},
+            {"id": "flow", "symbol": "flow", "name": "Flow"},
+            {"id": "sui", "symbol": "sui", "name": "Sui"},
+        ], aliases={}, ambiguous_symbols={"near", "flow", "sui"})
+        self.assertEqual(tagger.tag("Bitcoin is near its high as cash flow improves"), {"bitcoin"})
+        self.assertEqual(tagger.tag("Flow of funds into sui generis products"), set())
+        self.assertEqual(tagger.tag("near protocol upgrade ships"), {"near"})
+        self.assertEqual(tagger.tag("NEAR and FLOW rally while $sui lags"), {"near", "flow", "sui"})
+
+    def test_incremental_universe_update(self):
+        self.tagger.tag("warm up the automaton")
+        added, removed = self.tagger.update_universe(UNIVERSE[1:] + [{"id": "solana", "symbol": "sol", "name": "Solana"}])
+        self.assertEqual((added, removed), (1, 1))
+        self.assertEqual(self.tagger.tag("BTC and SOL move"), {"solana"})
+        # Removing Bitcoin keeps the shared prefix for Bitcoin Cash
+        self.assertEqual(self.tagger.tag("Bitcoin Cash rallies"), {"bitcoin-cash"})
+
+        self.assertEqual(self.tagger.update_universe(UNIVERSE[1:] + [{"id": "solana", "symbol": "sol", "name": "Solana"}]),
+                         (0, 0))
+        self.assertFalse(self.tagger._dirty)
+
+    def test_shared_symbol_tags_both_coins(self):
+        tagger = CoinTagger([{"id": "a-coin", "symbol": "abc", "name": "A"}, {"id": "b-coin", "symbol": "abc", "name": "B"}],
+                            aliases={}, ambiguous_symbols=())
+        self.assertEqual(tagger.tag("ABC lists"), {"a-coin", "b-coin"})
+        tagger.update_universe([{"id": "b-coin", "symbol": "abc", "name": "B"}])
+        self.assertEqual(tagger.tag("ABC lists"), {"b-coin"})
+
+    def test_tag_many(self):
+        self.assertEqual(self.tagger.tag_many(["BTC", "ETH", "none"]), [{"bitcoin"}, {"ethereum"}, set()])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -176,6 +176,16 @@ class TestCoingeckoAPI(unittest.TestCase):
         result = coingecko.get_historical_ohlc(coin_id="bitcoin")
         self.assertEqual(result, [])
 
+    def test_ohlc_granularity(self):
+        self.assertEqual(coingecko.ohlc_interval_ms("1"), 30 * 60_000)
+        self.assertEqual(coingecko.ohlc_interval_ms(30), 4 * 3_600_000)
+        self.assertEqual(coingecko.ohlc_interval_ms("90"), 4 * 86_400_000)
+        self.assertEqual(coingecko.ohlc_interval_ms("max"), 4 * 86_400_000)
+        self.assertEqual(coingecko.max_ohlc_days(3_600_000), 2)
+        self.assertEqual(coingecko.max_ohlc_days(86_400_000), 30)
+        self.assertEqual(coingecko.max_ohlc_days(7 * 86_400_000), 90)
+        self.assertEqual(coingecko.max_ohlc_days(5 * 60_000), 0)
+
 
 if __name__ == '__main__':
     # This allows running the tests directly from this file
@@ -0,0 +1,113 @@
+import unittest
+from trading_bot.reporting.delta_reporter import DeltaReporter
+
+
+def _coin(coin_id, price=100.0, rsi=50.0, signal="HOLD", sentiment="neutral", hist=1.0):
+    return {
+        "coin_id": coin_id, "symbol": coin_id[:3], "name": coin_id.capitalize(),
+        "latest_price": price, "rsi_14": rsi,
+        "macd": {"line": 1.0, "signal": 0.5, "histogram": hist},
+        "aggregated_sentiment": sentiment, "sentiment_score": 0, "news_articles_analyzed": 0,
+        "decision_factors": ["No strong technical or sentiment signals."], "signal": signal,
+    }
+
+
+def _send(reporter, coins):
+    """One delivered cycle: build the messages and commit them as sent."""
+    messages = reporter.build_messages(coins)
+    reporter.commit(coins)
+    return messages
+
+
+class TestDeltaReporter(unittest.TestCase):
+
+    def setUp(self):
+        self.reporter = DeltaReporter(price_change_pct=2.0, rsi_change=5.0, full_summary_every=0)
+
+    def test_first_cycle_reports_every_coin_without_placeholders(self):
+        messages = _send(self.reporter, [_coin("bitcoin"), _coin("ethereum")])
+        self.assertEqual(len(messages), 1)
+        self.assertIn("<b>Trading Update</b>", messages[0])
+        self.assertIn("<b>1. Bitcoin (BIT)</b>", messages[0])
+        self.assertIn("<b>2. Ethereum (ETH)</b>", messages[0])
+        self.assertIn("Changes: new", messages[0])
+        self.assertNotIn("Leveraged Recommendations", messages[0])
+
+    def test_unchanged_cycle_sends_nothing(self):
+        _send(self.reporter, [_coin("bitcoin")])
+        self.assertIsNone(_send(self.reporter, [_coin("bitcoin", price=101.0, rsi=52.0)]))
+
+    def test_only_changed_coins_are_reported(self):
+        _send(self.reporter, [_coin("bitcoin"), _coin("ethereum"), _coin("cardano")])
+        messages = _send(self.reporter, [
+            _coin("bitcoin", price=103.0),  # +3% price
+            _coin("ethereum", signal="BUY"),
+            _coin("cardano", price=100.5),  # Below thresholds
+        ])
+        text = "".join(messages)
+        self.assertIn("Bitcoin", text)
+        self.assertIn("price +3.00%", text)
+        self.assertIn("signal HOLD -> BUY", text)
+        self.assertNotIn("Cardano", text)
+
+    def test_small_moves_accumulate_against_last_sent_state(self):
+        _send(self.reporter, [_coin("bitcoin", price=100.0)])
+        self.assertIsNone(_send(self.reporter, [_coin("bitcoin", price=101.5)]))
+        messages = _send(self.reporter, [_coin("bitcoin", price=102.5)])  # +2.5% vs last sent
+        self.assertIsNotNone(messages)
+
+    def test_rsi_sentiment_and_macd_changes(self):
+        _send(self.reporter, [_coin("bitcoin")])
+        text = "".join(_send(self.reporter, [_coin("bitcoin", rsi=57.0)]))
+        self.assertIn("RSI 50.00 -> 57.00", text)
+        text = "".join(_send(self.reporter, [_coin("bitcoin", rsi=57.0, sentiment="negative")]))
+        self.assertIn("sentiment neutral -> negative", text)
+        text = "".join(_send(self.reporter, [_coin("bitcoin", rsi=57.0, sentiment="negative", hist=-0.5)]))
+        self.assertIn("MACD histogram crossed zero", text)
+
+    def test_periodic_full_summary(self):
+        reporter = DeltaReporter(full_summary_every=2)
+        coins = [_coin("bitcoin"), _coin("ethereum")]
+        first = _send(reporter, coins)
+        self.assertIn("<b>Trading Summary</b>", first[0])
+        self.assertIn("BIT: HOLD @ 100.00 | RSI 50.00 | neutral", first[0])
+        self.assertIsNone(_send(reporter, coins))
+        third = _send(reporter, coins)
+        self.assertIn("<b>Trading Summary</b>", third[0])
+
+    def test_messages_split_within_limit(self):
+        reporter = DeltaReporter(full_summary_every=0, max_length=1000)
+        messages = _send(reporter, [_coin(f"coin{i}") for i in range(40)])
+        self.assertGreater(len(messages), 1)
+        self.assertTrue(all(len(m) <= 1000 for m in messages))
+
+    def test_state_round_trip(self):
+        _send(self.reporter, [_coin("bitcoin")])
+        restored = DeltaReporter(full_summary_every=0)
+        restored.load_dict(self.reporter.to_dict())
+        self.assertIsNone(_send(restored, [_coin("bitcoin")]))
+
+    def test_coins_leaving_the_universe_are_forgotten(self):
+        _send(self.reporter, [_coin("bitcoin"), _coin("ethereum")])
+        _send(self.reporter, [_coin("bitcoin")])
+        self.assertEqual(set(self.reporter.last_sent), {"bitcoin"})
+        text = "".join(_send(self.reporter, [_coin("bitcoin"), _coin("ethereum")]))
+        self.assertIn("Changes: new", text)
+
+    def test_build_messages_without_commit_changes_nothing(self):
+        coins = [_coin("bitcoin")]
+        first = self.reporter.build_messages(coins)
+        self.assertEqual(self.reporter.build_messages(coins), first)  # Not delivered: still new
+        self.assertEqual((self.reporter.cycle, self.reporter.last_sent), (0, {}))
+        self.reporter.commit(coins)
+        self.assertIsNone(self.reporter.build_messages(coins))
+
+    def test_undelivered_summary_is_retried(self):
+        reporter = DeltaReporter(full_summary_every=2)
+        coins = [_coin("bitcoin")]
+        self.assertIn("<b>Trading Summary</b>", reporter.build_messages(coins)[0])
+        self.assertIn("<b>Trading Summary</b>", reporter.build_messages(coins)[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
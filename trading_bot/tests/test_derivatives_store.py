@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from trading_bot.data.derivatives_store import DerivativesStore, TimeSeriesBuffer
+
+HOUR_MS = 3_600_000
+NOW_MS = 1_700_000_000_000
+
+
+def _oi_rows(symbol, start, values):
+    return [{"symbol": symbol, "sumOpenInterest": str(v), "timestamp": start + i * HOUR_MS}
+            for i, v in enumerate(values)]
+
+
+def _funding_rows(symbol, start, rates):
+    return [{"symbol": symbol, "fundingRate": str(r), "fundingTime": start + i * 8 * HOUR_MS}
+            for i, r in enumerate(rates)]
+
+
+class TestTimeSeriesBuffer(unittest.TestCase):
+
+    def test_extend_skips_old_duplicate_and_nan_points(self):
+        buffer = TimeSeriesBuffer(max_points=100, initial_capacity=2)
+        self.assertEqual(buffer.extend(np.array([3, 1, 2, 2]), np.array([30.0, 10.0, 20.0, 21.0])), 3)
+        self.assertEqual(buffer.extend(np.array([2, 4, 5]), np.array([0.0, np.nan, 50.0])), 1)
+        self.assertEqual(buffer.timestamps.tolist(), [1, 2, 3, 5])
+        self.assertEqual(buffer.values.tolist(), [10.0, 20.0, 30.0, 50.0])
+
+    def test_cap_drops_oldest(self):
+        buffer = TimeSeriesBuffer(max_points=3)
+        buffer.extend(np.arange(5), np.arange(5, dtype=float))
+        self.assertEqual(buffer.timestamps.tolist(), [2, 3, 4])
+        self.assertEqual(buffer.tail_matrix_row(5)[2:].tolist(), [2.0, 3.0, 4.0])
+        self.assertTrue(np.isnan(buffer.tail_matrix_row(5)[:2]).all())
+
+
+class TestDerivativesStore(unittest.TestCase):
+
+    @patch('trading_bot.data.derivatives_store.exchange_api.get_funding_rates')
+    @patch('trading_bot.data.derivatives_store.exchange_api.get_open_interest_history')
+    def test_backfill_is_incremental(self, mock_oi, mock_funding):
+        store = DerivativesStore(lookback_hours=24, max_points=100)
+        mock_oi.return_value = _oi_rows("BTCUSDT", NOW_MS - 2 * HOUR_MS, [100, 110, 120])
+        mock_funding.return_value = _funding_rows("BTCUSDT", NOW_MS - 8 * HOUR_MS, [0.0001, 0.0002])
+        self.assertEqual(store.backfill(["BTCUSDT"], now_ms=NOW_MS), {"BTCUSDT": 5})
+        self.assertEqual(mock_oi.call_args.kwargs["start_time"], NOW_MS - 24 * HOUR_MS)
+
+        mock_oi.return_value = _oi_rows("BTCUSDT", NOW_MS + HOUR_MS, [130])
+        mock_funding.return_value = [{"error": "rate limited"}]
+        self.assertEqual(store.backfill(["BTCUSDT"], now_ms=NOW_MS + HOUR_MS), {"BTCUSDT": 1})
+        self.assertEqual(mock_oi.call_args.kwargs["start_time"], NOW_MS + 1)
+        self.assertEqual(mock_funding.call_args.kwargs["start_time"], NOW_MS + 1)
+        self.assertEqual(store.open_interest["BTCUSDT"].values.tolist(), [100, 110, 120, 130])
+
+    def test_oi_changes_across_symbols(self):
+        store = DerivativesStore(max_points=100)
+        store.add_open_interest("BTCUSDT", _oi_rows("BTCUSDT", NOW_MS, [100, 105, 110, 120]))
+        store.add_open_interest("ETHUSDT", _oi_rows("ETHUSDT", NOW_MS, [50, 40]))
+        df = store.oi_changes(["BTCUSDT", "ETHUSDT", "SOLUSDT"], periods=3)
+        self.assertEqual(df.loc["BTCUSDT", "open_interest"], 120)
+        self.assertAlmostEqual(df.loc["BTCUSDT", "oi_change_pct"], 20.0)
+        self.assertTrue(np.isnan(df.loc["ETHUSDT", "oi_change_pct"]))  # Too little history
+        self.assertTrue(np.isnan(df.loc["SOLUSDT", "open_interest"]))
+        self.assertAlmostEqual(store.oi_changes(["ETHUSDT"], periods=1).loc["ETHUSDT", "oi_change_pct"], -20.0)
+
+    def test_funding_zscores_match_pandas(self):
+        store = DerivativesStore(max_points=100)
+        rates = [0.0001, 0.0002, 0.0001, 0.00015, 0.0006]
+        store.add_funding("BTCUSDT", _funding_rows("BTCUSDT", NOW_MS, rates))
+        store.add_funding("ETHUSDT", _funding_rows("ETHUSDT", NOW_MS, [0.0001] * 5))
+        df = store.funding_zscores(["BTCUSDT", "ETHUSDT"], window=5)
+        expected = (rates[-1] - np.mean(rates)) / np.std(rates, ddof=1)
+        self.assertAlmostEqual(df.loc["BTCUSDT", "funding_zscore"], expected)
+        self.assertTrue(np.isnan(df.loc["ETHUSDT", "funding_zscore"]))  # No dispersion
+        self.assertAlmostEqual(df.loc["BTCUSDT", "funding_rate"], 0.0006)
+
+    def test_features_from_placeholder_exchange(self):
+        store = DerivativesStore(lookback_hours=72)
+        store.backfill(["BTCUSDT", "ETHUSDT"])
+        features = store.features(["BTCUSDT", "ETHUSDT"])
+        self.assertEqual(list(features.columns),
+                         ["open_interest", "oi_change", "oi_change_pct", "funding_rate", "funding_zscore"])
+        self.assertFalse(features.isna().any().any())
+
+
+if __name__ == '__main__':
+    unittest.main()
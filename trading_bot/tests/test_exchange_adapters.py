@@ -0,0 +1,227 @@
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+from urllib.parse import urlsplit, parse_qs
+
+from trading_bot.api import resilience
+from trading_bot.api.exchange_adapters import (
+    BinanceAdapter, KrakenAdapter, CoinbaseAdapter, BestPriceConsolidator, default_adapters,
+)
+from trading_bot.core import strategy
+
+NOW_MS = int(time.time() * 1000)
+
+
+def _binance_routes(bid, ask):
+    return {
+        "/api/v3/depth": {"lastUpdateId": 1, "bids": [[str(bid), "0.5"], [str(bid - 1), "2"]],
+                          "asks": [[str(ask), "0.8"], [str(ask + 1), "1"]]},
+        "/api/v3/trades": [{"id": 2, "price": str(bid), "qty": "0.1", "time": NOW_MS - 1000, "isBuyerMaker": True},
+                           {"id": 1, "price": str(ask), "qty": "0.2", "time": NOW_MS - 2000, "isBuyerMaker": False}],
+    }
+
+
+def _kraken_routes(bid, ask):
+    return {
+        "/0/public/Depth": {"error": [], "result": {"XXBTZUSD": {
+            "bids": [[str(bid), "1.5", 1699999999]], "asks": [[str(ask), "0.4", 1699999999]]}}},
+        "/0/public/Trades": {"error": [], "result": {
+            "XXBTZUSD": [[str(ask), "0.3", (NOW_MS - 1500) / 1000, "b", "m", "", 7]], "last": "1"}},
+    }
+
+
+def _coinbase_routes(bid, ask):
+    return {
+        "/products/BTC-USDT/book": {"sequence": 1, "bids": [[str(bid), "0.7", 3]], "asks": [[str(ask), "0.9", 1]]},
+        "/products/BTC-USDT/trades": [{"time": "2023-11-14T22:13:20.500Z", "trade_id": 1, "price": str(bid),
+                                       "size": "0.05", "side": "buy"}],
+    }
+
+
+class _StubVenue:
+    """A local venue serving canned JSON per path, optionally slow or failing."""
+
+    def __init__(self, routes, prefix="", delay=0.0, status=200):
+        self.routes, self.delay, self.status = routes, delay, status
+        self.requests = []  # (path, query params)
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                stub.requests.append((url.path, {k: v[0] for k, v in parse_qs(url.query).items()}))
+                time.sleep(stub.delay)
+                payload = stub.routes.get(url.path)
+                status = stub.status if payload is not None else 404
+                data = json.dumps(payload if status == 200 else {"error": "unavailable"}).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}{prefix}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class _VenueTestCase(unittest.TestCase):
+
+    def setUp(self):
+        resilience.reset()
+        self.venues = []
+
+    def tearDown(self):
+        for venue in self.venues:
+            venue.close()
+        resilience.reset()
+
+    def venue(self, routes, prefix="", **kwargs):
+        stub = _StubVenue(routes, prefix, **kwargs)
+        self.venues.append(stub)
+        return stub
+
+
+class TestAdapters(_VenueTestCase):
+
+    def test_binance(self):
+        stub = self.venue(_binance_routes(100.0, 101.0), prefix="/api/v3")
+        adapter = BinanceAdapter(base_url=stub.url)
+        book = adapter.fetch_order_book("BTC", "USDT", depth=1)
+        self.assertEqual(book["venue"], "binance")
+        self.assertEqual(book["bids"], [(100.0, 0.5)])
+        self.assertEqual(book["asks"], [(101.0, 0.8)])
+        self.assertEqual(stub.requests[0], ("/api/v3/depth", {"symbol": "BTCUSDT", "limit": "5"}))
+        trades = adapter.fetch_trades("BTC", "USDT")
+        self.assertEqual([t["time"] for t in trades], [NOW_MS - 2000, NOW_MS - 1000])  # Oldest first
+        self.assertEqual([t["side"] for t in trades], ["buy", "sell"])
+
+    def test_kraken(self):
+        stub = self.venue(_kraken_routes(100.5, 101.5))
+        adapter = KrakenAdapter(base_url=stub.url)
+        book = adapter.fetch_order_book("BTC", "USDT")
+        self.assertEqual((book["bids"], book["asks"]), ([(100.5, 1.5)], [(101.5, 0.4)]))
+        self.assertEqual(stub.requests[0][1]["pair"], "XBTUSDT")
+        trades = adapter.fetch_trades("BTC", "USDT")
+        self.assertEqual(trades, [{"price": 101.5, "qty": 0.3, "time": NOW_MS - 1500, "side": "buy",
+                                   "venue": "kraken"}])
+
+    def test_kraken_error_payload(self):
+        stub = self.venue({"/0/public/Depth": {"error": ["EQuery:Unknown asset pair"], "result": {}}})
+        self.assertIsNone(KrakenAdapter(base_url=stub.url).fetch_order_book("FOO", "USDT"))
+
+    def test_coinbase(self):
+        stub = self.venue(_coinbase_routes(99.5, 100.2))
+        adapter = CoinbaseAdapter(base_url=stub.url)
+        book = adapter.fetch_order_book("BTC", "USDT")
+        self.assertEqual((book["bids"], book["asks"]), ([(99.5, 0.7)], [(100.2, 0.9)]))
+        trade, = adapter.fetch_trades("BTC", "USDT")
+        self.assertEqual(trade["time"], 1_700_000_000_500)
+        self.assertEqual(trade["side"], "sell")  # Maker bought, so the taker sold
+
+    def test_unavailable_venue_returns_none(self):
+        stub = self.venue(_binance_routes(100.0, 101.0), prefix="/api/v3", status=503)
+        adapter = BinanceAdapter(base_url=stub.url)
+        self.assertIsNone(adapter.fetch_order_book("BTC", "USDT"))
+        self.assertIsNone(adapter.fetch_trades("BTC", "USDT"))
+        self.assertIsNone(adapter.fetch_order_book("ETH", "USDT"))  # 404 on an unknown route is still None
+
+    def test_default_adapters_follow_config(self):
+        with patch("trading_bot.api.exchange_adapters.config.EXCHANGE_VENUES", ["kraken", "nope", " Binance"]):
+            self.assertEqual([a.name for a in default_adapters()], ["kraken", "binance"])
+
+
+class TestBestPriceConsolidator(_VenueTestCase):
+
+    def _consolidator(self, delay=0.0, coinbase_status=200):
+        binance = self.venue(_binance_routes(100.0, 101.0), prefix="/api/v3", delay=delay)
+        kraken = self.venue(_kraken_routes(100.5, 101.5), delay=delay)
+        coinbase = self.venue(_coinbase_routes(99.5, 100.2), delay=delay, status=coinbase_status)
+        return BestPriceConsolidator([BinanceAdapter(binance.url), KrakenAdapter(kraken.url),
+                                      CoinbaseAdapter(coinbase.url)])
+
+    def test_best_bid_offer_across_venues(self):
+        consolidator = self._consolidator()
+        self.assertEqual(consolidator.refresh([("BTC", "USDT")]), 3)
+        best = consolidator.best_bid_offer("BTC", "USDT")
+        self.assertEqual((best["best_bid"], best["best_bid_venue"]), (100.5, "kraken"))
+        self.assertEqual((best["best_ask"], best["best_ask_venue"]), (100.2, "coinbase"))
+        self.assertAlmostEqual(best["spread"], -0.3)
+        self.assertTrue(best["crossed"])
+        self.assertEqual(best["venues"], ["binance", "coinbase", "kraken"])
+        trades = consolidator.trades("BTC", "USDT")
+        self.assertEqual(len(trades), 4)
+        self.assertEqual([t["time"] for t in trades], sorted(t["time"] for t in trades))
+
+    def test_failed_venue_is_left_out(self):
+        consolidator = self._consolidator(coinbase_status=500)
+        self.assertEqual(consolidator.refresh([("BTC", "USDT")]), 2)
+        best = consolidator.best_bid_offer("BTC", "USDT")
+        self.assertEqual((best["best_ask"], best["best_ask_venue"]), (101.0, "binance"))
+        self.assertFalse(best["crossed"])
+        self.assertIsNone(consolidator.best_bid_offer("ETH", "USDT"))
+
+    def test_stale_books_are_ignored(self):
+        consolidator = BestPriceConsolidator(adapters=[], max_age_seconds=30)
+        now = time.time()
+        consolidator.update_book({"venue": "a", "base": "BTC", "quote": "USDT", "timestamp": (now - 60) * 1000,
+                                  "bids": [(105.0, 1.0)], "asks": [(106.0, 1.0)]})
+        consolidator.update_book({"venue": "b", "base": "BTC", "quote": "USDT", "timestamp": now * 1000,
+                                  "bids": [(100.0, 1.0)], "asks": [(101.0, 1.0)]})
+        best = consolidator.best_bid_offer("BTC", "USDT", now=now)
+        self.assertEqual((best["best_bid"], best["venues"]), (100.0, ["b"]))
+
+    def test_venues_are_fetched_concurrently(self):
+        consolidator = self._consolidator(delay=0.2)
+        start = time.perf_counter()
+        consolidator.refresh([("BTC", "USDT")])
+        self.assertLess(time.perf_counter() - start, 0.8)  # Six sequential requests would take 1.2s
+
+
+class TestStrategyUsesConsolidatedView(unittest.TestCase):
+
+    @patch('trading_bot.core.strategy.exchange_api.get_recent_trades')
+    @patch('trading_bot.core.strategy.exchange_api.get_order_book')
+    @patch('trading_bot.core.strategy.sentiment_analyzer.analyze_sentiment_gemini')
+    @patch('trading_bot.core.strategy.news_api.get_crypto_news')
+    @patch('trading_bot.core.strategy.cg_api.get_historical_ohlc')
+    @patch('trading_bot.core.strategy.cg_api.get_top_coins')
+    def test_order_book_and_trades_come_from_memory(self, mock_get_top_coins, mock_get_historical_ohlc,
+                                                    mock_get_crypto_news, mock_analyze_sentiment,
+                                                    mock_get_order_book, mock_get_recent_trades):
+        mock_get_top_coins.return_value = [{"id": "bitcoin", "symbol": "btc", "name": "Bitcoin",
+                                            "current_price": 100.0, "market_cap": 1e12}]
+        mock_get_historical_ohlc.return_value = [[1678886400000 + i * 3_600_000, 100, 110, 90, 105]
+                                                 for i in range(30)]
+        mock_get_crypto_news.return_value = []
+
+        consolidator = BestPriceConsolidator(adapters=[])
+        now_ms = int(time.time() * 1000)
+        for venue, bid, ask in (("binance", 100.0, 101.0), ("kraken", 100.4, 100.9)):
+            consolidator.update_book({"venue": venue, "base": "BTC", "quote": "USDT", "timestamp": now_ms,
+                                      "bids": [(bid, 1.0)], "asks": [(ask, 1.0)]})
+        consolidator.update_trades("kraken", "BTC", "USDT", [
+            {"venue": "kraken", "price": p, "qty": 1.0, "time": now_ms - i * 1000, "side": "buy"}
+            for i, p in enumerate((100.0, 102.0))])
+
+        results = strategy.run_trading_strategy(top_n_coins=1, price_consolidator=consolidator)
+        mock_get_order_book.assert_not_called()
+        mock_get_recent_trades.assert_not_called()
+        summary = results[0]["order_book_summary"]
+        self.assertEqual((summary["best_bid"], summary["best_ask"]), (100.4, 100.9))
+        self.assertEqual(summary["best_ask_venue"], "kraken")
+        self.assertAlmostEqual(results[0]["volatility"], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
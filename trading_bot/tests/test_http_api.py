@@ -0,0 +1,181 @@
+import asyncio
+import http.client
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from trading_bot.data.journal import DecisionJournal
+from trading_bot.reporting.http_api import StateStore, start_api_server, json_safe
+
+OUTPUTS = [
+    {"coin_id": "bitcoin", "symbol": "BTC", "name": "Bitcoin", "signal": "BUY", "latest_price": np.float64(60000.0),
+     "rsi_14": 28.5, "macd": {"line": 1.0, "signal": 0.5, "histogram": 0.5},
+     "indicators": {"atr_14": 850.0, "adx_14": float("nan")}, "market_regime": "risk_on",
+     "decision_factors": ["RSI < 30 (Oversold)"]},
+    {"coin_id": "ethereum", "symbol": "ETH", "name": "Ethereum", "signal": "HOLD", "latest_price": 3000.0,
+     "decision_factors": []},
+]
+
+
+class _ApiTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.store = StateStore(journal=None)
+        self.server = start_api_server(self.store, port=0)
+        self.connection = http.client.HTTPConnection("127.0.0.1", self.server.port, timeout=5)
+
+    def tearDown(self):
+        self.connection.close()
+        self.server.stop()
+
+    def get(self, path, method="GET", headers=None):
+        self.connection.request(method, path, headers=headers or {})
+        response = self.connection.getresponse()
+        body = response.read()
+        return response.status, dict(response.getheaders()), json.loads(body) if body else None
+
+
+class TestSnapshotEndpoints(_ApiTestCase):
+
+    def test_coins_signals_and_indicators(self):
+        self.store.publish(OUTPUTS, timestamp_ms=1_000)
+        status, _, coins = self.get("/api/coins")
+        self.assertEqual(status, 200)
+        self.assertEqual([c["coin_id"] for c in coins], ["bitcoin", "ethereum"])
+        self.assertEqual(coins[0], {"coin_id": "bitcoin", "symbol": "BTC", "name": "Bitcoin", "signal": "BUY",
+                                    "latest_price": 60000.0, "market_regime": "risk_on"})
+        self.assertEqual(self.get("/api/signals")[2], {"bitcoin": "BUY", "ethereum": "HOLD"})
+
+        status, _, indicators = self.get("/api/coins/bitcoin/indicators")
+        self.assertEqual(indicators["rsi_14"], 28.5)
+        self.assertEqual(indicators["indicators"], {"atr_14": 850.0, "adx_14": None})  # NaN served as null
+        self.assertNotIn("decision_factors", indicators)
+        self.assertEqual(self.get("/api/coins/bitcoin/")[2]["decision_factors"], ["RSI < 30 (Oversold)"])
+        self.assertEqual(self.get("/healthz")[2], {"status": "ok", "published_at": 1.0})
+
+    def test_conditional_get(self):
+        self.store.publish(OUTPUTS)
+        status, headers, _ = self.get("/api/coins/bitcoin")
+        etag = headers["ETag"]
+        status, headers, body = self.get("/api/coins/bitcoin", headers={"If-None-Match": etag})
+        self.assertEqual((status, body, headers["ETag"]), (304, None, etag))
+        self.assertEqual(self.get("/api/coins/bitcoin", headers={"If-None-Match": f'"other", W/{etag}'})[0], 304)
+
+        self.store.publish([dict(OUTPUTS[0], signal="CONSIDER_BUY")])
+        status, headers, body = self.get("/api/coins/bitcoin", headers={"If-None-Match": etag})
+        self.assertEqual(status, 200)
+        self.assertNotEqual(headers["ETag"], etag)
+        self.assertEqual(body["signal"], "CONSIDER_BUY")
+        self.assertEqual(self.get("/api/coins/ethereum")[0], 404)  # Gone from the latest cycle
+
+    def test_head_errors_and_methods(self):
+        self.store.publish(OUTPUTS)
+        status, headers, body = self.get("/api/signals", method="HEAD")
+        self.assertEqual((status, body), (200, None))
+        self.assertGreater(int(headers["Content-Length"]), 0)
+        self.assertEqual(self.get("/api/coins/dogecoin")[0], 404)
+        self.assertEqual(self.get("/api/signals", method="POST")[0], 405)
+        self.assertEqual(self.get("/api/history?limit=ten")[0], 400)
+
+    def test_requests_never_reach_upstream(self):
+        self.store.publish(OUTPUTS)
+        with patch("trading_bot.api.coingecko.requests.get") as mock_get, \
+                patch("trading_bot.api.resilience.requests.get") as mock_resilient_get:
+            for path in ("/api/coins", "/api/coins/bitcoin/indicators", "/api/history", "/api/coins/unknown"):
+                self.get(path)
+        mock_get.assert_not_called()
+        mock_resilient_get.assert_not_called()
+
+    def test_json_safe(self):
+        self.assertEqual(json_safe({"a": (np.int64(3), float("inf")), 1: np.float32(0.5)}), {"a": [3, None], "1": 0.5})
+
+
+class TestHistory(_ApiTestCase):
+
+    def _publish_cycles(self, n_cycles):
+        for i in range(n_cycles):
+            self.store.publish(OUTPUTS, timestamp_ms=i * 1000)
+
+    def test_pagination(self):
+        self._publish_cycles(5)
+        items, cursor = [], None
+        while True:
+            query = "/api/history?limit=3" + (f"&cursor={cursor}" if cursor is not None else "")
+            status, _, page = self.get(query)
+            self.assertEqual(status, 200)
+            self.assertLessEqual(len(page["items"]), 3)
+            items.extend(page["items"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(len(items), 10)
+        self.assertEqual([item["ts"] for item in items], sorted(item["ts"] for item in items))
+
+    def test_coin_and_time_range(self):
+        self._publish_cycles(5)
+        _, _, page = self.get("/api/history?coin_id=bitcoin&start=1000&end=4000")
+        self.assertEqual([(item["coin_id"], item["ts"]) for item in page["items"]],
+                         [("bitcoin", 1000), ("bitcoin", 2000), ("bitcoin", 3000)])
+        self.assertIsNone(page["next_cursor"])
+        _, _, page = self.get("/api/history?coin_id=bitcoin&start=1000&limit=2")
+        self.assertEqual(page["next_cursor"], 3)
+        _, _, page = self.get(f"/api/history?coin_id=bitcoin&start=1000&limit=2&cursor={page['next_cursor']}")
+        self.assertEqual([item["ts"] for item in page["items"]], [3000, 4000])
+        self.assertEqual(self.get("/api/history?coin_id=solana")[2], {"items": [], "next_cursor": None})
+
+    def test_history_etag_changes_when_a_page_grows(self):
+        self._publish_cycles(1)
+        _, headers, page = self.get("/api/history?coin_id=bitcoin")
+        self.assertEqual(self.get("/api/history?coin_id=bitcoin", headers={"If-None-Match": headers["ETag"]})[0], 304)
+        self.store.publish(OUTPUTS, timestamp_ms=5000)
+        status, _, page = self.get("/api/history?coin_id=bitcoin", headers={"If-None-Match": headers["ETag"]})
+        self.assertEqual((status, len(page["items"])), (200, 2))
+
+    def test_history_is_seeded_from_the_journal(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            journal = DecisionJournal(os.path.join(tmp_dir, "journal.jsonl"))
+            journal.record(OUTPUTS, timestamp_ms=2_000)
+            journal.record(OUTPUTS[:1], timestamp_ms=1_000)
+            store = StateStore(journal)
+        body, _ = store.history_page()
+        self.assertEqual([(r["coin_id"], r["ts"]) for r in json.loads(body)["items"]],
+                         [("bitcoin", 1000), ("bitcoin", 2000), ("ethereum", 2000)])
+
+
+class TestThroughput(_ApiTestCase):
+
+    def test_keep_alive_clients(self):
+        self.store.publish(OUTPUTS)
+        port, n_clients, per_client = self.server.port, 20, 100
+
+        async def client():
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            request = b"GET /api/signals HTTP/1.1\r\nHost: localhost\r\n\r\n"
+            ok = 0
+            for _ in range(per_client):
+                writer.write(request)
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = int(next(line.split(b":")[1] for line in head.split(b"\r\n")
+                                  if line.lower().startswith(b"content-length")))
+                await reader.readexactly(length)
+                ok += head.startswith(b"HTTP/1.1 200")
+            writer.close()
+            return ok
+
+        async def run():
+            return sum(await asyncio.gather(*(client() for _ in range(n_clients))))
+
+        start = time.perf_counter()
+        ok = asyncio.run(run())
+        elapsed = time.perf_counter() - start
+        self.assertEqual(ok, n_clients * per_client)
+        self.assertLess(elapsed, 4.0)  # Over 500 requests/s even on a slow CI runner
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from ta.momentum import RSIIndicator, StochasticOscillator
+from ta.trend import EMAIndicator, SMAIndicator, MACD
+from ta.volatility import AverageTrueRange, BollingerBands
+from ta.volume import OnBalanceVolumeIndicator, VolumeWeightedAveragePrice
+
+from trading_bot.analysis import indicator_engine
+from trading_bot.analysis.indicator_engine import IndicatorEngine, compute_indicators, latest_values
+
+
+def _sample_frame(n=300, seed=7, volume=True):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    frame = pd.DataFrame({
+        "open": close + rng.normal(0, 0.3, n),
+        "high": close + rng.uniform(0.1, 2, n),
+        "low": close - rng.uniform(0.1, 2, n),
+        "close": close,
+    })
+    if volume:
+        frame["volume"] = rng.uniform(10, 1000, n)
+    return frame
+
+
+def _reference_adx(high, low, close, window):
+    """Textbook Wilder ADX, one bar at a time."""
+    n = len(close)
+    tr, plus_dm, minus_dm = np.zeros(n), np.zeros(n), np.zeros(n)
+    for i in range(1, n):
+        tr[i] = max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+        up, down = high[i] - high[i - 1], low[i - 1] - low[i]
+        plus_dm[i] = up if up > down and up > 0 else 0.0
+        minus_dm[i] = down if down > up and down > 0 else 0.0
+
+    def wilder(values, start):
+        out = np.full(n, np.nan)
+        out[start + window - 1] = values[start:start + window].mean()
+        for i in range(start + window, n):
+            out[i] = (out[i - 1] * (window - 1) + values[i]) / window
+        return out
+
+    atr = wilder(tr, 1)
+    plus_di = 100 * wilder(plus_dm, 1) / atr
+    minus_di = 100 * wilder(minus_dm, 1) / atr
+    dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    return wilder(np.nan_to_num(dx), window), plus_di, minus_di
+
+
+class TestIndicatorEngineMatchesReference(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = _sample_frame()
+        cls.result = compute_indicators(cls.df, ["sma_20", "ema_8", "ema_21", "rsi_14", "bb_20", "macd_12_26_9",
+                                                 "atr_14", "stoch_14_3", "adx_14", "obv", "vwap_20"])
+
+    def assertSeriesClose(self, actual, expected, first_valid=None):
+        expected = np.asarray(expected, dtype=float)
+        actual = np.asarray(actual, dtype=float)
+        if first_valid is not None:  # ta fills warm-up rows with 0 for some indicators
+            expected = expected.copy()
+            expected[:first_valid] = np.nan
+        np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+    def test_moving_averages_and_bands(self):
+        close = self.df["close"]
+        self.assertSeriesClose(self.result["sma_20"], SMAIndicator(close, 20).sma_indicator())
+        self.assertSeriesClose(self.result["ema_8"], EMAIndicator(close, 8).ema_indicator())
+        self.assertSeriesClose(self.result["ema_21"], EMAIndicator(close, 21).ema_indicator())
+        bb = BollingerBands(close, 20, 2)
+        self.assertSeriesClose(self.result["bb_20_upper"], bb.bollinger_hband())
+        self.assertSeriesClose(self.result["bb_20_middle"], bb.bollinger_mavg())
+        self.assertSeriesClose(self.result["bb_20_lower"], bb.bollinger_lband())
+
+    def test_momentum(self):
+        close = self.df["close"]
+        self.assertSeriesClose(self.result["rsi_14"], RSIIndicator(close, 14).rsi())
+        macd = MACD(close, window_slow=26, window_fast=12, window_sign=9)
+        self.assertSeriesClose(self.result["macd_12_26_9_line"], macd.macd())
+        self.assertSeriesClose(self.result["macd_12_26_9_signal"], macd.macd_signal())
+        self.assertSeriesClose(self.result["macd_12_26_9_histogram"], macd.macd_diff())
+        stoch = StochasticOscillator(self.df["high"], self.df["low"], close, window=14, smooth_window=3)
+        self.assertSeriesClose(self.result["stoch_14_3_k"], stoch.stoch())
+        self.assertSeriesClose(self.result["stoch_14_3_d"], stoch.stoch_signal())
+
+    def test_volatility_and_trend_strength(self):
+        atr = AverageTrueRange(self.df["high"], self.df["low"], self.df["close"], window=14)
+        self.assertSeriesClose(self.result["atr_14"], atr.average_true_range(), first_valid=13)
+
+        adx, plus_di, minus_di = _reference_adx(*(self.df[c].to_numpy() for c in ("high", "low", "close")), 14)
+        self.assertSeriesClose(self.result["adx_14"], adx, first_valid=27)
+        self.assertSeriesClose(self.result["adx_14_plus_di"], plus_di)
+        self.assertSeriesClose(self.result["adx_14_minus_di"], minus_di)
+        valid = self.result["adx_14"].dropna()
+        self.assertTrue(((valid >= 0) & (valid <= 100)).all())
+
+    def test_volume_indicators(self):
+        obv = OnBalanceVolumeIndicator(self.df["close"], self.df["volume"]).on_balance_volume()
+        self.assertSeriesClose(self.result["obv"], obv)
+        vwap = VolumeWeightedAveragePrice(self.df["high"], self.df["low"], self.df["close"], self.df["volume"],
+                                          window=20).volume_weighted_average_price()
+        self.assertSeriesClose(self.result["vwap_20"], vwap)
+
+
+class TestIndicatorEngine(unittest.TestCase):
+
+    def test_intermediates_are_shared(self):
+        engine = IndicatorEngine.from_dataframe(_sample_frame())
+        engine.compute(["ema_12", "ema_26", "macd_12_26_9", "sma_20", "bb_20", "atr_14", "adx_14"])
+        ema_keys = [key for key in engine._cache if key[0] == "ema"]
+        self.assertEqual(sorted(ema_keys), [("ema", 12), ("ema", 26)])  # MACD reuses the ribbon's EMAs
+        self.assertEqual(sum(1 for key in engine._cache if key == ("prefix", "close")), 1)
+        self.assertEqual(sum(1 for key in engine._cache if key == ("true_range",)), 1)
+
+    def test_volume_indicators_skipped_without_volume(self):
+        no_volume = compute_indicators(_sample_frame(volume=False), ["obv", "vwap_20", "ema_8"])
+        self.assertEqual(list(no_volume.columns), ["ema_8"])
+        zero_volume = _sample_frame().assign(volume=0.0)
+        self.assertEqual(list(compute_indicators(zero_volume, ["obv", "ema_8"]).columns), ["ema_8"])
+
+    def test_short_history_is_nan(self):
+        latest = latest_values(_sample_frame(n=10), ["ema_21", "atr_14", "stoch_14_3", "adx_14", "ema_8"])
+        self.assertIsNone(latest["ema_21"])
+        self.assertIsNone(latest["atr_14"])
+        self.assertIsNone(latest["stoch_14_3_d"])
+        self.assertIsNone(latest["adx_14"])
+        self.assertIsInstance(latest["ema_8"], float)
+
+    def test_invalid_specs_and_inputs(self):
+        for spec in ("foo_3", "ema", "macd_12_26", "ema_x", "atr_0"):
+            with self.assertRaises(ValueError):
+                indicator_engine.parse_spec(spec)
+        self.assertTrue(compute_indicators(pd.DataFrame({"close": [1.0, 2.0]})).empty)
+        self.assertTrue(compute_indicators(pd.DataFrame(columns=["high", "low", "close"])).empty)
+        self.assertEqual(latest_values(pd.DataFrame()), {})
+
+    def test_default_pack_uses_config(self):
+        columns = compute_indicators(_sample_frame()).columns
+        expected = [c for spec in indicator_engine.config.INDICATOR_PACK for c in indicator_engine.output_columns(spec)]
+        self.assertEqual(list(columns), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
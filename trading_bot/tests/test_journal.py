@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+
+from trading_bot.data.journal import DecisionJournal, JOURNAL_COLUMNS, decision_records
+
+OUTPUTS = [
+    {"coin_id": "bitcoin", "symbol": "BTC", "signal": "BUY", "latest_price": 60000.0,
+     "decision_factors": ["RSI < 30 (Oversold)", "Positive sentiment supports BUY"]},
+    {"coin_id": "ethereum", "symbol": "ETH", "signal": "HOLD", "latest_price": None, "decision_factors": []},
+    {"symbol": "???"},  # No coin id: not journaled
+]
+
+
+class TestDecisionJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.journal = DecisionJournal(os.path.join(self.tmp_dir.name, "journal.jsonl"))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_records(self):
+        records = decision_records(OUTPUTS, 1_000)
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0], {"ts": 1_000, "coin_id": "bitcoin", "symbol": "BTC", "signal": "BUY",
+                                      "price": 60000.0, "factors": ["RSI < 30 (Oversold)",
+                                                                    "Positive sentiment supports BUY"]})
+        self.assertIsNone(records[1]["price"])
+
+    def test_append_and_load(self):
+        self.assertEqual(self.journal.record(OUTPUTS, timestamp_ms=2_000), 2)
+        self.assertEqual(self.journal.record(OUTPUTS[:1], timestamp_ms=1_000), 1)
+        frame = self.journal.load()
+        self.assertEqual(list(frame.columns), JOURNAL_COLUMNS)
+        self.assertEqual(frame["ts"].tolist(), [1_000, 2_000, 2_000])
+        self.assertEqual(frame["coin_id"].tolist(), ["bitcoin", "bitcoin", "ethereum"])
+        self.assertEqual(frame["factors"].iloc[2], [])
+        self.assertEqual(str(frame["ts"].dtype), "int64")
+
+    def test_truncated_line_is_skipped(self):
+        self.journal.record(OUTPUTS, timestamp_ms=1_000)
+        with open(self.journal.path, "a", encoding="utf-8") as f:
+            f.write('{"ts": 2000, "coin_id": "bit')
+        self.assertEqual(len(self.journal.load()), 2)
+
+    def test_missing_journal_is_empty(self):
+        frame = self.journal.load()
+        self.assertTrue(frame.empty)
+        self.assertEqual(list(frame.columns), JOURNAL_COLUMNS)
+        self.assertEqual(self.journal.record([]), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+from trading_bot.lazy_imports import lazy_import, is_loaded
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+HEAVY_MODULES = ("pandas", "numpy", "ta", "google.generativeai", "google.api_core.exceptions")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+from trading_bot.lazy_imports import is_loaded
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if is_loaded(m)]}}))
+"""
+
+
+def _import_in_subprocess(module: str) -> dict:
+    """Imports a module in a fresh interpreter; returns its import time and which heavy modules got loaded."""
+    result = subprocess.run([sys.executable, "-c", _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                            cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=120, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestLazyImport(unittest.TestCase):
+
+    def test_already_imported_module_is_returned_as_is(self):
+        self.assertIs(lazy_import("json"), json)
+        self.assertTrue(is_loaded("json"))
+
+    def test_missing_module_raises(self):
+        with self.assertRaises(ModuleNotFoundError):
+            lazy_import("trading_bot_no_such_module")
+
+
+class TestImportTime(unittest.TestCase):
+
+    def test_strategy_import_defers_heavy_dependencies(self):
+        probe = _import_in_subprocess("trading_bot.core.strategy")
+        self.assertEqual(probe["loaded"], [])
+        self.assertLess(probe["seconds"], 1.0)  # Eager imports took over a second
+
+    def test_reporter_import_defers_pandas(self):
+        probe = _import_in_subprocess("trading_bot.reporting.telegram_reporter")
+        self.assertEqual(probe["loaded"], [])
+
+    def test_lazy_module_loads_on_first_use(self):
+        code = ("from trading_bot.lazy_imports import lazy_import, is_loaded\n"
+                "pd = lazy_import('pandas')\n"
+                "assert not is_loaded('pandas')\n"
+                "from trading_bot.analysis import technical_indicators as ti\n"
+                "sma = ti.calculate_sma(pd.DataFrame({'close': [1.0, 2.0, 3.0]}), window=2)\n"
+                "assert is_loaded('pandas') and is_loaded('ta')\n"
+                "print(sma.iloc[-1])\n")
+        result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True,
+                                text=True, timeout=120)
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "2.5")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,147 @@
+import math
+import time
+import unittest
+
+import numpy as np
+
+from trading_bot.analysis import market_regime
+from trading_bot.analysis.market_regime import CorrelationTracker, classify_regime
+from trading_bot.core import strategy
+
+
+def _correlated_returns(n_bars, n_assets, drift, market_vol=0.01, noise_vol=0.002, seed=0):
+    rng = np.random.default_rng(seed)
+    market = rng.normal(drift, market_vol, n_bars)
+    return market[:, None] + rng.normal(0, noise_vol, (n_bars, n_assets))
+
+
+def _reference_ew(returns, alpha):
+    """Bar-by-bar EW mean and covariance, written out without the in-place tricks."""
+    n = returns.shape[1]
+    mean, cov = np.zeros(n), np.zeros((n, n))
+    for r in returns:
+        delta = r - mean
+        mean = mean + alpha * delta
+        cov = (1 - alpha) * (cov + alpha * np.outer(delta, delta))
+    return mean, cov
+
+
+class TestCorrelationTracker(unittest.TestCase):
+
+    def test_covariance_matches_reference(self):
+        returns = _correlated_returns(200, 5, 0.0)
+        symbols = [f"c{i}" for i in range(5)]
+        tracker = CorrelationTracker(half_life_bars=30, min_periods=10, initial_capacity=2)  # Forces growth
+        for bar in returns:
+            tracker.update_returns(dict(zip(symbols, bar)))
+
+        mean, cov = _reference_ew(returns, tracker.alpha)
+        np.testing.assert_allclose(tracker.covariance(), cov, rtol=1e-10, atol=1e-15)
+        np.testing.assert_allclose(tracker._mean[:5], mean, rtol=1e-10)
+        std = np.sqrt(np.diag(cov))
+        np.testing.assert_allclose(tracker.correlation(), cov / np.outer(std, std), rtol=1e-10)
+        self.assertAlmostEqual(tracker.alpha, 1 - 0.5 ** (1 / 30))
+
+    def test_average_correlation(self):
+        tracker = CorrelationTracker(half_life_bars=50, min_periods=10)
+        for bar in _correlated_returns(300, 4, 0.0):
+            tracker.update_returns({f"c{i}": value for i, value in enumerate(bar)})
+        corr = tracker.correlation()
+        expected = (corr.sum() - 4) / 12
+        self.assertAlmostEqual(tracker.average_correlation(), expected)
+        self.assertGreater(expected, 0.8)
+
+    def test_missing_symbols_keep_their_statistics(self):
+        tracker = CorrelationTracker(half_life_bars=10, min_periods=1)
+        tracker.update_returns({"a": 0.01, "b": 0.02})
+        before = tracker.covariance(["b"])[0, 0]
+        tracker.update_returns({"a": -0.01, "b": float("nan")})
+        tracker.update_returns({"a": 0.03, "c": 0.01})
+        self.assertEqual(tracker.covariance(["b"])[0, 0], before)
+        self.assertEqual(tracker.symbols, ["a", "b", "c"])
+        self.assertEqual(list(tracker._counts[:3]), [3, 1, 1])
+
+    def test_update_prices_uses_log_returns(self):
+        tracker = CorrelationTracker(half_life_bars=10)
+        self.assertEqual(tracker.update_prices({"a": 100.0, "b": None, "c": 0.0}), {})
+        returns = tracker.update_prices({"a": 110.0, "b": 5.0})
+        self.assertEqual(set(returns), {"a"})
+        self.assertAlmostEqual(returns["a"], math.log(1.1))
+        self.assertEqual(tracker.symbols, ["a", "b"])
+
+    def test_regime_needs_history(self):
+        tracker = CorrelationTracker(half_life_bars=10, min_periods=20)
+        for bar in _correlated_returns(5, 3, 0.0):
+            tracker.update_returns({f"c{i}": value for i, value in enumerate(bar)})
+        regime = tracker.regime()
+        self.assertIsNone(regime["regime"])
+        self.assertIsNone(regime["average_correlation"])
+        self.assertEqual(regime["assets"], 0)
+
+    def test_regimes(self):
+        cases = {market_regime.RISK_ON: 0.01, market_regime.RISK_OFF: -0.01, market_regime.CHOP: 0.0}
+        for expected, drift in cases.items():
+            tracker = CorrelationTracker(half_life_bars=30, min_periods=10)
+            returns = _correlated_returns(120, 6, drift, market_vol=0.01 if drift else 0.0, noise_vol=0.01)
+            for bar in returns:
+                tracker.update_returns({f"c{i}": value for i, value in enumerate(bar)})
+            self.assertEqual(tracker.regime()["regime"], expected, drift)
+
+    def test_round_trip(self):
+        tracker = CorrelationTracker(half_life_bars=10, min_periods=2)
+        for i in range(5):
+            tracker.update_prices({"a": 100.0 + i, "b": 50.0 - i})
+        restored = CorrelationTracker(half_life_bars=10, min_periods=2)
+        restored.load_dict(tracker.to_dict())
+        np.testing.assert_array_equal(restored.covariance(), tracker.covariance())
+        self.assertEqual(restored.regime(), tracker.regime())
+        self.assertEqual(restored.update_prices({"a": 105.0}), tracker.update_prices({"a": 105.0}))
+
+        other = CorrelationTracker(half_life_bars=20)
+        other.load_dict(tracker.to_dict())
+        self.assertEqual(len(other), 0)
+
+    def test_update_speed(self):
+        symbols = [f"c{i}" for i in range(500)]
+        tracker = CorrelationTracker(half_life_bars=48, min_periods=20)
+        bars = _correlated_returns(50, 500, 0.0)
+        start = time.perf_counter()
+        for bar in bars:
+            tracker.update_returns(dict(zip(symbols, bar.tolist())))
+        self.assertLess((time.perf_counter() - start) / len(bars), 0.05)
+
+
+class TestClassifyRegime(unittest.TestCase):
+
+    def test_thresholds(self):
+        self.assertIsNone(classify_regime(None, 0.9))
+        self.assertEqual(classify_regime(2.0, 0.2, trend_threshold=1.5), market_regime.RISK_ON)
+        self.assertEqual(classify_regime(-2.0, None, trend_threshold=1.5), market_regime.RISK_OFF)
+        self.assertEqual(classify_regime(0.5, 0.9, trend_threshold=1.5), market_regime.CHOP)
+
+    def test_correlated_decline_is_risk_off(self):
+        self.assertEqual(classify_regime(-0.5, 0.8, trend_threshold=1.5, high_correlation=0.7),
+                         market_regime.RISK_OFF)
+        self.assertEqual(classify_regime(-0.5, 0.5, trend_threshold=1.5, high_correlation=0.7),
+                         market_regime.CHOP)
+
+
+class TestStrategyRegimeFilter(unittest.TestCase):
+
+    def _decision(self, signal):
+        return {"signal": signal, "decision_factors": []}
+
+    def test_signals_against_the_regime_are_downgraded(self):
+        risk_off, risk_on = {"regime": market_regime.RISK_OFF}, {"regime": market_regime.RISK_ON}
+        for regime, signal, expected in ((risk_off, "BUY", "CONSIDER_BUY"), (risk_off, "CONSIDER_BUY", "HOLD"),
+                                         (risk_off, "SELL", "SELL"), (risk_on, "SELL", "CONSIDER_SELL"),
+                                         (risk_on, "CONSIDER_SELL", "HOLD"), (risk_on, "BUY", "BUY"),
+                                         ({"regime": market_regime.CHOP}, "BUY", "BUY")):
+            decision = self._decision(signal)
+            strategy._apply_market_regime(decision, regime)
+            self.assertEqual(decision["signal"], expected, (regime, signal))
+            self.assertEqual(len(decision["decision_factors"]), int(signal != expected))
+
+
+if __name__ == '__main__':
+    unittest.main()
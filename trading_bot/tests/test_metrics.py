@@ -0,0 +1,106 @@
+import json
+import os
+import tempfile
+import unittest
+import urllib.request
+from unittest.mock import patch, MagicMock
+
+from trading_bot.reporting import metrics
+from trading_bot.analysis import sentiment_analyzer
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        metrics.reset()
+        metrics.enable(True)
+
+    def tearDown(self):
+        metrics.reset()
+        metrics.enable(False)
+
+    def test_disabled_records_nothing(self):
+        metrics.enable(False)
+        with metrics.span("coingecko.get_top_coins"):
+            pass
+        metrics.increment("api_errors_total", endpoint="coins/markets")
+        metrics.observe("strategy_cycle_seconds", 1.0)
+        snap = metrics.snapshot()
+        self.assertEqual(snap["counters"], [])
+        self.assertEqual(snap["histograms"], [])
+        self.assertEqual(snap["recent_spans"], [])
+
+    def test_disabled_span_is_shared_noop(self):
+        metrics.enable(False)
+        self.assertIs(metrics.span("a"), metrics.span("b"))
+
+    def test_span_records_latency_histogram(self):
+        with metrics.span("indicator.rsi", coin="bitcoin"):
+            pass
+        with metrics.span("indicator.rsi", coin="bitcoin"):
+            pass
+        hist = [h for h in metrics.snapshot()["histograms"] if h["name"] == metrics.SPAN_METRIC]
+        self.assertEqual(len(hist), 1)
+        self.assertEqual(hist[0]["count"], 2)
+        self.assertEqual(hist[0]["labels"], {"coin": "bitcoin", "span": "indicator.rsi"})
+        self.assertEqual(len(metrics.snapshot()["recent_spans"]), 2)
+
+    def test_span_counts_errors_and_reraises(self):
+        with self.assertRaises(RuntimeError):
+            with metrics.span("sentiment.analyze"):
+                raise RuntimeError("boom")
+        counters = metrics.snapshot()["counters"]
+        self.assertEqual(counters[0]["name"], metrics.SPAN_ERROR_METRIC)
+        self.assertEqual(counters[0]["value"], 1)
+        self.assertEqual(metrics.snapshot()["recent_spans"][0]["error"], "RuntimeError")
+
+    def test_render_prometheus(self):
+        metrics.increment("api_errors_total", api="coingecko", endpoint="ohlc")
+        metrics.increment("api_errors_total", api="coingecko", endpoint="ohlc")
+        metrics.observe("strategy_cycle_seconds", 0.02)
+        text = metrics.render_prometheus()
+        self.assertIn("# TYPE trading_bot_api_errors_total counter", text)
+        self.assertIn('trading_bot_api_errors_total{api="coingecko",endpoint="ohlc"} 2', text)
+        self.assertIn("# TYPE trading_bot_strategy_cycle_seconds histogram", text)
+        self.assertIn('trading_bot_strategy_cycle_seconds_bucket{le="0.01"} 0', text)
+        self.assertIn('trading_bot_strategy_cycle_seconds_bucket{le="0.025"} 1', text)
+        self.assertIn('trading_bot_strategy_cycle_seconds_bucket{le="+Inf"} 1', text)
+        self.assertIn("trading_bot_strategy_cycle_seconds_count 1", text)
+
+    def test_write_json(self):
+        metrics.increment("signals_total", signal="BUY")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = metrics.write_json(os.path.join(tmp, "metrics.json"))
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        self.assertEqual(data["counters"][0]["labels"], {"signal": "BUY"})
+
+    def test_http_endpoint(self):
+        metrics.increment("signals_total", signal="HOLD")
+        server = metrics.start_http_server(port=0)
+        try:
+            port = server.server_address[1]
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as resp:
+                body = resp.read().decode("utf-8")
+            self.assertIn('trading_bot_signals_total{signal="HOLD"} 1', body)
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics.json", timeout=5) as resp:
+                self.assertEqual(json.loads(resp.read())["counters"][0]["value"], 1)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    @patch('trading_bot.analysis.sentiment_analyzer.genai')
+    def test_sentiment_fallback_is_counted(self, mock_genai):
+        mock_model = MagicMock()
+        mock_model.generate_content.side_effect = Exception("Unexpected error")
+        mock_genai.GenerativeModel.return_value = mock_model
+
+        with patch('trading_bot.analysis.sentiment_analyzer.GEMINI_API_KEY', 'fake_valid_key'):
+            self.assertEqual(sentiment_analyzer.analyze_sentiment_gemini("Some text."), "neutral")
+        counters = metrics.snapshot()["counters"]
+        self.assertEqual(counters, [{"name": "sentiment_fallbacks_total",
+                                     "labels": {"reason": "unexpected_error"}, "value": 1}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+import json
+import threading
+import unittest
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+from trading_bot.api.news_feed import (
+    normalize_url, simhash, hamming_distance, NewsDeduplicator, NewsIndex, NewsSource, NewsIngestor,
+)
+
+UNIVERSE = [
+    {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"},
+    {"id": "ethereum", "symbol": "eth", "name": "Ethereum"},
+    {"id": "solana", "symbol": "sol", "name": "Solana"},
+]
+
+
+def _article(title, url, published_at="2023-10-28T11:00:00Z", snippet=""):
+    return {"title": title, "url": url, "published_at": published_at, "content_snippet": snippet}
+
+
+class _StubNewsAPI:
+    """A local news endpoint honouring If-None-Match and a `from` cursor."""
+
+    def __init__(self):
+        self.articles = []
+        self.requests = []  # (query params, If-None-Match header)
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+                stub.requests.append((params, self.headers.get("If-None-Match")))
+                since = params.get("from", "")
+                articles = [a for a in stub.articles if a["publishedAt"] >= since]
+                etag = f'"{len(stub.articles)}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                data = json.dumps({"status": "ok", "articles": articles}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/everything"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestDeduplication(unittest.TestCase):
+
+    def test_normalize_url(self):
+        self.assertEqual(normalize_url("HTTPS://WWW.Example.com/news/a/?utm_source=tw&id=3&fbclid=x#top"),
+                         "https://example.com/news/a?id=3")
+        self.assertEqual(normalize_url("https://example.com/news/a"), "https://example.com/news/a")
+
+    def test_simhash_near_duplicates_are_close(self):
+        base = "Bitcoin ETF inflows hit a record as institutional demand for spot exposure keeps growing this week"
+        near = base + " says analyst"
+        other = "Solana validators vote on a fee market change that would alter priority fees for transactions"
+        self.assertLessEqual(hamming_distance(simhash(base), simhash(near)), 12)
+        self.assertGreater(hamming_distance(simhash(base), simhash(other)), 12)
+        self.assertEqual(simhash(""), 0)
+
+    def test_url_and_text_duplicates(self):
+        dedup = NewsDeduplicator(max_distance=3)
+        text = "Bitcoin ETF inflows hit a record as institutional demand for spot exposure keeps growing"
+        self.assertTrue(dedup.check_and_add(_article(text, "https://www.example.com/a?utm_medium=x")))
+        self.assertFalse(dedup.check_and_add(_article("Different title", "https://example.com/a/")))
+        self.assertFalse(dedup.check_and_add(_article(text, "https://mirror.example.org/copy")))
+        self.assertTrue(dedup.check_and_add(_article("Ethereum upgrade date set", "https://example.com/b")))
+
+    def test_capacity_forgets_oldest(self):
+        dedup = NewsDeduplicator(capacity=2)
+        for i in range(3):
+            dedup.add(_article(f"Story number {i} about markets", f"https://example.com/{i}"))
+        self.assertFalse(dedup.is_duplicate(_article("unrelated words here", "https://example.com/0")))
+        self.assertTrue(dedup.is_duplicate(_article("x", "https://example.com/2")))
+
+
+class TestNewsIndex(unittest.TestCase):
+
+    def test_articles_are_routed_and_fresh(self):
+        index = NewsIndex(per_coin=3, max_age_hours=24)
+        index.update_universe(UNIVERSE)
+        index.add(_article("Bitcoin and Solana lead gains", "u1", "2023-10-28T10:00:00Z"))
+        index.add(_article("Bitcoin miners sell", "u2", "2023-10-28T12:00:00Z"))
+        index.add(_article("BTC funding turns negative", "u3", "2023-10-28T11:00:00Z"))
+        index.add(_article("Old Bitcoin story", "u4", "2023-10-20T11:00:00Z"))
+        now = datetime(2023, 10, 28, 13, tzinfo=timezone.utc)
+
+        self.assertEqual([a["url"] for a in index.get_articles("bitcoin", now=now)], ["u2", "u3"])
+        self.assertEqual([a["url"] for a in index.get_articles("solana", now=now)], ["u1"])
+        self.assertEqual(index.get_articles("ethereum", now=now), [])
+
+
+class TestNewsPolling(unittest.TestCase):
+
+    def setUp(self):
+        self.stub = _StubNewsAPI()
+        self.source = NewsSource("stub", self.stub.url, params={"q": "crypto"})
+        index = NewsIndex(max_age_hours=0)
+        index.update_universe(UNIVERSE)
+        self.ingestor = NewsIngestor([self.source], index)
+
+    def tearDown(self):
+        self.stub.close()
+
+    def test_incremental_poll_with_cursor_and_etag(self):
+        self.stub.articles = [
+            {"title": "Bitcoin rallies", "url": "https://example.com/1", "publishedAt": "2023-10-28T10:00:00Z",
+             "description": "BTC up", "source": {"name": "Example"}},
+            {"title": "Ethereum gas falls", "url": "https://example.com/2", "publishedAt": "2023-10-28T11:00:00Z",
+             "description": "ETH fees", "source": {"name": "Example"}},
+        ]
+        self.assertEqual(self.ingestor.poll(), 2)
+        self.assertEqual(self.source.cursor, "2023-10-28T11:00:00Z")
+        self.assertEqual(self.ingestor.index.get_articles("bitcoin")[0]["source"], "Example")
+
+        # Unchanged feed: conditional request answered with 304
+        self.assertEqual(self.ingestor.poll(), 0)
+        params, etag = self.stub.requests[-1]
+        self.assertEqual(params["from"], "2023-10-28T11:00:00Z")
+        self.assertEqual(etag, '"2"')
+
+        # New article plus a syndicated copy of an old one
+        self.stub.articles.append({"title": "Solana outage resolved", "url": "https://example.com/3",
+                                   "publishedAt": "2023-10-28T12:00:00Z", "description": "SOL back"})
+        self.stub.articles.append({"title": "Bitcoin rallies", "url": "https://example.com/1?utm_source=feed",
+                                   "publishedAt": "2023-10-28T12:00:00Z", "description": "BTC up"})
+        self.assertEqual(self.ingestor.poll(), 1)
+        self.assertEqual(len(self.ingestor.index.get_articles("bitcoin")), 1)
+        self.assertEqual(len(self.ingestor.index.get_articles("solana")), 1)
+
+    def test_poll_error_returns_nothing(self):
+        source = NewsSource("down", "http://127.0.0.1:1/everything", timeout=1)
+        self.assertEqual(source.fetch(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
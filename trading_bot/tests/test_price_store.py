@@ -0,0 +1,137 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from trading_bot.data.price_store import PriceStore, ingest_from_coingecko
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _ohlc(n, start=1678886400000, base=100.0):
+    return [[start + i * 1800000, base + i, base + i + 1, base + i - 1, base + i + 0.5] for i in range(n)]
+
+
+class TestPriceStore(unittest.TestCase):
+
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".bin")
+        os.close(handle)
+        self.writer = PriceStore.create(self.path, n_slots=4, capacity=8)
+
+    def tearDown(self):
+        self.writer.close()
+        os.remove(self.path)
+
+    def test_reader_sees_writes_without_reopening(self):
+        reader = PriceStore.open(self.path)
+        self.assertIsNone(reader.snapshot("bitcoin"))
+        self.assertTrue(self.writer.write_ohlc("bitcoin", _ohlc(5)))
+        timestamps, ohlc = reader.snapshot("bitcoin")
+        self.assertEqual(timestamps.tolist(), [row[0] for row in _ohlc(5)])
+        self.assertEqual(ohlc[-1].tolist(), [104.0, 105.0, 103.0, 104.5])
+        self.assertEqual(reader.symbols(), ["bitcoin"])
+        self.assertEqual(reader.version, 2)
+
+    def test_view_is_zero_copy(self):
+        self.writer.write_ohlc("bitcoin", _ohlc(3))
+        reader = PriceStore.open(self.path)
+        _, ohlc_view = reader.view("bitcoin")
+        self.assertFalse(ohlc_view.flags.owndata)
+        self.writer.write_ohlc("bitcoin", _ohlc(3, base=200.0))
+        self.assertEqual(ohlc_view[0, 0], 200.0)
+
+    def test_keeps_newest_rows_and_rejects_bad_data(self):
+        self.writer.write_ohlc("bitcoin", list(reversed(_ohlc(12))))
+        self.assertEqual(self.writer.snapshot_ohlc_list("bitcoin"), _ohlc(12)[-8:])
+        self.assertFalse(self.writer.write_ohlc("ethereum", [[1, 2, 3]]))
+        self.assertIsNone(self.writer.slot("ethereum"))
+
+    def test_store_full_and_read_only(self):
+        for i in range(4):
+            self.writer.write_ohlc(f"coin{i}", _ohlc(2))
+        with self.assertRaises(ValueError):
+            self.writer.write_ohlc("coin4", _ohlc(2))
+        with self.assertRaises(PermissionError):
+            PriceStore.open(self.path).write_ohlc("coin0", _ohlc(2))
+
+    def test_open_rejects_foreign_file(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a store" * 10)
+        with self.assertRaises(ValueError):
+            PriceStore.open(self.path)
+
+    def test_snapshot_waits_for_writer(self):
+        self.writer.write_ohlc("bitcoin", _ohlc(3))
+        reader = PriceStore.open(self.path)
+        self.writer._begin_write()  # Simulate a writer stuck mid-update
+        with self.assertRaises(TimeoutError):
+            reader.read_consistent(lambda store: None, max_retries=3)
+
+        timer = threading.Timer(0.05, self.writer._end_write)
+        timer.start()
+        timestamps, _ = reader.snapshot("bitcoin")
+        timer.join()
+        self.assertEqual(len(timestamps), 3)
+        self.assertEqual(reader.version % 2, 0)
+
+    def test_symbol_directory_is_read_under_the_seqlock(self):
+        reader = PriceStore.open(self.path)
+        self.writer._begin_write()
+        self.writer._assign_slot("bitcoin")  # Directory changed mid-write
+        with patch.object(reader, "read_consistent", wraps=reader.read_consistent) as read_consistent:
+            timer = threading.Timer(0.05, self.writer._end_write)
+            timer.start()
+            self.assertEqual(reader.symbols(), ["bitcoin"])
+            timer.join()
+        read_consistent.assert_called_once()
+        self.assertEqual(reader.version % 2, 0)
+
+    def test_concurrent_snapshots_are_never_torn(self):
+        self.writer.write_ohlc("bitcoin", _ohlc(8, base=0.0))
+        reader = PriceStore.open(self.path)
+        stop = threading.Event()
+
+        def write_loop():
+            base = 0.0
+            while not stop.is_set():
+                base += 1000.0
+                self.writer.write_ohlc("bitcoin", _ohlc(8, base=base))
+
+        thread = threading.Thread(target=write_loop)
+        thread.start()
+        try:
+            for _ in range(200):
+                _, ohlc = reader.snapshot("bitcoin")
+                # Every row of a consistent snapshot comes from the same write
+                np.testing.assert_array_equal(ohlc[:, 0] - np.arange(8), np.full(8, ohlc[0, 0]))
+        finally:
+            stop.set()
+            thread.join()
+
+    def test_reader_in_another_process(self):
+        self.writer.write_ohlc("bitcoin", _ohlc(6))
+        code = (
+            "from trading_bot.data.price_store import PriceStore\n"
+            f"ts, ohlc = PriceStore.open({self.path!r}).snapshot('bitcoin')\n"
+            "print(len(ts), ohlc[:, 3].sum())\n"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                cwd=REPO_ROOT, check=True)
+        self.assertEqual(result.stdout.split(), ["6", str(sum(row[4] for row in _ohlc(6)))])
+
+    @patch('trading_bot.api.coingecko.get_historical_ohlc')
+    def test_ingest_from_coingecko(self, mock_ohlc):
+        mock_ohlc.side_effect = lambda coin_id, days: _ohlc(4) if coin_id == "bitcoin" else []
+        self.assertEqual(ingest_from_coingecko(self.writer, ["bitcoin", "ethereum"], days="1"), 1)
+        self.assertEqual(self.writer.symbols(), ["bitcoin"])
+        self.assertEqual(self.writer.version, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+from trading_bot import config
+from trading_bot.api import coingecko, resilience
+from trading_bot.reporting import metrics
+
+OHLC = [[1678886400000 + i * 1800000, 100, 110, 90, 105] for i in range(4)]
+
+
+class _FaultyUpstream:
+    """A local Coingecko stand-in; queued faults are applied to requests in arrival order."""
+
+    def __init__(self):
+        self.faults = []  # ("status", code) or ("delay", seconds)
+        self.request_count = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with stub.lock:
+                    stub.request_count += 1
+                    fault = stub.faults.pop(0) if stub.faults else None
+                status = 200
+                if fault and fault[0] == "delay":
+                    time.sleep(fault[1])
+                elif fault and fault[0] == "status":
+                    status = fault[1]
+                data = json.dumps(OHLC if status == 200 else {"error": "injected"}).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.breaker = resilience.CircuitBreaker("test", failure_threshold=2, recovery_seconds=10,
+                                                 clock=lambda: self.now)
+
+    def test_opens_after_consecutive_failures_and_recovers(self):
+        self.breaker.record_failure()
+        self.breaker.record_success()  # Resets the streak
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, resilience.OPEN)
+        self.assertFalse(self.breaker.allow())
+
+        self.now = 10.0
+        self.assertTrue(self.breaker.allow())  # Single trial request
+        self.assertFalse(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, resilience.CLOSED)
+
+    def test_failed_trial_reopens(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.now = 10.0
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, resilience.OPEN)
+        self.now = 15.0
+        self.assertFalse(self.breaker.allow())
+
+    def test_unexpected_error_during_trial_frees_the_slot(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.now = 10.0
+        with patch.object(resilience, "get_breaker", return_value=self.breaker), \
+                patch.object(resilience, "_timed_get", side_effect=ValueError("bad params")):
+            with self.assertRaises(ValueError):
+                resilience.resilient_get("test", "http://127.0.0.1:1/")
+        self.assertEqual(self.breaker.state, resilience.HALF_OPEN)
+        self.assertTrue(self.breaker.allow())  # The next request gets the trial
+
+
+class TestResilientCoingecko(unittest.TestCase):
+
+    def setUp(self):
+        resilience.reset()
+        metrics.reset()
+        metrics.enable()
+        self.upstream = _FaultyUpstream()
+        patches = [
+            patch.object(coingecko, "COINGECKO_API_URL", self.upstream.url),
+            patch.object(config, "BREAKER_FAILURE_THRESHOLD", 3),
+            patch.object(config, "BREAKER_RECOVERY_SECONDS", 0.2),
+            patch.object(config, "HEDGE_MIN_SAMPLES", 5),
+            patch.object(config, "HEDGE_MIN_DELAY_SECONDS", 0.01),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def tearDown(self):
+        self.upstream.close()
+        metrics.enable(False)
+        metrics.reset()
+        resilience.reset()
+
+    def _counter(self, name, **labels):
+        labels = {k: str(v) for k, v in labels.items()}
+        return sum(c["value"] for c in metrics.snapshot()["counters"]
+                   if c["name"] == name and c["labels"] == labels)
+
+    def test_breaker_fails_fast_then_recovers(self):
+        self.upstream.faults = [("status", 500)] * 3
+        for _ in range(3):
+            self.assertEqual(coingecko.get_historical_ohlc("bitcoin", days="1"), [])
+        self.assertEqual(self.upstream.request_count, 3)
+
+        start = time.perf_counter()
+        self.assertEqual(coingecko.get_historical_ohlc("bitcoin", days="1"), [])
+        self.assertLess(time.perf_counter() - start, 0.05)
+        self.assertEqual(self.upstream.request_count, 3)  # Rejected without a request
+        self.assertEqual(self._counter("breaker_rejections_total", endpoint="coingecko.ohlc"), 1)
+        self.assertEqual(self._counter("api_errors_total", api="coingecko", endpoint="ohlc", kind="circuit_open"), 1)
+
+        time.sleep(0.25)
+        self.assertEqual(coingecko.get_historical_ohlc("bitcoin", days="1"), OHLC)
+        self.assertEqual(resilience.get_breaker("coingecko.ohlc").state, resilience.CLOSED)
+        # Other endpoints have their own breaker
+        self.assertEqual(resilience.get_breaker("coingecko.markets").state, resilience.CLOSED)
+
+    def test_client_errors_do_not_open_breaker(self):
+        self.upstream.faults = [("status", 404)] * 5
+        for _ in range(5):
+            coingecko.get_historical_ohlc("not-a-coin", days="1")
+        self.assertEqual(resilience.get_breaker("coingecko.ohlc").state, resilience.CLOSED)
+        self.assertEqual(self.upstream.request_count, 5)
+
+    def test_network_errors_open_breaker(self):
+        with patch.object(coingecko, "COINGECKO_API_URL", "http://127.0.0.1:1"):
+            for _ in range(4):
+                coingecko.get_top_coins(limit=1)
+        self.assertEqual(resilience.get_breaker("coingecko.markets").state, resilience.OPEN)
+
+    def test_hedged_request_beats_slow_primary(self):
+        with patch.object(config, "HEDGE_OHLC_REQUESTS", True):
+            for _ in range(5):  # Build up a fast latency history
+                self.assertEqual(coingecko.get_historical_ohlc("bitcoin", days="1"), OHLC)
+            self.upstream.faults = [("delay", 1.0)]
+            start = time.perf_counter()
+            self.assertEqual(coingecko.get_historical_ohlc("bitcoin", days="1"), OHLC)
+            elapsed = time.perf_counter() - start
+        self.assertLess(elapsed, 0.8)
+        self.assertEqual(self.upstream.request_count, 7)
+        self.assertEqual(self._counter("hedged_requests_total", endpoint="coingecko.ohlc"), 1)
+        self.assertEqual(self._counter("hedge_wins_total", endpoint="coingecko.ohlc"), 1)
+
+    def test_hedging_waits_for_latency_history(self):
+        with patch.object(config, "HEDGE_OHLC_REQUESTS", True):
+            self.upstream.faults = [("delay", 0.2)]
+            self.assertEqual(coingecko.get_historical_ohlc("bitcoin", days="1"), OHLC)
+        self.assertEqual(self.upstream.request_count, 1)
+
+    def test_hedge_falls_back_to_other_attempt_on_server_error(self):
+        tracker = resilience.get_latency_tracker("stub")
+        for _ in range(5):
+            tracker.record(0.01)
+        self.upstream.faults = [("delay", 0.3), ("status", 503)]
+        response = resilience.resilient_get("stub", f"{self.upstream.url}/coins/bitcoin/ohlc", hedge=True, timeout=5)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(resilience.get_breaker("stub").failures, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from trading_bot.trading import risk
+from trading_bot.reporting import telegram_reporter
+
+RISK_SETTINGS = {
+    "RISK_PER_TRADE": 0.01,
+    "RISK_ATR_STOP_MULTIPLIER": 2.0,
+    "RISK_VOLATILITY_STOP_MULTIPLIER": 3.0,
+    "RISK_REWARD_RATIO": 2.0,
+    "RISK_CONSIDER_SCALE": 0.5,
+    "MAX_POSITION_PCT": 1.0,
+    "MAX_GROSS_EXPOSURE": 10.0,
+    "MAX_NET_EXPOSURE": 10.0,
+}
+
+
+def _flat_tail(close, half_range, rows=15):
+    closes = np.full(rows, float(close))
+    return np.column_stack((closes + half_range, closes - half_range, closes))
+
+
+class TestAverageTrueRange(unittest.TestCase):
+
+    def test_atr_matches_loop_and_is_nan_for_short_history(self):
+        rng = np.random.default_rng(1)
+        close = 100 + np.cumsum(rng.normal(0, 1, 20))
+        tail = np.column_stack((close + rng.uniform(0, 2, 20), close - rng.uniform(0, 2, 20), close))
+
+        atr = risk.average_true_range(risk.stack_price_tails([tail, tail[:5], None], window=14))
+
+        expected = np.mean([max(tail[i, 0] - tail[i, 1], abs(tail[i, 0] - tail[i - 1, 2]),
+                                abs(tail[i, 1] - tail[i - 1, 2])) for i in range(6, 20)])
+        self.assertAlmostEqual(atr[0], expected)
+        self.assertTrue(np.isnan(atr[1]))
+        self.assertTrue(np.isnan(atr[2]))
+
+
+@patch.multiple("trading_bot.trading.risk.config", **RISK_SETTINGS)
+class TestComputeRisk(unittest.TestCase):
+
+    def test_long_and_short_stops_targets_and_sizes(self):
+        result = risk.compute_risk(["BUY", "SELL", "HOLD"], np.array([100.0, 50.0, 10.0]),
+                                   atr=np.array([2.0, 1.0, 1.0]), volatility=np.array([np.nan, 1.0, 1.0]),
+                                   equity=10_000)
+
+        # Long: stop distance = 2 ATR = 4; risking 100 => 25 units
+        self.assertAlmostEqual(result["stop_loss"][0], 96.0)
+        self.assertAlmostEqual(result["take_profit"][0], 108.0)
+        self.assertAlmostEqual(result["position_size"][0], 25.0)
+        # Short: volatility stop (3) beats the ATR stop (2)
+        self.assertAlmostEqual(result["stop_loss"][1], 53.0)
+        self.assertAlmostEqual(result["take_profit"][1], 44.0)
+        self.assertAlmostEqual(result["position_size"][1], 100 / 3)
+        self.assertTrue(np.isnan(result["position_size"][2]))
+        self.assertTrue(np.isnan(result["stop_loss"][2]))
+
+    def test_consider_signals_are_scaled_and_missing_data_is_nan(self):
+        result = risk.compute_risk(["CONSIDER_BUY", "BUY"], np.array([100.0, 100.0]),
+                                   atr=np.array([2.0, np.nan]), volatility=np.array([np.nan, np.nan]),
+                                   equity=10_000)
+        self.assertAlmostEqual(result["position_size"][0], 12.5)
+        self.assertTrue(np.isnan(result["position_size"][1]))
+
+    def test_position_cap_and_lot_rounding(self):
+        with patch("trading_bot.trading.risk.config.MAX_POSITION_PCT", 0.1):
+            result = risk.compute_risk(["BUY", "BUY"], np.array([100.0, 100.0]), atr=np.array([0.5, 10.0]),
+                                       volatility=np.array([np.nan, np.nan]), equity=10_000,
+                                       lot_sizes=np.array([np.nan, 0.3]))
+        self.assertAlmostEqual(result["position_size"][0], 10.0)  # 100 units capped to 10% of equity
+        self.assertAlmostEqual(result["position_size"][1], 4.8)  # 5 units rounded down to 0.3 lots
+        self.assertAlmostEqual(result["position_notional"][1], 480.0)
+
+    def test_gross_and_net_exposure_limits(self):
+        signals = ["BUY", "BUY", "SELL"]
+        prices = np.array([100.0, 100.0, 100.0])
+        atr = np.array([0.5, 0.5, 0.5])  # 100 units = 10,000 notional each before limits
+        nan = np.full(3, np.nan)
+
+        with patch("trading_bot.trading.risk.config.MAX_GROSS_EXPOSURE", 1.5):
+            gross = risk.compute_risk(signals, prices, atr, nan, equity=10_000)
+        self.assertAlmostEqual(np.nansum(gross["position_notional"]), 15_000)
+
+        with patch("trading_bot.trading.risk.config.MAX_NET_EXPOSURE", 0.5):
+            net = risk.compute_risk(signals, prices, atr, nan, equity=10_000)
+        long_notional = net["position_notional"][:2].sum()
+        self.assertAlmostEqual(long_notional - net["position_notional"][2], 5_000)
+        self.assertAlmostEqual(net["position_notional"][2], 10_000)  # Minority side untouched
+
+
+@patch.multiple("trading_bot.trading.risk.config", **RISK_SETTINGS)
+class TestApplyRisk(unittest.TestCase):
+
+    def test_apply_risk_annotates_decisions_and_report(self):
+        decisions = [
+            {"name": "Bitcoin", "symbol": "BTC", "signal": "BUY", "latest_price": 100.0, "volatility": None},
+            {"name": "Ether", "symbol": "ETH", "signal": "HOLD", "latest_price": 50.0, "volatility": 0.1},
+        ]
+        risk.apply_risk(decisions, [_flat_tail(100, 1.0), _flat_tail(50, 0.5)],
+                        lot_sizes=[0.001, None], equity=10_000, window=14)
+
+        self.assertAlmostEqual(decisions[0]["atr"], 2.0)
+        self.assertAlmostEqual(decisions[0]["stop_loss"], 96.0)
+        self.assertAlmostEqual(decisions[0]["take_profit"], 108.0)
+        self.assertAlmostEqual(decisions[0]["position_size"], 25.0)
+        self.assertIsNone(decisions[1]["stop_loss"])
+        self.assertIsNone(decisions[1]["position_size"])
+
+        report = telegram_reporter.format_telegram_report(decisions)
+        self.assertIn("Stop Loss: 96.00", report)
+        self.assertIn("Take Profit: 108.00", report)
+        self.assertIn("Position Size: 25.000000", report)
+        self.assertEqual(report.count("Position Size"), 1)
+
+    def test_apply_risk_handles_empty_batch(self):
+        self.assertEqual(risk.apply_risk([], []), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
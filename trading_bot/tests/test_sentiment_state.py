@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+
+from trading_bot.analysis.sentiment_state import SentimentState
+
+NOW = 1_700_000_000.0
+HOUR = 3600.0
+
+
+class TestSentimentState(unittest.TestCase):
+
+    def setUp(self):
+        self.state = SentimentState(half_life_hours=6, source_weights={"default": 1.0, "reuters": 2.0},
+                                    prior_weight=1.0)
+
+    def test_unknown_coin_is_neutral(self):
+        self.assertEqual(self.state.score("bitcoin", NOW), 0.0)
+        self.assertEqual(self.state.label("bitcoin", NOW), "neutral")
+
+    def test_score_and_source_weights(self):
+        self.state.add("bitcoin", "positive", NOW, source="Reuters", now=NOW)
+        self.state.add("bitcoin", "negative", NOW, source="Some Blog", now=NOW)
+        # (2 - 1) / (3 + prior 1)
+        self.assertAlmostEqual(self.state.score("bitcoin", NOW), 0.25)
+        self.assertAlmostEqual(self.state.weight("bitcoin", NOW), 3.0)
+
+    def test_older_news_weighs_less(self):
+        self.state.add("bitcoin", "negative", NOW - 12 * HOUR, now=NOW)  # Two half-lives old: weight 0.25
+        self.state.add("bitcoin", "positive", NOW, now=NOW)
+        self.assertAlmostEqual(self.state.score("bitcoin", NOW), 0.75 / 2.25)
+
+        # Late arrival (older than the last update) decays to the same result
+        late = SentimentState(half_life_hours=6, source_weights={"default": 1.0}, prior_weight=1.0)
+        late.add("bitcoin", "positive", NOW, now=NOW)
+        late.add("bitcoin", "negative", NOW - 12 * HOUR, now=NOW)
+        self.assertAlmostEqual(late.score("bitcoin", NOW), self.state.score("bitcoin", NOW))
+
+    def test_score_decays_toward_neutral(self):
+        self.state.add("bitcoin", "positive", NOW, now=NOW)
+        self.assertAlmostEqual(self.state.score("bitcoin", NOW), 0.5)
+        self.assertAlmostEqual(self.state.score("bitcoin", NOW + 6 * HOUR), 0.5 / 1.5)
+        self.assertEqual(self.state.label("bitcoin", NOW + 48 * HOUR, threshold=0.15), "neutral")
+
+    def test_articles_counted_once(self):
+        self.assertTrue(self.state.add("bitcoin", "positive", "2023-11-14T22:13:20Z", article_key="u1", now=NOW))
+        self.assertFalse(self.state.add("bitcoin", "positive", "2023-11-14T22:13:20Z", article_key="u1", now=NOW))
+        self.assertFalse(self.state.add("bitcoin", "unknown-label", now=NOW))
+        self.assertTrue(self.state.has_seen("bitcoin", "u1"))
+        self.assertFalse(self.state.has_seen("ethereum", "u1"))
+
+    def test_seen_keys_are_bounded(self):
+        state = SentimentState(half_life_hours=6, max_seen=2)
+        for key in ("a", "b", "c"):
+            state.add("bitcoin", "neutral", NOW, article_key=key, now=NOW)
+        self.assertFalse(state.has_seen("bitcoin", "a"))
+        self.assertTrue(state.has_seen("bitcoin", "c"))
+
+    def test_persistence_round_trip(self):
+        self.state.add("bitcoin", "positive", NOW - HOUR, source="Reuters", article_key="u1", now=NOW)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "sentiment.json")
+            self.state.save(path)
+            restored = SentimentState.load(path, half_life_hours=6, prior_weight=1.0)
+            self.assertAlmostEqual(restored.score("bitcoin", NOW), self.state.score("bitcoin", NOW))
+            self.assertTrue(restored.has_seen("bitcoin", "u1"))
+
+            with open(path, "w") as f:
+                f.write("{not json")
+            self.assertEqual(SentimentState.load(path).score("bitcoin", NOW), 0.0)
+            self.assertEqual(SentimentState.load(os.path.join(tmp, "missing.json")).score("bitcoin", NOW), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
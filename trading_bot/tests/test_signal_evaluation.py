@@ -0,0 +1,138 @@
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from trading_bot.analysis import signal_evaluation
+from trading_bot.analysis.signal_evaluation import (
+    factor_key, forward_returns, evaluate_by_signal, evaluate_by_factor, evaluate_journal, prices_from_candles,
+)
+from trading_bot.data.candles import CandleAggregator
+
+HOUR_MS = 3_600_000
+
+
+def _prices():
+    # bitcoin rises 1% per hour, ethereum falls 2% per hour
+    rows = []
+    for i in range(10):
+        rows.append((i * HOUR_MS, "bitcoin", 100.0 * 1.01 ** i))
+        rows.append((i * HOUR_MS, "ethereum", 50.0 * 0.98 ** i))
+    return pd.DataFrame(rows, columns=["ts", "coin_id", "price"])
+
+
+class TestForwardReturns(unittest.TestCase):
+
+    def test_returns_at_each_horizon(self):
+        signals = pd.DataFrame({"ts": [0, 2 * HOUR_MS, 0], "coin_id": ["bitcoin", "bitcoin", "ethereum"],
+                                "signal": ["BUY", "SELL", "SELL"], "price": [100.0, np.nan, 50.0]})
+        result = forward_returns(signals, _prices(), horizons=["1h", "4h"])
+        np.testing.assert_allclose(result["return_1h"], [0.01, 0.01, -0.02])
+        np.testing.assert_allclose(result["return_4h"], [1.01 ** 4 - 1, 1.01 ** 4 - 1, 0.98 ** 4 - 1])
+        self.assertEqual(result["coin_id"].tolist(), ["bitcoin", "bitcoin", "ethereum"])  # Order kept
+
+    def test_first_price_after_the_horizon_is_used(self):
+        prices = pd.DataFrame({"ts": [0, 90 * 60_000, 200 * 60_000], "coin_id": "bitcoin",
+                               "price": [100.0, 110.0, 120.0]})
+        signals = pd.DataFrame({"ts": [0], "coin_id": ["bitcoin"], "signal": ["BUY"], "price": [100.0]})
+        result = forward_returns(signals, prices, horizons=["1h", "2h", "4h"])
+        self.assertAlmostEqual(result["return_1h"][0], 0.10)  # First price at or after 60 min is at 90 min
+        self.assertAlmostEqual(result["return_2h"][0], 0.20)
+        self.assertTrue(np.isnan(result["return_4h"][0]))  # Not matured yet
+
+    def test_data_gaps_beyond_max_delay_are_nan(self):
+        prices = pd.DataFrame({"ts": [0, 5 * HOUR_MS], "coin_id": "bitcoin", "price": [100.0, 150.0]})
+        signals = pd.DataFrame({"ts": [0], "coin_id": ["bitcoin"], "signal": ["BUY"], "price": [100.0]})
+        self.assertTrue(np.isnan(forward_returns(signals, prices, ["1h"])["return_1h"][0]))
+        self.assertAlmostEqual(forward_returns(signals, prices, ["1h"], max_delay=4)["return_1h"][0], 0.5)
+
+    def test_unknown_coins_and_empty_input(self):
+        signals = pd.DataFrame({"ts": [0], "coin_id": ["solana"], "signal": ["BUY"], "price": [10.0]})
+        self.assertTrue(np.isnan(forward_returns(signals, _prices(), ["1h"])["return_1h"][0]))
+        empty = forward_returns(signals.iloc[:0], _prices(), ["1h"])
+        self.assertIn("return_1h", empty.columns)
+        self.assertTrue(empty.empty)
+
+    def test_prices_from_candles_use_close_time(self):
+        candles = CandleAggregator(timeframes=("1h",), capacity=10)
+        candles.add_candle("bitcoin", 0, 100, 101, 99, 100.5, 1.0, HOUR_MS)
+        prices = prices_from_candles(candles, ["bitcoin", "ethereum"], "1h")
+        self.assertEqual(prices.values.tolist(), [[HOUR_MS, "bitcoin", 100.5]])
+
+
+class TestEvaluation(unittest.TestCase):
+
+    def setUp(self):
+        ts = [i * HOUR_MS for i in range(4)]
+        self.journal = pd.DataFrame({
+            "ts": ts * 2,
+            "coin_id": ["bitcoin"] * 4 + ["ethereum"] * 4,
+            "signal": ["BUY", "CONSIDER_BUY", "SELL", "HOLD", "SELL", "BUY", "SELL", "HOLD"],
+            "price": [np.nan] * 8,
+            "factors": [["RSI < 30 (Oversold)"], ["Funding rate z-score -2.31 (crowded short)"], [], [],
+                        ["RSI > 70 (Overbought)"], ["Funding rate z-score -2.05 (crowded short)"],
+                        ["RSI > 70 (Overbought)"], ["No strong technical or sentiment signals."]],
+        })
+
+    def test_by_signal(self):
+        evaluated = forward_returns(self.journal, _prices(), ["1h", "4h"])
+        summary = evaluate_by_signal(evaluated, ["1h", "4h"])
+        self.assertEqual(list(summary.index.names), ["signal", "horizon"])
+        self.assertEqual(summary.loc[("SELL", "1h"), "signals"], 3)
+        self.assertAlmostEqual(summary.loc[("SELL", "1h"), "hit_rate"], 2 / 3)  # Bitcoin rose after one SELL
+        self.assertAlmostEqual(summary.loc[("BUY", "1h"), "hit_rate"], 0.5)
+        self.assertAlmostEqual(summary.loc[("BUY", "1h"), "mean_return"], (0.01 - 0.02) / 2)
+        self.assertAlmostEqual(summary.loc[("BUY", "1h"), "mean_signed_return"], (0.01 - 0.02) / 2)
+        self.assertAlmostEqual(summary.loc[("SELL", "1h"), "mean_signed_return"], (-0.01 + 0.02 + 0.02) / 3)
+        self.assertTrue(np.isnan(summary.loc[("HOLD", "1h"), "hit_rate"]))
+        self.assertEqual(summary.loc[("HOLD", "1h"), "signals"], 2)
+        self.assertEqual(summary.loc[("BUY", "4h"), "signals"], 2)
+        self.assertEqual([h for s, h in summary.index if s == "BUY"], ["1h", "4h"])
+
+    def test_by_factor_groups_numeric_variants(self):
+        self.assertEqual(factor_key("Funding rate z-score -2.31 (crowded short)"),
+                         "Funding rate z-score # (crowded short)")
+        self.assertEqual(factor_key("RSI < 30 (Oversold)"), "RSI < 30 (Oversold)")
+        summary = evaluate_by_factor(forward_returns(self.journal, _prices(), ["1h"]), ["1h"])
+        funding = summary.loc[("Funding rate z-score # (crowded short)", "1h")]
+        self.assertEqual(funding["signals"], 2)
+        self.assertAlmostEqual(funding["hit_rate"], 0.5)
+        self.assertAlmostEqual(summary.loc[("RSI > 70 (Overbought)", "1h"), "hit_rate"], 1.0)
+        self.assertEqual(len(summary), 4)  # Decisions without factors are not counted
+
+    def test_evaluate_journal_uses_journal_prices(self):
+        journal = self.journal.copy()
+        journal["price"] = _prices().set_index(["ts", "coin_id"]).loc[
+            list(zip(journal["ts"], journal["coin_id"])), "price"].to_numpy()
+        report = evaluate_journal(journal, horizons=["1h"])
+        self.assertEqual(report["decisions"], 8)
+        self.assertAlmostEqual(report["by_signal"].loc[("SELL", "1h"), "hit_rate"], 2 / 3)
+        self.assertEqual(report["by_signal"].loc[("SELL", "1h"), "signals"], 3)
+        self.assertNotIn(("HOLD", "1h"), report["by_signal"].index)  # Both HOLDs are on the last cycle
+
+    def test_million_decisions_in_seconds(self):
+        rng = np.random.default_rng(0)
+        n_coins, n_cycles = 100, 10_000
+        ts = np.repeat(np.arange(n_cycles, dtype=np.int64) * HOUR_MS, n_coins)
+        journal = pd.DataFrame({
+            "ts": ts, "coin_id": np.tile(np.array([f"c{i}" for i in range(n_coins)], dtype=object), n_cycles),
+            "signal": rng.choice(["BUY", "HOLD", "SELL"], len(ts)),
+            "price": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n_cycles, n_coins)), axis=0)).ravel(),
+            "factors": [["MACD line crossed above signal line"]] * len(ts),
+        })
+        start = time.perf_counter()
+        report = evaluate_journal(journal, horizons=["1h", "4h", "1d"])
+        self.assertLess(time.perf_counter() - start, 20.0)
+        self.assertEqual(report["by_signal"].loc[("BUY", "1d"), "signals"] +
+                         report["by_signal"].loc[("SELL", "1d"), "signals"] +
+                         report["by_signal"].loc[("HOLD", "1d"), "signals"], (n_cycles - 24) * n_coins)
+
+    def test_default_horizons_from_config(self):
+        result = forward_returns(self.journal, _prices())
+        for horizon in signal_evaluation.config.SIGNAL_EVAL_HORIZONS:
+            self.assertIn(f"return_{horizon}", result.columns)
+
+
+if __name__ == '__main__':
+    unittest.main()
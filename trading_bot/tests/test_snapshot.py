@@ -0,0 +1,169 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+
+from trading_bot.analysis.market_regime import CorrelationTracker
+from trading_bot.analysis.sentiment_state import SentimentState
+from trading_bot.data import snapshot
+from trading_bot.data.candles import CandleAggregator
+from trading_bot.data.derivatives_store import DerivativesStore
+from trading_bot.reporting.delta_reporter import DeltaReporter
+
+HOUR_MS = 3_600_000
+NOW = 1_699_999_200.0  # Hour-aligned
+NOW_MS = int(NOW * 1000)
+
+
+def _filled_candles(coin_ids=("bitcoin", "ethereum"), hours=48):
+    candles = CandleAggregator(timeframes=("1h", "4h"), capacity=100)
+    start = NOW_MS - hours * HOUR_MS
+    for n, coin_id in enumerate(coin_ids):
+        for i in range(hours):
+            price = 100.0 * (n + 1) + i
+            candles.add_candle(coin_id, start + i * HOUR_MS, price, price + 1, price - 1, price + 0.5, 2.0, HOUR_MS)
+    return candles
+
+
+class TestSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, "state.snapshot")
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_round_trip_restores_all_components(self):
+        candles = _filled_candles()
+        sentiment = SentimentState(half_life_hours=6)
+        sentiment.add("bitcoin", "positive", NOW - 60, source="Reuters", article_key="a", now=NOW)
+        derivatives = DerivativesStore(max_points=50)
+        derivatives.add_funding("BTCUSDT", [{"fundingTime": NOW_MS - i * 8 * HOUR_MS, "fundingRate": "0.0001"}
+                                            for i in range(5)])
+        reporter = DeltaReporter()
+        reporter.load_dict({"cycle": 4, "last_sent": {"bitcoin": {"signal": "BUY"}}})
+        tracker = CorrelationTracker(half_life_bars=10, min_periods=2)
+        for i in range(5):
+            tracker.update_prices({"bitcoin": 100.0 + i, "ethereum": 50.0 + i * i})
+        universe = [{"id": "bitcoin", "symbol": "btc", "name": "Bitcoin"}]
+
+        size = snapshot.save_snapshot(self.path, candles=candles, sentiment_state=sentiment,
+                                      derivatives=derivatives, delta_reporter=reporter,
+                                      correlation_tracker=tracker, universe=universe, now=NOW)
+        self.assertEqual(size, os.path.getsize(self.path))
+
+        state = snapshot.load_snapshot(self.path, now=NOW + 60)
+        restored = (CandleAggregator(timeframes=("1h", "4h"), capacity=100), SentimentState(half_life_hours=6),
+                    DerivativesStore(max_points=50), DeltaReporter(), CorrelationTracker(half_life_bars=10))
+        names = snapshot.restore(state, candles=restored[0], sentiment_state=restored[1],
+                                 derivatives=restored[2], delta_reporter=restored[3],
+                                 correlation_tracker=restored[4])
+
+        self.assertEqual(names, list(snapshot.STATEFUL_COMPONENTS))
+        self.assertEqual(state["saved_at"], NOW)
+        self.assertEqual(state["universe"], universe)
+        for tf in ("1h", "4h"):
+            for coin_id in ("bitcoin", "ethereum"):
+                expected_ts, expected_values = candles.get_arrays(coin_id, tf)
+                ts, values = restored[0].get_arrays(coin_id, tf)
+                np.testing.assert_array_equal(ts, expected_ts)
+                np.testing.assert_array_equal(values, expected_values)
+        self.assertAlmostEqual(restored[1].score("bitcoin", NOW), sentiment.score("bitcoin", NOW))
+        self.assertTrue(restored[1].has_seen("bitcoin", "a"))
+        np.testing.assert_array_equal(restored[2].funding["BTCUSDT"].values, derivatives.funding["BTCUSDT"].values)
+        self.assertEqual(restored[3].cycle, 4)
+        np.testing.assert_array_equal(restored[4].covariance(), tracker.covariance())
+
+    def test_restored_candles_keep_aggregating_and_ignore_old_rows(self):
+        candles = _filled_candles(coin_ids=("bitcoin",), hours=10)
+        snapshot.save_snapshot(self.path, candles=candles, now=NOW)
+        restored = CandleAggregator(timeframes=("1h", "4h"), capacity=100)
+        snapshot.restore(snapshot.load_snapshot(self.path, now=NOW), candles=restored)
+
+        self.assertFalse(restored.add_candle("bitcoin", NOW_MS - 5 * HOUR_MS, 1, 1, 1, 1, 0, HOUR_MS))
+        self.assertTrue(restored.add_candle("bitcoin", NOW_MS, 1, 2, 0.5, 1.5, 0, HOUR_MS))
+        self.assertEqual(restored.candle_count("bitcoin", "1h"), 11)
+
+    def test_capacity_shrink_keeps_newest_candles(self):
+        snapshot.save_snapshot(self.path, candles=_filled_candles(coin_ids=("bitcoin",), hours=48), now=NOW)
+        restored = CandleAggregator(timeframes=("1h",), capacity=10)
+        snapshot.restore(snapshot.load_snapshot(self.path, now=NOW), candles=restored)
+
+        timestamps, _ = restored.get_arrays("bitcoin", "1h")
+        self.assertEqual(len(timestamps), 10)
+        self.assertEqual(timestamps[-1], NOW_MS - HOUR_MS)
+
+    def test_stale_corrupt_and_foreign_files_are_ignored(self):
+        self.assertIsNone(snapshot.load_snapshot(self.path))  # Missing
+
+        snapshot.save_snapshot(self.path, universe=[{"id": "bitcoin"}], now=NOW)
+        self.assertIsNone(snapshot.load_snapshot(self.path, max_age_hours=1, now=NOW + 2 * 3600))
+        self.assertIsNotNone(snapshot.load_snapshot(self.path, max_age_hours=1, now=NOW + 60))
+
+        with open(self.path, "r+b") as f:
+            f.seek(-1, os.SEEK_END)
+            last = f.read(1)
+            f.seek(-1, os.SEEK_END)
+            f.write(bytes([last[0] ^ 0xFF]))
+        self.assertIsNone(snapshot.load_snapshot(self.path, now=NOW))
+
+        with open(self.path, "wb") as f:
+            f.write(b"NOTASNAPSHOT" * 4)
+        self.assertIsNone(snapshot.load_snapshot(self.path, now=NOW))
+        self.assertEqual(snapshot.restore(None, candles=CandleAggregator()), [])
+
+    def test_restore_is_fast(self):
+        coin_ids = [f"coin-{i}" for i in range(50)]
+        snapshot.save_snapshot(self.path, candles=_filled_candles(coin_ids=coin_ids, hours=100), now=NOW)
+
+        start = time.perf_counter()
+        snapshot.restore(snapshot.load_snapshot(self.path, now=NOW),
+                         candles=CandleAggregator(timeframes=("1h", "4h"), capacity=100))
+        self.assertLess(time.perf_counter() - start, 1.0)
+
+    def test_checkpointer_respects_interval(self):
+        checkpointer = snapshot.Checkpointer(self.path, interval_seconds=300)
+        self.assertTrue(checkpointer.maybe_save(now=NOW, universe=[]))
+        self.assertFalse(checkpointer.maybe_save(now=NOW + 100, universe=[]))
+        self.assertTrue(checkpointer.maybe_save(force=True, now=NOW + 100, universe=[]))
+        self.assertTrue(checkpointer.maybe_save(now=NOW + 400, universe=[]))
+
+
+class TestCandleGap(unittest.TestCase):
+
+    def test_gap_days(self):
+        self.assertEqual(snapshot.gap_days(None), 90)
+        self.assertEqual(snapshot.gap_days(NOW_MS - HOUR_MS, NOW_MS), 1)
+        self.assertEqual(snapshot.gap_days(NOW_MS - 50 * HOUR_MS, NOW_MS), 3)
+        self.assertEqual(snapshot.gap_days(NOW_MS - 400 * 24 * HOUR_MS, NOW_MS), 90)
+
+    @patch("trading_bot.data.snapshot.cg_api.get_historical_ohlc")
+    def test_fetch_candle_gap_requests_only_missing_days(self, mock_ohlc):
+        candles = _filled_candles(coin_ids=("bitcoin",), hours=10)
+        # One day of Coingecko OHLC is 30-minute candles stamped with their close time
+        mock_ohlc.return_value = [[NOW_MS + i * HOUR_MS // 2, 1.0, 2.0, 0.5, 1.5] for i in range(-5, 5)]
+
+        ingested = snapshot.fetch_candle_gap(candles, ["bitcoin", "unknown-coin"], timeframe="1h",
+                                             now_ms=NOW_MS + 2 * HOUR_MS)
+
+        mock_ohlc.assert_called_once_with(coin_id="bitcoin", days="1")
+        self.assertEqual(ingested, {"bitcoin": 5})  # Opens from NOW - 30m to NOW + 90m are new
+        self.assertEqual(candles.candle_count("bitcoin", "1h"), 12)
+
+    @patch("trading_bot.data.snapshot.cg_api.get_historical_ohlc")
+    def test_fetch_candle_gap_keeps_a_granularity_that_builds_the_timeframe(self, mock_ohlc):
+        candles = _filled_candles(coin_ids=("bitcoin",), hours=10)
+        mock_ohlc.return_value = [[NOW_MS + i * HOUR_MS // 2, 1.0, 2.0, 0.5, 1.5] for i in range(-5, 5)]
+
+        # A 5-day gap would come back as 4h candles; only the last 2 days of 30m candles build 1h candles
+        snapshot.fetch_candle_gap(candles, ["bitcoin"], timeframe="1h", now_ms=NOW_MS + 5 * 24 * HOUR_MS)
+        mock_ohlc.assert_called_once_with(coin_id="bitcoin", days="2")
+        self.assertEqual(snapshot.fetch_candle_gap(candles, ["bitcoin"], timeframe="5m"), {})  # Finer than any OHLC
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -22,6 +22,13 @@ SAMPLE_NEWS_ARTICLES = [
     {"title": "Bitcoin Surges", "content_snippet": "Bitcoin price is up.", "source": "News1", "url": "url1", "published_at": "date1"},
     {"title": "Ethereum Stable", "content_snippet": "Ethereum holds steady.", "source": "News2", "url": "url2", "published_at": "date2"},
 ]
+# Latest indicator values as returned by the indicator engine
+LATEST_INDICATORS = {
+    "sma_20": 100.0, "rsi_14": 50.0,
+    "bb_20_upper": 110.0, "bb_20_middle": 100.0, "bb_20_lower": 90.0,
+    "macd_12_26_9_line": 1.0, "macd_12_26_9_signal": 0.5, "macd_12_26_9_histogram": 0.5,
+    "atr_14": 2.0,
+}
 
 class TestTradingStrategy(unittest.TestCase):
 
@@ -31,10 +38,7 @@ class TestTradingStrategy(unittest.TestCase):
     @patch('trading_bot.core.strategy.exchange_api.get_recent_trades')
     @patch('trading_bot.core.strategy.exchange_api.get_order_book')
     @patch('trading_bot.core.strategy.sentiment_analyzer.analyze_sentiment_gemini')
-    @patch('trading_bot.core.strategy.ti.calculate_macd')
-    @patch('trading_bot.core.strategy.ti.calculate_bollinger_bands')
-    @patch('trading_bot.core.strategy.ti.calculate_rsi')
-    @patch('trading_bot.core.strategy.ti.calculate_sma')
+    @patch('trading_bot.core.strategy.indicator_engine.latest_values')
     @patch('trading_bot.core.strategy.news_api.get_crypto_news')
     @patch('trading_bot.core.strategy.data_processor.ohlc_list_to_dataframe')
     @patch('trading_bot.core.strategy.cg_api.get_historical_ohlc')
@@ -42,8 +46,7 @@ class TestTradingStrategy(unittest.TestCase):
     @patch('trading_bot.core.strategy.cg_api.get_top_coins')
     def test_run_trading_strategy_successful_flow(
             self, mock_get_top_coins, mock_process_coin_data, mock_get_historical_ohlc,
-            mock_ohlc_list_to_df, mock_get_crypto_news, mock_calc_sma, mock_calc_rsi,
-            mock_calc_bb, mock_calc_macd, mock_analyze_sentiment,
+            mock_ohlc_list_to_df, mock_get_crypto_news, mock_latest_values, mock_analyze_sentiment,
             mock_get_order_book, mock_get_recent_trades, mock_calc_volatility,
             mock_get_open_interest, mock_get_funding_rates):
 
@@ -61,20 +64,7 @@ class TestTradingStrategy(unittest.TestCase):
         mock_get_open_interest.return_value = {"openInterest": "1000", "symbol": "BTCUSDT"}
         mock_get_funding_rates.return_value = [{"fundingRate": "0.0001"}]
 
-        mock_calc_sma.return_value = pd.Series([100.0] * len(SAMPLE_OHLC_DF), index=SAMPLE_OHLC_DF.index)
-        mock_calc_rsi.return_value = pd.Series([50.0] * len(SAMPLE_OHLC_DF), index=SAMPLE_OHLC_DF.index)
-        mock_bb_df = pd.DataFrame({
-            'bb_upper': [110.0] * len(SAMPLE_OHLC_DF),
-            'bb_middle': [100.0] * len(SAMPLE_OHLC_DF),
-            'bb_lower': [90.0] * len(SAMPLE_OHLC_DF)
-        }, index=SAMPLE_OHLC_DF.index)
-        mock_calc_bb.return_value = mock_bb_df
-        mock_macd_df = pd.DataFrame({
-            'macd_line': [1.0] * len(SAMPLE_OHLC_DF),
-            'signal_line': [0.5] * len(SAMPLE_OHLC_DF),
-            'macd_histogram': [0.5] * len(SAMPLE_OHLC_DF)
-        }, index=SAMPLE_OHLC_DF.index)
-        mock_calc_macd.return_value = mock_macd_df
+        mock_latest_values.return_value = LATEST_INDICATORS
 
         # Simulate alternating sentiment for variety
         # 2 coins, 2 articles each = 4 calls
@@ -105,6 +95,10 @@ class TestTradingStrategy(unittest.TestCase):
         self.assertEqual(btc_result['rsi_14'], 50.0)
         self.assertEqual(btc_result['bollinger_bands']['middle'], 100.0)
         self.assertEqual(btc_result['macd']['line'], 1.0)
+        self.assertEqual(btc_result['indicators'], {"atr_14": 2.0}) # Core columns are not repeated in the pack
+        requested = mock_latest_values.call_args[0][1]
+        for spec in strategy.CORE_INDICATORS:
+            self.assertIn(spec, requested) # One engine pass for the core fields and the pack
         self.assertEqual(btc_result['aggregated_sentiment'], 'positive')
         self.assertEqual(btc_result['signal'], 'CONSIDER_BUY')
         self.assertIsNotNone(btc_result['order_book_summary'])
@@ -183,7 +177,7 @@ class TestTradingStrategy(unittest.TestCase):
 
 
     @patch('trading_bot.core.strategy.sentiment_analyzer.analyze_sentiment_gemini')
-    @patch('trading_bot.core.strategy.ti') # Mock the entire ti module
+    @patch('trading_bot.core.strategy.indicator_engine.latest_values')
     @patch('trading_bot.core.strategy.news_api.get_crypto_news')
     @patch('trading_bot.core.strategy.data_processor.ohlc_list_to_dataframe')
     @patch('trading_bot.core.strategy.cg_api.get_historical_ohlc')
@@ -191,7 +185,7 @@ class TestTradingStrategy(unittest.TestCase):
     @patch('trading_bot.core.strategy.cg_api.get_top_coins')
     def test_run_trading_strategy_no_news(
             self, mock_get_top_coins, mock_process_coin_data, mock_get_historical_ohlc,
-            mock_ohlc_list_to_df, mock_get_crypto_news, mock_ti_module, mock_analyze_sentiment):
+            mock_ohlc_list_to_df, mock_get_crypto_news, mock_latest_values, mock_analyze_sentiment):
 
         mock_get_top_coins.return_value = SAMPLE_TOP_COINS_RAW[:1]
         mock_process_coin_data.return_value = SAMPLE_PROCESSED_COINS[:1]
@@ -199,21 +193,8 @@ class TestTradingStrategy(unittest.TestCase):
         mock_ohlc_list_to_df.return_value = SAMPLE_OHLC_DF
         mock_get_crypto_news.return_value = [] # No news articles
 
-        # Mock TI functions to return some valid data so strategy proceeds
-        mock_ti_module.calculate_sma.return_value = pd.Series([100.0] * len(SAMPLE_OHLC_DF), index=SAMPLE_OHLC_DF.index)
-        mock_ti_module.calculate_rsi.return_value = pd.Series([50.0] * len(SAMPLE_OHLC_DF), index=SAMPLE_OHLC_DF.index)
-        mock_bb_df_no_news = pd.DataFrame({
-            'bb_upper': [110.0] * len(SAMPLE_OHLC_DF),
-            'bb_middle': [100.0] * len(SAMPLE_OHLC_DF),
-            'bb_lower': [90.0] * len(SAMPLE_OHLC_DF)
-        }, index=SAMPLE_OHLC_DF.index)
-        mock_ti_module.calculate_bollinger_bands.return_value = mock_bb_df_no_news
-        mock_macd_df_no_news = pd.DataFrame({
-            'macd_line': [1.0] * len(SAMPLE_OHLC_DF),
-            'signal_line': [0.5] * len(SAMPLE_OHLC_DF),
-            'macd_histogram': [0.5] * len(SAMPLE_OHLC_DF)
-        }, index=SAMPLE_OHLC_DF.index)
-        mock_ti_module.calculate_macd.return_value = mock_macd_df_no_news
+        # Valid indicator values so the strategy proceeds
+        mock_latest_values.return_value = LATEST_INDICATORS
 
 
         results = strategy.run_trading_strategy(top_n_coins=1)
@@ -226,7 +207,7 @@ class TestTradingStrategy(unittest.TestCase):
 
 
     @patch('trading_bot.core.strategy.sentiment_analyzer.analyze_sentiment_gemini')
-    @patch('trading_bot.core.strategy.ti')
+    @patch('trading_bot.core.strategy.indicator_engine.latest_values')
     @patch('trading_bot.core.strategy.news_api.get_crypto_news')
     @patch('trading_bot.core.strategy.data_processor.ohlc_list_to_dataframe')
     @patch('trading_bot.core.strategy.cg_api.get_historical_ohlc')
@@ -234,7 +215,7 @@ class TestTradingStrategy(unittest.TestCase):
     @patch('trading_bot.core.strategy.cg_api.get_top_coins')
     def test_run_trading_strategy_indicator_calculation_issues(
             self, mock_get_top_coins, mock_process_coin_data, mock_get_historical_ohlc,
-            mock_ohlc_list_to_df, mock_get_crypto_news, mock_ti_module, mock_analyze_sentiment):
+            mock_ohlc_list_to_df, mock_get_crypto_news, mock_latest_values, mock_analyze_sentiment):
 
         mock_get_top_coins.return_value = SAMPLE_TOP_COINS_RAW[:1]
         mock_process_coin_data.return_value = SAMPLE_PROCESSED_COINS[:1]
@@ -242,11 +223,8 @@ class TestTradingStrategy(unittest.TestCase):
         mock_ohlc_list_to_df.return_value = SAMPLE_OHLC_DF # Valid DF initially
         mock_get_crypto_news.return_value = [] # No news to simplify
 
-        # Simulate indicator functions returning empty Series/DataFrames
-        mock_ti_module.calculate_sma.return_value = pd.Series(dtype=float)
-        mock_ti_module.calculate_rsi.return_value = pd.Series(dtype=float)
-        mock_ti_module.calculate_bollinger_bands.return_value = pd.DataFrame()
-        mock_ti_module.calculate_macd.return_value = pd.DataFrame()
+        # Simulate the indicator engine producing nothing (e.g. missing high/low columns)
+        mock_latest_values.return_value = {}
 
         results = strategy.run_trading_strategy(top_n_coins=1)
         self.assertEqual(len(results), 1)
@@ -257,5 +235,171 @@ class TestTradingStrategy(unittest.TestCase):
         self.assertIsNone(btc_result['macd'])
         self.assertEqual(btc_result['signal'], 'HOLD') # Should default to HOLD if no indicators
 
+    @patch('trading_bot.core.strategy.sentiment_analyzer.analyze_sentiment_gemini')
+    @patch('trading_bot.core.strategy.news_api.get_crypto_news')
+    @patch('trading_bot.core.strategy.cg_api.get_historical_ohlc')
+    @patch('trading_bot.core.strategy.data_processor.process_coin_data')
+    @patch('trading_bot.core.strategy.cg_api.get_top_coins')
+    def test_run_trading_strategy_uses_aggregated_candles(
+            self, mock_get_top_coins, mock_process_coin_data, mock_get_historical_ohlc,
+            mock_get_crypto_news, mock_analyze_sentiment):
+        from trading_bot import config
+        from trading_bot.data.candles import CandleAggregator, timeframe_to_ms
+
+        mock_get_top_coins.return_value = SAMPLE_TOP_COINS_RAW[:1]
+        mock_process_coin_data.return_value = SAMPLE_PROCESSED_COINS[:1]
+        mock_get_crypto_news.return_value = []
+
+        candles = CandleAggregator(timeframes=(config.DATA_INTERVAL,), capacity=200)
+        step = timeframe_to_ms(config.DATA_INTERVAL)
+        for i in range(60):
+            candles.add_candle("bitcoin", 1678886400000 + i * step, 100 + i, 101 + i, 99 + i, 100.5 + i)
+
+        results = strategy.run_trading_strategy(top_n_coins=1, candles=candles)
+        mock_get_historical_ohlc.assert_not_called()
+        self.assertEqual(results[0]['latest_price'], 159.5)
+        self.assertAlmostEqual(results[0]['sma_20'], 150.0) # Mean of the last 20 closes
+        self.assertAlmostEqual(results[0]['bollinger_bands']['middle'], results[0]['sma_20'])
+        self.assertEqual(results[0]['rsi_14'], 100.0) # Closes only rise
+        self.assertNotIn('sma_20', results[0]['indicators'])
+        self.assertAlmostEqual(results[0]['indicators']['atr_14'], 2.0)
+        self.assertIsNotNone(results[0]['indicators']['ema_55'])
+        self.assertNotIn('obv', results[0]['indicators']) # Candles built from OHLC carry no volume
+
+    @patch('trading_bot.core.strategy.sentiment_analyzer.analyze_sentiment_gemini')
+    @patch('trading_bot.core.strategy.news_api.get_crypto_news')
+    @patch('trading_bot.core.strategy.cg_api.get_historical_ohlc')
+    @patch('trading_bot.core.strategy.data_processor.process_coin_data')
+    @patch('trading_bot.core.strategy.cg_api.get_top_coins')
+    def test_run_trading_strategy_updates_correlation_tracker(
+            self, mock_get_top_coins, mock_process_coin_data, mock_get_historical_ohlc,
+            mock_get_crypto_news, mock_analyze_sentiment):
+        from trading_bot.analysis.market_regime import CorrelationTracker
+
+        mock_process_coin_data.return_value = SAMPLE_PROCESSED_COINS
+        mock_get_historical_ohlc.return_value = []
+        mock_get_crypto_news.return_value = []
+
+        tracker = CorrelationTracker(half_life_bars=5, min_periods=3)
+        for i in range(6): # A correlated sell-off across the fetched universe
+            mock_get_top_coins.return_value = [dict(coin, current_price=coin["current_price"] * 0.97 ** i)
+                                               for coin in SAMPLE_TOP_COINS_RAW]
+            results = strategy.run_trading_strategy(top_n_coins=2, correlation_tracker=tracker)
+
+        self.assertEqual(tracker.symbols, ["bitcoin", "ethereum"])
+        self.assertEqual(tracker.market_count, 5)
+        self.assertEqual([r['market_regime'] for r in results], ['risk_off', 'risk_off'])
+        self.assertIsNone(strategy.run_trading_strategy(top_n_coins=2)[0]['market_regime'])
+
+    @patch('trading_bot.core.strategy.sentiment_analyzer.analyze_sentiment_gemini')
+    @patch('trading_bot.core.strategy.news_api.get_crypto_news')
+    @patch('trading_bot.core.strategy.cg_api.get_historical_ohlc')
+    @patch('trading_bot.core.strategy.data_processor.process_coin_data')
+    @patch('trading_bot.core.strategy.cg_api.get_top_coins')
+    def test_run_trading_strategy_reads_news_index(
+            self, mock_get_top_coins, mock_process_coin_data, mock_get_historical_ohlc,
+            mock_get_crypto_news, mock_analyze_sentiment):
+        from trading_bot.api.news_feed import NewsIndex
+
+        mock_get_top_coins.return_value = SAMPLE_TOP_COINS_RAW
+        mock_process_coin_data.return_value = SAMPLE_PROCESSED_COINS
+        mock_get_historical_ohlc.return_value = []
+        mock_analyze_sentiment.return_value = "positive"
+
+        news_index = NewsIndex(max_age_hours=0)
+        results_before_news = strategy.run_trading_strategy(top_n_coins=2, news_index=news_index)
+        self.assertEqual(len(results_before_news), 2)
+        news_index.add({"title": "Bitcoin hits new high", "url": "https://example.com/btc",
+                        "published_at": "2023-10-28T11:00:00Z", "content_snippet": "BTC rallies."})
+
+        mock_get_historical_ohlc.return_value = SAMPLE_OHLC_LIST
+        results = strategy.run_trading_strategy(top_n_coins=2, news_index=news_index)
+        mock_get_crypto_news.assert_not_called()
+        self.assertEqual(results[0]['news_articles_analyzed'], 1)
+        self.assertEqual(results[0]['aggregated_sentiment'], 'positive')
+        self.assertEqual(results[1]['news_articles_analyzed'], 0)
+
+    @patch('trading_bot.core.strategy.sentiment_analyzer.analyze_sentiment_gemini')
+    @patch('trading_bot.core.strategy.news_api.get_crypto_news')
+    @patch('trading_bot.core.strategy.cg_api.get_historical_ohlc')
+    @patch('trading_bot.core.strategy.data_processor.process_coin_data')
+    @patch('trading_bot.core.strategy.cg_api.get_top_coins')
+    def test_run_trading_strategy_uses_sentiment_state(
+            self, mock_get_top_coins, mock_process_coin_data, mock_get_historical_ohlc,
+            mock_get_crypto_news, mock_analyze_sentiment):
+        from trading_bot.analysis.sentiment_state import SentimentState
+
+        mock_get_top_coins.return_value = SAMPLE_TOP_COINS_RAW[:1]
+        mock_process_coin_data.return_value = SAMPLE_PROCESSED_COINS[:1]
+        mock_get_historical_ohlc.return_value = SAMPLE_OHLC_LIST
+        mock_get_crypto_news.return_value = SAMPLE_NEWS_ARTICLES
+        mock_analyze_sentiment.return_value = "positive"
+
+        state = SentimentState(half_life_hours=6, source_weights={"default": 1.0}, prior_weight=1.0)
+        results = strategy.run_trading_strategy(top_n_coins=1, sentiment_state=state)
+        self.assertEqual(mock_analyze_sentiment.call_count, 2)
+        self.assertEqual(results[0]['aggregated_sentiment'], 'positive')
+        self.assertGreater(results[0]['sentiment_score'], 0.5)
+
+        # The same articles next cycle are not re-analyzed
+        results = strategy.run_trading_strategy(top_n_coins=1, sentiment_state=state)
+        self.assertEqual(mock_analyze_sentiment.call_count, 2)
+        self.assertEqual(results[0]['aggregated_sentiment'], 'positive')
+
+    @patch('trading_bot.core.strategy.exchange_api.get_open_interest')
+    @patch('trading_bot.core.strategy.news_api.get_crypto_news')
+    @patch('trading_bot.core.strategy.cg_api.get_historical_ohlc')
+    @patch('trading_bot.core.strategy.data_processor.process_coin_data')
+    @patch('trading_bot.core.strategy.cg_api.get_top_coins')
+    def test_run_trading_strategy_uses_derivatives_store(
+            self, mock_get_top_coins, mock_process_coin_data, mock_get_historical_ohlc,
+            mock_get_crypto_news, mock_get_open_interest):
+        from trading_bot.data.derivatives_store import DerivativesStore
+
+        mock_get_top_coins.return_value = SAMPLE_TOP_COINS_RAW[:1]
+        mock_process_coin_data.return_value = SAMPLE_PROCESSED_COINS[:1]
+        mock_get_historical_ohlc.return_value = SAMPLE_OHLC_LIST
+        mock_get_crypto_news.return_value = []
+
+        store = DerivativesStore()
+        rates = [0.0001, 0.0001, 0.0002, 0.0001, 0.0002, 0.0001, 0.0009]
+        store.add_funding("BTCUSDT", [{"fundingTime": 1678886400000 + i * 28800000, "fundingRate": str(r)}
+                                      for i, r in enumerate(rates)])
+        with patch.object(store, 'backfill') as mock_backfill:
+            results = strategy.run_trading_strategy(top_n_coins=1, derivatives=store)
+        mock_backfill.assert_called_once_with(["BTCUSDT"])
+        mock_get_open_interest.assert_not_called()
+        self.assertAlmostEqual(results[0]['funding_rate'], 0.0009)
+        self.assertIsNone(results[0]['open_interest'])
+        self.assertTrue(any(f.startswith("Funding rate z-score") and "crowded longs" in f
+                            for f in results[0]['decision_factors']))
+
+    @patch('trading_bot.core.strategy.exchange_api.get_funding_rates')
+    @patch('trading_bot.core.strategy.exchange_api.get_open_interest')
+    @patch('trading_bot.core.strategy.news_api.get_crypto_news')
+    @patch('trading_bot.core.strategy.cg_api.get_historical_ohlc')
+    @patch('trading_bot.core.strategy.data_processor.process_coin_data')
+    @patch('trading_bot.core.strategy.cg_api.get_top_coins')
+    def test_run_trading_strategy_skips_coins_without_market(
+            self, mock_get_top_coins, mock_process_coin_data, mock_get_historical_ohlc,
+            mock_get_crypto_news, mock_get_open_interest, mock_get_funding_rates):
+        from trading_bot.data.symbol_registry import SymbolRegistry
+
+        mock_get_top_coins.return_value = SAMPLE_TOP_COINS_RAW
+        mock_process_coin_data.return_value = SAMPLE_PROCESSED_COINS
+        mock_get_historical_ohlc.return_value = SAMPLE_OHLC_LIST
+        mock_get_crypto_news.return_value = []
+        mock_get_open_interest.return_value = {"openInterest": "1"}
+        mock_get_funding_rates.return_value = []
+
+        registry = SymbolRegistry(quote_asset="USDT", overrides={})
+        registry.spot = {"BTC": {"symbol": "BTCUSDT", "tick_size": 0.01, "lot_size": 0.00001, "min_qty": 0.00001}}
+        registry.perp = {"BTC": {"symbol": "BTCUSDT", "tick_size": 0.1, "lot_size": 0.001, "min_qty": 0.001}}
+
+        results = strategy.run_trading_strategy(top_n_coins=2, symbol_registry=registry)
+        self.assertEqual([r['coin_id'] for r in results], ['bitcoin'])
+        mock_get_historical_ohlc.assert_called_once_with(coin_id='bitcoin', days='90')
+        mock_get_open_interest.assert_called_once_with(symbol='BTCUSDT')
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,100 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+from trading_bot.data.symbol_registry import SymbolRegistry
+
+SPOT_INFO = {"symbols": [
+    {"symbol": "BTCUSDT", "status": "TRADING", "baseAsset": "BTC", "quoteAsset": "USDT",
+     "filters": [{"filterType": "PRICE_FILTER", "tickSize": "0.01"},
+                 {"filterType": "LOT_SIZE", "stepSize": "0.00001", "minQty": "0.00001"}]},
+    {"symbol": "ETHBTC", "status": "TRADING", "baseAsset": "ETH", "quoteAsset": "BTC", "filters": []},
+    {"symbol": "LUNAUSDT", "status": "BREAK", "baseAsset": "LUNA", "quoteAsset": "USDT", "filters": []},
+    {"symbol": "POLUSDT", "status": "TRADING", "baseAsset": "POL", "quoteAsset": "USDT", "filters": []},
+]}
+FUTURES_INFO = {"symbols": [
+    {"symbol": "BTCUSDT", "status": "TRADING", "baseAsset": "BTC", "quoteAsset": "USDT",
+     "contractType": "PERPETUAL", "filters": [{"filterType": "PRICE_FILTER", "tickSize": "0.1"}]},
+    {"symbol": "BTCUSDT_240628", "status": "TRADING", "baseAsset": "BTC", "quoteAsset": "USDT",
+     "contractType": "CURRENT_QUARTER", "filters": []},
+]}
+
+
+def _exchange_info(market):
+    return SPOT_INFO if market == "spot" else FUTURES_INFO
+
+
+class TestSymbolRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmp.name, "exchange_info.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _registry(self, **kwargs):
+        return SymbolRegistry(cache_path=self.cache_path, refresh_hours=24, quote_asset="USDT",
+                              overrides={"matic-network": "POL"}, **kwargs)
+
+    @patch('trading_bot.data.symbol_registry.exchange_api.get_exchange_info', side_effect=_exchange_info)
+    def test_resolve_spot_and_perp(self, mock_info):
+        registry = self._registry().load()
+        btc = registry.resolve({"id": "bitcoin", "symbol": "btc"})
+        self.assertEqual(btc["spot"], {"symbol": "BTCUSDT", "tick_size": 0.01, "lot_size": 0.00001, "min_qty": 0.00001})
+        self.assertEqual(btc["perp"]["symbol"], "BTCUSDT")
+        self.assertEqual(btc["perp"]["tick_size"], 0.1)
+        self.assertIsNone(registry.resolve({"id": "ethereum", "symbol": "eth"}))  # Only a BTC-quoted pair
+        self.assertIsNone(registry.resolve({"id": "terra-luna", "symbol": "luna"}))  # Not trading
+        self.assertEqual(registry.resolve({"id": "matic-network", "symbol": "matic"})["spot"]["symbol"], "POLUSDT")
+
+    @patch('trading_bot.data.symbol_registry.exchange_api.get_exchange_info', side_effect=_exchange_info)
+    def test_annotate_drops_unmapped(self, mock_info):
+        registry = self._registry().load()
+        coins = registry.annotate([
+            {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin", "trading_pair_spot": "BTCUSDT"},
+            {"id": "tether", "symbol": "usdt", "name": "Tether", "trading_pair_spot": "USDTUSDT"},
+            {"id": "matic-network", "symbol": "matic", "name": "Polygon", "trading_pair_spot": "MATICUSDT"},
+        ])
+        self.assertEqual([c["id"] for c in coins], ["bitcoin", "matic-network"])
+        self.assertEqual(coins[1]["trading_pair_spot"], "POLUSDT")
+        self.assertIsNone(coins[1]["trading_pair_perp"])
+        self.assertEqual(coins[0]["lot_size"], 0.00001)
+
+    @patch('trading_bot.data.symbol_registry.exchange_api.get_exchange_info', side_effect=_exchange_info)
+    def test_disk_cache_and_refresh_interval(self, mock_info):
+        self._registry().load()
+        self.assertEqual(mock_info.call_count, 2)
+
+        cached = self._registry().load()  # Fresh cache: no exchange call
+        self.assertEqual(mock_info.call_count, 2)
+        self.assertEqual(cached.resolve({"id": "bitcoin", "symbol": "btc"})["spot"]["symbol"], "BTCUSDT")
+
+        with open(self.cache_path) as f:
+            data = json.load(f)
+        data["fetched_at"] = time.time() - 25 * 3600
+        with open(self.cache_path, "w") as f:
+            json.dump(data, f)
+        self._registry().load()  # Stale cache: refetched
+        self.assertEqual(mock_info.call_count, 4)
+
+    @patch('trading_bot.data.symbol_registry.exchange_api.get_exchange_info')
+    def test_failed_refresh_keeps_stale_cache(self, mock_info):
+        mock_info.side_effect = _exchange_info
+        registry = self._registry().load()
+        registry.fetched_at -= 48 * 3600
+        mock_info.side_effect = lambda market: {"error": "down"}
+        registry.load()
+        self.assertIsNotNone(registry.resolve({"id": "bitcoin", "symbol": "btc"}))
+
+    def test_placeholder_exchange_info(self):
+        registry = self._registry().load()
+        self.assertIsNotNone(registry.resolve({"id": "cardano", "symbol": "ada"})["spot"])
+        self.assertIsNone(registry.resolve({"id": "cardano", "symbol": "ada"})["perp"])
+
+
+if __name__ == '__main__':
+    unittest.main()
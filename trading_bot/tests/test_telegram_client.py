@@ -0,0 +1,215 @@
+import asyncio
+import json
+import re
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from trading_bot.reporting.delta_reporter import DeltaReporter
+from trading_bot.reporting.telegram_client import TelegramClient, send_telegram_report_async
+from trading_bot.reporting.telegram_reporter import (
+    CONTINUATION_HEADER, split_telegram_report, format_telegram_report,
+)
+
+
+class _StubBotAPI:
+    """A local stand-in for api.telegram.org that records sendMessage calls."""
+
+    def __init__(self):
+        self.received = []  # (path, payload)
+        self.responses = []  # Queue of (status, body) to return before succeeding
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                with stub.lock:
+                    stub.received.append((self.path, payload))
+                    status, body = stub.responses.pop(0) if stub.responses else (
+                        200, {"ok": True, "result": {"message_id": len(stub.received),
+                                                     "chat": {"id": payload.get("chat_id")}}})
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _coin(i):
+    return {"coin_id": f"coin{i}", "symbol": f"c{i}", "name": f"Coin {i}", "latest_price": float(i),
+            "rsi_14": 50.0, "decision_factors": ["No strong technical or sentiment signals."],
+            "signal": "HOLD"}
+
+
+class TestTelegramClient(unittest.TestCase):
+
+    def setUp(self):
+        self.stub = _StubBotAPI()
+
+    def tearDown(self):
+        self.stub.close()
+
+    def _client(self, **kwargs):
+        params = dict(bot_token="TESTTOKEN", api_url=self.stub.url, messages_per_second=0,
+                      per_chat_interval=0, max_retries=2, backoff=0.01, timeout=5)
+        params.update(kwargs)
+        return TelegramClient(**params)
+
+    def test_split_report_respects_limit_and_coin_boundaries(self):
+        coins = [_coin(i) for i in range(100)]
+        messages = split_telegram_report(coins, max_length=4096)
+        self.assertGreater(len(messages), 1)
+        for message in messages:
+            self.assertLessEqual(len(message), 4096)
+            self.assertEqual(message.count("<b>"), message.count("</b>"))
+        joined = "".join(messages)
+        for i in range(100):
+            self.assertEqual(joined.count(f"<b>{i + 1}. Coin {i} (C{i})</b>"), 1)
+
+    def test_split_report_oversized_section(self):
+        coin = _coin(0)
+        coin["decision_factors"] = [f"<b>Factor {i}</b> with a long explanation" for i in range(300)]
+        messages = split_telegram_report([coin, coin, _coin(2)], max_length=4096)
+        self.assertGreater(len(messages), 3)
+        for message in messages:
+            self.assertLessEqual(len(message), 4096)
+            self.assertEqual(message.count("<b>"), message.count("</b>"))
+            self.assertEqual(message.count("<"), message.count(">"))  # No tag cut in half
+        self.assertLess(len(messages[-1]), 4096 - 300)  # The last coin packed after the second's tail
+        self.assertIn("Coin 2 (C2)", messages[-1])
+        # Cuts may fall between words and reopen tags; the text itself must survive
+        bodies = [message.replace(CONTINUATION_HEADER, "") for message in messages]
+        text = re.sub(r"<[^>]+>|[\s,]", "", "".join(bodies))
+        for i in range(300):
+            self.assertEqual(text.count(f"Factor{i}withalongexplanation"), 2)
+
+    def test_split_report_single_message_matches_full_report(self):
+        coins = [_coin(i) for i in range(2)]
+        self.assertEqual(split_telegram_report(coins), [format_telegram_report(coins)])
+        self.assertEqual(split_telegram_report([]), [format_telegram_report([])])
+
+    def test_send_message_success(self):
+        client = self._client()
+        try:
+            result = asyncio.run(client.send_message("42", "<b>hello</b>"))
+        finally:
+            client.close()
+        self.assertEqual(result["message_id"], 1)
+        path, payload = self.stub.received[0]
+        self.assertEqual(path, "/botTESTTOKEN/sendMessage")
+        self.assertEqual(payload["chat_id"], "42")
+        self.assertEqual(payload["parse_mode"], "HTML")
+
+    def test_retries_server_errors_and_rate_limits(self):
+        self.stub.responses = [
+            (500, {"ok": False, "description": "Internal Server Error"}),
+            (429, {"ok": False, "description": "Too Many Requests", "parameters": {"retry_after": 0}}),
+        ]
+        client = self._client()
+        try:
+            result = asyncio.run(client.send_message("42", "retry me"))
+        finally:
+            client.close()
+        self.assertIsNotNone(result)
+        self.assertEqual(len(self.stub.received), 3)
+
+    def test_gives_up_after_max_retries(self):
+        self.stub.responses = [(502, {"ok": False})] * 3
+        client = self._client(max_retries=2)
+        try:
+            result = asyncio.run(client.send_message("42", "fail"))
+        finally:
+            client.close()
+        self.assertIsNone(result)
+        self.assertEqual(len(self.stub.received), 3)
+
+    def test_client_errors_are_not_retried(self):
+        self.stub.responses = [(400, {"ok": False, "description": "Bad Request: chat not found"})]
+        client = self._client()
+        try:
+            result = asyncio.run(client.send_message("missing", "hi"))
+        finally:
+            client.close()
+        self.assertIsNone(result)
+        self.assertEqual(len(self.stub.received), 1)
+
+    def test_report_delivery_keeps_order_per_chat(self):
+        coins = [_coin(i) for i in range(60)]
+        expected = split_telegram_report(coins)
+        client = self._client(max_concurrency=4)
+
+        async def run():
+            async with client:
+                return await send_telegram_report_async(coins, chat_ids=["1", "2"], client=client)
+
+        results = asyncio.run(run())
+        self.assertEqual(set(results), {"1", "2"})
+        self.assertTrue(all(r is not None for r in results["1"] + results["2"]))
+        for chat_id in ("1", "2"):
+            texts = [p["text"] for _, p in self.stub.received if p["chat_id"] == chat_id]
+            self.assertEqual(texts, expected)
+
+    def test_delta_report_sends_only_changes(self):
+        reporter = DeltaReporter(full_summary_every=0)
+        client = self._client()
+
+        async def run(coins):
+            async with client:
+                return await send_telegram_report_async(coins, chat_ids=["1"], client=client,
+                                                        delta_reporter=reporter)
+
+        first = asyncio.run(run([_coin(1), _coin(2)]))
+        self.assertEqual(len(first["1"]), 1)
+        self.assertIn("<b>Trading Update</b>", self.stub.received[0][1]["text"])
+        self.assertEqual(asyncio.run(run([_coin(1), _coin(2)])), {})
+        self.assertEqual(len(self.stub.received), 1)
+
+    def test_failed_delta_report_is_sent_again(self):
+        reporter = DeltaReporter(full_summary_every=0)
+        client = self._client(max_retries=0)
+        self.stub.responses = [(400, {"ok": False, "description": "Bad Request"})]
+
+        async def run(coins):
+            async with client:
+                return await send_telegram_report_async(coins, chat_ids=["1"], client=client,
+                                                        delta_reporter=reporter)
+
+        self.assertEqual(asyncio.run(run([_coin(1)])), {"1": [None]})
+        self.assertEqual((reporter.cycle, reporter.last_sent), (0, {}))
+        second = asyncio.run(run([_coin(1)]))  # Delivered this time
+        self.assertIsNotNone(second["1"][0])
+        self.assertEqual(self.stub.received[0][1]["text"], self.stub.received[1][1]["text"])
+        self.assertEqual(reporter.cycle, 1)
+        self.assertIn("coin1", reporter.last_sent)
+
+    def test_rate_limiter_spaces_messages_per_chat(self):
+        client = self._client(per_chat_interval=0.05)
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            async with client:
+                await client.send_messages("7", ["a", "b", "c"])
+            return loop.time() - start
+
+        elapsed = asyncio.run(run())
+        self.assertGreaterEqual(elapsed, 0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+"""
+Stops, targets and position sizes for a batch of signals.
+
+Everything is computed on arrays with one row per coin:
+    stop distance  = max(ATR * RISK_ATR_STOP_MULTIPLIER, volatility * RISK_VOLATILITY_STOP_MULTIPLIER)
+    stop loss      = entry -/+ stop distance (long/short)
+    take profit    = entry +/- stop distance * RISK_REWARD_RATIO
+    position size  = equity * RISK_PER_TRADE / stop distance   (x RISK_CONSIDER_SCALE for CONSIDER_*)
+Sizes are then capped per position, scaled down to the portfolio's gross and
+net exposure limits, and rounded down to the exchange lot size.
+"""
+from __future__ import annotations
+
+from typing import List, Dict, Any, Sequence
+
+from trading_bot import config
+from trading_bot.lazy_imports import lazy_import
+
+np = lazy_import("numpy")
+
+SIGNAL_DIRECTION = {"BUY": 1.0, "CONSIDER_BUY": 1.0, "SELL": -1.0, "CONSIDER_SELL": -1.0}
+CONSIDER_SIGNALS = {"CONSIDER_BUY", "CONSIDER_SELL"}  # Sized at config.RISK_CONSIDER_SCALE
+
+
+def stack_price_tails(price_tails: Sequence[np.ndarray | None], window: int) -> np.ndarray:
+    """
+    Right-aligns the last window+1 (high, low, close) rows of each coin.
+
+    Args:
+        price_tails: Per coin, an (n, 3) array of high, low, close (or None).
+        window: ATR window.
+
+    Returns:
+        An (n_coins, window + 1, 3) array, NaN where a coin has less history.
+    """
+    stacked = np.full((len(price_tails), window + 1, 3), np.nan)
+    for i, tail in enumerate(price_tails):
+        if tail is None or not len(tail):
+            continue
+        tail = np.asarray(tail, dtype=np.float64)[-(window + 1):, :3]
+        stacked[i, window + 1 - len(tail):] = tail
+    return stacked
+
+
+def average_true_range(stacked: np.ndarray) -> np.ndarray:
+    """
+    Simple-average true range over the stacked window for every coin.
+
+    Args:
+        stacked: Output of stack_price_tails.
+
+    Returns:
+        ATR per coin; NaN if a coin lacks a full window.
+    """
+    high, low, close = stacked[:, 1:, 0], stacked[:, 1:, 1], stacked[:, 1:, 2]
+    prev_close = stacked[:, :-1, 2]
+    true_range = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return true_range.mean(axis=1)  # NaN propagates for short histories
+
+
+def compute_risk(signals: Sequence[str], entry_prices: np.ndarray, atr: np.ndarray, volatility: np.ndarray,
+                 equity: float | None = None, lot_sizes: np.ndarray | None = None) -> Dict[str, np.ndarray]:
+    """
+    Vectorized stops, targets and sizes for a batch of signals.
+
+    Args:
+        signals: Signal per coin (BUY, CONSIDER_BUY, HOLD, CONSIDER_SELL, SELL).
+        entry_prices: Entry (latest) price per coin.
+        atr: ATR per coin, in price units (NaN if unknown).
+        volatility: Short-term price standard deviation per coin (NaN if unknown).
+        equity: Account equity in quote currency. Defaults to config.ACCOUNT_EQUITY.
+        lot_sizes: Exchange lot size per coin (NaN for no rounding).
+
+    Returns:
+        Arrays keyed stop_loss, take_profit, position_size (units) and
+        position_notional; NaN for HOLD signals or coins without a usable
+        stop distance.
+    """
+    equity = config.ACCOUNT_EQUITY if equity is None else equity
+    n = len(signals)
+    entry = np.asarray(entry_prices, dtype=np.float64)
+    direction = np.fromiter((SIGNAL_DIRECTION.get(s, 0.0) for s in signals), dtype=np.float64, count=n)
+    scale = np.fromiter((config.RISK_CONSIDER_SCALE if s in CONSIDER_SIGNALS else 1.0 for s in signals),
+                        dtype=np.float64, count=n)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stop_distance = np.fmax(np.asarray(atr, dtype=np.float64) * config.RISK_ATR_STOP_MULTIPLIER,
+                                np.asarray(volatility, dtype=np.float64) * config.RISK_VOLATILITY_STOP_MULTIPLIER)
+        valid = (direction != 0) & (stop_distance > 0) & (entry > 0)
+        stop_distance = np.where(valid, stop_distance, np.nan)
+
+        stop_loss = entry - direction * stop_distance
+        take_profit = entry + direction * stop_distance * config.RISK_REWARD_RATIO
+        stop_loss = np.where(stop_loss > 0, stop_loss, np.nan)
+
+        size = equity * config.RISK_PER_TRADE * scale / stop_distance
+        size = np.minimum(size, equity * config.MAX_POSITION_PCT / entry)  # Per-position notional cap
+
+        notional = np.nan_to_num(size * entry)
+        gross = notional.sum()
+        if gross > equity * config.MAX_GROSS_EXPOSURE:
+            size *= equity * config.MAX_GROSS_EXPOSURE / gross
+            notional = np.nan_to_num(size * entry)
+        net = float((notional * direction).sum())
+        if abs(net) > equity * config.MAX_NET_EXPOSURE:
+            # Scale down only the dominant side until the net limit holds
+            side = np.sign(net)
+            side_total = notional[direction == side].sum()
+            reduction = (abs(net) - equity * config.MAX_NET_EXPOSURE) / side_total
+            size = np.where(direction == side, size * (1 - reduction), size)
+
+        if lot_sizes is not None:
+            lots = np.asarray(lot_sizes, dtype=np.float64)
+            has_lot = lots > 0
+            rounded = np.floor(size / np.where(has_lot, lots, 1.0) + 1e-9) * lots
+            size = np.where(has_lot, rounded, size)
+        size = np.where(valid & (size > 0), size, np.nan)
+
+    return {
+        "stop_loss": np.where(valid, stop_loss, np.nan),
+        "take_profit": np.where(valid, take_profit, np.nan),
+        "position_size": size,
+        "position_notional": size * entry,
+    }
+
+
+def _none_if_nan(value: float) -> float | None:
+    return None if np.isnan(value) else float(value)
+
+
+def apply_risk(decision_data_list: List[Dict[str, Any]], price_tails: Sequence[np.ndarray | None],
+               lot_sizes: Sequence[float | None] | None = None, equity: float | None = None,
+               window: int | None = None) -> List[Dict[str, Any]]:
+    """
+    Adds stop_loss, take_profit, position_size and position_notional to each coin.
+
+    Args:
+        decision_data_list: coin_decision_data dictionaries (updated in place).
+        price_tails: Per coin, the recent (high, low, close) rows it was analyzed
+                     on, or None; aligned with decision_data_list.
+        lot_sizes: Per coin exchange lot size, or None.
+        equity: Account equity. Defaults to config.ACCOUNT_EQUITY.
+        window: ATR window. Defaults to config.RISK_ATR_WINDOW.
+
+    Returns:
+        The same list, for chaining.
+    """
+    if not decision_data_list:
+        return decision_data_list
+    window = window or config.RISK_ATR_WINDOW
+    atr = average_true_range(stack_price_tails(price_tails, window))
+
+    def _floats(key):
+        return np.array([np.nan if d.get(key) is None else float(d[key]) for d in decision_data_list])
+
+    lots = None if lot_sizes is None else np.array([np.nan if v is None else float(v) for v in lot_sizes])
+    risk = compute_risk([d.get("signal", "HOLD") for d in decision_data_list], _floats("latest_price"),
+                        atr, _floats("volatility"), equity=equity, lot_sizes=lots)
+    for i, data in enumerate(decision_data_list):
+        data["atr"] = _none_if_nan(atr[i])
+        for key, values in risk.items():
+            data[key] = _none_if_nan(values[i])
+    return decision_data_list
+
+
+if __name__ == '__main__':
+    import time
+
+    rng = np.random.default_rng(0)
+    n_coins = 500
+    closes = 100 + np.cumsum(rng.normal(0, 1, (n_coins, 30)), axis=1)
+    tails = [np.column_stack((c + 1, c - 1, c)) for c in closes]
+    signals = rng.choice(["BUY", "CONSIDER_BUY", "HOLD", "CONSIDER_SELL", "SELL"], n_coins).tolist()
+    batch = [{"signal": s, "latest_price": c[-1], "volatility": 0.5} for s, c in zip(signals, closes)]
+
+    start = time.perf_counter()
+    apply_risk(batch, tails, lot_sizes=[0.001] * n_coins, equity=100_000)
+    elapsed = time.perf_counter() - start
+    print(f"{n_coins} coins in {elapsed * 1000:.2f} ms ({elapsed / n_coins * 1e6:.1f} us/coin)")
+    print({k: batch[0][k] for k in ("signal", "latest_price", "atr", "stop_loss", "take_profit", "position_size")})